@@ -0,0 +1,102 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Measure the cost of L{twisted.internet.tcp.Port.doRead} accepting a storm of
+loopback connections which are all waiting in the listen queue at once.
+"""
+
+import socket
+import sys
+import time
+
+from twisted.internet import tcp
+from twisted.internet.protocol import Protocol, ServerFactory
+
+
+class FakeReactor:
+    """
+    Just enough of a reactor for a port and connections driven by hand.
+    """
+
+    def addReader(self, reader):
+        pass
+
+    def removeReader(self, reader):
+        pass
+
+    def addWriter(self, writer):
+        pass
+
+    def removeWriter(self, writer):
+        pass
+
+    def callLater(self, delay, f, *args, **kwargs):
+        pass
+
+
+class Discard(Protocol):
+    def dataReceived(self, data):
+        pass
+
+
+def storm(interface, connections, rounds):
+    """
+    Connect C{connections} clients to a port all at once and time how long it
+    takes the port to accept them, C{rounds} times.
+    """
+    factory = ServerFactory.forProtocol(Discard)
+    factory.noisy = False
+    port = tcp.Port(0, factory, connections, interface, FakeReactor())
+    port.startListening()
+    address = port.socket.getsockname()
+    family = port.socket.family
+
+    elapsed = 0.0
+    for _ in range(rounds):
+        clients = []
+        for _ in range(connections):
+            client = socket.socket(family, socket.SOCK_STREAM)
+            client.setblocking(False)
+            client.connect_ex(address)
+            clients.append(client)
+
+        accepted = []
+
+        def buildProtocol(addr):
+            protocol = Discard()
+            accepted.append(protocol)
+            return protocol
+
+        factory.buildProtocol = buildProtocol
+        before = time.perf_counter()
+        while len(accepted) < connections:
+            port.doRead()
+        elapsed += time.perf_counter() - before
+
+        for client in clients:
+            client.close()
+        for protocol in accepted:
+            protocol.transport.socket.close()
+    port.socket.close()
+    return elapsed
+
+
+def main(args):
+    connections = int(args[0]) if args else 1000
+    rounds = int(args[1]) if len(args) > 1 else 20
+    for interface in ("127.0.0.1", "::1"):
+        elapsed = storm(interface, connections, rounds)
+        print(
+            "{:<9} {} x {} connections: {:.3f}s ({:.1f}us/accept)".format(
+                interface,
+                rounds,
+                connections,
+                elapsed,
+                elapsed / (rounds * connections) * 1e6,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
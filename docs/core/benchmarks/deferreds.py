@@ -2,14 +2,17 @@
 # See LICENSE for details.
 
 """
-See how fast deferreds are.
+See how fast deferreds are: creating and firing them, running long and short
+callback chains before and after they have a result, callbacks which return
+other L{Deferred}s or raise exceptions, and L{defer.inlineCallbacks} and
+coroutines waiting on L{Deferred}s.
 
-This is mainly useful to compare cdefer.Deferred to defer.Deferred
+Usage: deferreds.py [name ...] to run only the benchmarks with those names.
 """
 
+import sys
 
 from twisted.internet import defer
-from twisted.python.compat import range
 from timer import timeit
 
 benchmarkFuncs = []
@@ -176,14 +179,175 @@ def pauseUnpause(n):
 pauseUnpause = benchmarkNFunc(20, ns)(pauseUnpause)
 
 
-def benchmark():
+def succeedAddCallback():
     """
-    Run all of the benchmarks registered in the benchmarkFuncs list
+    Add a single callback to an already fired deferred, the most common use
+    of a L{Deferred} when a result is available straight away.
+    """
+    defer.succeed(1).addCallback(lambda result: result)
+
+
+succeedAddCallback = benchmarkFunc(100000)(succeedAddCallback)
+
+
+def singleCallbackThenFire():
+    """
+    Add a single callback to a deferred and then fire it.
+    """
+    d = defer.Deferred()
+    d.addCallback(lambda result: result)
+    d.callback(1)
+
+
+singleCallbackThenFire = benchmarkFunc(100000)(singleCallbackThenFire)
+
+
+def callbacksReturningFiredDeferreds(n):
+    """
+    Fire a chain of the given number of callbacks, each of which returns an
+    already fired L{Deferred}.
+    """
+    d = defer.Deferred()
+    for i in range(n):
+        d.addCallback(defer.succeed)
+    d.callback(1)
+
+
+callbacksReturningFiredDeferreds = benchmarkNFunc(20, ns)(
+    callbacksReturningFiredDeferreds
+)
+
+
+def errorsHandled(n):
+    """
+    Fire a chain of the given number of callbacks which raise an exception,
+    each followed by an errback which handles it.
+    """
+    d = defer.Deferred()
+
+    def raiser(result):
+        raise ValueError(result)
+
+    def handler(reason):
+        return 1
+
+    for i in range(n):
+        d.addCallback(raiser)
+        d.addErrback(handler)
+    d.callback(1)
+
+
+errorsHandled = benchmarkNFunc(20, [10, 1000])(errorsHandled)
+
+
+@defer.inlineCallbacks
+def _nestedInlineCallbacks(depth):
+    result = yield defer.succeed(depth)
+    if depth:
+        result = yield _nestedInlineCallbacks(depth - 1)
+    return result
+
+
+def inlineCallbacksDepth(n):
+    """
+    Call an L{defer.inlineCallbacks} function which yields an already fired
+    L{Deferred} and then calls itself, to the given depth.
+    """
+    _nestedInlineCallbacks(n)
+
+
+inlineCallbacksDepth = benchmarkNFunc(1000, [1, 10, 100])(inlineCallbacksDepth)
+
+
+@defer.inlineCallbacks
+def _yieldMany(deferreds):
+    for d in deferreds:
+        yield d
+
+
+def inlineCallbacksFired(n):
+    """
+    Yield the given number of already fired L{Deferred}s from an
+    L{defer.inlineCallbacks} function.
+    """
+    _yieldMany([defer.succeed(i) for i in range(n)])
+
+
+inlineCallbacksFired = benchmarkNFunc(20, ns)(inlineCallbacksFired)
+
+
+def inlineCallbacksUnfired(n):
+    """
+    Yield the given number of L{Deferred}s from an L{defer.inlineCallbacks}
+    function, firing each after it has been yielded.
+    """
+    deferreds = [defer.Deferred() for i in range(n)]
+    _yieldMany(deferreds)
+    for d in deferreds:
+        d.callback(None)
+
+
+inlineCallbacksUnfired = benchmarkNFunc(20, ns)(inlineCallbacksUnfired)
+
+
+async def _awaitMany(deferreds):
+    for d in deferreds:
+        await d
+
+
+def coroutineAwaitFired(n):
+    """
+    Await the given number of already fired L{Deferred}s from a coroutine run
+    with L{defer.ensureDeferred}.
+    """
+    defer.ensureDeferred(_awaitMany([defer.succeed(i) for i in range(n)]))
+
+
+coroutineAwaitFired = benchmarkNFunc(20, ns)(coroutineAwaitFired)
+
+
+def coroutineAwaitUnfired(n):
+    """
+    Await the given number of L{Deferred}s from a coroutine run with
+    L{defer.ensureDeferred}, firing each after it has been awaited.
+    """
+    deferreds = [defer.Deferred() for i in range(n)]
+    defer.ensureDeferred(_awaitMany(deferreds))
+    for d in deferreds:
+        d.callback(None)
+
+
+coroutineAwaitUnfired = benchmarkNFunc(20, ns)(coroutineAwaitUnfired)
+
+
+async def _nestedCoroutines(depth):
+    result = await defer.succeed(depth)
+    if depth:
+        result = await defer.ensureDeferred(_nestedCoroutines(depth - 1))
+    return result
+
+
+def coroutineDepth(n):
+    """
+    Run a coroutine with L{defer.ensureDeferred} which awaits an already
+    fired L{Deferred} and then runs itself, to the given depth.
+    """
+    defer.ensureDeferred(_nestedCoroutines(n))
+
+
+coroutineDepth = benchmarkNFunc(1000, [1, 10, 100])(coroutineDepth)
+
+
+def benchmark(names=()):
+    """
+    Run all of the benchmarks registered in the benchmarkFuncs list, or only
+    those with the given names.
     """
     print(defer.Deferred.__module__)
     for func, args, iter in benchmarkFuncs:
-        print(func.__name__, args, timeit(func, iter, *args))
+        if not names or func.__name__ in names:
+            print(func.__name__, args, timeit(func, iter, *args))
 
 
 if __name__ == "__main__":
-    benchmark()
+    benchmark(sys.argv[1:])
@@ -0,0 +1,56 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Measure how fast L{twisted.names.cache.CacheResolver} caches entries and
+answers lookups from them, both of every entry in turn and of the most popular
+hundred, and how many timed calls it leaves on the reactor, which is not run.
+
+Usage: dnscache.py [entries]
+"""
+
+import sys
+import time
+
+from twisted.internet import reactor
+from twisted.names import dns
+from twisted.names.cache import CacheResolver
+
+
+def main(args):
+    entries = int(args[0]) if args else 50000
+    resolver = CacheResolver(maxEntries=entries)
+    names = [b"host%d.example.com" % (i,) for i in range(entries)]
+    payloads = [
+        (
+            [
+                dns.RRHeader(
+                    name, dns.A, dns.IN, 300 + i % 600, dns.Record_A("127.0.0.1")
+                )
+            ],
+            [],
+            [],
+        )
+        for i, name in enumerate(names)
+    ]
+
+    start = time.perf_counter()
+    for name, payload in zip(names, payloads):
+        resolver.cacheResult(dns.Query(name, dns.A, dns.IN), payload)
+    cached = time.perf_counter()
+    for name in names:
+        resolver.lookupAddress(name)
+    looked = time.perf_counter()
+    popular = names[:100] * (entries // 100)
+    for name in popular:
+        resolver.lookupAddress(name)
+    end = time.perf_counter()
+
+    print("cache   {:>10.0f} entries/s".format(entries / (cached - start)))
+    print("lookup  {:>10.0f} lookups/s".format(entries / (looked - cached)))
+    print("popular {:>10.0f} lookups/s".format(len(popular) / (end - looked)))
+    print("timed calls: {}".format(len(reactor.getDelayedCalls())))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
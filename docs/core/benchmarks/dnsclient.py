@@ -0,0 +1,66 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Measure how many lookups a second L{twisted.names.client.Resolver} makes of a
+local server which answers every query at once, with a new port for every
+query and with a pool of long-lived ports.
+
+Usage: dnsclient.py [lookups [concurrency]]
+"""
+
+import sys
+import time
+
+from twisted.internet import defer, protocol, task
+from twisted.names import client, dns
+
+
+class Answerer(protocol.DatagramProtocol):
+    """
+    Answer every query with an empty response.
+    """
+
+    def datagramReceived(self, data, address):
+        message = dns.Message()
+        message.fromStr(data)
+        message.answer = 1
+        self.transport.write(message.toStr(), address)
+
+
+@defer.inlineCallbacks
+def benchmark(server, lookups, concurrency, portPoolSize):
+    """
+    Make C{lookups} lookups, C{concurrency} at a time.
+
+    @return: A L{Deferred} which fires with the lookups made a second.
+    """
+    resolver = client.Resolver(servers=[server], portPoolSize=portPoolSize)
+    names = iter([b"host%d.example.com" % (i,) for i in range(lookups)])
+
+    @defer.inlineCallbacks
+    def worker():
+        for name in names:
+            yield resolver.lookupAddress(name)
+
+    start = time.perf_counter()
+    yield defer.gatherResults([worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - start
+    yield resolver.stopListening()
+    return lookups / elapsed
+
+
+@defer.inlineCallbacks
+def main(reactor, args):
+    lookups = int(args[0]) if args else 20000
+    concurrency = int(args[1]) if len(args) > 1 else 100
+    port = reactor.listenUDP(0, Answerer(), interface="127.0.0.1")
+    server = ("127.0.0.1", port.getHost().port)
+    for name, portPoolSize in [("per-query", 0), ("pool of 16", 16)]:
+        rate = yield benchmark(server, lookups, concurrency, portPoolSize)
+        print("{:<12} {:>10.0f} lookups/s".format(name, rate))
+    yield port.stopListening()
+
+
+if __name__ == "__main__":
+    task.react(main, [sys.argv[1:]])
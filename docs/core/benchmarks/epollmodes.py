@@ -0,0 +1,154 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Compare the epoll reactor's level-triggered and edge-triggered modes, counting
+the C{epoll_ctl(2)} and C{epoll_wait(2)} calls each makes for every message,
+on two workloads over loopback TCP:
+
+  - echo: many connections each sending a small message back and forth.
+  - http: many connections each sending batches of pipelined HTTP requests
+    to a twisted.web server.
+
+Usage: epollmodes.py [connections [seconds]]
+"""
+
+import sys
+
+from twisted.internet.epollreactor import EPollReactor
+from twisted.internet.protocol import ClientFactory, Factory, Protocol
+from twisted.web.resource import Resource
+from twisted.web.server import Site
+
+MESSAGE = b"x" * 64
+
+PIPELINED = 8
+REQUEST = b"GET / HTTP/1.1\r\nHost: localhost\r\n\r\n"
+RESPONSE_START = b"HTTP/1.1 200 OK\r\n"
+
+
+class Echo(Protocol):
+    def dataReceived(self, data):
+        self.transport.write(data)
+
+
+class PingPong(Protocol):
+    """
+    Send a message, and send it again whenever all of it has come back.
+    """
+
+    def connectionMade(self):
+        self.received = 0
+        self.transport.write(MESSAGE)
+
+    def dataReceived(self, data):
+        self.received += len(data)
+        if self.received >= len(MESSAGE):
+            self.received -= len(MESSAGE)
+            self.factory.messages += 1
+            self.transport.write(MESSAGE)
+
+
+class Hello(Resource):
+    isLeaf = True
+
+    def render_GET(self, request):
+        return b"hello"
+
+
+class PipeliningClient(Protocol):
+    """
+    Send a batch of pipelined requests, and another whenever the responses
+    to all of them have come back.
+    """
+
+    def connectionMade(self):
+        self.buffer = b""
+        self.outstanding = 0
+        self.sendBatch()
+
+    def sendBatch(self):
+        self.outstanding = PIPELINED
+        self.transport.write(REQUEST * PIPELINED)
+
+    def dataReceived(self, data):
+        self.buffer += data
+        # Every response ends with its five byte body.
+        responses = self.buffer.count(RESPONSE_START)
+        if responses and self.buffer.endswith(b"hello"):
+            self.buffer = b""
+            self.outstanding -= responses
+            self.factory.messages += responses
+            if self.outstanding <= 0:
+                self.sendBatch()
+
+
+class CountingFactory(ClientFactory):
+    noisy = False
+    messages = 0
+
+
+def echoServer(reactor):
+    factory = Factory.forProtocol(Echo)
+    factory.noisy = False
+    return factory, PingPong
+
+
+def httpServer(reactor):
+    site = Site(Hello(), reactor=reactor)
+    site.noisy = False
+    site.log = lambda request: None
+    return site, PipeliningClient
+
+
+WORKLOADS = [("echo", echoServer), ("http", httpServer)]
+
+
+def benchmark(reactor, makeServer, connections, duration):
+    """
+    Run C{connections} connections of a workload on C{reactor} for
+    C{duration} seconds.
+
+    @return: A tuple of the number of messages exchanged per second, and the
+        numbers of C{epoll_ctl} and C{epoll_wait} calls made per message.
+    """
+    server, protocol = makeServer(reactor)
+    port = reactor.listenTCP(0, server, backlog=connections, interface="127.0.0.1")
+    client = CountingFactory()
+    client.protocol = protocol
+    for _ in range(connections):
+        reactor.connectTCP("127.0.0.1", port.getHost().port, client)
+
+    def start():
+        client.messages = 0
+        reactor._controlCalls = reactor._waitCalls = 0
+        reactor.callLater(duration, reactor.stop)
+
+    # Give the connections a moment to be established before counting.
+    reactor.callLater(0.5, start)
+    reactor.run(installSignalHandlers=False)
+    messages = max(client.messages, 1)
+    return (
+        client.messages / duration,
+        reactor._controlCalls / messages,
+        reactor._waitCalls / messages,
+    )
+
+
+def main(args):
+    connections = int(args[0]) if args else 100
+    duration = float(args[1]) if len(args) > 1 else 5.0
+    for workload, makeServer in WORKLOADS:
+        for mode, edgeTriggered in [("level", False), ("edge", True)]:
+            reactor = EPollReactor(edgeTriggered=edgeTriggered)
+            rate, control, wait = benchmark(reactor, makeServer, connections, duration)
+            print(
+                "{:<4} {:<5} {:>8.0f} messages/s  {:.2f} epoll_ctl/message"
+                "  {:.2f} epoll_wait/message".format(
+                    workload, mode, rate, control, wait
+                )
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
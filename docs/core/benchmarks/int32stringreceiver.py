@@ -0,0 +1,74 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Measure how long an L{Int32StringReceiver} takes to receive one large string
+delivered in small reads, and many small strings delivered in one read.
+
+Usage: int32stringreceiver.py [megabytes]
+"""
+
+import struct
+import sys
+import time
+
+from twisted.protocols.basic import Int32StringReceiver
+
+
+class CollectingReceiver(Int32StringReceiver):
+    MAX_LENGTH = 2 ** 31
+
+    def __init__(self):
+        self.strings = []
+        self.stringReceived = self.strings.append
+
+
+def frame(string):
+    return struct.pack("!I", len(string)) + string
+
+
+def receive(chunks):
+    """
+    Deliver C{chunks} to a new receiver.
+
+    @return: The CPU time taken, and the strings received.
+    """
+    p = CollectingReceiver()
+    dataReceived = p.dataReceived
+    before = time.process_time()
+    for chunk in chunks:
+        dataReceived(chunk)
+    after = time.process_time()
+    return after - before, p.strings
+
+
+def largeString(size, readSize):
+    data = frame(b"x" * size)
+    chunks = [data[n : n + readSize] for n in range(0, len(data), readSize)]
+    elapsed, strings = receive(chunks)
+    assert strings == [b"x" * size]
+    print(
+        "one {} byte string in {} byte reads: {:.3f}s CPU".format(
+            size, readSize, elapsed
+        )
+    )
+
+
+def smallStrings(count, size):
+    data = frame(b"x" * size) * count
+    elapsed, strings = receive([data])
+    assert len(strings) == count
+    print("{} {} byte strings in one read: {:.3f}s CPU".format(count, size, elapsed))
+
+
+def main(args):
+    megabytes = int(args[0]) if args else 1
+    size = megabytes * 2 ** 20
+    for readSize in 1, 16, 4096:
+        largeString(size, readSize)
+    for count in 10000, 100000:
+        smallStrings(count, 10)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,6 +1,5 @@
 import time
 
-from twisted.python.compat import range
 from twisted.protocols import basic
 
 
@@ -23,9 +22,9 @@ def benchmark(chunkSize, lineLength, numLines):
     assert b"".join(chunks) == bytes, (chunks, bytes)
     p = CollectingLineReceiver()
 
-    before = time.clock()
+    before = time.process_time()
     deliver(p, chunks)
-    after = time.clock()
+    after = time.process_time()
 
     assert bytes.splitlines() == p.lines, (bytes.splitlines(), p.lines)
 
@@ -46,6 +45,11 @@ def main():
             for chunkSize in (51, 500, 5000):
                 benchmark(chunkSize, lineLength, numLines)
 
+    # All of the lines in one chunk.
+    for numLines in 10000, 100000:
+        for lineLength in (10, 100):
+            benchmark((lineLength + 2) * numLines, lineLength, numLines)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,91 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Measure how fast L{twisted.logger.Logger.debug} is called in a tight loop,
+with debug events filtered out by a L{LogLevelFilterPredicate} and with them
+let through, and, for comparison, filtered out by an observer which the
+L{Logger} cannot ask for the lowest level it wants, so that every event is
+built and published before being dropped.
+
+Usage: loggerdebug.py [calls]
+"""
+
+import sys
+import time
+
+from twisted.logger import (
+    FilteringLogObserver,
+    Logger,
+    LogLevel,
+    LogLevelFilterPredicate,
+    LogPublisher,
+)
+
+
+class Handler:
+    """
+    An object logging through a L{Logger} class attribute, as most of
+    Twisted does.
+    """
+
+    log = Logger()
+
+    def handle(self, calls):
+        for i in range(calls):
+            self.log.debug("Handled {i}", i=i)
+
+
+def publisher(level, opaque=False):
+    """
+    Make a L{LogPublisher} which counts the events at C{level} or above.
+
+    @param opaque: If C{True}, hide the filtering from L{Logger}.
+    """
+    events = []
+    predicate = LogLevelFilterPredicate(defaultLogLevel=level)
+    observer = FilteringLogObserver(events.append, [predicate])
+    if opaque:
+        filtering = observer
+
+        def observer(event):
+            filtering(event)
+
+    return LogPublisher(observer), events
+
+
+def benchmark(observer, calls):
+    """
+    Log C{calls} debug events, with a module-level L{Logger} and with one
+    that is a class attribute.
+
+    @return: The number of calls per second for each.
+    """
+    log = Logger(namespace="benchmark", observer=observer)
+    Handler.log = Logger(observer=observer)
+    start = time.perf_counter()
+    for i in range(calls):
+        log.debug("Handled {i}", i=i)
+    middle = time.perf_counter()
+    Handler().handle(calls)
+    end = time.perf_counter()
+    return calls / (middle - start), calls / (end - middle)
+
+
+def main(args):
+    calls = int(args[0]) if args else 200000
+    for name, level, opaque in [
+        ("disabled", LogLevel.info, False),
+        ("disabled-opaque", LogLevel.info, True),
+        ("enabled", LogLevel.debug, False),
+    ]:
+        observer, events = publisher(level, opaque)
+        module, attribute = max(benchmark(observer, calls) for _ in range(3))
+        print(
+            "{:<16} {:>10.0f} calls/s  {:>10.0f} calls/s (class attribute)"
+            "  {} events".format(name, module, attribute, len(events))
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,106 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Measure how fast log events are saved with L{twisted.logger.eventAsJSON} and
+read back with L{twisted.logger.eventsFromJSONLogFile} and
+L{twisted.logger.JSONLogReader}, and how fast L{twisted.logger.JSONLogIndex}
+reads a short range of times from a log file and its rotated predecessor.
+
+Usage: loggerjson.py [events]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from twisted.logger import (
+    JSONLogIndex,
+    JSONLogReader,
+    Logger,
+    eventAsJSON,
+    eventsFromJSONLogFile,
+    jsonFileLogObserver,
+)
+
+
+def makeEvents(count, start):
+    """
+    Log C{count} events, one a millisecond from C{start}.
+    """
+    events = []
+    log = Logger(namespace="benchmark", observer=events.append)
+    for i in range(count):
+        log.info(
+            "Request {i} from {peer!r} took {elapsed:.3f}s",
+            i=i,
+            peer=("127.0.0.1", 8080),
+            elapsed=0.5,
+        )
+    for i, event in enumerate(events):
+        event["log_time"] = start + i / 1000
+    return events
+
+
+def timed(name, count, f):
+    """
+    Print how many events a second C{f} handles, at best of three.
+    """
+    best = min(_once(f) for _ in range(3))
+    print("{:<12} {:>10.0f} events/s".format(name, count / best))
+
+
+def _once(f):
+    start = time.perf_counter()
+    f()
+    return time.perf_counter() - start
+
+
+def main(args):
+    count = int(args[0]) if args else 20000
+    directory = tempfile.mkdtemp()
+    paths = [os.path.join(directory, name) for name in ["log.json.1", "log.json"]]
+    for i, path in enumerate(paths):
+        events = makeEvents(count, i * count / 1000)
+        with open(path, "w") as f:
+            observer = jsonFileLogObserver(f)
+            timed("save", count, lambda: [eventAsJSON(dict(e)) for e in events])
+            for event in events:
+                observer(event)
+
+    def readFile():
+        with open(paths[0], "rb") as f:
+            for event in eventsFromJSONLogFile(f):
+                pass
+
+    def readMapped():
+        with JSONLogReader(paths[0]) as reader:
+            for offset, event in reader.events():
+                pass
+
+    timed("read", count, readFile)
+    timed("read mapped", count, readMapped)
+
+    def index():
+        with JSONLogIndex(paths) as index:
+            list(index.eventsBetween(0, 0))
+
+    timed("index", 2 * count, index)
+
+    with JSONLogIndex(paths) as index:
+        # One second either side of the rotation.
+        middle = count / 1000
+        timed(
+            "query",
+            2000,
+            lambda: list(index.eventsBetween(middle - 1, middle + 1)),
+        )
+
+    for path in paths:
+        os.remove(path)
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
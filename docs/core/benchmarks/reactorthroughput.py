@@ -0,0 +1,96 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Compare the throughput of reactors running many loopback TCP connections,
+each sending a small message back and forth as fast as it can.
+
+Usage: reactorthroughput.py [connections [seconds [reactor ...]]]
+"""
+
+import sys
+
+from twisted.internet.protocol import ClientFactory, Factory, Protocol
+from twisted.python.reflect import namedAny
+
+REACTORS = {
+    "select": "twisted.internet.selectreactor.SelectReactor",
+    "poll": "twisted.internet.pollreactor.PollReactor",
+    "epoll": "twisted.internet.epollreactor.EPollReactor",
+    "iouring": "twisted.internet.iouringreactor.IOUringReactor",
+}
+
+MESSAGE = b"x" * 64
+
+
+class Echo(Protocol):
+    def dataReceived(self, data):
+        self.transport.write(data)
+
+
+class PingPong(Protocol):
+    """
+    Send a message, and send it again whenever all of it has come back.
+    """
+
+    def connectionMade(self):
+        self.received = 0
+        self.transport.write(MESSAGE)
+
+    def dataReceived(self, data):
+        self.received += len(data)
+        if self.received >= len(MESSAGE):
+            self.received -= len(MESSAGE)
+            self.factory.roundTrips += 1
+            self.transport.write(MESSAGE)
+
+
+class PingPongFactory(ClientFactory):
+    protocol = PingPong
+    noisy = False
+    roundTrips = 0
+
+
+def benchmark(reactor, connections, duration):
+    """
+    Run C{connections} ping-pong connections on C{reactor} for C{duration}
+    seconds.
+
+    @return: The number of round trips made per second.
+    """
+    server = Factory.forProtocol(Echo)
+    server.noisy = False
+    port = reactor.listenTCP(0, server, backlog=connections, interface="127.0.0.1")
+    client = PingPongFactory()
+    for _ in range(connections):
+        reactor.connectTCP("127.0.0.1", port.getHost().port, client)
+
+    def start():
+        client.roundTrips = 0
+        reactor.callLater(duration, reactor.stop)
+
+    # Give the connections a moment to be established before counting.
+    reactor.callLater(0.5, start)
+    reactor.run(installSignalHandlers=False)
+    return client.roundTrips / duration
+
+
+def main(args):
+    connections = int(args[0]) if args else 200
+    duration = float(args[1]) if len(args) > 1 else 5.0
+    names = args[2:] or ["epoll", "iouring"]
+    for name in names:
+        try:
+            reactor = namedAny(REACTORS[name])()
+        except ImportError as e:
+            print("{:<8} unavailable: {}".format(name, e))
+            continue
+        print(
+            "{:<8} {} connections: {:.0f} round trips/s".format(
+                name, connections, benchmark(reactor, connections, duration)
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,82 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Compare the cost of L{twisted.internet.tcp.Connection.doRead} for many
+connections each receiving small messages, with and without
+L{twisted.internet.tcp.Connection.readIntoBuffer}.
+"""
+
+import socket
+import sys
+import time
+
+from twisted.internet import tcp
+from twisted.internet.protocol import Protocol
+
+
+class FakeReactor:
+    """
+    Just enough of a reactor for connections which are driven by hand.
+    """
+
+    def addReader(self, reader):
+        pass
+
+    def removeReader(self, reader):
+        pass
+
+    def addWriter(self, writer):
+        pass
+
+    def removeWriter(self, writer):
+        pass
+
+
+class Discard(Protocol):
+    def dataReceived(self, data):
+        pass
+
+
+def benchmark(readIntoBuffer, connections, rounds, message=b"x" * 64):
+    """
+    Deliver C{rounds} messages to each of C{connections} connections.
+    """
+    pairs = []
+    for _ in range(connections):
+        local, remote = socket.socketpair()
+        connection = tcp.Connection(local, Discard(), FakeReactor())
+        connection.readIntoBuffer = readIntoBuffer
+        pairs.append((connection, remote))
+
+    elapsed = 0.0
+    for _ in range(rounds):
+        for connection, remote in pairs:
+            remote.send(message)
+        before = time.perf_counter()
+        for connection, remote in pairs:
+            connection.doRead()
+        elapsed += time.perf_counter() - before
+
+    for connection, remote in pairs:
+        connection.socket.close()
+        remote.close()
+    return elapsed
+
+
+def main(args):
+    connections = int(args[0]) if args else 500
+    rounds = int(args[1]) if len(args) > 1 else 200
+    for readIntoBuffer in (False, True):
+        print(
+            "{} connections x {} reads, {:<9}: {:.3f}s".format(
+                connections,
+                rounds,
+                "recv_into" if readIntoBuffer else "recv",
+                benchmark(readIntoBuffer, connections, rounds),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
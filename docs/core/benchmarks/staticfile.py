@@ -0,0 +1,80 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Compare the time taken by L{twisted.web.static.File} to serve a large file
+over loopback TCP with and without
+L{twisted.internet.interfaces.ISendfileTransport}.
+"""
+
+import http.client
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from twisted.internet import reactor, tcp, threads
+from twisted.web import server, static
+
+
+def fetch(port, rounds):
+    """
+    Fetch the file C{rounds} times over one persistent connection.
+    """
+    connection = http.client.HTTPConnection("127.0.0.1", port)
+    for _ in range(rounds):
+        connection.request("GET", "/file")
+        response = connection.getresponse()
+        while response.read(1024 * 1024):
+            pass
+    connection.close()
+
+
+def benchmark(port, useSendfile, rounds):
+    """
+    Time fetching the file with C{sendfile()} enabled or disabled.
+    """
+    tcp._sendfile = os.sendfile if useSendfile else None
+    before = time.perf_counter()
+    d = threads.deferToThread(fetch, port, rounds)
+    d.addCallback(lambda ignored: time.perf_counter() - before)
+    return d
+
+
+def main(args):
+    size = int(args[0]) if args else 64 * 1024 * 1024
+    rounds = int(args[1]) if len(args) > 1 else 20
+    directory = tempfile.mkdtemp()
+    with open(os.path.join(directory, "file"), "wb") as f:
+        f.write(os.urandom(size))
+    site = server.Site(static.File(directory))
+    port = reactor.listenTCP(0, site, interface="127.0.0.1").getHost().port
+
+    results = []
+
+    def run(ignored=None):
+        if len(results) == 2:
+            for useSendfile, elapsed in zip((False, True), results):
+                print(
+                    "{} x {} bytes, {:<9}: {:.3f}s ({:.0f} MiB/s)".format(
+                        rounds,
+                        size,
+                        "sendfile" if useSendfile else "read",
+                        elapsed,
+                        size * rounds / elapsed / 1024 / 1024,
+                    )
+                )
+            reactor.stop()
+            return
+        d = benchmark(port, len(results) == 1, rounds)
+        d.addCallback(results.append)
+        d.addCallback(run)
+
+    reactor.callWhenRunning(run)
+    reactor.run()
+    shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,107 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Measure how fast L{twisted.web.static.File} serves small files, with and
+without a L{twisted.web.static.FileCache}, and how many C{stat} calls it
+makes for each request.
+
+Requests for files spread over a few directories are made with
+L{twisted.web.test.requesthelper.DummyRequest}, which collects the response
+in memory, to leave out the cost of HTTP and the network.
+
+Usage: staticsmallfiles.py [files [requests]]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from twisted.internet.task import Clock
+from twisted.python import filepath
+from twisted.web import static
+from twisted.web.resource import getChildForRequest
+from twisted.web.test._util import _render
+from twisted.web.test.requesthelper import DummyRequest
+
+
+class Counter:
+    """
+    Count calls to a function.
+    """
+
+    def __init__(self, module, name):
+        self.calls = 0
+        self.module = module
+        self.name = name
+        self.original = getattr(module, name)
+
+        def counted(*args, **kwargs):
+            self.calls += 1
+            return self.original(*args, **kwargs)
+
+        setattr(module, name, counted)
+
+
+def makeFiles(directory, files):
+    """
+    Make C{files} small files in ten subdirectories of C{directory}.
+
+    @return: The paths of the files, relative to C{directory}, as bytes.
+    """
+    paths = []
+    for i in range(files):
+        subdirectory = os.path.join(directory, "d{}".format(i % 10))
+        if not os.path.isdir(subdirectory):
+            os.mkdir(subdirectory)
+        with open(os.path.join(subdirectory, "f{}.css".format(i)), "wb") as f:
+            f.write(b"x" * 512)
+        paths.append("d{}/f{}.css".format(i % 10, i).encode("ascii"))
+    return paths
+
+
+def benchmark(root, paths, requests):
+    """
+    Request C{requests} files, cycling through C{paths}.
+
+    @return: The number of requests handled per second.
+    """
+    start = time.perf_counter()
+    for i in range(requests):
+        request = DummyRequest(paths[i % len(paths)].split(b"/"))
+        _render(getChildForRequest(root, request), request)
+    return requests / (time.perf_counter() - start)
+
+
+def main(args):
+    files = int(args[0]) if args else 1000
+    requests = int(args[1]) if len(args) > 1 else 20000
+    directory = tempfile.mkdtemp()
+    paths = makeFiles(directory, files)
+    for name in ["uncached", "cached"]:
+        if name == "cached":
+            cache = static.FileCache(ttl=60, maxOpenFiles=files, reactor=Clock())
+        else:
+            cache = None
+        root = static.File(directory, cache=cache)
+        benchmark(root, paths, requests)
+        stat = Counter(filepath, "stat")
+        cacheStat = Counter(os, "stat")
+        rate = benchmark(root, paths, requests)
+        statCalls = stat.calls + cacheStat.calls
+        for counter in [stat, cacheStat]:
+            setattr(counter.module, counter.name, counter.original)
+        print(
+            "{:<8} {:>8.0f} requests/s  {:.2f} stat calls/request".format(
+                name, rate, statCalls / requests
+            )
+        )
+        if cache is not None:
+            cache.close()
+    shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
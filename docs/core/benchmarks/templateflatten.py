@@ -0,0 +1,136 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Measure how fast L{twisted.web.template} flattens a large page made mostly of
+tables, with its template compiled, as L{Element} renders templates loaded
+by L{XMLString}, and, for comparison, uncompiled, and how many writes
+L{flatten} makes for each page.
+
+Usage: templateflatten.py [rows [pages]]
+"""
+
+import sys
+import time
+
+from twisted.web.template import Element, XMLString, flatten, renderer
+
+TEMPLATE = XMLString(
+    """\
+<html xmlns:t="http://twistedmatrix.com/ns/twisted.web.template/0.1">
+  <head>
+    <title>Administration</title>
+    <link rel="stylesheet" href="/static/admin.css" />
+    <script src="/static/admin.js"></script>
+  </head>
+  <body>
+    <div class="header">
+      <h1>Site administration</h1>
+      <ul class="nav">
+        <li><a href="/admin/users">Users</a></li>
+        <li><a href="/admin/groups">Groups</a></li>
+        <li><a href="/admin/logs">Logs</a></li>
+        <li><a href="/admin/settings">Settings</a></li>
+      </ul>
+    </div>
+    <table class="listing">
+      <thead>
+        <tr><th>Id</th><th>Name</th><th>Email</th><th>Group</th>
+            <th>Created</th><th>Last seen</th><th>Status</th><th></th></tr>
+      </thead>
+      <tbody>
+        <tr t:render="rows">
+          <td class="id"><t:slot name="id" /></td>
+          <td class="name"><a><t:attr name="href">/admin/users/<t:slot
+            name="id" /></t:attr><t:slot name="name" /></a></td>
+          <td class="email"><t:slot name="email" /></td>
+          <td class="group"><t:slot name="group" /></td>
+          <td class="date"><t:slot name="created" /></td>
+          <td class="date"><t:slot name="seen" /></td>
+          <td class="status"><span class="badge"><t:slot name="status" /></span></td>
+          <td class="actions">
+            <a class="button" href="#">Edit</a>
+            <a class="button danger" href="#">Delete</a>
+          </td>
+        </tr>
+      </tbody>
+    </table>
+    <div class="footer">Rendered by Twisted &amp; friends.</div>
+  </body>
+</html>
+"""
+)
+
+
+class Page(Element):
+    """
+    A page listing C{rows} users.
+    """
+
+    loader = TEMPLATE
+
+    def __init__(self, rows):
+        Element.__init__(self)
+        self.users = [
+            {
+                "id": str(i),
+                "name": "User <{}>".format(i),
+                "email": "user{}@example.com".format(i),
+                "group": "staff" if i % 3 else "admins & owners",
+                "created": "2020-01-{:02}".format(i % 28 + 1),
+                "seen": "2020-06-{:02}".format(i % 30 + 1),
+                "status": "active" if i % 7 else "locked",
+            }
+            for i in range(rows)
+        ]
+
+    @renderer
+    def rows(self, request, tag):
+        for user in self.users:
+            yield tag.clone().fillSlots(**user)
+
+
+class UncompiledPage(Page):
+    """
+    The same page, rendered from its template without compiling it.
+    """
+
+    def render(self, request):
+        return self.loader.load()
+
+
+def benchmark(page, pages):
+    """
+    Flatten C{page} C{pages} times.
+
+    @return: The number of pages flattened per second, the number of writes
+        made for each page, and the last page.
+    """
+    written = []
+    start = time.perf_counter()
+    for _ in range(pages):
+        del written[:]
+        flatten(None, page, written.append)
+    elapsed = time.perf_counter() - start
+    return pages / elapsed, len(written), b"".join(written)
+
+
+def main(args):
+    rows = int(args[0]) if args else 500
+    pages = int(args[1]) if len(args) > 1 else 20
+    outputs = set()
+    for pageClass in [UncompiledPage, Page]:
+        page = pageClass(rows)
+        rate, writes, output = max(benchmark(page, pages) for _ in range(3))
+        outputs.add(output)
+        print(
+            "{:<15} {:>8.1f} pages/s  {:>8.0f} KiB/s  {:>6} writes/page".format(
+                pageClass.__name__, rate, rate * len(output) / 1024, writes
+            )
+        )
+    if len(outputs) != 1:
+        raise AssertionError("Compiled and uncompiled output differ")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
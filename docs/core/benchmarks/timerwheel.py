@@ -0,0 +1,84 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Compare the cost of managing a large number of timeouts which are frequently
+reset, as L{twisted.protocols.policies.TimeoutMixin} does, with and without
+L{twisted.internet.base.ReactorBase.installTimerWheel}.
+"""
+
+import random
+import sys
+import time
+
+from twisted.internet.base import ReactorBase
+
+
+class SimulatedReactor(ReactorBase):
+    """
+    A reactor which does no I/O and whose notion of time only moves forward
+    when told to.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        ReactorBase.__init__(self)
+
+    def installWaker(self):
+        pass
+
+    def seconds(self):
+        return self.now
+
+
+def benchmark(useWheel, timers, steps=1500, step=0.1, resetsPerStep=None):
+    """
+    Schedule C{timers} idle timeouts of around a minute, then simulate
+    C{steps} iterations of the event loop, each of which sees activity on a
+    random selection of connections (which resets their timeouts) and on a
+    few others which close (which cancels their timeouts and schedules new
+    ones for their replacements).  Connections which see no activity for long
+    enough time out.
+    """
+    if resetsPerStep is None:
+        resetsPerStep = max(1, timers // 100)
+    reactor = SimulatedReactor()
+    if useWheel:
+        reactor.installTimerWheel()
+
+    def expired():
+        pass
+
+    calls = [reactor.callLater(random.uniform(55, 65), expired) for _ in range(timers)]
+    rng = random.Random(1234)
+    before = time.perf_counter()
+    reactor.runUntilCurrent()
+    for _ in range(steps):
+        reactor.now += step
+        for _ in range(resetsPerStep):
+            call = calls[rng.randrange(timers)]
+            if call.active():
+                call.reset(60)
+        index = rng.randrange(timers)
+        if calls[index].active():
+            calls[index].cancel()
+        calls[index] = reactor.callLater(60, expired)
+        reactor.runUntilCurrent()
+        reactor.timeout()
+    return time.perf_counter() - before
+
+
+def main(args):
+    sizes = [int(arg) for arg in args] or [10000, 100000, 1000000]
+    for timers in sizes:
+        for useWheel in (False, True):
+            elapsed = benchmark(useWheel, timers)
+            print(
+                "{:>8} timers, {:<5}: {:.3f}s".format(
+                    timers, "wheel" if useWheel else "heap", elapsed
+                )
+            )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,88 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Compare the cost of L{twisted.internet.abstract.FileDescriptor.doWrite} for a
+TCP-style connection with and without vectored (C{sendmsg}) writes, for
+writes made of many small pieces, of a few large ones, and of a mixture
+of the two such as an HTTP response with many headers and a large body.
+"""
+
+import socket
+import time
+
+from twisted.internet import tcp
+from twisted.internet.protocol import Protocol
+
+
+class FakeReactor:
+    """
+    Just enough of a reactor for a connection which is driven by hand.
+    """
+
+    def addWriter(self, writer):
+        pass
+
+    def removeWriter(self, writer):
+        pass
+
+    def addReader(self, reader):
+        pass
+
+    def removeReader(self, reader):
+        pass
+
+
+def benchmark(vectored, batch, rounds):
+    """
+    Write C{rounds} copies of the buffers in C{batch} with C{writeSequence}
+    and flush them with C{doWrite}, draining the other end of the socket as
+    we go.
+    """
+    server, client = socket.socketpair()
+    client.setblocking(False)
+    connection = tcp.Connection(server, Protocol(), FakeReactor())
+    connection.connected = True
+    if not vectored:
+        connection._writeVectorLimit = 0
+    total = sum(len(piece) for piece in batch)
+
+    before = time.perf_counter()
+    for _ in range(rounds):
+        connection.writeSequence(batch)
+        received = 0
+        while received < total:
+            connection.doWrite()
+            try:
+                while True:
+                    data = client.recv(1024 * 1024)
+                    if not data:
+                        break
+                    received += len(data)
+            except BlockingIOError:
+                pass
+    elapsed = time.perf_counter() - before
+    server.close()
+    client.close()
+    return elapsed
+
+
+def main():
+    cases = [
+        ("200 x 20 bytes", [b"x" * 20] * 200, 2000),
+        ("4 x 64 KiB", [b"x" * 64 * 1024] * 4, 500),
+        ("20 x 30 bytes + 256 KiB", [b"x" * 30] * 20 + [b"x" * 256 * 1024], 500),
+    ]
+    for name, batch, rounds in cases:
+        for vectored in (False, True):
+            print(
+                "{:<24} {:<8}: {:.3f}s".format(
+                    name,
+                    "sendmsg" if vectored else "join",
+                    benchmark(vectored, batch, rounds),
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -73,6 +73,8 @@ class TwistOptions(Options):
             self["reactor"] = self.installReactor(name)
         except NoSuchReactor:
             raise UsageError("Unknown reactor: {}".format(name))
+        except ImportError as e:
+            raise UsageError("Unable to use reactor {}: {}".format(name, e))
         else:
             self["reactorName"] = name
 
@@ -146,6 +148,23 @@ class TwistOptions(Options):
 
     opt_log_format.__doc__ = dedent(opt_log_format.__doc__ or "")
 
+    def opt_workers(self, count: str) -> None:
+        """
+        Run the application in this many worker processes, restarting them
+        if they exit and, on SIGHUP, one at a time.  The application should
+        listen with SO_REUSEPORT (eg. "tcp:8080:reusePort=yes").
+        (default: run it in this process)
+        """
+        try:
+            workers = int(count)
+        except ValueError:
+            raise UsageError("Invalid number of workers: {}".format(count))
+        if workers < 1:
+            raise UsageError("Invalid number of workers: {}".format(count))
+        self["workers"] = workers
+
+    opt_workers.__doc__ = dedent(opt_workers.__doc__ or "")
+
     def selectDefaultLogObserver(self) -> None:
         """
         Set C{fileLogObserverFactory} to the default appropriate for the
@@ -6,17 +6,25 @@
 Run a Twisted application.
 """
 
+import os
+import signal
 import sys
 from typing import Sequence
 
 from twisted.application.app import _exitWithSignal
-from twisted.internet.interfaces import _ISupportsExitSignalCapturing, IReactorCore
+from twisted.internet.interfaces import (
+    _ISupportsExitSignalCapturing,
+    IReactorCore,
+    IReactorFromThreads,
+    IReactorProcess,
+)
 from twisted.python.usage import Options, UsageError
 
 from ..runner._exit import exit, ExitStatus
 from ..runner._runner import Runner
 from ..service import Application, IService, IServiceMaker
 from ._options import TwistOptions
+from ._workers import WORKER_ENVIRONMENT, WorkerSupervisor
 
 
 class Twist:
@@ -57,6 +65,31 @@ class Twist:
 
         return IService(application)
 
+    @staticmethod
+    def supervisor(
+        reactor: IReactorProcess, argv: Sequence[str], workers: int
+    ) -> IService:
+        """
+        Create a service which runs the application in worker processes.
+
+        @param reactor: The reactor to run the workers with.  It must also
+            provide L{IReactorTime} and L{IReactorFromThreads}.
+        @param argv: The command line to run in each worker.
+        @param workers: The number of workers to run.
+        @return: The created supervisor service.
+        """
+        supervisor = WorkerSupervisor(reactor, argv, workers)
+
+        def hangup(signum: int, frame: object) -> None:
+            IReactorFromThreads(reactor).callFromThread(supervisor.restartGracefully)
+
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, hangup)
+
+        application = Application("twist")
+        supervisor.setServiceParent(application)
+        return IService(application)
+
     @staticmethod
     def startService(reactor: IReactorCore, service: IService) -> None:
         """
@@ -102,10 +135,13 @@ class Twist:
         options = cls.options(argv)
 
         reactor = options["reactor"]
-        service = cls.service(
-            plugin=options.plugins[options.subCommand],
-            options=options.subOptions,
-        )
+        if "workers" in options and os.environ.pop(WORKER_ENVIRONMENT, None) is None:
+            service = cls.supervisor(reactor, argv, options["workers"])
+        else:
+            service = cls.service(
+                plugin=options.plugins[options.subCommand],
+                options=options.subOptions,
+            )
 
         cls.startService(reactor, service)
         cls.run(options)
@@ -0,0 +1,129 @@
+# -*- test-case-name: twisted.application.twist.test.test_workers -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Supervision of C{twist} worker processes.
+"""
+
+import os
+import sys
+from typing import List, Mapping, Optional, Sequence
+
+from twisted.internet.defer import Deferred, succeed
+from twisted.internet.interfaces import IReactorProcess
+from twisted.runner.procmon import ProcessMonitor
+
+# The environment variable which tells a twist process that it is a worker,
+# and which of them it is.
+WORKER_ENVIRONMENT = "TWIST_WORKER"
+
+# The code run by a worker process, given the twist command line as its
+# arguments.
+_WORKER_MAIN = "from twisted.application.twist._twist import Twist; Twist.main()"
+
+
+class WorkerSupervisor(ProcessMonitor):
+    """
+    Run several copies of a C{twist} command in worker processes, each with
+    its own reactor, and restart them when they exit.
+
+    The workers share listening ports by asking for C{SO_REUSEPORT} (for
+    example with a C{tcp:8080:reusePort=yes} endpoint description), so that
+    the kernel distributes connections between them.
+
+    Stopping the supervisor stops the workers with C{SIGTERM}, and the
+    L{Deferred} returned by L{stopService} fires once they have all exited.
+    L{restartGracefully} restarts them one at a time, so that if there is
+    more than one worker some are always accepting connections.
+
+    @ivar restartInterval: The number of seconds to wait between restarting
+        one worker and the next in L{restartGracefully}.
+    @type restartInterval: L{float}
+
+    @ivar _stopped: A L{Deferred} which fires when the last worker exits
+        after the supervisor is stopped, or L{None}.
+    """
+
+    restartInterval = 2.0
+
+    def __init__(
+        self,
+        reactor: IReactorProcess,
+        argv: Sequence[str],
+        workers: int,
+        environ: Optional[Mapping[str, str]] = None,
+    ) -> None:
+        """
+        @param reactor: The reactor to spawn and supervise the workers with.
+            It must also provide L{IReactorTime}.
+        @param argv: The C{twist} command line for the workers to run,
+            including the name of the program.
+        @param workers: The number of workers to run.
+        @param environ: The environment to run the workers in, to which
+            L{WORKER_ENVIRONMENT} is added.  Defaults to this process'.
+        """
+        ProcessMonitor.__init__(self, reactor)
+        if environ is None:
+            environ = os.environ
+        args = [sys.executable, "-c", _WORKER_MAIN] + list(argv[1:])
+        for index in range(workers):
+            env = dict(environ)
+            env[WORKER_ENVIRONMENT] = str(index)
+            self.addProcess(self.workerName(index), args, env=env)
+        self._stopped = None  # type: Optional[Deferred]
+
+    @staticmethod
+    def workerName(index: int) -> str:
+        """
+        Get the name under which a worker is monitored.
+
+        @param index: The index of the worker.
+        @return: The name of the worker.
+        """
+        return "worker-{}".format(index)
+
+    def workerNames(self) -> List[str]:
+        """
+        @return: The names of the workers, in the order they were added.
+        """
+        return list(self._processes)
+
+    def restartGracefully(self) -> None:
+        """
+        Restart the workers one at a time, C{restartInterval} seconds apart,
+        by stopping each in turn and letting the supervisor start it again.
+        """
+        for index, name in enumerate(self.workerNames()):
+            self._reactor.callLater(
+                index * self.restartInterval, self._restartWorker, name
+            )
+
+    def _restartWorker(self, name: str) -> None:
+        """
+        Stop a worker if it is running, so that it gets restarted.
+        """
+        if self.running and name in self.protocols:
+            self.stopProcess(name)
+
+    def stopService(self) -> Deferred:
+        """
+        Stop the workers.
+
+        @return: A L{Deferred} which fires when all of the workers have exited.
+        """
+        ProcessMonitor.stopService(self)
+        if not self.protocols:
+            return succeed(None)
+        self._stopped = Deferred()
+        return self._stopped
+
+    def connectionLost(self, name: str) -> None:
+        """
+        Note that a worker has exited, restarting it unless the supervisor has
+        been stopped.
+        """
+        ProcessMonitor.connectionLost(self, name)
+        if self._stopped is not None and not self.protocols:
+            stopped, self._stopped = self._stopped, None
+            stopped.callback(None)
@@ -64,6 +64,8 @@ class OptionsTests(twisted.trial.unittest.TestCase):
         self.installedReactors = {}  # type: Dict[str, IReactorCore]
 
         def installReactor(name: str) -> IReactorCore:
+            if name == "fission":
+                raise ImportError("not supported here")
             if name != "fusion":
                 raise NoSuchReactor()
 
@@ -130,6 +132,18 @@ class OptionsTests(twisted.trial.unittest.TestCase):
         options = TwistOptions()
         self.assertRaises(UsageError, options.opt_reactor, "coal")
 
+    def test_installReactorUnavailable(self) -> None:
+        """
+        L{TwistOptions.installReactor} raises UsageError if the reactor
+        specified cannot be imported, for example because the platform does
+        not support it.
+        """
+        self.patchInstallReactor()
+
+        options = TwistOptions()
+        error = self.assertRaises(UsageError, options.opt_reactor, "fission")
+        self.assertIn("not supported here", str(error))
+
     def test_installReactorDefault(self) -> None:
         """
         L{TwistOptions.installReactor} returns the currently installed reactor
@@ -156,6 +170,26 @@ class OptionsTests(twisted.trial.unittest.TestCase):
 
         self.assertRaises(UsageError, options.opt_log_level, "cheese")
 
+    def test_workersValid(self) -> None:
+        """
+        L{TwistOptions.opt_workers} sets the number of worker processes.
+        """
+        options = TwistOptions()
+        options.opt_workers("4")
+
+        self.assertEqual(options["workers"], 4)
+
+    def test_workersInvalid(self) -> None:
+        """
+        L{TwistOptions.opt_workers} with a value which is not a positive
+        integer raises UsageError.
+        """
+        options = TwistOptions()
+
+        self.assertRaises(UsageError, options.opt_workers, "cheese")
+        self.assertRaises(UsageError, options.opt_workers, "0")
+        self.assertNotIn("workers", options)
+
     def _testLogFile(self, name: str, expectedStream: TextIO) -> None:
         """
         Set log file name and check the selected output stream.
@@ -6,21 +6,44 @@ Tests for L{twisted.application.twist._twist}.
 """
 
 from sys import stdout
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, List
 
-from twisted.internet.interfaces import IReactorCore
+from zope.interface import implementer
+
+from twisted.internet.interfaces import IReactorCore, IReactorFromThreads
 from twisted.logger import LogLevel, jsonFileLogObserver
 from twisted.test.proto_helpers import MemoryReactor
 from twisted.test.test_twistd import SignalCapturingMemoryReactor
 import twisted.trial.unittest
+from twisted.runner.test.test_procmon import DummyProcessReactor
 
 from ...runner._exit import ExitStatus
 from ...runner._runner import Runner
 from ...runner.test.test_runner import DummyExit
-from ...service import IService, MultiService
+from ...service import IService, IServiceCollection, MultiService
 from ...twist import _twist
 from .._options import TwistOptions
 from .._twist import Twist
+from .._workers import WORKER_ENVIRONMENT, WorkerSupervisor
+
+
+@implementer(IReactorFromThreads)
+class DummyThreadsProcessReactor(DummyProcessReactor):
+    """
+    A L{DummyProcessReactor} which records the functions passed to
+    L{callFromThread} rather than calling them.
+
+    @ivar threadCalls: The functions passed to L{callFromThread}.
+    """
+
+    def __init__(self) -> None:
+        DummyProcessReactor.__init__(self)
+        self.threadCalls = []  # type: List[Any]
+
+    def callFromThread(
+        self, callable: Callable[..., Any], *args: object, **kwargs: object
+    ) -> None:
+        self.threadCalls.append(callable)
 
 
 class TwistTests(twisted.trial.unittest.TestCase):
@@ -100,6 +123,54 @@ class TwistTests(twisted.trial.unittest.TestCase):
         service = Twist.service(options.plugins["web"], options.subOptions)
         self.assertTrue(IService.providedBy(service))
 
+    def test_supervisor(self) -> None:
+        """
+        L{Twist.supervisor} returns an L{IService} containing a
+        L{WorkerSupervisor} for the given command line, and restarts the
+        workers gracefully on SIGHUP.
+        """
+        handlers = {}  # type: Dict[int, Any]
+        self.patch(
+            _twist.signal, "signal", lambda signum, h: handlers.__setitem__(signum, h)
+        )
+        reactor = DummyThreadsProcessReactor()
+
+        argv = ["twist", "--workers=2", "web"]
+        service = Twist.supervisor(reactor, argv, 2)
+
+        self.assertTrue(IService.providedBy(service))
+        [supervisor] = list(IServiceCollection(service))
+        self.assertIsInstance(supervisor, WorkerSupervisor)
+        self.assertEqual(
+            supervisor.workerNames(),
+            [WorkerSupervisor.workerName(0), WorkerSupervisor.workerName(1)],
+        )
+        if hasattr(_twist.signal, "SIGHUP"):
+            handlers[_twist.signal.SIGHUP](_twist.signal.SIGHUP, None)
+            self.assertEqual(reactor.threadCalls, [supervisor.restartGracefully])
+
+    def test_mainWorkers(self) -> None:
+        """
+        L{Twist.main} with C{--workers} starts a L{WorkerSupervisor} rather
+        than the application, unless it is running in a worker process.
+        """
+        self.patchStartService()
+        self.patch(Twist, "run", staticmethod(lambda options: None))
+        self.patch(_twist.signal, "signal", lambda signum, handler: None)
+        environ = {}  # type: Dict[str, str]
+        self.patch(_twist.os, "environ", environ)
+
+        Twist.main(["twist", "--reactor=default", "--workers=2", "web"])
+        [service] = self.serviceStarts
+        [supervisor] = list(IServiceCollection(service))
+        self.assertIsInstance(supervisor, WorkerSupervisor)
+
+        environ[WORKER_ENVIRONMENT] = "1"
+        Twist.main(["twist", "--reactor=default", "--workers=2", "web"])
+        service = self.serviceStarts[1]
+        self.assertNotIsInstance(list(IServiceCollection(service))[0], WorkerSupervisor)
+        self.assertEqual(environ, {})
+
     def test_startService(self) -> None:
         """
         L{Twist.startService} starts the service and registers a trigger to
@@ -0,0 +1,90 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.application.twist._workers}.
+"""
+
+import sys
+
+import twisted.trial.unittest
+from twisted.runner.test.test_procmon import DummyProcessReactor
+
+from .._workers import WORKER_ENVIRONMENT, WorkerSupervisor, _WORKER_MAIN
+
+
+class WorkerSupervisorTests(twisted.trial.unittest.TestCase):
+    """
+    Tests for L{WorkerSupervisor}.
+    """
+
+    def setUp(self) -> None:
+        self.reactor = DummyProcessReactor()
+        self.supervisor = WorkerSupervisor(
+            self.reactor, ["twist", "web", "--listen", "tcp:8080"], 3, {"A": "B"}
+        )
+
+    def test_workers(self) -> None:
+        """
+        L{WorkerSupervisor} starts the requested number of workers, each
+        running the C{twist} command line in a new Python interpreter with
+        L{WORKER_ENVIRONMENT} set to its index.
+        """
+        self.supervisor.startService()
+        processes = self.reactor.spawnedProcesses
+        self.assertEqual(len(processes), 3)
+        for index, process in enumerate(processes):
+            self.assertEqual(
+                process._args,
+                [sys.executable, "-c", _WORKER_MAIN, "web", "--listen", "tcp:8080"],
+            )
+            self.assertEqual(
+                process._environment, {"A": "B", WORKER_ENVIRONMENT: str(index)}
+            )
+
+    def test_restartGracefully(self) -> None:
+        """
+        L{WorkerSupervisor.restartGracefully} stops the workers one at a time,
+        C{restartInterval} seconds apart, and they are started again.
+        """
+        self.supervisor.startService()
+        self.reactor.advance(self.supervisor.threshold)
+        names = self.supervisor.workerNames()
+        first = dict(self.supervisor.protocols)
+
+        self.supervisor.restartGracefully()
+        self.reactor.advance(0)
+        # The first worker has been asked to stop, the others not yet.
+        self.assertIn(names[0], self.supervisor.murder)
+        self.assertNotIn(names[1], self.supervisor.murder)
+
+        self.reactor.advance(self.supervisor.restartInterval)
+        self.assertIn(names[1], self.supervisor.murder)
+        self.assertNotIn(names[2], self.supervisor.murder)
+
+        self.reactor.advance(self.supervisor.restartInterval)
+        self.reactor.advance(self.supervisor.minRestartDelay + 1)
+        self.assertEqual(len(self.reactor.spawnedProcesses), 6)
+        for name in names:
+            self.assertIsNot(self.supervisor.protocols[name], first[name])
+
+    def test_stopServiceWaitsForWorkers(self) -> None:
+        """
+        The L{Deferred} returned by L{WorkerSupervisor.stopService} fires once
+        every worker has exited, and the workers are not restarted.
+        """
+        self.supervisor.startService()
+        d = self.supervisor.stopService()
+        self.assertNoResult(d)
+        self.reactor.advance(self.supervisor.killTime)
+        self.successResultOf(d)
+        self.assertEqual(self.supervisor.protocols, {})
+        self.reactor.advance(self.supervisor.maxRestartDelay)
+        self.assertEqual(len(self.reactor.spawnedProcesses), 3)
+
+    def test_stopServiceNoWorkers(self) -> None:
+        """
+        L{WorkerSupervisor.stopService} returns a L{Deferred} which has already
+        fired if no workers are running.
+        """
+        self.successResultOf(self.supervisor.stopService())
@@ -0,0 +1,548 @@
+# -*- test-case-name: twisted.internet.test.test_iouringreactor -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+A minimal binding to Linux's io_uring(7) interface, using L{ctypes}, providing
+just what L{twisted.internet.iouringreactor} needs: submitting requests to
+poll, accept connections, receive, send and cancel other requests, and
+waiting for their completions with a timeout.
+
+Only the submission queue and completion queue rings are used; the kernel is
+entered with C{io_uring_enter(2)} to submit requests and wait for completions,
+so no kernel polling thread is involved.  Because every exchange with the
+kernel happens through that system call, which orders memory accesses on both
+sides of it, the ring indices can be read and written without explicit memory
+barriers.
+"""
+
+import ctypes
+import mmap
+import os
+import socket
+import struct
+import sys
+import weakref
+from errno import EBUSY, EINTR, ENOSYS, ETIME
+from typing import cast, Iterator, List, Optional, Tuple
+
+if not sys.platform.startswith("linux"):
+    raise ImportError("io_uring is only available on Linux")
+
+
+# The architectures which use the common numbers of the system calls added
+# since Linux 5.1, other than the 32 bit ARM and PowerPC variants.
+_GENERIC_MACHINES = frozenset(
+    [
+        "aarch64",
+        "arm64",
+        "i386",
+        "i486",
+        "i586",
+        "i686",
+        "loongarch64",
+        "riscv64",
+        "s390x",
+        "sparc64",
+        "x86_64",
+    ]
+)
+
+
+def _syscallNumbers(machine: str) -> Optional[Tuple[int, int]]:
+    """
+    Find the numbers of the C{io_uring_setup(2)} and C{io_uring_enter(2)}
+    system calls on an architecture.
+
+    Most architectures number the system calls added since Linux 5.1 the
+    same way, but some offset them and MIPS numbers them differently for
+    each of its ABIs.  Only the architectures whose numbers are known here,
+    and which do not depend on the ABI, are supported.
+
+    @param machine: The name of the architecture, as given by
+        L{os.uname}.
+
+    @return: The numbers of the two system calls, or L{None} if they are not
+        known for C{machine}.
+    """
+    if machine == "alpha":
+        return (535, 536)
+    if machine == "ia64":
+        return (1449, 1450)
+    if machine in _GENERIC_MACHINES or machine.startswith(("armv", "ppc")):
+        return (425, 426)
+    return None
+
+
+_numbers = _syscallNumbers(os.uname().machine)
+if _numbers is None:
+    raise ImportError(
+        "io_uring system call numbers are not known for {}".format(os.uname().machine)
+    )
+_SYS_io_uring_setup, _SYS_io_uring_enter = _numbers
+del _numbers
+
+# Setup flags.
+IORING_SETUP_CQSIZE = 1 << 3
+
+# Features reported by the kernel.
+IORING_FEAT_SINGLE_MMAP = 1 << 0
+IORING_FEAT_EXT_ARG = 1 << 8
+IORING_FEAT_CQE_SKIP = 1 << 11
+
+# Flags for io_uring_enter(2).
+IORING_ENTER_GETEVENTS = 1 << 0
+IORING_ENTER_EXT_ARG = 1 << 3
+
+# Flags the kernel sets in the submission queue ring.
+IORING_SQ_CQ_OVERFLOW = 1 << 1
+
+# Offsets at which to map the rings.
+IORING_OFF_SQ_RING = 0
+IORING_OFF_CQ_RING = 0x8000000
+IORING_OFF_SQES = 0x10000000
+
+# Operations.
+IORING_OP_POLL_ADD = 6
+IORING_OP_ACCEPT = 13
+IORING_OP_ASYNC_CANCEL = 14
+IORING_OP_SEND = 26
+IORING_OP_RECV = 27
+IORING_OP_PROVIDE_BUFFERS = 31
+
+# Request flags.
+IOSQE_BUFFER_SELECT = 1 << 5
+IOSQE_CQE_SKIP_SUCCESS = 1 << 6
+
+# Completion flags.
+IORING_CQE_F_BUFFER = 1 << 0
+IORING_CQE_BUFFER_SHIFT = 16
+
+# struct io_uring_sqe: opcode, flags, ioprio, fd, off, addr, len, the
+# operation flags, user_data, buf_group, and padding to 64 bytes.
+_SQE = struct.Struct("=BBHiQQIIQH22x")
+
+# The kernel reads poll events from the low half of the operation flags as
+# if they were 16 bits wide, which on a big endian machine is the high half
+# of the 32 bit value.
+_POLL_EVENTS_SHIFT = 16 if sys.byteorder == "big" else 0
+# struct io_uring_cqe: user_data, res, flags.
+_CQE = struct.Struct("=QiI")
+_U32 = struct.Struct("=I")
+
+
+class _SQRingOffsets(ctypes.Structure):
+    _fields_ = [
+        ("head", ctypes.c_uint32),
+        ("tail", ctypes.c_uint32),
+        ("ring_mask", ctypes.c_uint32),
+        ("ring_entries", ctypes.c_uint32),
+        ("flags", ctypes.c_uint32),
+        ("dropped", ctypes.c_uint32),
+        ("array", ctypes.c_uint32),
+        ("resv1", ctypes.c_uint32),
+        ("user_addr", ctypes.c_uint64),
+    ]
+
+
+class _CQRingOffsets(ctypes.Structure):
+    _fields_ = [
+        ("head", ctypes.c_uint32),
+        ("tail", ctypes.c_uint32),
+        ("ring_mask", ctypes.c_uint32),
+        ("ring_entries", ctypes.c_uint32),
+        ("overflow", ctypes.c_uint32),
+        ("cqes", ctypes.c_uint32),
+        ("flags", ctypes.c_uint32),
+        ("resv1", ctypes.c_uint32),
+        ("user_addr", ctypes.c_uint64),
+    ]
+
+
+class _Params(ctypes.Structure):
+    _fields_ = [
+        ("sq_entries", ctypes.c_uint32),
+        ("cq_entries", ctypes.c_uint32),
+        ("flags", ctypes.c_uint32),
+        ("sq_thread_cpu", ctypes.c_uint32),
+        ("sq_thread_idle", ctypes.c_uint32),
+        ("features", ctypes.c_uint32),
+        ("wq_fd", ctypes.c_uint32),
+        ("resv", ctypes.c_uint32 * 3),
+        ("sq_off", _SQRingOffsets),
+        ("cq_off", _CQRingOffsets),
+    ]
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_int64), ("tv_nsec", ctypes.c_int64)]
+
+
+class _GetEventsArg(ctypes.Structure):
+    _fields_ = [
+        ("sigmask", ctypes.c_uint64),
+        ("sigmask_sz", ctypes.c_uint32),
+        ("pad", ctypes.c_uint32),
+        ("ts", ctypes.c_uint64),
+    ]
+
+
+try:
+    _libc = ctypes.CDLL(None, use_errno=True)
+    _syscall = _libc.syscall
+except (OSError, AttributeError) as e:
+    raise ImportError(e)
+_syscall.restype = ctypes.c_long
+
+
+def _setup(entries: int, params: _Params) -> int:
+    """
+    Call C{io_uring_setup(2)}.
+
+    @return: The file descriptor of the new ring.
+    @raise OSError: If the call fails.
+    """
+    fd = _syscall(
+        ctypes.c_long(_SYS_io_uring_setup),
+        ctypes.c_uint(entries),
+        ctypes.byref(params),
+    )
+    if fd < 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, os.strerror(errno))
+    return int(fd)
+
+
+def _enter(
+    fd: int, toSubmit: int, minComplete: int, flags: int, arg: object, argSize: int
+) -> int:
+    """
+    Call C{io_uring_enter(2)}.
+
+    @return: The number of requests submitted, or a negative errno.
+    """
+    result = _syscall(
+        ctypes.c_long(_SYS_io_uring_enter),
+        ctypes.c_uint(fd),
+        ctypes.c_uint(toSubmit),
+        ctypes.c_uint(minComplete),
+        ctypes.c_uint(flags),
+        arg,
+        ctypes.c_size_t(argSize),
+    )
+    if result < 0:
+        return -ctypes.get_errno()
+    return int(result)
+
+
+class Ring:
+    """
+    An io_uring instance with which requests can be submitted in batches and
+    their completions collected.
+
+    Requests are queued with methods such as L{pollAdd} and L{recv} and are
+    passed to the kernel by the next call to L{submitAndWait}, which also
+    waits for completions and returns them, or to L{submit}.
+
+    @ivar fileno: The ring's file descriptor.
+    @ivar _queued: The number of requests queued but not yet submitted.
+    @ivar _skipSuccess: The request flag which stops a request from
+        completing if it succeeds, or 0 if the kernel does not support it.
+    """
+
+    def __init__(self, entries: int = 1024) -> None:
+        """
+        @param entries: The size of the submission queue, which is the number
+            of requests which can be queued before they must be submitted.
+            The completion queue is four times this size.
+
+        @raise OSError: If the kernel does not support io_uring, or lacks a
+            feature this requires (reported as C{ENOSYS}).
+        """
+        params = _Params()
+        params.flags = IORING_SETUP_CQSIZE
+        params.cq_entries = entries * 4
+        self.fileno = fd = _setup(entries, params)
+        finalizer = weakref.finalize(self, os.close, fd)
+        try:
+            if not params.features & IORING_FEAT_EXT_ARG:
+                raise OSError(ENOSYS, "io_uring_enter(2) has no timeout support")
+            sq, cq = params.sq_off, params.cq_off
+            sqSize = sq.array + params.sq_entries * 4
+            cqSize = cq.cqes + params.cq_entries * _CQE.size
+            if params.features & IORING_FEAT_SINGLE_MMAP:
+                sqSize = cqSize = max(sqSize, cqSize)
+            self._sqRing = mmap.mmap(fd, sqSize, offset=IORING_OFF_SQ_RING)
+            if params.features & IORING_FEAT_SINGLE_MMAP:
+                self._cqRing = self._sqRing
+            else:
+                self._cqRing = mmap.mmap(fd, cqSize, offset=IORING_OFF_CQ_RING)
+            self._sqes = mmap.mmap(
+                fd, params.sq_entries * _SQE.size, offset=IORING_OFF_SQES
+            )
+        except BaseException:
+            finalizer()
+            raise
+        self._close = finalizer
+        self._skipSuccess = 0
+        if params.features & IORING_FEAT_CQE_SKIP:
+            self._skipSuccess = IOSQE_CQE_SKIP_SUCCESS
+
+        self._sqTail = sq.tail
+        self._sqFlags = sq.flags
+        self._sqMask = _U32.unpack_from(self._sqRing, sq.ring_mask)[0]
+        self._sqEntries = params.sq_entries
+        self._cqHead = cq.head
+        self._cqTail = cq.tail
+        self._cqMask = _U32.unpack_from(self._cqRing, cq.ring_mask)[0]
+        self._cqes = cq.cqes
+
+        # Each slot of the submission queue always refers to the entry with
+        # the same index, so only the entries themselves need to be written.
+        for index in range(params.sq_entries):
+            _U32.pack_into(self._sqRing, sq.array + index * 4, index)
+
+        self._tail = _U32.unpack_from(self._sqRing, self._sqTail)[0]
+        self._queued = 0
+        self._timespec = _Timespec()
+        self._waitArg = _GetEventsArg()
+        self._waitArgPointer = ctypes.byref(self._waitArg)
+
+    def close(self) -> None:
+        """
+        Close the ring.  Requests which have been submitted are cancelled.
+        """
+        if self._sqes.closed:
+            return
+        self._sqes.close()
+        if self._cqRing is not self._sqRing:
+            self._cqRing.close()
+        self._sqRing.close()
+        self._close()
+
+    def _queue(
+        self,
+        opcode: int,
+        fd: int,
+        addr: int,
+        length: int,
+        opFlags: int,
+        userData: int,
+        flags: int = 0,
+        off: int = 0,
+        bufGroup: int = 0,
+    ) -> None:
+        """
+        Queue a request, first submitting those already queued if there is no
+        room for another.
+        """
+        if self._queued == self._sqEntries:
+            self._submit(0, 0)
+            if self._queued == self._sqEntries:
+                raise OSError(EBUSY, "io_uring submission queue is full")
+        _SQE.pack_into(
+            self._sqes,
+            (self._tail & self._sqMask) * _SQE.size,
+            opcode,
+            flags,
+            0,
+            fd,
+            off,
+            addr,
+            length,
+            opFlags,
+            userData,
+            bufGroup,
+        )
+        self._tail = (self._tail + 1) & 0xFFFFFFFF
+        self._queued += 1
+
+    def pollAdd(self, fd: int, events: int, userData: int) -> None:
+        """
+        Queue a one-shot request for the kernel to report when C{fd} is ready
+        for any of C{events}.  Its completion carries C{userData} and the
+        events which occurred, or a negative errno.
+
+        @param fd: The file descriptor to poll.
+        @param events: A mask of C{select.POLL*} events.
+        @param userData: A non-zero integer identifying the request.
+        """
+        self._queue(
+            IORING_OP_POLL_ADD, fd, 0, 0, events << _POLL_EVENTS_SHIFT, userData
+        )
+
+    def accept(self, fd: int, userData: int) -> None:
+        """
+        Queue a request to accept a connection on the listening socket C{fd}.
+        Its completion carries C{userData} and the file descriptor of the new
+        socket, which is non-blocking and close-on-exec, or a negative errno.
+        """
+        self._queue(
+            IORING_OP_ACCEPT,
+            fd,
+            0,
+            0,
+            socket.SOCK_NONBLOCK | socket.SOCK_CLOEXEC,
+            userData,
+        )
+
+    def recv(self, fd: int, length: int, bufferGroup: int, userData: int) -> None:
+        """
+        Queue a request to receive at most C{length} bytes from the socket
+        C{fd}, into a buffer which the kernel picks from those provided to it
+        with L{provideBuffers}.  Its completion carries C{userData} and the
+        number of bytes received, or a negative errno, and if a buffer was
+        used, has L{IORING_CQE_F_BUFFER} set in its flags and the buffer's
+        identifier in the bits above L{IORING_CQE_BUFFER_SHIFT}.
+
+        If no buffer is left, the request completes with C{-ENOBUFS}.
+        """
+        self._queue(
+            IORING_OP_RECV,
+            fd,
+            0,
+            length,
+            0,
+            userData,
+            flags=IOSQE_BUFFER_SELECT,
+            bufGroup=bufferGroup,
+        )
+
+    def send(self, fd: int, address: int, length: int, userData: int) -> None:
+        """
+        Queue a request to send C{length} bytes from the memory at C{address}
+        over the socket C{fd}.  Its completion carries C{userData} and the
+        number of bytes sent, which may be fewer, or a negative errno.  The
+        memory must not be freed until then.
+        """
+        self._queue(IORING_OP_SEND, fd, address, length, socket.MSG_NOSIGNAL, userData)
+
+    def provideBuffers(
+        self, address: int, length: int, count: int, bufferGroup: int, first: int
+    ) -> None:
+        """
+        Queue a request to give the kernel C{count} buffers of C{length}
+        bytes each, laid out one after another from C{address}, to receive
+        into.  They are identified by consecutive numbers from C{first}.  The
+        request completes with a user data of 0, unless it succeeds and the
+        kernel can skip reporting that.
+        """
+        self._queue(
+            IORING_OP_PROVIDE_BUFFERS,
+            count,
+            address,
+            length,
+            0,
+            0,
+            flags=self._skipSuccess,
+            off=first,
+            bufGroup=bufferGroup,
+        )
+
+    def cancel(self, userData: int) -> None:
+        """
+        Queue the cancellation of the request identified by C{userData}.  The
+        request then completes with C{-ECANCELED}, if it had not already
+        completed; the cancellation itself completes with a user data of 0,
+        unless it succeeds and the kernel can skip reporting that.
+        """
+        self._queue(
+            IORING_OP_ASYNC_CANCEL, -1, userData, 0, 0, 0, flags=self._skipSuccess
+        )
+
+    def submit(self) -> None:
+        """
+        Submit the queued requests without waiting for any to complete.
+
+        @raise OSError: If the kernel refuses the requests.
+        """
+        if self._queued:
+            self._submit(0, 0)
+
+    def _submit(
+        self, minComplete: int, flags: int, arg: object = None, argSize: int = 0
+    ) -> None:
+        """
+        Pass the queued requests to the kernel, and possibly wait for
+        completions, ignoring interruption by a signal or the timeout
+        expiring.
+        """
+        _U32.pack_into(self._sqRing, self._sqTail, self._tail)
+        result = _enter(self.fileno, self._queued, minComplete, flags, arg, argSize)
+        if result >= 0:
+            self._queued -= result
+        elif result not in (-EINTR, -ETIME, -EBUSY):
+            # EBUSY means the completion queue has overflowed, and the kernel
+            # will take no more requests until it has been drained.
+            raise OSError(-result, os.strerror(-result))
+
+    def submitAndWait(self, timeout: Optional[float]) -> List[Tuple[int, int, int]]:
+        """
+        Submit the queued requests and wait for at least one completion.
+
+        @param timeout: The longest time to wait, in seconds, or L{None} to
+            wait until a request completes.
+
+        @return: The user data, result and flags of each completed request.
+
+        @raise OSError: If the kernel refuses the requests.
+        """
+        flags = IORING_ENTER_GETEVENTS | IORING_ENTER_EXT_ARG
+        if timeout is None:
+            self._waitArg.ts = 0
+        else:
+            if timeout < 0:
+                timeout = 0
+            seconds = int(timeout)
+            self._timespec.tv_sec = seconds
+            self._timespec.tv_nsec = int((timeout - seconds) * 1e9)
+            self._waitArg.ts = ctypes.addressof(self._timespec)
+        self._submit(1, flags, self._waitArgPointer, ctypes.sizeof(self._waitArg))
+        return self._reap()
+
+    def _reap(self) -> List[Tuple[int, int, int]]:
+        """
+        Collect the completions which are ready, including any which the
+        kernel had to hold back because the completion queue was full.
+        """
+        ring = self._cqRing
+        completions = []  # type: List[Tuple[int, int, int]]
+        while True:
+            head = _U32.unpack_from(ring, self._cqHead)[0]
+            tail = _U32.unpack_from(ring, self._cqTail)[0]
+            ready = (tail - head) & 0xFFFFFFFF
+            if ready:
+                # The completions may wrap around the end of the ring.
+                start = head & self._cqMask
+                first = min(ready, self._cqMask + 1 - start)
+                offset = self._cqes + start * _CQE.size
+                completions.extend(
+                    cast(
+                        Iterator[Tuple[int, int, int]],
+                        _CQE.iter_unpack(ring[offset : offset + first * _CQE.size]),
+                    )
+                )
+                if ready > first:
+                    offset = self._cqes
+                    completions.extend(
+                        cast(
+                            Iterator[Tuple[int, int, int]],
+                            _CQE.iter_unpack(
+                                ring[offset : offset + (ready - first) * _CQE.size]
+                            ),
+                        )
+                    )
+                _U32.pack_into(ring, self._cqHead, tail)
+            sqFlags = _U32.unpack_from(self._sqRing, self._sqFlags)[0]
+            if not sqFlags & IORING_SQ_CQ_OVERFLOW:
+                return completions
+            self._submit(0, IORING_ENTER_GETEVENTS)
+
+
+def probe() -> None:
+    """
+    Check that io_uring can be used here, by creating and closing a ring.
+
+    @raise OSError: If it cannot be.
+    """
+    Ring(1).close()
@@ -0,0 +1,279 @@
+# -*- test-case-name: twisted.internet.test.test_loopmonitor -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Measurement of how long a reactor spends running each iteration of its loop
+and each call it makes, for finding out when and why the loop is blocked.
+
+See L{twisted.internet.base.ReactorBase.installLoopMonitor}.
+"""
+
+from typing import Any, Callable, Optional, TYPE_CHECKING
+
+import attr
+
+from twisted.logger import Logger
+from twisted.python.deprecate import _fullyQualifiedName
+
+if TYPE_CHECKING:
+    from twisted.internet.base import DelayedCall, ReactorBase
+
+
+@attr.s
+class LoopStatistics:
+    """
+    What a L{LoopMonitor} has measured since it was installed or last reset.
+    All times are in seconds.
+
+    @ivar iterations: The number of iterations of the reactor's loop.
+    @ivar iterationTime: The total time the iterations took, including time
+        spent waiting for events.
+    @ivar longestIteration: The longest time one iteration took.
+    @ivar runUntilCurrentTime: The total time spent in C{runUntilCurrent},
+        running timed calls and calls from other threads.
+    @ivar longestRunUntilCurrent: The longest time one C{runUntilCurrent}
+        took.
+    @ivar dispatches: The number of times a ready descriptor's C{doRead} or
+        C{doWrite} was called.
+    @ivar mostDispatches: The largest number of dispatches in one iteration.
+    @ivar dispatchTime: The total time spent in C{doRead} and C{doWrite}.
+    @ivar timedCalls: The number of timed calls run.
+    @ivar timerLag: The total time by which timed calls ran later than they
+        were scheduled to.
+    @ivar longestTimerLag: The longest time by which one timed call ran late.
+    @ivar slowCalls: The number of calls which took at least the monitor's
+        C{slowThreshold}.
+    """
+
+    iterations = attr.ib(default=0)  # type: int
+    iterationTime = attr.ib(default=0.0)  # type: float
+    longestIteration = attr.ib(default=0.0)  # type: float
+    runUntilCurrentTime = attr.ib(default=0.0)  # type: float
+    longestRunUntilCurrent = attr.ib(default=0.0)  # type: float
+    dispatches = attr.ib(default=0)  # type: int
+    mostDispatches = attr.ib(default=0)  # type: int
+    dispatchTime = attr.ib(default=0.0)  # type: float
+    timedCalls = attr.ib(default=0)  # type: int
+    timerLag = attr.ib(default=0.0)  # type: float
+    longestTimerLag = attr.ib(default=0.0)  # type: float
+    slowCalls = attr.ib(default=0)  # type: int
+
+
+def _describe(obj: Any) -> str:
+    """
+    Describe the object responsible for a call, by its log prefix if it has
+    one, or else by its name.
+    """
+    logPrefix = getattr(obj, "logPrefix", None)
+    if logPrefix is None:
+        logPrefix = getattr(getattr(obj, "__self__", None), "logPrefix", None)
+    if logPrefix is not None:
+        try:
+            return str(logPrefix())
+        except BaseException:
+            pass
+    try:
+        return str(_fullyQualifiedName(obj))
+    except BaseException:
+        return repr(obj)
+
+
+class LoopMonitor:
+    """
+    Measures a reactor's loop, as described by L{LoopStatistics}, and logs a
+    warning for every call which takes at least C{slowThreshold} seconds.
+
+    Created by L{ReactorBase.installLoopMonitor}, which arranges for the
+    reactor to call into it.  Descriptors are timed by reactors which
+    dispatch to them with a C{_doReadOrWrite} method, which all of the
+    select, poll, epoll and io_uring reactors do.
+
+    @ivar statistics: What has been measured since the monitor was installed
+        or last reset.
+    @type statistics: L{LoopStatistics}
+
+    @ivar slowThreshold: The number of seconds a call must take to be logged
+        as slow.
+    @type slowThreshold: L{float}
+
+    @ivar _iterationDispatches: The number of dispatches made so far in the
+        current iteration.
+
+    @ivar _log: The L{Logger} slow calls and reports are logged with.
+
+    @ivar _reportCall: The timed call which will next call L{report}, or
+        L{None}.
+    """
+
+    def __init__(
+        self,
+        reactor: "ReactorBase",
+        slowThreshold: float = 0.1,
+        reportInterval: Optional[float] = None,
+    ) -> None:
+        """
+        @param reactor: The reactor to measure.
+        @param slowThreshold: See L{slowThreshold}.
+        @param reportInterval: If not L{None}, call L{report} every this
+            many seconds.
+        """
+        self._reactor = reactor
+        self._log = Logger(source=self)
+        self.slowThreshold = slowThreshold
+        self.statistics = LoopStatistics()
+        self._iterationDispatches = 0
+        self._reportCall = None  # type: Optional[DelayedCall]
+        if reportInterval is not None:
+            self._scheduleReport(reportInterval)
+
+    def uninstall(self) -> None:
+        """
+        Stop measuring the reactor.
+        """
+        reactor = self._reactor
+        if reactor._loopMonitor is self:
+            reactor._loopMonitor = None
+            reactor.__dict__.pop("_doReadOrWrite", None)
+        if self._reportCall is not None and self._reportCall.active():
+            self._reportCall.cancel()
+        self._reportCall = None
+
+    def _scheduleReport(self, interval: float) -> None:
+        """
+        Arrange for L{report} to be called in C{interval} seconds, and every
+        C{interval} seconds after that.
+        """
+
+        def reportAndReschedule() -> None:
+            self._scheduleReport(interval)
+            self.report()
+
+        self._reportCall = self._reactor.callLater(interval, reportAndReschedule)
+
+    def reset(self) -> LoopStatistics:
+        """
+        Start measuring afresh.
+
+        @return: What was measured before.
+        """
+        statistics, self.statistics = self.statistics, LoopStatistics()
+        return statistics
+
+    def report(self) -> LoopStatistics:
+        """
+        Log what has been measured since the last report as a
+        C{twisted.logger} event, with the fields of L{LoopStatistics}, and
+        start measuring afresh.
+
+        @return: What was reported.
+        """
+        statistics = self.reset()
+        self._log.info(
+            "Reactor loop: {iterations} iterations, longest {longestIteration:.3f}s;"
+            " {dispatches} dispatches taking {dispatchTime:.3f}s;"
+            " {timedCalls} timed calls, longest lag {longestTimerLag:.3f}s;"
+            " {slowCalls} slow calls",
+            **attr.asdict(statistics),
+        )
+        return statistics
+
+    def _slow(self, kind: str, responsible: Any, duration: float) -> None:
+        """
+        Record and log a slow call.
+
+        @param kind: What sort of call it was.
+        @param responsible: The object on whose behalf it was made.
+        @param duration: How long it took.
+        """
+        self.statistics.slowCalls += 1
+        self._log.warn(
+            "Slow {kind} for {logPrefix} took {duration:.3f}s",
+            kind=kind,
+            logPrefix=_describe(responsible),
+            duration=duration,
+        )
+
+    def _iterate(self) -> None:
+        """
+        Run one iteration of the reactor's loop, measuring it.
+        """
+        reactor = self._reactor
+        seconds = reactor.seconds
+        start = seconds()
+        reactor.runUntilCurrent()
+        ran = seconds()
+        t2 = reactor.timeout()
+        t = reactor.running and t2
+        self._iterationDispatches = 0
+        reactor.doIteration(t)
+        duration = seconds() - start
+
+        statistics = self.statistics
+        statistics.iterations += 1
+        statistics.iterationTime += duration
+        if duration > statistics.longestIteration:
+            statistics.longestIteration = duration
+        duration = ran - start
+        statistics.runUntilCurrentTime += duration
+        if duration > statistics.longestRunUntilCurrent:
+            statistics.longestRunUntilCurrent = duration
+        if self._iterationDispatches > statistics.mostDispatches:
+            statistics.mostDispatches = self._iterationDispatches
+
+    def _runTimedCall(self, call: "DelayedCall") -> None:
+        """
+        Run a timed call which is due, measuring how late it is and how long
+        it takes.
+        """
+        seconds = self._reactor.seconds
+        start = seconds()
+        lag = start - call.time
+        statistics = self.statistics
+        statistics.timedCalls += 1
+        statistics.timerLag += lag
+        if lag > statistics.longestTimerLag:
+            statistics.longestTimerLag = lag
+        try:
+            call.func(*call.args, **call.kw)
+        finally:
+            duration = seconds() - start
+            if duration >= self.slowThreshold:
+                self._slow("timed call", call.func, duration)
+
+    def _runThreadCall(self, f: Callable[..., Any], args: Any, kw: Any) -> None:
+        """
+        Run a call from another thread, measuring how long it takes.
+        """
+        seconds = self._reactor.seconds
+        start = seconds()
+        try:
+            f(*args, **kw)
+        finally:
+            duration = seconds() - start
+            if duration >= self.slowThreshold:
+                self._slow("call from thread", f, duration)
+
+    def _timeDispatches(
+        self, doReadOrWrite: Callable[..., None]
+    ) -> Callable[..., None]:
+        """
+        Wrap a reactor's C{_doReadOrWrite} method to measure how long the
+        descriptors it dispatches to take.
+        """
+        seconds = self._reactor.seconds
+
+        def _doReadOrWrite(selectable: Any, *args: Any) -> None:
+            start = seconds()
+            try:
+                doReadOrWrite(selectable, *args)
+            finally:
+                duration = seconds() - start
+                statistics = self.statistics
+                statistics.dispatches += 1
+                statistics.dispatchTime += duration
+                self._iterationDispatches += 1
+                if duration >= self.slowThreshold:
+                    self._slow("I/O", selectable, duration)
+
+        return _doReadOrWrite
@@ -0,0 +1,258 @@
+# -*- test-case-name: twisted.internet.test.test_timerwheel -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+A hierarchical timing wheel for coarse scheduling of L{DelayedCall}s.
+
+The wheel divides time into ticks of a fixed resolution and files each call
+into a slot according to the tick in which it is due.  Slots are grouped into
+levels; each level covers C{2 ** bits} times the span of the level below it,
+and calls are moved ("cascaded") towards level 0 as their due time
+approaches.  This makes adding and removing calls constant-time operations,
+independent of the number of calls being tracked.
+
+The wheel never runs calls itself.  Instead, calls are I{released} from the
+wheel once the tick they were filed under has been reached, and the reactor
+moves them into its precise heap of timed calls, which is what ultimately
+decides the order in which they run.  A call is never released after the
+time it is due, so using the wheel never delays a call; it only changes how
+the reactor keeps track of calls which are far in the future.
+"""
+
+
+from typing import Dict, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from twisted.internet.base import DelayedCall
+
+
+_Slot = Dict["DelayedCall", None]
+
+
+class TimerWheel:
+    """
+    A hierarchical timing wheel.
+
+    Each level C{k} holds the calls which are due within the same period of
+    C{2 ** (bits * (k + 1))} ticks as the current tick but in a later period
+    of C{2 ** (bits * k)} ticks.  Calls which are due beyond the period
+    covered by the highest level are not accepted by L{add}, and should be
+    kept elsewhere by the caller.
+
+    @ivar resolution: The length of one tick, in seconds.
+
+    @ivar _bits: The base two logarithm of the number of slots per level.
+
+    @ivar _mask: A mask selecting a slot index from a tick number.
+
+    @ivar _current: The number of the most recent tick which the wheel has
+        been advanced to.  Calls due in this tick or any earlier tick are
+        never stored in the wheel.
+
+    @ivar _levels: The slots of each level; every slot is a L{dict} used as an
+        insertion-ordered set of L{DelayedCall}s.
+
+    @ivar _counts: The number of calls stored in each level.
+
+    @ivar _slotOf: A mapping from each stored call to the level and slot it is
+        stored in, so that it can be removed in constant time.
+    """
+
+    def __init__(
+        self, now: float, resolution: float = 0.1, bits: int = 8, levels: int = 4
+    ) -> None:
+        """
+        @param now: The current time, in seconds.
+        @param resolution: The length of one tick, in seconds.
+        @param bits: The base two logarithm of the number of slots per level.
+        @param levels: The number of levels of the wheel.
+        """
+        if resolution <= 0:
+            raise ValueError("resolution must be positive, not {!r}".format(resolution))
+        self.resolution = resolution
+        self._bits = bits
+        self._mask = (1 << bits) - 1
+        self._levels = [
+            [{} for _ in range(1 << bits)] for _ in range(levels)
+        ]  # type: List[List[_Slot]]
+        self._counts = [0] * levels
+        self._slotOf = {}  # type: Dict[DelayedCall, Tuple[int, _Slot]]
+        self._current = self._tickFor(now)
+
+    def __len__(self) -> int:
+        return len(self._slotOf)
+
+    def __contains__(self, call: object) -> bool:
+        return call in self._slotOf
+
+    def __iter__(self) -> Iterator["DelayedCall"]:
+        return iter(list(self._slotOf))
+
+    def _tickFor(self, when: float) -> int:
+        """
+        Find the tick during which the given time falls.
+
+        @param when: A time, in seconds.
+
+        @return: The number of the tick C{n} for which C{n * resolution <=
+            when < (n + 1) * resolution}, computed so that it is consistent
+            with the tick start times reported by L{nextTime} despite
+            floating point rounding.
+        """
+        resolution = self.resolution
+        tick = int(when // resolution)
+        if tick * resolution > when:
+            tick -= 1
+        elif (tick + 1) * resolution <= when:
+            tick += 1
+        return tick
+
+    def _place(self, call: "DelayedCall", tick: int) -> bool:
+        """
+        File C{call} under C{tick} relative to the current tick.
+
+        @return: C{True} if the call was stored, C{False} if it is due no
+            later than the current tick or beyond the span of the wheel.
+        """
+        current = self._current
+        if tick <= current:
+            return False
+        bits = self._bits
+        shift = bits
+        for level, slots in enumerate(self._levels):
+            if (tick >> shift) == (current >> shift):
+                slot = slots[(tick >> (shift - bits)) & self._mask]
+                slot[call] = None
+                self._slotOf[call] = (level, slot)
+                self._counts[level] += 1
+                return True
+            shift += bits
+        return False
+
+    def add(self, call: "DelayedCall") -> bool:
+        """
+        Start tracking a call.
+
+        @param call: The call to track.  It must not already be tracked by this
+            wheel.
+
+        @return: C{True} if the call is now tracked by the wheel, C{False} if
+            it is due too soon or too far in the future for the wheel and
+            should be scheduled by some other means.
+        """
+        return self._place(call, self._tickFor(call.getTime()))
+
+    def remove(self, call: "DelayedCall") -> bool:
+        """
+        Stop tracking a call.
+
+        @param call: The call to stop tracking.
+
+        @return: C{True} if the call was tracked by the wheel, C{False}
+            otherwise.
+        """
+        entry = self._slotOf.pop(call, None)
+        if entry is None:
+            return False
+        level, slot = entry
+        del slot[call]
+        self._counts[level] -= 1
+        return True
+
+    def _release(self, level: int, index: int, released: List["DelayedCall"]) -> None:
+        """
+        Empty one slot, re-filing its calls relative to the current tick.
+
+        Calls which cannot be re-filed are appended to C{released}.
+        """
+        slots = self._levels[level]
+        slot = slots[index]
+        if not slot:
+            return
+        slots[index] = {}
+        self._counts[level] -= len(slot)
+        slotOf = self._slotOf
+        for call in slot:
+            del slotOf[call]
+            if not self._place(call, self._tickFor(call.getTime())):
+                released.append(call)
+
+    def _cascade(self, released: List["DelayedCall"]) -> None:
+        """
+        Having just reached the first tick of a new rotation of level 0, move
+        the calls filed under the slots of the higher levels which cover that
+        tick down towards level 0, releasing those which are due now.
+        """
+        current = self._current
+        bits = self._bits
+        top = 1
+        while top < len(self._levels) - 1 and not current & (
+            (1 << (bits * (top + 1))) - 1
+        ):
+            top += 1
+        for level in range(top, 0, -1):
+            self._release(level, (current >> (bits * level)) & self._mask, released)
+        self._release(0, current & self._mask, released)
+
+    def advance(self, now: float) -> List["DelayedCall"]:
+        """
+        Move the wheel forward to the given time.
+
+        @param now: The current time, in seconds.  If it is earlier than the
+            time the wheel was last advanced to, nothing happens.
+
+        @return: The calls which are no longer tracked by the wheel because
+            the tick they are due in has been reached.
+        """
+        target = self._tickFor(now)
+        released = []  # type: List[DelayedCall]
+        counts = self._counts
+        mask = self._mask
+        while self._current < target:
+            if not self._slotOf:
+                self._current = target
+                break
+            level = 0
+            while not counts[level]:
+                level += 1
+            shift = self._bits * (level or 1)
+            boundary = ((self._current >> shift) + 1) << shift
+            if level == 0:
+                stop = min(target, boundary - 1)
+                while self._current < stop and counts[0]:
+                    self._current += 1
+                    self._release(0, self._current & mask, released)
+                if stop == target:
+                    self._current = target
+                    break
+            elif target < boundary:
+                self._current = target
+                break
+            self._current = boundary
+            self._cascade(released)
+        return released
+
+    def nextTime(self) -> Optional[float]:
+        """
+        Determine a time before which none of the tracked calls are due.
+
+        The result is the start of the first tick in which the wheel has work
+        to do, found by examining at most one level's worth of slots.
+
+        @return: A time, in seconds, or L{None} if no calls are tracked.
+        """
+        if not self._slotOf:
+            return None
+        level = 0
+        while not self._counts[level]:
+            level += 1
+        bits = self._bits
+        shift = bits * level
+        current = self._current
+        slots = self._levels[level]
+        base = (current >> (shift + bits)) << (shift + bits)
+        for index in range(((current >> shift) & self._mask) + 1, self._mask + 1):
+            if slots[index]:
+                return (base | (index << shift)) * self.resolution
+        raise RuntimeError("Timer wheel level {} is inconsistent".format(level))
@@ -174,6 +174,16 @@ class FileDescriptor(_ConsumerMixin, _LogOwner):
 
     SEND_LIMIT = 128 * 1024
 
+    # The maximum number of buffers to pass to a single call to
+    # _writeSomeDataVector, or 0 if this descriptor does not support vectored
+    # writes.
+    _writeVectorLimit = 0
+
+    # Buffers smaller than this are joined with their neighbours rather than
+    # passed to _writeSomeDataVector individually, since copying them is
+    # cheaper than the per-buffer overhead of a vectored write.
+    _writeVectorMinimum = 1024
+
     def __init__(self, reactor: Optional[interfaces.IReactorFDSet] = None):
         """
         @param reactor: An L{IReactorFDSet} provider which this descriptor will
@@ -221,6 +231,98 @@ class FileDescriptor(_ConsumerMixin, _LogOwner):
             "%s does not implement writeSomeData" % reflect.qual(self.__class__)
         )
 
+    def _writeSomeDataVector(self, vector: List[bytes]) -> int:
+        """
+        Write as much as possible of the given buffers, in order, immediately.
+
+        Subclasses which set C{_writeVectorLimit} must override this to send
+        the buffers with a single scatter/gather operation, such as
+        C{sendmsg()} or C{writev()}.  The result is interpreted in the same way
+        as the result of L{writeSomeData}.
+
+        @param vector: A L{list} of L{bytes} or L{memoryview} objects, no
+            longer than C{_writeVectorLimit}.
+        """
+        raise NotImplementedError(
+            "%s does not implement _writeSomeDataVector" % reflect.qual(self.__class__)
+        )
+
+    def _doWriteVector(self):
+        """
+        Write buffered data by handing the queued buffers directly to
+        L{_writeSomeDataVector}, rather than joining them together first.
+
+        C{dataBuffer} and C{offset} keep track of the buffer which has been
+        partially written, if any, and the buffers in C{_tempDataBuffer}
+        which have been completely written are discarded.
+
+        @return: L{None} if the write succeeded (even partially), otherwise
+            the failure result of L{_writeSomeDataVector}.
+        """
+        buffers = self._tempDataBuffer
+        vector = []
+        size = len(self.dataBuffer) - self.offset
+        if size:
+            vector.append(lazyByteSlice(self.dataBuffer, self.offset))
+        limit = self._writeVectorLimit
+        minimum = self._writeVectorMinimum
+        # Small buffers are cheaper to copy than to pass individually, so
+        # runs of them are still joined together.
+        small = []  # type: List[bytes]
+        count = 0
+        for buffer in buffers:
+            if size >= self.SEND_LIMIT:
+                break
+            if len(buffer) < minimum:
+                if not small and len(vector) == limit:
+                    break
+                small.append(buffer)
+            else:
+                if small:
+                    vector.append(b"".join(small))
+                    small = []
+                if len(vector) == limit:
+                    break
+                vector.append(buffer)
+            size += len(buffer)
+            count += 1
+        if small:
+            vector.append(b"".join(small))
+
+        l = self._writeSomeDataVector(vector)
+        if isinstance(l, Exception) or l < 0:
+            return l
+
+        remaining = len(self.dataBuffer) - self.offset
+        if l < remaining:
+            self.offset += l
+            return None
+        l -= remaining
+        self.dataBuffer = b""
+        self.offset = 0
+        if l == size - remaining:
+            # Everything was written.
+            self._tempDataLen -= l
+            del buffers[:count]
+            return None
+        written = 0
+        while written < count:
+            length = len(buffers[written])
+            if l < length:
+                if l:
+                    # This buffer was only partially written; it becomes the
+                    # one tracked by dataBuffer and offset.
+                    self.dataBuffer = buffers[written]
+                    self.offset = l
+                    self._tempDataLen -= length
+                    written += 1
+                break
+            l -= length
+            self._tempDataLen -= length
+            written += 1
+        del buffers[:written]
+        return None
+
     def doRead(self):
         """
         Called when data is available for reading.
@@ -241,29 +343,40 @@ class FileDescriptor(_ConsumerMixin, _LogOwner):
 
         @see: L{twisted.internet.interfaces.IWriteDescriptor.doWrite}.
         """
-        if len(self.dataBuffer) - self.offset < self.SEND_LIMIT:
-            # If there is currently less than SEND_LIMIT bytes left to send
-            # in the string, extend it with the array data.
-            self.dataBuffer = _concatenate(
-                self.dataBuffer, self.offset, self._tempDataBuffer
-            )
-            self.offset = 0
-            self._tempDataBuffer = []
-            self._tempDataLen = 0
-
-        # Send as much data as you can.
-        if self.offset:
-            l = self.writeSomeData(lazyByteSlice(self.dataBuffer, self.offset))
+        if self._writeVectorLimit and (
+            self._tempDataLen >= self._writeVectorMinimum * len(self._tempDataBuffer)
+        ):
+            # The queued buffers are large enough on average that it is
+            # worth sending them as they are, avoiding the copy needed to
+            # join them together.
+            l = self._doWriteVector()
+            if l is not None:
+                return l
         else:
-            l = self.writeSomeData(self.dataBuffer)
-
-        # There is no writeSomeData implementation in Twisted which returns
-        # < 0, but the documentation for writeSomeData used to claim negative
-        # integers meant connection lost.  Keep supporting this here,
-        # although it may be worth deprecating and removing at some point.
-        if isinstance(l, Exception) or l < 0:
-            return l
-        self.offset += l
+            if len(self.dataBuffer) - self.offset < self.SEND_LIMIT:
+                # If there is currently less than SEND_LIMIT bytes left to
+                # send in the string, extend it with the array data.
+                self.dataBuffer = _concatenate(
+                    self.dataBuffer, self.offset, self._tempDataBuffer
+                )
+                self.offset = 0
+                self._tempDataBuffer = []
+                self._tempDataLen = 0
+
+            # Send as much data as you can.
+            if self.offset:
+                l = self.writeSomeData(lazyByteSlice(self.dataBuffer, self.offset))
+            else:
+                l = self.writeSomeData(self.dataBuffer)
+
+            # There is no writeSomeData implementation in Twisted which returns
+            # < 0, but the documentation for writeSomeData used to claim
+            # negative integers meant connection lost.  Keep supporting this
+            # here, although it may be worth deprecating and removing at some
+            # point.
+            if isinstance(l, Exception) or l < 0:
+                return l
+            self.offset += l
         # If there is nothing left to send,
         if self.offset == len(self.dataBuffer) and not self._tempDataLen:
             self.dataBuffer = b""
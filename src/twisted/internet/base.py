@@ -40,6 +40,7 @@ from twisted.internet._resolver import (
     GAIResolver as _GAIResolver,
     SimpleResolverComplexifier as _SimpleResolverComplexifier,
 )
+from twisted.internet._timerwheel import TimerWheel
 from twisted.internet.defer import Deferred, DeferredList
 from twisted.internet.interfaces import (
     _ISupportsExitSignalCapturing,
@@ -63,6 +64,7 @@ from twisted.python.failure import Failure
 from twisted.python.runtime import seconds as runtimeSeconds, platform
 
 if TYPE_CHECKING:
+    from twisted.internet._loopmonitor import LoopMonitor
     from twisted.internet.tcp import Client
 
 # This import is for side-effects!  Even if you don't see any code using it
@@ -593,6 +595,11 @@ class ReactorBase(PluggableResolverMixin):
         register the thread it is running in as the I/O thread when it starts.
         If C{True}, registration will be done, otherwise it will not be.
     @ivar _exitSignal: See L{_ISupportsExitSignalCapturing._exitSignal}
+    @ivar _timerWheel: The L{TimerWheel} which tracks timed calls that are not
+        yet due, or L{None} if all timed calls are kept in
+        C{_pendingTimedCalls}.  See L{installTimerWheel}.
+    @ivar _loopMonitor: The L{LoopMonitor} measuring the reactor's loop, or
+        L{None}.  See L{installLoopMonitor}.
     """
 
     _registerAsIOThread = True
@@ -611,6 +618,8 @@ class ReactorBase(PluggableResolverMixin):
         self._pendingTimedCalls = []  # type: List[DelayedCall]
         self._newTimedCalls = []  # type: List[DelayedCall]
         self._cancellations = 0
+        self._timerWheel = None  # type: Optional[TimerWheel]
+        self._loopMonitor = None  # type: Optional[LoopMonitor]
         self.running = False
         self._started = False
         self._justStopped = False
@@ -882,7 +891,81 @@ class ReactorBase(PluggableResolverMixin):
         self._newTimedCalls.append(delayedCall)
         return delayedCall
 
+    def installTimerWheel(self, resolution: float = 0.1) -> None:
+        """
+        Keep track of timed calls which are not yet due using a hierarchical
+        timing wheel rather than only a heap.
+
+        Scheduling, cancelling and rescheduling a call tracked by the wheel
+        take constant time regardless of the number of outstanding calls,
+        which makes the wheel well suited to reactors with a large number of
+        long timeouts which are frequently reset or cancelled before they
+        expire.  Calls still run at the time they are scheduled for and in
+        the same order as without the wheel.
+
+        @param resolution: The granularity, in seconds, with which the wheel
+            tracks calls.  Calls due within one such interval of the current
+            time are kept in the heap.
+        """
+        previous = self._timerWheel
+        self._timerWheel = TimerWheel(self.seconds(), resolution)
+        if previous is not None:
+            for call in previous:
+                call.activate_delay()
+                self._scheduleTimedCall(call)
+
+    def installLoopMonitor(
+        self, slowThreshold: float = 0.1, reportInterval: Optional[float] = None
+    ) -> "LoopMonitor":
+        """
+        Measure how long each iteration of the reactor's loop takes and what
+        it spends that time on, and log a warning, naming the object
+        responsible, for every timed call, call from another thread, or
+        C{doRead} or C{doWrite} which takes too long.
+
+        What is measured is available from the monitor's C{statistics}
+        attribute, and is logged as a C{twisted.logger} event every
+        C{reportInterval} seconds if that is given.  Measuring adds a little
+        overhead to every iteration and every call, so it is off unless this
+        is called.
+
+        @param slowThreshold: The number of seconds a call must take to be
+            logged as slow.
+        @param reportInterval: If not L{None}, log what has been measured
+            every this many seconds.
+
+        @return: The monitor, which stops measuring when its C{uninstall}
+            method is called.  Installing another monitor uninstalls this
+            one.
+        @rtype: L{twisted.internet._loopmonitor.LoopMonitor}
+        """
+        from twisted.internet._loopmonitor import LoopMonitor
+
+        if self._loopMonitor is not None:
+            self._loopMonitor.uninstall()
+        monitor = LoopMonitor(self, slowThreshold, reportInterval)
+        self._loopMonitor = monitor
+        doReadOrWrite = getattr(self, "_doReadOrWrite", None)
+        if doReadOrWrite is not None:
+            # Dispatching looks the method up on the reactor each iteration.
+            self._doReadOrWrite = monitor._timeDispatches(doReadOrWrite)
+        return monitor
+
+    def _scheduleTimedCall(self, delayedCall: DelayedCall) -> None:
+        """
+        Start tracking a timed call whose delay has been applied to its time,
+        using the timer wheel if there is one and it can accept the call.
+        """
+        wheel = self._timerWheel
+        if wheel is None or not wheel.add(delayedCall):
+            heappush(self._pendingTimedCalls, delayedCall)
+
     def _moveCallLaterSooner(self, delayedCall: DelayedCall) -> None:
+        wheel = self._timerWheel
+        if wheel is not None and wheel.remove(delayedCall):
+            self._scheduleTimedCall(delayedCall)
+            return
+
         # Linear time find: slow.
         heap = self._pendingTimedCalls
         try:
@@ -903,7 +986,9 @@ class ReactorBase(PluggableResolverMixin):
             pass
 
     def _cancelCallLater(self, delayedCall: DelayedCall) -> None:
-        self._cancellations += 1
+        wheel = self._timerWheel
+        if wheel is None or not wheel.remove(delayedCall):
+            self._cancellations += 1
 
     def getDelayedCalls(self) -> List[IDelayedCall]:
         """
@@ -914,11 +999,10 @@ class ReactorBase(PluggableResolverMixin):
 
         @return: A list of outstanding delayed calls.
         """
-        return [
-            x
-            for x in (self._pendingTimedCalls + self._newTimedCalls)
-            if not x.cancelled
-        ]
+        calls = self._pendingTimedCalls + self._newTimedCalls
+        if self._timerWheel is not None:
+            calls.extend(self._timerWheel)
+        return [x for x in calls if not x.cancelled]
 
     def _insertNewDelayedCalls(self) -> None:
         for call in self._newTimedCalls:
@@ -926,7 +1010,7 @@ class ReactorBase(PluggableResolverMixin):
                 self._cancellations -= 1
             else:
                 call.activate_delay()
-                heappush(self._pendingTimedCalls, call)
+                self._scheduleTimedCall(call)
         self._newTimedCalls = []
 
     def timeout(self) -> Optional[float]:
@@ -940,10 +1024,21 @@ class ReactorBase(PluggableResolverMixin):
         # insert new delayed calls to make sure to include them in timeout value
         self._insertNewDelayedCalls()
 
-        if not self._pendingTimedCalls:
+        nextTime = None  # type: Optional[float]
+        if self._pendingTimedCalls:
+            nextTime = self._pendingTimedCalls[0].time
+        if self._timerWheel is not None:
+            # This is only a lower bound on when the next call in the wheel
+            # is due, but it is cheap to compute and waking up early merely
+            # gives runUntilCurrent the chance to move calls into the heap.
+            wheelTime = self._timerWheel.nextTime()
+            if wheelTime is not None and (nextTime is None or wheelTime < nextTime):
+                nextTime = wheelTime
+
+        if nextTime is None:
             return None
 
-        delay = self._pendingTimedCalls[0].time - cast(float, self.seconds())
+        delay = nextTime - cast(float, self.seconds())
 
         # Pick a somewhat arbitrary maximum possible value for the timeout.
         # This value is 2 ** 31 / 1000, which is the number of seconds which can
@@ -961,6 +1056,7 @@ class ReactorBase(PluggableResolverMixin):
         """
         Run all pending timed calls.
         """
+        monitor = self._loopMonitor
         if self.threadCallQueue:
             # Keep track of how many calls we actually make, as we're
             # making them, in case another call is added to the queue
@@ -969,7 +1065,10 @@ class ReactorBase(PluggableResolverMixin):
             total = len(self.threadCallQueue)
             for (f, a, kw) in self.threadCallQueue:
                 try:
-                    f(*a, **kw)
+                    if monitor is None:
+                        f(*a, **kw)
+                    else:
+                        monitor._runThreadCall(f, a, kw)
                 except BaseException:
                     log.err()
                 count += 1
@@ -983,6 +1082,11 @@ class ReactorBase(PluggableResolverMixin):
         self._insertNewDelayedCalls()
 
         now = self.seconds()
+        if self._timerWheel is not None:
+            for call in self._timerWheel.advance(now):
+                call.activate_delay()
+                self._scheduleTimedCall(call)
+
         while self._pendingTimedCalls and (self._pendingTimedCalls[0].time <= now):
             call = heappop(self._pendingTimedCalls)
             if call.cancelled:
@@ -991,12 +1095,15 @@ class ReactorBase(PluggableResolverMixin):
 
             if call.delayed_time > 0.0:
                 call.activate_delay()
-                heappush(self._pendingTimedCalls, call)
+                self._scheduleTimedCall(call)
                 continue
 
             try:
                 call.called = 1
-                call.func(*call.args, **call.kw)
+                if monitor is None:
+                    call.func(*call.args, **call.kw)
+                else:
+                    monitor._runTimedCall(call)
             except BaseException:
                 log.deferr()
                 if hasattr(call, "creator"):
@@ -1414,6 +1521,9 @@ class _SignalReactorMixin:
         while reactorBaseSelf._started:
             try:
                 while reactorBaseSelf._started:
+                    if reactorBaseSelf._loopMonitor is not None:
+                        reactorBaseSelf._loopMonitor._iterate()
+                        continue
                     # Advance simulation time in delayed event
                     # processors.
                     reactorBaseSelf.runUntilCurrent()
@@ -107,7 +107,13 @@ def succeed(result: object) -> "Deferred":
            method.
     """
     d = Deferred()
-    d.callback(result)
+    if d.debug or isinstance(result, (Deferred, failure.Failure)):
+        d.callback(result)
+    else:
+        # Nothing can have been added to the callback chain yet, so there is
+        # nothing to run.
+        d.called = True
+        d.result = result
     return d
 
 
@@ -633,33 +639,48 @@ class Deferred:
 
             finished = True
             current._chainedTo = None
-            while current.callbacks:
-                item = current.callbacks.pop(0)
-                callback, args, kw = item[isinstance(current.result, failure.Failure)]
-                args = args or ()
-                kw = kw or {}
-
-                # Avoid recursion if we can.
-                if callback is _CONTINUE:
-                    # Give the waiting Deferred our current result and then
-                    # forget about that result ourselves.
-                    chainee = args[0]
-                    chainee.result = current.result
-                    current.result = None
-                    # Making sure to update _debugInfo
-                    if current._debugInfo is not None:
-                        current._debugInfo.failResult = None
-                    chainee.paused -= 1
-                    chain.append(chainee)
-                    # Delay cleaning this Deferred and popping it from the chain
-                    # until after we've dealt with chainee.
-                    finished = False
-                    break
+            # Callbacks are consumed from the front of the list by index, and
+            # removed all at once when the loop stops, rather than popped one
+            # at a time, which takes time proportional to the length of the
+            # list.  Callbacks added while the loop is running are appended to
+            # the same list, and so are run by it.
+            callbacks = current.callbacks
+            index = 0
+            current._runningCallbacks = True
+            try:
+                while index < len(callbacks):
+                    callback, args, kw = callbacks[index][
+                        isinstance(current.result, failure.Failure)
+                    ]
+                    index += 1
+
+                    # Avoid recursion if we can.
+                    if callback is _CONTINUE:
+                        # Give the waiting Deferred our current result and then
+                        # forget about that result ourselves.
+                        chainee = args[0]
+                        chainee.result = current.result
+                        current.result = None
+                        # Making sure to update _debugInfo
+                        if current._debugInfo is not None:
+                            current._debugInfo.failResult = None
+                        chainee.paused -= 1
+                        chain.append(chainee)
+                        # Delay cleaning this Deferred and popping it from the
+                        # chain until after we've dealt with chainee.
+                        finished = False
+                        break
 
-                try:
-                    current._runningCallbacks = True
                     try:
-                        current.result = callback(current.result, *args, **kw)
+                        # Most callbacks are added without extra arguments.
+                        if kw:
+                            current.result = callback(
+                                current.result, *(args or ()), **kw
+                            )
+                        elif args:
+                            current.result = callback(current.result, *args)
+                        else:
+                            current.result = callback(current.result)
 
                         if current.result is current:
                             warnAboutFunction(
@@ -669,38 +690,41 @@ class Deferred:
                                 "callback chain and will raise an "
                                 "exception in the future.",
                             )
-                    finally:
-                        current._runningCallbacks = False
-                except BaseException:
-                    # Including full frame information in the Failure is quite
-                    # expensive, so we avoid it unless self.debug is set.
-                    current.result = failure.Failure(captureVars=self.debug)
-                else:
-                    if isinstance(current.result, Deferred):
-                        # The result is another Deferred.  If it has a result,
-                        # we can take it and keep going.
-                        resultResult = getattr(current.result, "result", _NO_RESULT)
-                        if (
-                            resultResult is _NO_RESULT
-                            or isinstance(resultResult, Deferred)
-                            or current.result.paused
-                        ):
-                            # Nope, it didn't.  Pause and chain.
-                            current.pause()
-                            current._chainedTo = current.result
-                            # Note: current.result has no result, so it's not
-                            # running its callbacks right now.  Therefore we can
-                            # append to the callbacks list directly instead of
-                            # using addCallbacks.
-                            current.result.callbacks.append(current._continuation())
-                            break
-                        else:
-                            # Yep, it did.  Steal it.
-                            current.result.result = None
-                            # Make sure _debugInfo's failure state is updated.
-                            if current.result._debugInfo is not None:
-                                current.result._debugInfo.failResult = None
-                            current.result = resultResult
+                    except BaseException:
+                        # Including full frame information in the Failure is
+                        # quite expensive, so we avoid it unless self.debug is
+                        # set.
+                        current.result = failure.Failure(captureVars=self.debug)
+                    else:
+                        if isinstance(current.result, Deferred):
+                            # The result is another Deferred.  If it has a
+                            # result, we can take it and keep going.
+                            resultResult = getattr(current.result, "result", _NO_RESULT)
+                            if (
+                                resultResult is _NO_RESULT
+                                or isinstance(resultResult, Deferred)
+                                or current.result.paused
+                            ):
+                                # Nope, it didn't.  Pause and chain.
+                                current.pause()
+                                current._chainedTo = current.result
+                                # Note: current.result has no result, so it's
+                                # not running its callbacks right now.
+                                # Therefore we can append to the callbacks list
+                                # directly instead of using addCallbacks.
+                                current.result.callbacks.append(current._continuation())
+                                break
+                            else:
+                                # Yep, it did.  Steal it.
+                                current.result.result = None
+                                # Make sure _debugInfo's failure state is
+                                # updated.
+                                if current.result._debugInfo is not None:
+                                    current.result._debugInfo.failResult = None
+                                current.result = resultResult
+            finally:
+                current._runningCallbacks = False
+                del callbacks[:index]
 
             if finished:
                 # As much of the callback chain - perhaps all of it - as can be
@@ -1503,6 +1527,15 @@ def _inlineCallbacks(result, g, status):
 
         if isinstance(result, Deferred):
             # a deferred was yielded, get the result.
+            if result.called and not result.paused and not result.callbacks:
+                # It already has one, which nothing else is waiting for, so
+                # take it, just as the callback below would.
+                value, result.result = result.result, None
+                if result._debugInfo is not None:
+                    result._debugInfo.failResult = None
+                result = value
+                continue
+
             def gotResult(r):
                 if waiting[0]:
                     waiting[0] = False
@@ -485,7 +485,7 @@ class _TCPServerEndpoint:
     A TCP server endpoint interface
     """
 
-    def __init__(self, reactor, port, backlog, interface):
+    def __init__(self, reactor, port, backlog, interface, reusePort=False):
         """
         @param reactor: An L{IReactorTCP} provider.
 
@@ -497,23 +497,35 @@ class _TCPServerEndpoint:
 
         @param interface: The hostname to bind to
         @type interface: str
+
+        @param reusePort: Whether to set C{SO_REUSEPORT} on the listening
+            socket, so that several processes can listen on the same port.
+            This requires C{reactor} to accept a C{reusePort} argument to
+            C{listenTCP}, as the reactors in L{twisted.internet.posixbase}
+            do.
+        @type reusePort: bool
         """
         self._reactor = reactor
         self._port = port
         self._backlog = backlog
         self._interface = interface
+        self._reusePort = reusePort
 
     def listen(self, protocolFactory):
         """
         Implement L{IStreamServerEndpoint.listen} to listen on a TCP
         socket
         """
+        kwargs = {}
+        if self._reusePort:
+            kwargs["reusePort"] = True
         return defer.execute(
             self._reactor.listenTCP,
             self._port,
             protocolFactory,
             backlog=self._backlog,
             interface=self._interface,
+            **kwargs,
         )
 
 
@@ -522,7 +534,7 @@ class TCP4ServerEndpoint(_TCPServerEndpoint):
     Implements TCP server endpoint with an IPv4 configuration
     """
 
-    def __init__(self, reactor, port, backlog=50, interface=""):
+    def __init__(self, reactor, port, backlog=50, interface="", reusePort=False):
         """
         @param reactor: An L{IReactorTCP} provider.
 
@@ -534,8 +546,12 @@ class TCP4ServerEndpoint(_TCPServerEndpoint):
 
         @param interface: The hostname to bind to, defaults to '' (all)
         @type interface: str
+
+        @param reusePort: Whether to set C{SO_REUSEPORT} on the listening
+            socket.  See L{_TCPServerEndpoint.__init__}.
+        @type reusePort: bool
         """
-        _TCPServerEndpoint.__init__(self, reactor, port, backlog, interface)
+        _TCPServerEndpoint.__init__(self, reactor, port, backlog, interface, reusePort)
 
 
 class TCP6ServerEndpoint(_TCPServerEndpoint):
@@ -543,7 +559,7 @@ class TCP6ServerEndpoint(_TCPServerEndpoint):
     Implements TCP server endpoint with an IPv6 configuration
     """
 
-    def __init__(self, reactor, port, backlog=50, interface="::"):
+    def __init__(self, reactor, port, backlog=50, interface="::", reusePort=False):
         """
         @param reactor: An L{IReactorTCP} provider.
 
@@ -555,8 +571,12 @@ class TCP6ServerEndpoint(_TCPServerEndpoint):
 
         @param interface: The hostname to bind to, defaults to C{::} (all)
         @type interface: str
+
+        @param reusePort: Whether to set C{SO_REUSEPORT} on the listening
+            socket.  See L{_TCPServerEndpoint.__init__}.
+        @type reusePort: bool
         """
-        _TCPServerEndpoint.__init__(self, reactor, port, backlog, interface)
+        _TCPServerEndpoint.__init__(self, reactor, port, backlog, interface, reusePort)
 
 
 @implementer(interfaces.IStreamClientEndpoint)
@@ -1319,7 +1339,27 @@ class AdoptedStreamServerEndpoint:
         return defer.succeed(port)
 
 
-def _parseTCP(factory, port, interface="", backlog=50):
+def _parseBoolean(value):
+    """
+    Interpret a yes-or-no argument from an endpoint description string.
+
+    @param value: C{"yes"}, C{"true"} or C{"1"}, or C{"no"}, C{"false"} or
+        C{"0"}, in any case.
+    @type value: C{str}
+
+    @rtype: C{bool}
+
+    @raise ValueError: If C{value} is none of these.
+    """
+    lowered = value.lower()
+    if lowered in ("yes", "true", "1"):
+        return True
+    if lowered in ("no", "false", "0"):
+        return False
+    raise ValueError("Expected yes or no, not {!r}".format(value))
+
+
+def _parseTCP(factory, port, interface="", backlog=50, reusePort="no"):
     """
     Internal parser function for L{_parseServer} to convert the string
     arguments for a TCP(IPv4) stream endpoint into the structured arguments.
@@ -1337,11 +1377,18 @@ def _parseTCP(factory, port, interface="", backlog=50):
     @param backlog: the length of the listen queue
     @type backlog: C{str}
 
+    @param reusePort: C{"yes"} to set C{SO_REUSEPORT} on the listening
+        socket, so that several processes can listen on the same port.
+    @type reusePort: C{str}
+
     @return: a 2-tuple of (args, kwargs), describing  the parameters to
         L{IReactorTCP.listenTCP} (or, modulo argument 2, the factory, arguments
         to L{TCP4ServerEndpoint}.
     """
-    return (int(port), factory), {"interface": interface, "backlog": int(backlog)}
+    kwargs = {"interface": interface, "backlog": int(backlog)}
+    if _parseBoolean(reusePort):
+        kwargs["reusePort"] = True
+    return (int(port), factory), kwargs
 
 
 def _parseUNIX(factory, address, mode="666", backlog=50, lockfile=True):
@@ -1737,6 +1784,12 @@ def serverFromString(reactor, description):
 
         serverFromString(reactor, "tcp:80:interface=127.0.0.1")
 
+    Several processes can listen on the same TCP port, with the kernel
+    distributing connections between them, if they all set C{SO_REUSEPORT}
+    with the C{reusePort} argument::
+
+        serverFromString(reactor, "tcp:80:reusePort=yes")
+
     SSL server endpoints may be specified with the 'ssl' prefix, and the
     private key and certificate files may be specified by the C{privateKey} and
     C{certKey} arguments::
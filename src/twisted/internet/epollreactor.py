@@ -9,6 +9,14 @@ listeners or connectors are added)::
 
     from twisted.internet import epollreactor
     epollreactor.install()
+
+By default descriptors are watched level-triggered, and the reactor tells the
+kernel whenever a descriptor starts or stops being read from or written to.
+In edge-triggered mode (see L{EPollReactor}) TCP connections are instead
+watched for both reading and writing from the start, and are dispatched to
+until they have read or written everything they can, so that starting and
+stopping writing, which happens for almost every write, costs no system
+calls.
 """
 
 import errno
@@ -30,6 +38,8 @@ try:
     EPOLLERR = getattr(select, "EPOLLERR")
     EPOLLIN = getattr(select, "EPOLLIN")
     EPOLLOUT = getattr(select, "EPOLLOUT")
+    EPOLLET = getattr(select, "EPOLLET")
+    EPOLLRDHUP = getattr(select, "EPOLLRDHUP")
 except AttributeError as e:
     raise ImportError(e)
 
@@ -61,6 +71,34 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
     @ivar _continuousPolling: A L{_ContinuousPolling} instance, used to handle
         file descriptors (e.g. filesystem files) that are not supported by
         C{epoll(7)}.
+
+    @ivar _edgeTriggered: Whether descriptors which support it are watched
+        edge-triggered.  Those are the descriptors with a true
+        C{_edgeTriggerable} attribute, which must also have C{_readable} and
+        C{_writable} attributes.  The reactor sets these to C{True} when the
+        kernel reports that the descriptor has become ready for reading or
+        writing, and the descriptor must set them to C{False} when a read or
+        write finds that it is no longer ready; until it does the reactor
+        keeps dispatching to it, without waiting for the kernel.
+
+    @ivar _edges: A set of the file descriptors registered with C{_poller}
+        edge-triggered, for both reading and writing, whatever they are being
+        used for.
+
+    @ivar _ready: A set of file descriptors in C{_edges} which may be ready to
+        read from or write to, and so are to be dispatched to the next time
+        the reactor polls, without waiting.
+
+    @ivar _hangups: A set of file descriptors in C{_edges} for which the
+        kernel has reported that the other end has stopped writing, or an
+        error.  The kernel only reports this once, and a read which comes up
+        short may have stopped before reaching it, so these are kept ready for
+        reading until they are removed.
+
+    @ivar _controlCalls: The number of C{epoll_ctl(2)} calls made, for
+        measuring how many system calls the reactor makes.
+
+    @ivar _waitCalls: The number of C{epoll_wait(2)} calls made.
     """
 
     # Attributes for _PollLikeMixin
@@ -68,10 +106,14 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
     _POLL_IN = EPOLLIN
     _POLL_OUT = EPOLLOUT
 
-    def __init__(self):
+    def __init__(self, edgeTriggered=False):
         """
         Initialize epoll object, file descriptor tracking dictionaries, and the
         base class.
+
+        @param edgeTriggered: If C{True}, watch descriptors which support it
+            edge-triggered.
+        @type edgeTriggered: L{bool}
         """
         # Create the poller we're going to use.  The 1024 here is just a hint
         # to the kernel, it is not a hard maximum.  After Linux 2.6.8, the size
@@ -80,6 +122,12 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
         self._reads = set()
         self._writes = set()
         self._selectables = {}
+        self._edgeTriggered = edgeTriggered
+        self._edges = set()
+        self._ready = set()
+        self._hangups = set()
+        self._controlCalls = 0
+        self._waitCalls = 0
         self._continuousPolling = posixbase._ContinuousPolling(self)
         posixbase.PosixReactorBase.__init__(self)
 
@@ -92,15 +140,28 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
         """
         fd = xer.fileno()
         if fd not in primary:
+            if fd in self._edges:
+                # Already watched for both; just see whether it is ready.
+                if xer._readable if event == EPOLLIN else xer._writable:
+                    self._ready.add(fd)
+                primary.add(fd)
+                return
             flags = event
             # epoll_ctl can raise all kinds of IOErrors, and every one
             # indicates a bug either in the reactor or application-code.
             # Let them all through so someone sees a traceback and fixes
             # something.  We'll do the same thing for every other call to
             # this method in this file.
+            self._controlCalls += 1
             if fd in other:
                 flags |= antievent
                 self._poller.modify(fd, flags)
+            elif self._edgeTriggered and getattr(xer, "_edgeTriggerable", False):
+                # The kernel reports whether it is ready yet once it is
+                # registered.
+                self._poller.register(fd, EPOLLIN | EPOLLOUT | EPOLLRDHUP | EPOLLET)
+                xer._readable = xer._writable = False
+                self._edges.add(fd)
             else:
                 self._poller.register(fd, flags)
 
@@ -159,12 +220,19 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
                 return
         if fd in primary:
             if fd in other:
-                flags = antievent
-                # See comment above modify call in _add.
-                self._poller.modify(fd, flags)
+                if fd not in self._edges:
+                    flags = antievent
+                    # See comment above modify call in _add.
+                    self._controlCalls += 1
+                    self._poller.modify(fd, flags)
             else:
                 del selectables[fd]
+                if fd in self._edges:
+                    self._edges.remove(fd)
+                    self._ready.discard(fd)
+                    self._hangups.discard(fd)
                 # See comment above _control call in _add.
+                self._controlCalls += 1
                 self._poller.unregister(fd)
             primary.remove(fd)
 
@@ -216,9 +284,12 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
         """
         Poll the poller for new events.
         """
-        if timeout is None:
+        if self._ready:
+            timeout = 0  # There is already work to do.
+        elif timeout is None:
             timeout = -1  # Wait indefinitely.
 
+        self._waitCalls += 1
         try:
             # Limit the number of events to the number of io objects we're
             # currently tracking (because that's maybe a good heuristic) and
@@ -235,22 +306,75 @@ class EPollReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
             raise
 
         _drdw = self._doReadOrWrite
+        edges = self._edges
         for fd, event in l:
             try:
                 selectable = self._selectables[fd]
             except KeyError:
                 pass
             else:
-                log.callWithLogger(selectable, _drdw, selectable, fd, event)
+                if fd in edges:
+                    # Disconnection and errors are found out by reading or
+                    # writing.
+                    if event & (EPOLLRDHUP | self._POLL_DISCONNECTED):
+                        self._hangups.add(fd)
+                    if event & EPOLLIN:
+                        selectable._readable = True
+                    if event & (EPOLLOUT | self._POLL_DISCONNECTED):
+                        selectable._writable = True
+                    self._ready.add(fd)
+                else:
+                    log.callWithLogger(selectable, _drdw, selectable, fd, event)
+
+        if self._ready:
+            self._dispatchReady()
+
+    def _dispatchReady(self):
+        """
+        Dispatch to the edge-triggered descriptors which may be ready to read
+        from or write to, if they are being read from or written to.  Those
+        which are still ready afterwards, having stopped short of reading or
+        writing everything they could, are dispatched to again the next time
+        the reactor polls.
+        """
+        _drdw = self._doReadOrWrite
+        selectables = self._selectables
+        reads = self._reads
+        writes = self._writes
+        hangups = self._hangups
+        ready, self._ready = self._ready, set()
+        for fd in ready:
+            selectable = selectables.get(fd)
+            if selectable is None:
+                continue
+            if fd in hangups:
+                selectable._readable = True
+            event = 0
+            if selectable._readable and fd in reads:
+                event = EPOLLIN
+            if selectable._writable and fd in writes:
+                event |= EPOLLOUT
+            if not event:
+                continue
+            log.callWithLogger(selectable, _drdw, selectable, fd, event)
+            if selectables.get(fd) is selectable and (
+                (fd in reads and (selectable._readable or fd in hangups))
+                or (selectable._writable and fd in writes)
+            ):
+                self._ready.add(fd)
 
     doIteration = doPoll
 
 
-def install():
+def install(edgeTriggered=False):
     """
     Install the epoll() reactor.
+
+    @param edgeTriggered: If C{True}, watch descriptors which support it
+        edge-triggered.
+    @type edgeTriggered: L{bool}
     """
-    p = EPollReactor()
+    p = EPollReactor(edgeTriggered)
     from twisted.internet.main import installReactor
 
     installReactor(p)
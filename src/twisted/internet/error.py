@@ -444,6 +444,14 @@ class AlreadyListened(Exception):
     """
 
 
+class SendfileUnavailable(Exception):
+    """
+    An attempt was made to send a file with
+    L{twisted.internet.interfaces.ISendfileTransport.sendfile} in
+    circumstances where the transport cannot do so.
+    """
+
+
 class InvalidAddressError(ValueError):
     """
     An invalid address was specified (i.e. neither IPv4 or IPv6, or expected
@@ -505,5 +513,6 @@ __all__ = [
     "ConnectingCancelledError",
     "UnsupportedAddressFamily",
     "UnsupportedSocketType",
+    "SendfileUnavailable",
     "InvalidAddressError",
 ]
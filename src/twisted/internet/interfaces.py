@@ -2157,6 +2157,43 @@ class IUNIXTransport(ITransport):
         """
 
 
+class ISendfileTransport(ITransport):
+    """
+    A transport which can send the contents of a file directly from the
+    file to the connection, without copying them through the process.
+    """
+
+    def sendfile(fileObject: Any, offset: int, count: int) -> "Deferred":
+        """
+        Send part of a file over this connection.
+
+        The send is non-blocking.  Bytes written to the transport before this
+        call are sent before the contents of the file, and bytes written
+        afterwards are sent after them.  While the file is being sent the
+        transport's buffer is not considered empty, so a registered producer
+        is not asked for more data until the transfer is complete.
+
+        The transport works on its own duplicate of the file's descriptor, so
+        the file may be closed at any time after this method returns.  The
+        current position of the file is neither used nor changed.
+
+        @param fileObject: An object with a C{fileno} method returning the
+            descriptor of a regular file.
+        @param offset: The offset into the file of the first byte to send.
+        @param count: The number of bytes to send.
+
+        @return: A L{Deferred} which fires with the number of bytes from the
+            file which were sent, which is less than C{count} only if the end
+            of the file was reached first, or which fails if the connection
+            is lost before the transfer is complete.
+
+        @raise twisted.internet.error.SendfileUnavailable: If the file cannot
+            be sent this way over this transport (for example because the
+            connection is using TLS or the file has no descriptor), in which
+            case the caller should write the file's contents instead.
+        """
+
+
 class IOpenSSLServerConnectionCreator(Interface):
     """
     A provider of L{IOpenSSLServerConnectionCreator} can create
@@ -0,0 +1,808 @@
+# -*- test-case-name: twisted.internet.test.test_iouringreactor -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+An io_uring(7) based implementation of the twisted main loop, for Linux 5.11
+and later.
+
+TCP connections made with C{connectTCP} or accepted by ports made with
+C{listenTCP} are read from through the ring: rather than waiting for a socket
+to become readable and then calling C{recv(2)}, the reactor asks the kernel
+to receive from it and is told when that is done.  Connections are accepted
+the same way.  Data is sent straight away if there is room for it in the
+socket's send buffer, as by any other reactor, and otherwise the kernel is
+asked to send it once there is.  All of the requests made during an
+iteration of the reactor are submitted together, by the same
+C{io_uring_enter(2)} call which waits for them to complete.
+
+Other file descriptors, such as those of UDP ports, UNIX sockets and
+processes, are watched with poll requests made through the ring and are then
+read from and written to as by any other reactor.
+
+To install the event loop (and you should do this before any connections,
+listeners or connectors are added)::
+
+    from twisted.internet import iouringreactor
+    iouringreactor.install()
+"""
+
+import ctypes
+import os
+import socket
+import sys
+from errno import EAGAIN, ECONNABORTED, EINTR, ENOBUFS
+from itertools import count
+from select import POLLERR, POLLHUP, POLLIN, POLLNVAL, POLLOUT
+from typing import cast, Any, Dict, List, Optional, Set, Tuple, Union
+
+from zope.interface import implementer
+
+from twisted.internet import main, posixbase, tcp
+from twisted.internet.interfaces import IReactorFDSet, IReadDescriptor, IWriteDescriptor
+from twisted.python import log
+from twisted.python.compat import lazyByteSlice
+
+try:
+    from twisted.internet import _iouring
+
+    _iouring.probe()
+except OSError as e:
+    raise ImportError(e)
+
+
+_Descriptor = Union[IReadDescriptor, IWriteDescriptor]
+
+# The kinds of request made for descriptors.
+_POLL_READ = 0
+_POLL_WRITE = 1
+_RECV = 2
+_SEND = 3
+_ACCEPT = 4
+
+# The buffers provided to the kernel to receive into.  If more receives
+# complete during one iteration of the reactor than there are buffers, the
+# rest wait for their connections to become readable instead.
+_BUFFER_GROUP = 0
+_BUFFER_COUNT = 256
+_BUFFER_SIZE = 2 ** 14
+
+
+class _Connection(tcp.Connection):
+    """
+    A TCP connection which sends through an L{IOUringReactor}'s ring when it
+    cannot send straight away.
+
+    Receiving is done by the reactor, which passes what it receives to
+    C{_dataReceived}.  L{writeSomeData} sends what it can, as for any other
+    reactor, and if that is not all of it, hands the rest to the reactor to
+    send once there is room.  When that send completes, C{doWrite} is called
+    again and L{writeSomeData} reports how much it sent.
+
+    @ivar _sendResult: What the last send made by the reactor completed
+        with, for L{writeSomeData} to return: the number of bytes sent or an
+        exception, or L{None} if no send has completed since.
+    """
+
+    # The ring sends one buffer at a time.
+    _writeVectorLimit = 0
+    _sendResult = None  # type: Union[None, int, Exception]
+
+    def writeSomeData(  # type: ignore[override]
+        self, data: bytes
+    ) -> Union[int, Exception]:
+        """
+        Send as much of C{data} as can be sent now, and have the reactor send
+        the rest; or report how much the send made by the reactor sent.
+
+        @return: The number of bytes sent, or an exception if the connection
+            was lost.
+        """
+        result = self._sendResult
+        if result is not None:
+            self._sendResult = None
+            return result
+        reactor = cast(IOUringReactor, self.reactor)
+        if self in reactor._writeRequests:
+            # Anything sent now would overtake what the reactor is sending.
+            return 0
+        sent = tcp.Connection.writeSomeData(self, data)  # type: Union[int, Exception]
+        limit = min(len(data), self.SEND_LIMIT)
+        if isinstance(sent, int) and sent < limit:
+            # The socket's send buffer is full.
+            reactor._send(self, lazyByteSlice(data, sent, limit - sent))
+        return sent
+
+    def _closeSocket(self, orderly: bool) -> None:
+        """
+        Cancel the requests outstanding for the socket, so that the kernel
+        lets go of it, and then close it.
+        """
+        cast(IOUringReactor, self.reactor)._release(self)
+        tcp.Connection._closeSocket(self, orderly)
+
+
+class _Server(_Connection, tcp.Server):
+    """
+    A TCP server connection accepted by a L{_Port}.
+    """
+
+
+class _Client(_Connection, tcp.Client):
+    """
+    A TCP client connection made by a L{_Connector}.
+    """
+
+
+class _Connector(tcp.Connector):
+    """
+    A TCP connector which makes L{_Client}s.
+    """
+
+    def _makeTransport(self) -> _Client:
+        """
+        Create a L{_Client} bound to this L{_Connector}.
+        """
+        return _Client(self.host, self.port, self.bindAddress, self, self.reactor)
+
+
+class _AcceptedFirst:
+    """
+    The listening socket of a L{_Port}, from which the connection the ring
+    accepted is accepted first.
+
+    @ivar _port: The L{_Port}.
+    """
+
+    def __init__(self, port: "_Port") -> None:
+        self._port = port
+
+    def accept(self) -> Tuple[socket.socket, Any]:
+        """
+        Accept the connection accepted by the ring, if there is one, and
+        otherwise one from the listening socket.
+
+        @raise OSError: If the ring failed to accept a connection, or if the
+            listening socket does.
+        """
+        accepted = self._port._accepted
+        if accepted is None:
+            return cast(Tuple[socket.socket, Any], self._port.socket.accept())
+        self._port._accepted = None
+        if isinstance(accepted, OSError):
+            raise accepted
+        return accepted
+
+
+class _Port(tcp.Port):
+    """
+    A TCP port which accepts connections through an L{IOUringReactor}'s ring,
+    and makes L{_Server}s of them.
+
+    @ivar _accepted: What the last accept request made for the port
+        completed with, for L{doRead <tcp.Port.doRead>} to accept before
+        anything else: the new socket and its peer's address, or an
+        L{OSError}.  L{None} if there is nothing.
+    """
+
+    transport = _Server
+    _accepted = None  # type: Union[None, Tuple[socket.socket, Any], OSError]
+
+    def _listeningSocket(self) -> _AcceptedFirst:
+        return _AcceptedFirst(self)
+
+    def _closeSocket(self, orderly: bool) -> None:
+        """
+        Cancel the request outstanding for the socket, so that the kernel
+        lets go of it, and then close it.
+        """
+        cast(IOUringReactor, self.reactor)._release(self)
+        if isinstance(self._accepted, tuple):
+            self._accepted[0].close()
+        self._accepted = None
+        tcp.Port._closeSocket(self, orderly)
+
+
+@implementer(IReactorFDSet)
+class IOUringReactor(posixbase.PosixReactorBase, posixbase._PollLikeMixin):
+    """
+    A reactor that uses io_uring(7).
+
+    A L{_Connection} which is being read from has a request outstanding to
+    receive into one of a group of buffers provided to the kernel, and one
+    which has more to write than its socket had room for has a request
+    outstanding to send the rest.  When such a request completes, the
+    connection is given the data received or told how much was sent, and if
+    it is still reading or has more to write, another request is made.  A
+    L{_Port} which is being read from likewise has a request outstanding to
+    accept a connection.
+
+    Other descriptors, and connections while they connect or if the kernel
+    has nothing to receive into, have a one-shot poll request outstanding for
+    C{POLLIN} if they are being read from and one for C{POLLOUT} if they are
+    being written to.  When such a request completes its descriptor is
+    dispatched to as by any other poll-like reactor.
+
+    Requests are only made when the reactor next waits for completions, so
+    all of those made by one iteration of the reactor are submitted together.
+    Stopping reading or writing does not cancel a request.  A poll request
+    which then completes is ignored, and anything received or accepted is
+    kept until reading resumes.  Removing a descriptor altogether cancels its
+    poll requests at once, since the file descriptor may then be closed and
+    its number reused; the requests of connections and ports are cancelled
+    when their sockets are closed.
+
+    @ivar _ring: The L{_iouring.Ring} through which requests are made.
+
+    @ivar _buffers: The memory of the buffers provided to the kernel to
+        receive into, L{_BUFFER_COUNT} of L{_BUFFER_SIZE} bytes each.
+
+    @ivar _selectables: A dictionary mapping integer file descriptors to
+        instances of C{FileDescriptor} which have been registered with the
+        reactor.  All C{FileDescriptors} which are currently receiving read or
+        write readiness notifications will be present as values in this
+        dictionary.
+
+    @ivar _reads: A set containing integer file descriptors.  Values in this
+        set will be read from, or polled for read readiness notifications
+        which will be dispatched to the corresponding C{FileDescriptor}
+        instances in C{_selectables}.
+
+    @ivar _writes: A set containing integer file descriptors.  Values in this
+        set will be written to, or polled for write readiness notifications
+        which will be dispatched to the corresponding C{FileDescriptor}
+        instances in C{_selectables}.
+
+    @ivar _readRequests: A dictionary mapping descriptors to the identifier
+        of the request outstanding to read from them: a poll for C{POLLIN},
+        a receive or an accept.
+
+    @ivar _writeRequests: A dictionary mapping descriptors to the identifier
+        of the request outstanding to write to them: a poll for C{POLLOUT} or
+        a send.
+
+    @ivar _requests: A dictionary mapping the identifiers of outstanding
+        requests to the file descriptor and descriptor they are for, the kind
+        of request, and anything which must be kept alive until the request
+        completes.
+
+    @ivar _cancelled: A set of the identifiers of the requests in
+        C{_requests} which have been cancelled, whose completions are
+        ignored.
+
+    @ivar _held: A dictionary mapping descriptors which are not being read
+        from to what a request to read from them completed with: the bytes
+        received or the exception to disconnect a L{_Connection} with, or
+        nothing for a L{_Port}, which keeps what was accepted itself.
+
+    @ivar _pendingReads: A set of the file descriptors which may need a
+        request made to read from them before the reactor next waits.
+
+    @ivar _pendingWrites: A set of the file descriptors which may need a
+        request made to write to them before the reactor next waits.
+    """
+
+    # Attributes for _PollLikeMixin
+    _POLL_DISCONNECTED = POLLHUP | POLLERR | POLLNVAL
+    _POLL_IN = POLLIN
+    _POLL_OUT = POLLOUT
+
+    def __init__(self) -> None:
+        """
+        Initialize the ring, the buffers, file descriptor tracking
+        dictionaries, and the base class.
+        """
+        self._ring = _iouring.Ring()
+        self._buffers = ctypes.create_string_buffer(_BUFFER_COUNT * _BUFFER_SIZE)
+        self._buffersAddress = ctypes.addressof(self._buffers)
+        self._ring.provideBuffers(
+            self._buffersAddress, _BUFFER_SIZE, _BUFFER_COUNT, _BUFFER_GROUP, 0
+        )
+        self._reads = set()  # type: Set[int]
+        self._writes = set()  # type: Set[int]
+        self._selectables = {}  # type: Dict[int, _Descriptor]
+        self._readRequests = {}  # type: Dict[_Descriptor, int]
+        self._writeRequests = {}  # type: Dict[_Descriptor, int]
+        self._requests = {}  # type: Dict[int, Tuple[int, _Descriptor, int, object]]
+        self._cancelled = set()  # type: Set[int]
+        self._held = {}  # type: Dict[_Descriptor, Union[None, bytes, Exception]]
+        self._pendingReads = set()  # type: Set[int]
+        self._pendingWrites = set()  # type: Set[int]
+        self._identifiers = count(1)
+        posixbase.PosixReactorBase.__init__(self)
+
+    def listenTCP(
+        self,
+        port: int,
+        factory: Any,
+        backlog: int = 50,
+        interface: str = "",
+        reusePort: bool = False,
+    ) -> _Port:
+        """
+        @see: L{twisted.internet.interfaces.IReactorTCP.listenTCP}
+
+        @param reusePort: If C{True}, set C{SO_REUSEPORT} on the listening
+            socket so that several processes may listen on the same port.
+            See L{tcp.Port.reusePort}.
+        """
+        p = _Port(port, factory, backlog, interface, self, reusePort)
+        p.startListening()
+        return p
+
+    def connectTCP(
+        self,
+        host: str,
+        port: int,
+        factory: Any,
+        timeout: float = 30,
+        bindAddress: Optional[Tuple[str, int]] = None,
+    ) -> _Connector:
+        """
+        @see: L{twisted.internet.interfaces.IReactorTCP.connectTCP}
+        """
+        c = _Connector(host, port, factory, timeout, bindAddress, self)
+        c.connect()
+        return c
+
+    def _add(
+        self,
+        xer: _Descriptor,
+        primary: Set[int],
+        selectables: Dict[int, _Descriptor],
+        pending: Set[int],
+    ) -> None:
+        """
+        Private method for adding a descriptor to the event loop.
+        """
+        fd = cast(int, xer.fileno())
+        if fd not in primary:
+            primary.add(fd)
+            selectables[fd] = xer
+            pending.add(fd)
+
+    def addReader(self, reader: IReadDescriptor) -> None:
+        """
+        Add a FileDescriptor for notification of data available to read.
+        """
+        self._add(reader, self._reads, self._selectables, self._pendingReads)
+
+    def addWriter(self, writer: IWriteDescriptor) -> None:
+        """
+        Add a FileDescriptor for notification of data available to write.
+        """
+        self._add(writer, self._writes, self._selectables, self._pendingWrites)
+
+    def _remove(
+        self,
+        xer: _Descriptor,
+        primary: Set[int],
+        other: Set[int],
+        selectables: Dict[int, _Descriptor],
+    ) -> None:
+        """
+        Private method for removing a descriptor from the event loop.
+
+        It does the inverse job of _add, and also add a check in case of the fd
+        has gone away.
+        """
+        fd = cast(int, xer.fileno())
+        if fd == -1:
+            for fd, fdes in selectables.items():
+                if xer is fdes:
+                    break
+            else:
+                return
+        if fd in primary:
+            primary.remove(fd)
+            if fd not in other:
+                del selectables[fd]
+                self._cancelPoll(self._readRequests, xer)
+                self._cancelPoll(self._writeRequests, xer)
+
+    def removeReader(self, reader: IReadDescriptor) -> None:
+        """
+        Remove a Selectable for notification of data available to read.
+        """
+        self._remove(reader, self._reads, self._writes, self._selectables)
+
+    def removeWriter(self, writer: IWriteDescriptor) -> None:
+        """
+        Remove a Selectable for notification of data available to write.
+        """
+        self._remove(writer, self._writes, self._reads, self._selectables)
+
+    def removeAll(self) -> List[_Descriptor]:
+        """
+        Remove all selectables, and return a list of them.
+        """
+        removed = self._removeAll(
+            [self._selectables[fd] for fd in self._reads],
+            [self._selectables[fd] for fd in self._writes],
+        )  # type: List[_Descriptor]
+        return removed
+
+    def getReaders(self) -> List[IReadDescriptor]:
+        return cast(
+            List[IReadDescriptor], [self._selectables[fd] for fd in self._reads]
+        )
+
+    def getWriters(self) -> List[IWriteDescriptor]:
+        return cast(
+            List[IWriteDescriptor], [self._selectables[fd] for fd in self._writes]
+        )
+
+    def _cancel(self, requests: Dict[_Descriptor, int], xer: _Descriptor) -> bool:
+        """
+        Cancel the request outstanding in C{requests} for a descriptor, if
+        there is one.  Its completion will be ignored.
+
+        @return: Whether there was a request to cancel.
+        """
+        identifier = requests.pop(xer, None)
+        if identifier is None:
+            return False
+        # The request stays in _requests, keeping alive anything the kernel
+        # may still use, until it completes.
+        self._cancelled.add(identifier)
+        self._ring.cancel(identifier)
+        return True
+
+    def _cancelPoll(self, requests: Dict[_Descriptor, int], xer: _Descriptor) -> None:
+        """
+        Cancel the poll request outstanding in C{requests} for a descriptor,
+        if there is one.
+        """
+        identifier = requests.get(xer)
+        if identifier is not None and self._requests[identifier][2] in (
+            _POLL_READ,
+            _POLL_WRITE,
+        ):
+            self._cancel(requests, xer)
+
+    def _release(self, xer: _Descriptor) -> None:
+        """
+        Cancel all of the requests outstanding for a descriptor whose file
+        descriptor is about to be closed, at once, so that the kernel lets go
+        of the file, and forget anything held for it.
+        """
+        self._held.pop(xer, None)
+        cancelled = self._cancel(self._readRequests, xer)
+        if self._cancel(self._writeRequests, xer) or cancelled:
+            self._ring.submit()
+
+    def _poll(self, fd: int, xer: _Descriptor, kind: int) -> None:
+        """
+        Make a poll request for a descriptor.
+
+        @param kind: L{_POLL_READ} or L{_POLL_WRITE}.
+        """
+        identifier = next(self._identifiers)
+        if kind == _POLL_READ:
+            self._ring.pollAdd(fd, POLLIN, identifier)
+            self._readRequests[xer] = identifier
+        else:
+            self._ring.pollAdd(fd, POLLOUT, identifier)
+            self._writeRequests[xer] = identifier
+        self._requests[identifier] = (fd, xer, kind, None)
+
+    def _read(self, fd: int, xer: _Descriptor) -> None:
+        """
+        Make a request to read from a descriptor: to receive, if it is a
+        L{_Connection} which has finished connecting, to accept if it is a
+        L{_Port}, and otherwise to poll.
+        """
+        if "doRead" in vars(xer):
+            # Connecting, or aborted; either way, not reading data.
+            self._poll(fd, xer, _POLL_READ)
+            return
+        if isinstance(xer, _Connection):
+            kind = _RECV
+            identifier = next(self._identifiers)
+            self._ring.recv(
+                fd, min(xer.bufferSize, _BUFFER_SIZE), _BUFFER_GROUP, identifier
+            )
+        elif isinstance(xer, _Port):
+            kind = _ACCEPT
+            identifier = next(self._identifiers)
+            self._ring.accept(fd, identifier)
+        else:
+            self._poll(fd, xer, _POLL_READ)
+            return
+        self._readRequests[xer] = identifier
+        self._requests[identifier] = (fd, xer, kind, None)
+
+    def _send(self, connection: _Connection, data: bytes) -> None:
+        """
+        Make a request to send data over a connection, once there is room for
+        it in the socket's send buffer.
+        """
+        if type(data) is not bytes:
+            data = bytes(data)
+        pointer = ctypes.c_char_p(data)
+        address = cast(int, ctypes.cast(pointer, ctypes.c_void_p).value)
+        identifier = next(self._identifiers)
+        fd = connection.fileno()
+        self._ring.send(fd, address, len(data), identifier)
+        self._writeRequests[connection] = identifier
+        self._requests[identifier] = (fd, connection, _SEND, (data, pointer))
+
+    def _doReceiveOrSend(
+        self,
+        connection: _Connection,
+        received: Union[None, bytes, Exception] = None,
+        sent: Union[None, int, Exception] = None,
+    ) -> None:
+        """
+        Give a connection what a request to receive from it or to send over
+        it completed with, and then, if it has more to send, start sending
+        it.  Disconnect it if any of that calls for it.
+
+        Starting to send here, rather than before the reactor next waits,
+        saves dispatching to the connection a second time.
+
+        @param received: The bytes received, which are empty if the other
+            side has closed the connection, or the reason the connection was
+            lost.
+
+        @param sent: The number of bytes sent, or the reason the connection
+            was lost.
+        """
+        why = None  # type: Any
+        isRead = False
+        try:
+            if received is not None:
+                isRead = True
+                if isinstance(received, bytes):
+                    why = connection._dataReceived(received)
+                else:
+                    why = received
+            elif sent is not None:
+                connection._sendResult = sent
+                why = connection.doWrite()
+            fd = connection.fileno()
+            if not why and self._mayStartSending(fd, connection):
+                isRead = False
+                # If a send completed while the connection was not writing,
+                # this only learns what was sent.
+                learning = connection._sendResult is not None
+                why = connection.doWrite()
+                if not why and self._mayStartSending(fd, connection):
+                    if learning:
+                        self._pendingWrites.add(fd)
+                    else:
+                        # Nothing was sent; for example, sendfile() is
+                        # waiting for room in the socket's send buffer.
+                        self._poll(fd, connection, _POLL_WRITE)
+        except BaseException:
+            why = sys.exc_info()[1]
+            log.err()
+        if why:
+            self._disconnectSelectable(connection, why, isRead)
+
+    def _mayStartSending(self, fd: int, connection: _Connection) -> bool:
+        """
+        Determine whether a connection is writing, but has no request
+        outstanding to write to it.
+        """
+        return (
+            fd in self._writes
+            and self._selectables[fd] is connection
+            and connection not in self._writeRequests
+            and "doWrite" not in vars(connection)
+        )
+
+    def _dispatchHeld(self, fd: int, xer: _Descriptor) -> None:
+        """
+        Dispatch to a descriptor which has started reading again what was
+        held for it.
+        """
+        value = self._held.pop(xer)
+        if isinstance(xer, _Connection):
+            log.callWithLogger(
+                xer,
+                self._doReceiveOrSend,
+                xer,
+                cast(Union[bytes, Exception], value),
+            )
+        else:
+            log.callWithLogger(xer, self._doReadOrWrite, xer, fd, POLLIN)
+
+    def _makeRequests(self) -> bool:
+        """
+        Make requests for the descriptors which need them.  Starting to send
+        calls C{doWrite}, and resuming reading dispatches anything held, so
+        this repeats until nothing more needs a request.
+
+        @return: Whether any descriptor was dispatched to.
+        """
+        dispatched = False
+        selectables = self._selectables
+        reads = self._reads
+        writes = self._writes
+        while self._pendingReads or self._pendingWrites:
+            pending = self._pendingReads
+            self._pendingReads = set()
+            for fd in pending:
+                if fd not in reads:
+                    continue
+                xer = selectables[fd]
+                if xer in self._readRequests:
+                    continue
+                if xer in self._held:
+                    dispatched = True
+                    self._dispatchHeld(fd, xer)
+                    self._pendingReads.add(fd)
+                else:
+                    self._read(fd, xer)
+
+            pending = self._pendingWrites
+            self._pendingWrites = set()
+            for fd in pending:
+                if fd not in writes:
+                    continue
+                xer = selectables[fd]
+                if xer in self._writeRequests:
+                    continue
+                if isinstance(xer, _Connection) and "doWrite" not in vars(xer):
+                    dispatched = True
+                    log.callWithLogger(xer, self._doReceiveOrSend, xer)
+                    continue
+                self._poll(fd, xer, _POLL_WRITE)
+        return dispatched
+
+    def doPoll(self, delay: Optional[float]) -> None:
+        """
+        Make any new requests, and wait for and dispatch their completions.
+        """
+        if self._makeRequests():
+            # What was dispatched to may have scheduled something to be done
+            # straight away.
+            timeout = self.timeout()
+            if timeout is not None and (delay is None or timeout < delay):
+                delay = timeout
+
+        # Interruption by a signal is ignored.  See io_uring_enter(2) for the
+        # other conditions under which this can fail; like those of
+        # epoll_wait(2), they can only be due to a serious programming error
+        # on our part, so they are raised.
+        completions = self._ring.submitAndWait(delay)
+
+        _drdw = self._doReadOrWrite
+        requests = self._requests
+        cancelled = self._cancelled
+        selectables = self._selectables
+        reads = self._reads
+        writes = self._writes
+        for identifier, result, flags in completions:
+            data = None
+            if flags & _iouring.IORING_CQE_F_BUFFER:
+                # Copy what was received and give the buffer back at once,
+                # whether or not the request is still wanted.
+                buffer = flags >> _iouring.IORING_CQE_BUFFER_SHIFT
+                address = self._buffersAddress + buffer * _BUFFER_SIZE
+                data = ctypes.string_at(address, result)
+                self._ring.provideBuffers(
+                    address, _BUFFER_SIZE, 1, _BUFFER_GROUP, buffer
+                )
+            if not identifier:
+                # A cancellation, or buffers being provided.
+                continue
+            fd, selectable, kind, kept = requests.pop(identifier)
+            if identifier in cancelled:
+                cancelled.remove(identifier)
+                if kind == _ACCEPT and result >= 0:
+                    # The connection was accepted before the request could
+                    # be cancelled.
+                    os.close(result)
+                continue
+
+            if kind == _RECV:
+                del self._readRequests[selectable]
+                if result >= 0:
+                    value = data or b""  # type: Union[bytes, Exception]
+                elif result in (-ENOBUFS, -EAGAIN, -EINTR):
+                    # Wait until there is something to read, and read it
+                    # without the ring.
+                    if fd in reads and selectables.get(fd) is selectable:
+                        self._poll(fd, selectable, _POLL_READ)
+                    continue
+                else:
+                    value = main.CONNECTION_LOST
+                if fd not in reads or selectables.get(fd) is not selectable:
+                    self._held[selectable] = value
+                elif "doRead" not in vars(selectable):
+                    # Otherwise the connection has been aborted.
+                    self._pendingReads.add(fd)
+                    log.callWithLogger(
+                        selectable, self._doReceiveOrSend, selectable, value
+                    )
+            elif kind == _SEND:
+                del self._writeRequests[selectable]
+                if result >= 0:
+                    sent = result  # type: Union[int, Exception]
+                elif result in (-ENOBUFS, -EAGAIN, -EINTR):
+                    if fd in writes and selectables.get(fd) is selectable:
+                        self._poll(fd, selectable, _POLL_WRITE)
+                    continue
+                else:
+                    sent = main.CONNECTION_LOST
+                if fd in writes and selectables.get(fd) is selectable:
+                    log.callWithLogger(
+                        selectable, self._doReceiveOrSend, selectable, None, sent
+                    )
+                else:
+                    # doWrite will learn what was sent when the connection
+                    # is writing again.
+                    cast(_Connection, selectable)._sendResult = sent
+            elif kind == _ACCEPT:
+                del self._readRequests[selectable]
+                port = cast(_Port, selectable)
+                if result >= 0:
+                    port._accepted = self._acceptedSocket(port, result)
+                elif result not in (-EAGAIN, -EINTR):
+                    port._accepted = OSError(-result, os.strerror(-result))
+                if fd not in reads or selectables.get(fd) is not selectable:
+                    if port._accepted is not None:
+                        self._held[selectable] = None
+                else:
+                    self._pendingReads.add(fd)
+                    log.callWithLogger(selectable, _drdw, selectable, fd, POLLIN)
+            elif kind == _POLL_READ:
+                del self._readRequests[selectable]
+                if result < 0:
+                    # The descriptor could not be polled; most likely it had
+                    # been closed without being removed from the reactor
+                    # first.
+                    result = POLLNVAL
+                if fd not in reads or selectables.get(fd) is not selectable:
+                    continue
+                self._pendingReads.add(fd)
+                log.callWithLogger(selectable, _drdw, selectable, fd, result)
+            elif kind == _POLL_WRITE:
+                del self._writeRequests[selectable]
+                if result < 0:
+                    result = POLLNVAL
+                if fd not in writes or selectables.get(fd) is not selectable:
+                    continue
+                self._pendingWrites.add(fd)
+                if fd in reads:
+                    # Leave reporting disconnection to the read request,
+                    # which will see it too, so that any data still to be
+                    # read is read first.
+                    result &= ~self._POLL_DISCONNECTED
+                    if not result:
+                        continue
+                log.callWithLogger(selectable, _drdw, selectable, fd, result)
+
+    doIteration = doPoll
+
+    def _acceptedSocket(
+        self, port: _Port, fd: int
+    ) -> Union[Tuple[socket.socket, Any], OSError]:
+        """
+        Make a socket of a file descriptor the ring accepted for a port.
+
+        @return: The socket and the address of its peer, as
+            L{socket.socket.accept} returns, or an L{OSError} if the peer has
+            gone already.
+        """
+        skt = socket.socket(port.addressFamily, port.socketType, 0, fd)
+        try:
+            return skt, skt.getpeername()
+        except OSError:
+            skt.close()
+            return OSError(ECONNABORTED, os.strerror(ECONNABORTED))
+
+
+def install() -> None:
+    """
+    Install the io_uring reactor.
+    """
+    p = IOUringReactor()
+    from twisted.internet.main import installReactor
+
+    installReactor(p)
+
+
+__all__ = ["IOUringReactor", "install"]
@@ -564,8 +564,15 @@ class PosixReactorBase(_SignalReactorMixin, _DisconnectSelectableMixin, ReactorB
 
     # IReactorTCP
 
-    def listenTCP(self, port, factory, backlog=50, interface=""):
-        p = tcp.Port(port, factory, backlog, interface, self)
+    def listenTCP(self, port, factory, backlog=50, interface="", reusePort=False):
+        """
+        @see: L{twisted.internet.interfaces.IReactorTCP.listenTCP}
+
+        @param reusePort: If C{True}, set C{SO_REUSEPORT} on the listening
+            socket so that several processes may listen on the same port.
+            See L{tcp.Port.reusePort}.
+        """
+        p = tcp.Port(port, factory, backlog, interface, self, reusePort)
         p.startListening()
         return p
 
@@ -13,6 +13,7 @@ import socket
 import sys
 import os
 import struct
+import threading
 from typing import Optional
 
 import attr
@@ -25,6 +26,7 @@ from twisted.internet.interfaces import (
     ITCPTransport,
     ISystemHandle,
     IListeningPort,
+    ISendfileTransport,
 )
 from twisted.python.compat import lazyByteSlice
 from twisted.python.runtime import platformType
@@ -91,9 +93,10 @@ else:
 
 
 from errno import errorcode
+from errno import ENOPROTOOPT, ENOSYS, EOPNOTSUPP
 
 # Twisted Imports
-from twisted.internet import base, address, fdesc
+from twisted.internet import base, address, defer, fdesc
 from twisted.internet.task import deferLater
 from twisted.python import log, failure, reflect
 from twisted.python.util import untilConcludes
@@ -105,6 +108,74 @@ from twisted.internet.protocol import Protocol
 _AI_NUMERICSERV = getattr(socket, "AI_NUMERICSERV", 0)
 
 
+def _getIOVMax():
+    """
+    Determine how many buffers may be passed to a single C{sendmsg()} call.
+
+    @return: The platform's C{IOV_MAX}, the smallest value POSIX allows if
+        it cannot be determined, or C{0} if C{sendmsg()} is not available.
+    """
+    if not hasattr(socket.socket, "sendmsg"):
+        return 0
+    try:
+        iovMax = os.sysconf("SC_IOV_MAX")
+    except (AttributeError, ValueError, OSError):
+        iovMax = -1
+    if iovMax <= 0:
+        # _XOPEN_IOV_MAX
+        iovMax = 16
+    return iovMax
+
+
+_IOV_MAX = _getIOVMax()
+
+
+# Connections which read into a buffer (see Connection.readIntoBuffer) share
+# one per thread, kept here as a writeable memoryview.  A reactor reads from
+# one connection at a time and copies what it read out of the buffer before
+# delivering it, so sharing is safe.
+_readBuffers = threading.local()
+
+
+_sendfile = getattr(os, "sendfile", None)
+
+# Linux transfers at most this many bytes with one sendfile() call.
+_SENDFILE_LIMIT = 0x7FFFF000
+
+# Port.acceptQueue relies on the layout of Linux's struct tcp_info.
+_isLinux = sys.platform.startswith("linux")
+
+
+@attr.s
+class _SendfileRegion:
+    """
+    The state of a transfer started with L{Connection.sendfile}.
+
+    @ivar deferred: The L{Deferred} returned by L{Connection.sendfile}.
+    @ivar fileno: A duplicate of the descriptor of the file being sent, which
+        is closed when the transfer ends.
+    @ivar offset: The offset into the file of the next byte to send.
+    @ivar remaining: The number of bytes of the file still to send.
+    @ivar pending: Bytes to send before any more of the file: whatever the
+        transport had buffered when the transfer began, or a chunk read from
+        the file if it is being copied.
+    @ivar pendingOffset: The number of bytes of C{pending} already sent.
+    @ivar sent: The number of bytes of the file sent or read so far.
+    @ivar copying: C{True} if C{sendfile()} turned out not to support this
+        file or socket, in which case the file is read into C{pending} one
+        chunk at a time instead.
+    """
+
+    deferred = attr.ib()
+    fileno = attr.ib()
+    offset = attr.ib()
+    remaining = attr.ib()
+    pending = attr.ib(default=b"")
+    pendingOffset = attr.ib(default=0)
+    sent = attr.ib(default=0)
+    copying = attr.ib(default=False)
+
+
 def _getrealname(addr):
     """
     Return a 2-tuple of socket IP and port for IPv4 and a 4-tuple of
@@ -117,6 +188,10 @@ def _getrealname(addr):
     """
     if len(addr) == 4:
         # IPv6
+        if not addr[3]:
+            # Without a scope ID there is no interface to add, and the host
+            # is already in the numeric form getnameinfo would give.
+            return tuple(addr)
         host = socket.getnameinfo(addr, socket.NI_NUMERICHOST | socket.NI_NUMERICSERV)[
             0
         ]
@@ -202,7 +277,7 @@ class _AbortingMixin:
         )
 
 
-@implementer(ITLSTransport, ITCPTransport, ISystemHandle)
+@implementer(ITLSTransport, ITCPTransport, ISystemHandle, ISendfileTransport)
 class Connection(
     _TLSConnectionMixin, abstract.FileDescriptor, _SocketCloser, _AbortingMixin
 ):
@@ -214,8 +289,41 @@ class Connection(
 
     @ivar logstr: prefix used when logging events related to this connection.
     @type logstr: C{str}
+
+    @ivar readIntoBuffer: If C{True}, read from the socket with C{recv_into}
+        into a buffer shared by all connections in the thread, instead of
+        allocating a new buffer of C{bufferSize} bytes for every read.  Each
+        read then asks for a number of bytes which adapts to the amount of
+        data which has been arriving, between C{_minimumReadSize} and
+        C{bufferSize}.  This is meant for servers with very many mostly idle
+        connections, and may be set on a class or on a single connection.
+    @type readIntoBuffer: L{bool}
+
+    @ivar _readSize: The number of bytes to read next, if C{readIntoBuffer}
+        is set.
+
+    @ivar _sendfileRegion: The L{_SendfileRegion} describing the file being
+        sent by L{sendfile}, or L{None} if no file is being sent.
+
+    @ivar _readable: Whether the socket may have data to read, for reactors
+        which watch it edge-triggered.  Cleared when a read comes up short.
+
+    @ivar _writable: Whether the socket may have room to write to, for
+        reactors which watch it edge-triggered.  Cleared when a write comes up
+        short.
     """
 
+    _writeVectorLimit = _IOV_MAX
+    _sendfileRegion = None  # type: Optional[_SendfileRegion]
+
+    _edgeTriggerable = True
+    _readable = True
+    _writable = True
+
+    readIntoBuffer = False
+    _minimumReadSize = 4096
+    _readSize = _minimumReadSize
+
     def __init__(self, skt, protocol, reactor=None):
         abstract.FileDescriptor.__init__(self, reactor=reactor)
         self.socket = skt
@@ -235,16 +343,54 @@ class Connection(
         lost through an error in the physical recv(), this function will return
         the result of the dataReceived call.
         """
+        if self.readIntoBuffer:
+            return self._doReadIntoBuffer()
         try:
             data = self.socket.recv(self.bufferSize)
         except OSError as se:
             if se.args[0] == EWOULDBLOCK:
+                self._readable = False
                 return
             else:
                 return main.CONNECTION_LOST
 
+        if len(data) < self.bufferSize:
+            # Everything there was to read has been read.
+            self._readable = False
         return self._dataReceived(data)
 
+    def _doReadIntoBuffer(self):
+        """
+        Read available data into the thread's shared receive buffer and call
+        self.protocol.dataReceived with a copy of it, adjusting how much to
+        read next time.
+
+        The read size doubles each time a read fills it, up to
+        C{self.bufferSize}, and halves each time a read uses less than a
+        quarter of it, down to C{self._minimumReadSize}.
+        """
+        size = min(self._readSize, self.bufferSize)
+        view = getattr(_readBuffers, "view", None)
+        if view is None or len(view) < size:
+            view = _readBuffers.view = memoryview(bytearray(self.bufferSize))
+        try:
+            received = self.socket.recv_into(view, size)
+        except OSError as se:
+            if se.args[0] == EWOULDBLOCK:
+                self._readable = False
+                return
+            else:
+                return main.CONNECTION_LOST
+
+        if received == size:
+            if size < self.bufferSize:
+                self._readSize = size * 2
+        else:
+            self._readable = False
+            if received and received < size // 4 and size > self._minimumReadSize:
+                self._readSize = size // 2
+        return self._dataReceived(view[:received].tobytes())
+
     def _dataReceived(self, data):
         if not data:
             return main.CONNECTION_DONE
@@ -274,12 +420,155 @@ class Connection(
         limitedData = lazyByteSlice(data, 0, self.SEND_LIMIT)
 
         try:
-            return untilConcludes(self.socket.send, limitedData)
+            sent = untilConcludes(self.socket.send, limitedData)
         except OSError as se:
-            if se.args[0] in (EWOULDBLOCK, ENOBUFS):
+            if se.args[0] == EWOULDBLOCK:
+                self._writable = False
+                return 0
+            elif se.args[0] == ENOBUFS:
                 return 0
             else:
                 return main.CONNECTION_LOST
+        if sent < len(limitedData):
+            # The socket's send buffer is full.
+            self._writable = False
+        return sent
+
+    def _writeSomeDataVector(self, vector):
+        """
+        Write as much as possible of the given buffers to this TCP connection
+        with a single C{sendmsg} call.
+
+        @see: L{abstract.FileDescriptor._writeSomeDataVector}
+        """
+        try:
+            sent = untilConcludes(self.socket.sendmsg, vector)
+        except OSError as se:
+            if se.args[0] == EWOULDBLOCK:
+                self._writable = False
+                return 0
+            elif se.args[0] == ENOBUFS:
+                return 0
+            else:
+                return main.CONNECTION_LOST
+        if sent < sum(map(len, vector)):
+            self._writable = False
+        return sent
+
+    def sendfile(self, fileObject, offset, count):
+        """
+        Send part of a file over this connection with C{sendfile()}.
+
+        @see: L{ISendfileTransport.sendfile}
+        """
+        if _sendfile is None:
+            raise error.SendfileUnavailable("sendfile() is not available")
+        if self.TLS:
+            raise error.SendfileUnavailable("TLS is in use")
+        if self._sendfileRegion is not None:
+            raise error.SendfileUnavailable("a file is already being sent")
+        if not self.connected or self._writeDisconnected:
+            return defer.fail(error.ConnectionDone())
+        try:
+            fileno = os.dup(fileObject.fileno())
+        except (AttributeError, ValueError, OSError) as e:
+            raise error.SendfileUnavailable(str(e))
+
+        # Whatever is already buffered goes out ahead of the file.
+        pending = abstract._concatenate(
+            self.dataBuffer, self.offset, self._tempDataBuffer
+        )
+        self.dataBuffer = b""
+        self.offset = 0
+        self._tempDataBuffer = []
+        self._tempDataLen = 0
+        region = _SendfileRegion(defer.Deferred(), fileno, offset, count, pending)
+        self._sendfileRegion = region
+        self.startWriting()
+        return region.deferred
+
+    def _writeSendfileRegion(self, region):
+        """
+        Send as much as possible of a file being sent by L{sendfile}, and if
+        all of it has been sent, end the transfer.
+
+        @return: L{None} on success, an exception on failure.
+        """
+        while True:
+            if region.pendingOffset < len(region.pending):
+                l = self.writeSomeData(
+                    lazyByteSlice(region.pending, region.pendingOffset)
+                )
+                if isinstance(l, Exception) or l < 0:
+                    return l
+                region.pendingOffset += l
+                if region.pendingOffset < len(region.pending):
+                    return None
+                region.pending = b""
+                region.pendingOffset = 0
+            if not region.remaining:
+                break
+
+            if region.copying:
+                try:
+                    chunk = os.pread(
+                        region.fileno,
+                        min(region.remaining, self.bufferSize),
+                        region.offset,
+                    )
+                except OSError:
+                    return main.CONNECTION_LOST
+                region.pending = chunk
+                l = len(chunk)
+            else:
+                count = min(region.remaining, _SENDFILE_LIMIT)
+                try:
+                    l = untilConcludes(
+                        _sendfile, self.fileno(), region.fileno, region.offset, count
+                    )
+                except OSError as se:
+                    if se.args[0] in (EWOULDBLOCK, EAGAIN):
+                        self._writable = False
+                        return None
+                    elif se.args[0] == ENOBUFS:
+                        return None
+                    elif se.args[0] in (EINVAL, ENOSYS, EOPNOTSUPP):
+                        # sendfile() does not support this file or socket, so
+                        # copy the file instead.
+                        region.copying = True
+                        continue
+                    else:
+                        return main.CONNECTION_LOST
+            if not l:
+                # The end of the file was reached early.
+                break
+            region.offset += l
+            region.remaining -= l
+            region.sent += l
+            if not region.copying and l < count:
+                # The socket's send buffer is full.
+                self._writable = False
+                return None
+
+        self._sendfileRegion = None
+        os.close(region.fileno)
+        region.deferred.callback(region.sent)
+        return None
+
+    def doWrite(self):
+        """
+        Send the rest of the file being sent by L{sendfile}, if there is one,
+        and then any data written since the transfer began.
+
+        @see: L{abstract.FileDescriptor.doWrite}
+        """
+        while self._sendfileRegion is not None:
+            region = self._sendfileRegion
+            result = self._writeSendfileRegion(region)
+            # Callbacks on a finished transfer may have started another one.
+            if result is not None or self._sendfileRegion is region:
+                return result
+        return abstract.FileDescriptor.doWrite(self)
 
     def _closeWriteConnection(self):
         try:
@@ -317,6 +606,11 @@ class Connection(
             return
         abstract.FileDescriptor.connectionLost(self, reason)
         self._closeSocket(not reason.check(error.ConnectionAborted))
+        region = self._sendfileRegion
+        if region is not None:
+            self._sendfileRegion = None
+            os.close(region.fileno)
+            region.deferred.errback(reason)
         protocol = self.protocol
         del self.protocol
         del self.socket
@@ -1125,7 +1419,51 @@ class _BuffersLogs:
             self._observer(event)
 
 
-def _accept(logger, accepts, listener, reservedFD):
+@attr.s
+class AcceptStatistics:
+    """
+    Counters describing the connections accepted by a L{Port}, for
+    monitoring a server under load.
+
+    Sampling L{accepted} periodically gives the rate at which connections are
+    being accepted; increases in L{dropped} or L{failures} show that
+    connections are being lost because the process is short of resources.
+    L{Port.acceptQueue} shows how many connections are waiting to be
+    accepted.
+
+    @ivar accepted: The number of connections accepted from the listening
+        socket, including those then closed because the factory refused them.
+    @type accepted: L{int}
+
+    @ivar refused: The number of accepted connections closed because the
+        factory's C{buildProtocol} returned L{None}.
+    @type refused: L{int}
+
+    @ivar dropped: The number of accepted connections closed straight away
+        because the process had run out of file descriptors.
+    @type dropped: L{int}
+
+    @ivar failures: The number of times C{accept} failed because the process
+        or the system was short of resources.
+    @type failures: L{int}
+
+    @ivar batches: The number of times the listening socket was read from
+        and at least one connection was accepted.
+    @type batches: L{int}
+
+    @ivar largestBatch: The largest number of connections accepted at once.
+    @type largestBatch: L{int}
+    """
+
+    accepted = attr.ib(default=0)  # type: int
+    refused = attr.ib(default=0)  # type: int
+    dropped = attr.ib(default=0)  # type: int
+    failures = attr.ib(default=0)  # type: int
+    batches = attr.ib(default=0)  # type: int
+    largestBatch = attr.ib(default=0)  # type: int
+
+
+def _accept(logger, accepts, listener, reservedFD, statistics=None):
     """
     Return a generator that yields client sockets from the provided
     listening socket until there are none left or an unrecoverable
@@ -1148,6 +1486,10 @@ def _accept(logger, accepts, listener, reservedFD):
         recover from C{EMFILE} on UNIX-like systems.
     @type reservedFD: L{_IFileDescriptorReservation}
 
+    @param statistics: If not L{None}, where to count connections dropped
+        and C{accept} failures.
+    @type statistics: L{AcceptStatistics}
+
     @return: A generator that yields C{(socket, addr)} tuples from
         L{socket.socket.accept}
     """
@@ -1176,10 +1518,14 @@ def _accept(logger, accepts, listener, reservedFD):
                 )
                 # The following block should not run arbitrary code
                 # that might acquire its own file descriptor.
+                if statistics is not None:
+                    statistics.failures += 1
                 with reservedFD:
                     clientsToClose = _accept(logger, accepts, listener, reservedFD)
                     for clientToClose, closedAddress in clientsToClose:
                         clientToClose.close()
+                        if statistics is not None:
+                            statistics.dropped += 1
                         logger.info(
                             "EMFILE recovery:" " Closed socket from {address}",
                             address=closedAddress,
@@ -1187,6 +1533,8 @@ def _accept(logger, accepts, listener, reservedFD):
                     logger.info("Re-reserving EMFILE recovery file descriptor.")
                 return
             elif e.args[0] in _ACCEPT_ERRORS:
+                if statistics is not None:
+                    statistics.failures += 1
                 logger.info(
                     "Could not accept new connection ({acceptError})",
                     acceptError=errorcode[e.args[0]],
@@ -1233,6 +1581,16 @@ class Port(base.BasePort, _SocketCloser):
         was created and initialized outside of the reactor and will be used to
         listen for connections (instead of a new socket being created by this
         L{Port}).
+
+    @ivar reusePort: If C{True}, set C{SO_REUSEPORT} on the listening socket,
+        so that other sockets with the option set may listen on the same
+        address and port (in this process or in others) and have incoming
+        connections distributed between them by the kernel.
+    @type reusePort: C{bool}
+
+    @ivar acceptStatistics: Counters of the connections this port has
+        accepted, refused and dropped.
+    @type acceptStatistics: L{AcceptStatistics}
     """
 
     socketType = socket.SOCK_STREAM
@@ -1241,6 +1599,7 @@ class Port(base.BasePort, _SocketCloser):
     sessionno = 0
     interface = ""
     backlog = 50
+    reusePort = False
 
     _type = "TCP"
 
@@ -1256,12 +1615,16 @@ class Port(base.BasePort, _SocketCloser):
     _addressType = address.IPv4Address
     _logger = Logger()
 
-    def __init__(self, port, factory, backlog=50, interface="", reactor=None):
+    def __init__(
+        self, port, factory, backlog=50, interface="", reactor=None, reusePort=False
+    ):
         """Initialize with a numeric port to listen on."""
         base.BasePort.__init__(self, reactor=reactor)
         self.port = port
         self.factory = factory
         self.backlog = backlog
+        self.reusePort = reusePort
+        self.acceptStatistics = AcceptStatistics()
         if abstract.isIPv6Address(interface):
             self.addressFamily = socket.AF_INET6
             self._addressType = address.IPv6Address
@@ -1307,6 +1670,12 @@ class Port(base.BasePort, _SocketCloser):
         s = base.BasePort.createInternetSocket(self)
         if platformType == "posix" and sys.platform != "cygwin":
             s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if self.reusePort:
+            reusePort = getattr(socket, "SO_REUSEPORT", None)
+            if reusePort is None:
+                s.close()
+                raise OSError(ENOPROTOOPT, "SO_REUSEPORT is not supported")
+            s.setsockopt(socket.SOL_SOCKET, reusePort, 1)
         return s
 
     def startListening(self):
@@ -1372,27 +1741,31 @@ class Port(base.BasePort, _SocketCloser):
                 # in an iteration of the event loop.
                 numAccepts = 1
 
+            statistics = self.acceptStatistics
             with _BuffersLogs(
                 self._logger.namespace, self._logger.observer
             ) as bufferingLogger:
                 accepted = 0
                 clients = _accept(
-                    bufferingLogger, range(numAccepts), self.socket, _reservedFD
+                    bufferingLogger,
+                    range(numAccepts),
+                    self._listeningSocket(),
+                    _reservedFD,
+                    statistics,
                 )
 
+                # socket.accept() already makes the new socket close-on-exec
+                # (see PEP 446), using accept4() where it is available, so
+                # there is no need for fdesc._setCloseOnExec here.
                 for accepted, (skt, addr) in enumerate(clients, 1):
-                    fdesc._setCloseOnExec(skt.fileno())
-
                     if len(addr) == 4:
                         # IPv6, make sure we get the scopeID if it
                         # exists
-                        host = socket.getnameinfo(
-                            addr, socket.NI_NUMERICHOST | socket.NI_NUMERICSERV
-                        )
-                        addr = tuple([host[0]] + list(addr[1:]))
+                        addr = _getrealname(addr)
 
                     protocol = self.factory.buildProtocol(self._buildAddr(addr))
                     if protocol is None:
+                        statistics.refused += 1
                         skt.close()
                         continue
                     s = self.sessionno
@@ -1402,6 +1775,12 @@ class Port(base.BasePort, _SocketCloser):
                     )
                     protocol.makeConnection(transport)
 
+            if accepted:
+                statistics.accepted += accepted
+                statistics.batches += 1
+                if accepted > statistics.largestBatch:
+                    statistics.largestBatch = accepted
+
             # Scale our synchronous accept loop according to traffic
             # Reaching our limit on consecutive accept calls indicates
             # there might be still more clients to serve the next time
@@ -1422,6 +1801,39 @@ class Port(base.BasePort, _SocketCloser):
             # and return, so handling it here works just as well.
             log.deferr()
 
+    def _listeningSocket(self):
+        """
+        Get the socket from which L{doRead} accepts connections.
+
+        @return: The listening socket, or an object with an C{accept} method
+            which behaves like that of a non-blocking socket.
+        """
+        return self.socket
+
+    def acceptQueue(self):
+        """
+        Find out how many connections are waiting to be accepted.
+
+        This is only known on Linux, which reports it for listening TCP
+        sockets with C{TCP_INFO}.
+
+        @return: The number of connections which have been established and
+            are waiting to be accepted, and the number which may wait (the
+            backlog, as limited by the kernel) before further connection
+            attempts are dropped; or L{None} if these are not known.
+        @rtype: 2-L{tuple} of L{int}, or L{None}
+        """
+        tcpInfo = getattr(socket, "TCP_INFO", None)
+        if tcpInfo is None or not self.connected or not _isLinux:
+            return None
+        try:
+            info = self.socket.getsockopt(socket.IPPROTO_TCP, tcpInfo, 32)
+        except OSError:
+            return None
+        # The tcpi_unacked and tcpi_sacked fields of struct tcp_info, which
+        # for a listening socket are the length and limit of its queue.
+        return struct.unpack_from("=24xII", info)
+
     def loseConnection(self, connDone=failure.Failure(main.CONNECTION_DONE)):
         """
         Stop accepting connections on this port.
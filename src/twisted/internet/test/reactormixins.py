@@ -166,7 +166,9 @@ class ReactorBuilder:
                     "twisted.internet.epollreactor.EPollReactor",
                 ]
             )
-            if not platform.isLinux():
+            if platform.isLinux():
+                _reactors.append("twisted.internet.iouringreactor.IOUringReactor")
+            else:
                 # Presumably Linux is not going to start supporting kqueue, so
                 # skip even trying this configuration.
                 _reactors.extend(
@@ -2976,6 +2976,31 @@ class ParserTests(unittest.TestCase):
             ("TCP", (80, self.f), {"interface": "", "backlog": 6}),
         )
 
+    def test_reusePortTCP(self):
+        """
+        TCP port descriptions parse their 'reusePort' argument as a boolean,
+        passing it on only if it is true.
+        """
+        self.assertEqual(
+            self.parse("tcp:80:reusePort=yes", self.f),
+            (
+                "TCP",
+                (80, self.f),
+                {"interface": "", "backlog": 50, "reusePort": True},
+            ),
+        )
+        self.assertEqual(
+            self.parse("tcp:80:reusePort=no", self.f),
+            ("TCP", (80, self.f), {"interface": "", "backlog": 50}),
+        )
+
+    def test_reusePortTCPInvalid(self):
+        """
+        A TCP port description with a 'reusePort' argument which is not a
+        boolean raises L{ValueError}.
+        """
+        self.assertRaises(ValueError, self.parse, "tcp:80:reusePort=maybe", self.f)
+
     def test_simpleUNIX(self):
         """
         L{endpoints._parseServer} returns a C{'UNIX'} port description with
@@ -3085,6 +3110,17 @@ class ServerStringTests(unittest.TestCase):
         self.assertEqual(server._backlog, 12)
         self.assertEqual(server._interface, "10.0.0.1")
 
+    def test_tcpReusePort(self):
+        """
+        When passed a TCP strports description with C{reusePort=yes},
+        L{endpoints.serverFromString} returns a L{TCP4ServerEndpoint} which
+        asks the reactor to listen with C{SO_REUSEPORT}.
+        """
+        reactor = object()
+        server = endpoints.serverFromString(reactor, "tcp:1234:reusePort=yes")
+        self.assertIsInstance(server, endpoints.TCP4ServerEndpoint)
+        self.assertTrue(server._reusePort)
+
     @skipIf(skipSSL, skipSSLReason)
     def test_ssl(self):
         """
@@ -5,6 +5,7 @@
 Tests for L{twisted.internet.epollreactor}.
 """
 
+import socket
 from unittest import skipIf
 
 from twisted.trial.unittest import TestCase
@@ -229,3 +230,189 @@ class ContinuousPollingTests(TestCase):
         writer = object()
         poller.addWriter(writer)
         self.assertIn(writer, poller.getWriters())
+
+
+class EdgeTriggeredDescriptor:
+    """
+    Reads from and records writes to a socket, keeping track of whether it
+    is ready as a descriptor watched edge-triggered must.
+
+    @ivar received: The data read, one string per read.
+    @ivar writes: The number of times C{doWrite} was called.
+    @ivar lost: The reason the descriptor was disconnected, or L{None}.
+    """
+
+    _edgeTriggerable = True
+    _readable = True
+    _writable = True
+
+    readSize = 4
+    lost = None
+
+    def __init__(self, reactor, skt):
+        self.reactor = reactor
+        self.socket = skt
+        self.socket.setblocking(False)
+        self.received = []
+        self.writes = 0
+
+    def fileno(self):
+        return self.socket.fileno()
+
+    def logPrefix(self):
+        return "EdgeTriggeredDescriptor"
+
+    def doRead(self):
+        try:
+            data = self.socket.recv(self.readSize)
+        except BlockingIOError:
+            self._readable = False
+            return
+        if len(data) < self.readSize:
+            self._readable = False
+        if not data:
+            return ConnectionDone()
+        self.received.append(data)
+
+    def doWrite(self):
+        self.writes += 1
+        self.reactor.removeWriter(self)
+
+    def connectionLost(self, reason):
+        self.lost = reason
+        self.reactor.removeReader(self)
+        self.reactor.removeWriter(self)
+
+
+@skipIf(not epollreactor, "epoll not supported in this environment.")
+class EdgeTriggeredTests(TestCase):
+    """
+    Tests for L{epollreactor.EPollReactor} in edge-triggered mode.
+    """
+
+    def setUp(self):
+        self.reactor = epollreactor.EPollReactor(edgeTriggered=True)
+        self.addCleanup(self.reactor._poller.close)
+        # Let the reactor register its own descriptors, which these tests are
+        # not interested in.
+        self.reactor.doPoll(0)
+        self.reactor._controlCalls = 0
+        self.reactor._waitCalls = 0
+        self.client, server = socket.socketpair()
+        self.addCleanup(self.client.close)
+        self.addCleanup(server.close)
+        self.descriptor = EdgeTriggeredDescriptor(self.reactor, server)
+
+    def test_registeredOnce(self):
+        """
+        A descriptor which supports it is registered once for both reading and
+        writing, so that starting and stopping writing while it is reading
+        costs no C{epoll_ctl} calls.
+        """
+        self.reactor.addReader(self.descriptor)
+        for _ in range(3):
+            self.reactor.addWriter(self.descriptor)
+            self.reactor.removeWriter(self.descriptor)
+        self.assertEqual(self.reactor._controlCalls, 1)
+        self.reactor.removeReader(self.descriptor)
+        self.assertEqual(self.reactor._controlCalls, 2)
+        self.assertNotIn(self.descriptor, self.reactor.getReaders())
+
+    def test_levelTriggeredByDefault(self):
+        """
+        Without C{edgeTriggered}, every change to what a descriptor is being
+        used for costs an C{epoll_ctl} call.
+        """
+        reactor = epollreactor.EPollReactor()
+        self.addCleanup(reactor._poller.close)
+        reactor._controlCalls = 0
+        self.descriptor.reactor = reactor
+        reactor.addReader(self.descriptor)
+        for _ in range(3):
+            reactor.addWriter(self.descriptor)
+            reactor.removeWriter(self.descriptor)
+        self.assertEqual(reactor._controlCalls, 7)
+        reactor.removeReader(self.descriptor)
+
+    def test_otherDescriptorsLevelTriggered(self):
+        """
+        Descriptors which do not keep track of whether they are ready are
+        registered level-triggered even in edge-triggered mode.
+        """
+        self.descriptor._edgeTriggerable = False
+        self.reactor.addReader(self.descriptor)
+        self.reactor.addWriter(self.descriptor)
+        self.reactor.removeWriter(self.descriptor)
+        self.assertEqual(self.reactor._controlCalls, 3)
+        self.reactor.removeReader(self.descriptor)
+
+    def test_readUntilShort(self):
+        """
+        A descriptor is read from without waiting for the kernel again until
+        a read comes up short.
+        """
+        self.reactor.addReader(self.descriptor)
+        self.client.send(b"0123456789")
+        self.reactor.doPoll(0)
+        self.assertEqual(self.descriptor.received, [b"0123"])
+        self.assertTrue(self.reactor._ready)
+
+        self.reactor.doPoll(None)
+        self.reactor.doPoll(None)
+        self.assertEqual(self.descriptor.received, [b"0123", b"4567", b"89"])
+        self.assertFalse(self.reactor._ready)
+        self.assertEqual(self.reactor._controlCalls, 1)
+
+    def test_readyWhenResumed(self):
+        """
+        A descriptor which stops reading before it has read everything is read
+        from again as soon as it starts reading again.
+        """
+        self.reactor.addReader(self.descriptor)
+        self.reactor.addWriter(self.descriptor)
+        self.client.send(b"0123456789")
+        self.reactor.doPoll(0)
+        self.reactor.removeReader(self.descriptor)
+        self.reactor.doPoll(0)
+        self.assertEqual(self.descriptor.received, [b"0123"])
+
+        self.reactor.addReader(self.descriptor)
+        self.reactor.doPoll(None)
+        self.assertEqual(self.descriptor.received, [b"0123", b"4567"])
+
+    def test_writeWhenWritable(self):
+        """
+        A descriptor which starts writing when it is already known to be
+        writable is written to without waiting for the kernel.
+        """
+        self.reactor.addReader(self.descriptor)
+        self.reactor.doPoll(0)
+        for writes in range(1, 3):
+            self.reactor.addWriter(self.descriptor)
+            self.reactor.doPoll(None)
+            self.assertEqual(self.descriptor.writes, writes)
+        self.assertEqual(self.reactor._controlCalls, 1)
+
+    def test_hangupAfterShortRead(self):
+        """
+        When the other end stops writing, the descriptor is read from until it
+        finds out, even if a read comes up short first.
+        """
+        self.reactor.addReader(self.descriptor)
+        self.client.send(b"01")
+        self.client.shutdown(socket.SHUT_WR)
+        self.reactor.doPoll(0)
+        self.assertEqual(self.descriptor.received, [b"01"])
+
+        self.reactor.doPoll(None)
+        self.assertIsInstance(self.descriptor.lost.value, ConnectionDone)
+        self.assertNotIn(self.descriptor, self.reactor.getReaders())
+        self.assertFalse(self.reactor._hangups)
+
+    def test_waitCalls(self):
+        """
+        Every poll makes one C{epoll_wait} call.
+        """
+        self.reactor.doPoll(0)
+        self.reactor.doPoll(0)
+        self.assertEqual(self.reactor._waitCalls, 2)
@@ -92,3 +92,150 @@ class WriteDescriptorTests(SynchronousTestCase):
         descriptor = MemoryFile()
         descriptor.write(b"hello, world")
         self.assertIsNone(descriptor.doWrite())
+
+
+class MemoryVectorFile(MemoryFile):
+    """
+    A L{MemoryFile} which also supports vectored writes.
+
+    @ivar _vectors: A C{list} of the C{list}s of buffers passed to
+        C{_writeSomeDataVector}.
+    """
+
+    _writeVectorLimit = 4
+    _writeVectorMinimum = 0
+
+    def __init__(self):
+        MemoryFile.__init__(self)
+        self._vectors = []
+
+    def _writeSomeDataVector(self, vector):
+        """
+        Record C{vector} and copy at most C{self._freeSpace} bytes from it into
+        C{self._written}.
+
+        @return: A C{int} indicating how many bytes were copied from
+            C{vector}.
+        """
+        self._vectors.append([bytes(b) for b in vector])
+        return self.writeSomeData(b"".join(vector))
+
+
+class VectoredWriteTests(SynchronousTestCase):
+    """
+    Tests for L{FileDescriptor.doWrite} when the descriptor supports vectored
+    writes.
+    """
+
+    def test_buffersNotJoined(self):
+        """
+        The buffers queued by L{FileDescriptor.writeSequence} are passed to
+        C{_writeSomeDataVector} as they are.
+        """
+        descriptor = MemoryVectorFile()
+        descriptor._freeSpace = 100
+        descriptor.writeSequence([b"abc", b"de", b"f"])
+        self.assertIsNone(descriptor.doWrite())
+        self.assertEqual(descriptor._vectors, [[b"abc", b"de", b"f"]])
+        self.assertEqual(b"".join(descriptor._written), b"abcdef")
+        self.assertEqual(descriptor._tempDataBuffer, [])
+        self.assertEqual(descriptor._tempDataLen, 0)
+        self.assertEqual(descriptor.dataBuffer, b"")
+
+    def test_vectorLimit(self):
+        """
+        No more than C{_writeVectorLimit} buffers are passed to a single call
+        to C{_writeSomeDataVector}.
+        """
+        descriptor = MemoryVectorFile()
+        descriptor._freeSpace = 100
+        descriptor.writeSequence([b"a", b"b", b"c", b"d", b"e", b"f"])
+        descriptor.doWrite()
+        descriptor.doWrite()
+        self.assertEqual(descriptor._vectors, [[b"a", b"b", b"c", b"d"], [b"e", b"f"]])
+        self.assertEqual(b"".join(descriptor._written), b"abcdef")
+
+    def test_sendLimit(self):
+        """
+        Buffers beyond the first which brings the total to C{SEND_LIMIT}
+        bytes are left for a later call to C{_writeSomeDataVector}.
+        """
+        descriptor = MemoryVectorFile()
+        descriptor.SEND_LIMIT = 3
+        descriptor._freeSpace = 100
+        descriptor.writeSequence([b"ab", b"cd", b"ef"])
+        descriptor.doWrite()
+        self.assertEqual(descriptor._vectors, [[b"ab", b"cd"]])
+        self.assertEqual(descriptor._tempDataBuffer, [b"ef"])
+        self.assertEqual(descriptor._tempDataLen, 2)
+
+    def test_partialWrite(self):
+        """
+        When only part of the buffers are written, the rest of the data is
+        sent, in order, by later calls to L{FileDescriptor.doWrite}.
+        """
+        descriptor = MemoryVectorFile()
+        descriptor.writeSequence([b"abc", b"def", b"ghi"])
+        descriptor._freeSpace = 4
+        descriptor.doWrite()
+        self.assertEqual(descriptor.dataBuffer, b"def")
+        self.assertEqual(descriptor.offset, 1)
+        self.assertEqual(descriptor._tempDataBuffer, [b"ghi"])
+        self.assertEqual(descriptor._tempDataLen, 3)
+
+        descriptor._freeSpace = 1
+        descriptor.doWrite()
+        self.assertEqual(descriptor.offset, 2)
+
+        descriptor._freeSpace = 100
+        descriptor.write(b"jkl")
+        descriptor.doWrite()
+        self.assertEqual(
+            descriptor._vectors[-1],
+            [b"f", b"ghi", b"jkl"],
+        )
+        self.assertEqual(b"".join(descriptor._written), b"abcdefghijkl")
+        self.assertEqual(descriptor.dataBuffer, b"")
+        self.assertEqual(descriptor.offset, 0)
+        self.assertEqual(descriptor._tempDataLen, 0)
+
+    def test_smallBuffersJoined(self):
+        """
+        Runs of buffers smaller than C{_writeVectorMinimum} are joined into a
+        single buffer before being passed to C{_writeSomeDataVector}.
+        """
+        descriptor = MemoryVectorFile()
+        descriptor._writeVectorMinimum = 4
+        descriptor._freeSpace = 100
+        descriptor.writeSequence(
+            [b"a", b"bc", b"defghijklmno", b"pqrstuvwxyz0", b"1", b"2"]
+        )
+        descriptor.doWrite()
+        self.assertEqual(
+            descriptor._vectors, [[b"abc", b"defghijklmno", b"pqrstuvwxyz0", b"12"]]
+        )
+        self.assertEqual(descriptor._tempDataBuffer, [])
+
+    def test_smallWritesNotVectored(self):
+        """
+        If the queued buffers are smaller than C{_writeVectorMinimum} on
+        average, they are joined and written with C{writeSomeData}.
+        """
+        descriptor = MemoryVectorFile()
+        descriptor._writeVectorMinimum = 4
+        descriptor._freeSpace = 100
+        descriptor.writeSequence([b"ab", b"cd", b"efg"])
+        descriptor.doWrite()
+        self.assertEqual(descriptor._vectors, [])
+        self.assertEqual(b"".join(descriptor._written), b"abcdefg")
+
+    def test_writeFailed(self):
+        """
+        If C{_writeSomeDataVector} returns an exception, L{FileDescriptor.doWrite}
+        returns it.
+        """
+        descriptor = MemoryVectorFile()
+        failure = Exception()
+        descriptor._writeSomeDataVector = lambda vector: failure
+        descriptor.write(b"abc")
+        self.assertIs(descriptor.doWrite(), failure)
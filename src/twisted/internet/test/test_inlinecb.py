@@ -16,6 +16,8 @@ from twisted.internet.defer import (
     returnValue,
     inlineCallbacks,
     CancelledError,
+    fail,
+    succeed,
 )
 
 
@@ -198,6 +200,84 @@ class ForwardTraceBackTests(SynchronousTestCase):
         self.assertIn("in erroring", f.getTraceback())
 
 
+class FiredDeferredTests(SynchronousTestCase):
+    """
+    Tests for yielding L{Deferred}s which already have a result from an
+    L{inlineCallbacks} function.
+    """
+
+    def test_resultTaken(self):
+        """
+        The result of a L{Deferred} which already has one is sent into the
+        generator, and the L{Deferred} is left with a result of L{None}, as if
+        a callback had taken it.
+        """
+        fired = succeed(1)
+
+        @inlineCallbacks
+        def f():
+            result = yield fired
+            returnValue(result + 1)
+
+        self.assertEqual(self.successResultOf(f()), 2)
+        self.assertIsNone(self.successResultOf(fired))
+
+    def test_failureHandled(self):
+        """
+        A failure which a L{Deferred} already has is thrown into the
+        generator, and is no longer an unhandled error of that L{Deferred}.
+        """
+        fired = fail(ZeroDivisionError())
+
+        @inlineCallbacks
+        def f():
+            try:
+                yield fired
+            except ZeroDivisionError:
+                returnValue("handled")
+
+        self.assertEqual(self.successResultOf(f()), "handled")
+        self.assertIsNone(fired._debugInfo.failResult)
+        self.assertIsNone(self.successResultOf(fired))
+
+    def test_pausedDeferred(self):
+        """
+        A L{Deferred} which has a result but is paused is waited for until it
+        is unpaused.
+        """
+        fired = succeed(1)
+        fired.pause()
+
+        @inlineCallbacks
+        def f():
+            result = yield fired
+            returnValue(result)
+
+        d = f()
+        self.assertNoResult(d)
+        fired.unpause()
+        self.assertEqual(self.successResultOf(d), 1)
+
+    def test_deferredWithCallbacks(self):
+        """
+        A L{Deferred} which has a result and is running its callbacks, one of
+        which yields it, is waited for until the rest of its callbacks have
+        run.
+        """
+        fired = Deferred()
+
+        @inlineCallbacks
+        def f():
+            result = yield fired
+            returnValue(result)
+
+        results = []
+        fired.addCallback(lambda result: results.append(f()))
+        fired.addCallback(lambda result: 2)
+        fired.callback(1)
+        self.assertEqual(self.successResultOf(results[0]), 2)
+
+
 class UntranslatedError(Exception):
     """
     Untranslated exception type when testing an exception translation.
@@ -0,0 +1,633 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.internet.iouringreactor} and L{twisted.internet._iouring}.
+
+The behaviour the reactor shares with the others is tested by the reactor
+test suites in this package; these tests cover how it manages its requests.
+"""
+
+import ctypes
+import os
+import socket
+from errno import EBADF, ECANCELED, ENOBUFS
+from select import POLLHUP, POLLIN, POLLNVAL, POLLOUT
+from typing import Any, List, Optional, Tuple
+from unittest import skipIf
+
+from zope.interface import implementer
+
+from twisted.internet.error import ConnectionDone, ConnectionLost
+from twisted.internet.interfaces import (
+    IReactorFDSet,
+    IReadDescriptor,
+    IWriteDescriptor,
+)
+from twisted.internet.protocol import Protocol
+from twisted.python.failure import Failure
+from twisted.trial.unittest import SynchronousTestCase
+
+try:
+    from twisted.internet import _iouring, iouringreactor
+except ImportError:
+    iouringreactor = None  # type: ignore[assignment]
+
+
+@implementer(IReadDescriptor, IWriteDescriptor)
+class Descriptor:
+    """
+    Records reads, writes and disconnection, as if it were a
+    C{FileDescriptor}.
+    """
+
+    def __init__(self, reactor: IReactorFDSet, fd: int) -> None:
+        self.reactor = reactor
+        self.fd = fd
+        self.events = []  # type: List[str]
+
+    def fileno(self) -> int:
+        return self.fd
+
+    def logPrefix(self) -> str:
+        return "Descriptor"
+
+    def doRead(self) -> Optional[Failure]:
+        self.events.append("read")
+        return None
+
+    def doWrite(self) -> Optional[Failure]:
+        self.events.append("write")
+        return None
+
+    def connectionLost(self, reason: Failure) -> None:
+        reason.trap(ConnectionLost)
+        self.events.append("lost")
+        self.reactor.removeReader(self)
+        self.reactor.removeWriter(self)
+
+
+class FakeRing:
+    """
+    Records the requests made of an L{_iouring.Ring}, and returns the
+    completions given to it.
+
+    @ivar requests: The requests made, in order: C{("add", fd, events,
+        identifier)}, C{("recv", fd, length, bufferGroup, identifier)},
+        C{("send", fd, data, identifier)}, C{("accept", fd, identifier)},
+        C{("provide", address, length, count, bufferGroup, first)} and
+        C{("cancel", identifier)}, and C{("submit",)} for each submission
+        made without waiting.
+
+    @ivar completions: The completions to return the next time
+        L{submitAndWait} is called, as C{(identifier, result)} or
+        C{(identifier, result, flags)}.
+    """
+
+    def __init__(self) -> None:
+        self.requests = []  # type: List[Tuple[Any, ...]]
+        self.completions = []  # type: List[Tuple[int, ...]]
+        self.timeouts = []  # type: List[Optional[float]]
+
+    def pollAdd(self, fd: int, events: int, userData: int) -> None:
+        self.requests.append(("add", fd, events, userData))
+
+    def recv(self, fd: int, length: int, bufferGroup: int, userData: int) -> None:
+        self.requests.append(("recv", fd, length, bufferGroup, userData))
+
+    def send(self, fd: int, address: int, length: int, userData: int) -> None:
+        self.requests.append(("send", fd, ctypes.string_at(address, length), userData))
+
+    def accept(self, fd: int, userData: int) -> None:
+        self.requests.append(("accept", fd, userData))
+
+    def provideBuffers(
+        self, address: int, length: int, count: int, bufferGroup: int, first: int
+    ) -> None:
+        self.requests.append(("provide", address, length, count, bufferGroup, first))
+
+    def cancel(self, userData: int) -> None:
+        self.requests.append(("cancel", userData))
+
+    def submit(self) -> None:
+        self.requests.append(("submit",))
+
+    def submitAndWait(self, timeout: Optional[float]) -> List[Tuple[int, int, int]]:
+        self.timeouts.append(timeout)
+        completions, self.completions = self.completions, []
+        return [
+            (completion[0], completion[1], completion[2] if completion[2:] else 0)
+            for completion in completions
+        ]
+
+
+@skipIf(not iouringreactor, "io_uring is not supported in this environment.")
+class IOUringReactorPollTests(SynchronousTestCase):
+    """
+    Tests for the poll requests made by L{iouringreactor.IOUringReactor}.
+    """
+
+    def setUp(self) -> None:
+        self.reactor = iouringreactor.IOUringReactor()
+        self.addCleanup(self.reactor._ring.close)
+        self.ring = FakeRing()
+        self.reactor._ring = self.ring  # type: ignore[assignment]
+        # Let the reactor make its requests for its own descriptors, which
+        # these tests are not interested in.
+        self.reactor.doPoll(0)
+        self.ring.requests = []
+
+    def lastIdentifier(self) -> int:
+        """
+        @return: The identifier of the last poll request made.
+        """
+        identifier = self.ring.requests[-1][-1]  # type: int
+        return identifier
+
+    def test_batchedRequests(self) -> None:
+        """
+        Adding readers and writers makes no requests until the reactor next
+        waits for events, when it requests polls for all of them.
+        """
+        first = Descriptor(self.reactor, 100)
+        second = Descriptor(self.reactor, 101)
+        self.reactor.addReader(first)
+        self.reactor.addWriter(second)
+        self.reactor.addWriter(first)
+        self.assertEqual(self.ring.requests, [])
+
+        self.reactor.doPoll(1.5)
+
+        self.assertEqual(self.ring.timeouts[-1], 1.5)
+        self.assertEqual(
+            sorted(request[:3] for request in self.ring.requests),
+            [("add", 100, POLLIN), ("add", 100, POLLOUT), ("add", 101, POLLOUT)],
+        )
+
+    def test_dispatchAndRearm(self) -> None:
+        """
+        When a poll request completes, its descriptor is dispatched to and
+        another request is made for it the next time the reactor waits.
+        """
+        descriptor = Descriptor(self.reactor, 100)
+        self.reactor.addReader(descriptor)
+        self.reactor.doPoll(0)
+        identifier = self.lastIdentifier()
+
+        self.ring.completions = [(identifier, POLLIN)]
+        self.reactor.doPoll(0)
+        self.assertEqual(descriptor.events, ["read"])
+
+        self.ring.requests = []
+        self.reactor.doPoll(0)
+        self.assertEqual(self.ring.requests[0][:3], ("add", 100, POLLIN))
+        self.assertNotEqual(self.lastIdentifier(), identifier)
+
+    def test_writeWhileReading(self) -> None:
+        """
+        A descriptor which is being read from and starts writing gets a
+        separate request for C{POLLOUT}, leaving its C{POLLIN} request alone.
+        """
+        descriptor = Descriptor(self.reactor, 100)
+        self.reactor.addReader(descriptor)
+        self.reactor.doPoll(0)
+        identifier = self.lastIdentifier()
+        self.ring.requests = []
+
+        self.reactor.addWriter(descriptor)
+        self.reactor.doPoll(0)
+        self.assertEqual(self.ring.requests, [("add", 100, POLLOUT, identifier + 1)])
+
+        self.ring.completions = [(identifier + 1, POLLOUT)]
+        self.reactor.doPoll(0)
+        self.assertEqual(descriptor.events, ["write"])
+
+    def test_pauseAndResume(self) -> None:
+        """
+        A descriptor which stops and starts reading keeps its outstanding
+        request, and while it is not reading the request's completion is
+        ignored and no new request is made.
+        """
+        descriptor = Descriptor(self.reactor, 100)
+        self.reactor.addReader(descriptor)
+        self.reactor.addWriter(descriptor)
+        self.reactor.doPoll(0)
+        readIdentifier = self.ring.requests[0][-1]
+        self.ring.requests = []
+
+        self.reactor.removeReader(descriptor)
+        self.reactor.addReader(descriptor)
+        self.reactor.doPoll(0)
+        self.assertEqual(self.ring.requests, [])
+
+        self.reactor.removeReader(descriptor)
+        self.ring.completions = [(readIdentifier, POLLIN)]
+        self.reactor.doPoll(0)
+        self.reactor.doPoll(0)
+        self.assertEqual(descriptor.events, [])
+        self.assertEqual(self.ring.requests, [])
+
+        self.reactor.addReader(descriptor)
+        self.reactor.doPoll(0)
+        self.assertEqual(self.ring.requests[0][:3], ("add", 100, POLLIN))
+
+    def test_writeDisconnectLeftToRead(self) -> None:
+        """
+        Disconnection reported by the C{POLLOUT} request of a descriptor which
+        is also being read from is left for its C{POLLIN} request to report,
+        so that any data still to be read is read first.
+        """
+        descriptor = Descriptor(self.reactor, 100)
+        self.reactor.addReader(descriptor)
+        self.reactor.addWriter(descriptor)
+        self.reactor.doPoll(0)
+        [(_, _, _, readIdentifier), (_, _, _, writeIdentifier)] = sorted(
+            self.ring.requests, key=lambda request: request[2]
+        )
+
+        self.ring.completions = [(writeIdentifier, POLLHUP)]
+        self.reactor.doPoll(0)
+        self.assertEqual(descriptor.events, [])
+
+        self.ring.completions = [(readIdentifier, POLLIN | POLLHUP)]
+        self.reactor.doPoll(0)
+        self.assertEqual(descriptor.events, ["read"])
+
+    def test_removeCancelsImmediately(self) -> None:
+        """
+        Removing a descriptor altogether cancels its poll request straight
+        away, since its file descriptor may be closed and reused before the
+        reactor next waits, and a completion which arrives afterwards is
+        ignored.
+        """
+        descriptor = Descriptor(self.reactor, 100)
+        self.reactor.addReader(descriptor)
+        self.reactor.doPoll(0)
+        identifier = self.lastIdentifier()
+
+        self.reactor.removeReader(descriptor)
+        self.assertEqual(self.ring.requests[-1], ("cancel", identifier))
+
+        replacement = Descriptor(self.reactor, 100)
+        self.reactor.addReader(replacement)
+        self.ring.completions = [(identifier, POLLIN)]
+        self.reactor.doPoll(0)
+        self.assertEqual(descriptor.events, [])
+        self.assertEqual(replacement.events, [])
+        self.assertEqual(self.ring.requests[-1][:3], ("add", 100, POLLIN))
+
+    def test_failedPoll(self) -> None:
+        """
+        A descriptor whose poll request fails, for example because it was
+        closed without being removed from the reactor, is disconnected.
+        """
+        descriptor = Descriptor(self.reactor, 100)
+        self.reactor.addWriter(descriptor)
+        self.reactor.doPoll(0)
+
+        self.ring.completions = [(self.lastIdentifier(), -EBADF)]
+        self.reactor.doPoll(0)
+        self.assertEqual(descriptor.events, ["lost"])
+        self.assertNotIn(descriptor, self.reactor.getWriters())
+
+
+class RecordingProtocol(Protocol):
+    """
+    Records the data it receives, and the reason its connection was lost.
+    """
+
+    def __init__(self) -> None:
+        self.received = []  # type: List[bytes]
+        self.lostReason = None  # type: Optional[Failure]
+
+    def dataReceived(self, data: bytes) -> None:
+        self.received.append(data)
+
+    def connectionLost(self, reason: Optional[Failure] = None) -> None:
+        self.lostReason = reason
+
+
+@skipIf(not iouringreactor, "io_uring is not supported in this environment.")
+class IOUringReactorTransferTests(SynchronousTestCase):
+    """
+    Tests for the requests made by L{iouringreactor.IOUringReactor} to
+    receive from and send over TCP connections.
+    """
+
+    def setUp(self) -> None:
+        self.reactor = iouringreactor.IOUringReactor()
+        self.addCleanup(self.reactor._ring.close)
+        self.ring = FakeRing()
+        self.reactor._ring = self.ring  # type: ignore[assignment]
+        self.reactor.doPoll(0)
+        self.ring.requests = []
+
+        self.client, server = socket.socketpair()
+        self.addCleanup(self.client.close)
+        self.addCleanup(server.close)
+        self.protocol = RecordingProtocol()
+        self.connection = iouringreactor._Server(
+            server, self.protocol, ("127.0.0.1", 1), None, 1, self.reactor
+        )
+        self.fd = server.fileno()
+
+    def receiveRequest(self) -> int:
+        """
+        Let the reactor make its requests, and check that it requests to
+        receive from the connection.
+
+        @return: The identifier of the request.
+        """
+        self.reactor.doPoll(0)
+        [request] = [r for r in self.ring.requests if r[0] == "recv"]
+        self.assertEqual(
+            request[:4],
+            (
+                "recv",
+                self.fd,
+                iouringreactor._BUFFER_SIZE,
+                iouringreactor._BUFFER_GROUP,
+            ),
+        )
+        self.ring.requests = []
+        identifier = request[-1]  # type: int
+        return identifier
+
+    def complete(self, identifier: int, data: bytes, buffer: int = 3) -> None:
+        """
+        Complete a request to receive with C{data}, received into one of the
+        reactor's buffers.
+        """
+        address = self.reactor._buffersAddress + buffer * iouringreactor._BUFFER_SIZE
+        ctypes.memmove(address, data, len(data))
+        self.ring.completions = [
+            (
+                identifier,
+                len(data),
+                _iouring.IORING_CQE_F_BUFFER
+                | buffer << _iouring.IORING_CQE_BUFFER_SHIFT,
+            )
+        ]
+        self.reactor.doPoll(0)
+
+    def test_receive(self) -> None:
+        """
+        The data a request to receive completes with is given to the
+        connection's protocol, the buffer it was received into is given back
+        to the kernel, and another request to receive is made.
+        """
+        self.complete(self.receiveRequest(), b"hello", buffer=3)
+        self.assertEqual(self.protocol.received, [b"hello"])
+        self.assertEqual(
+            self.ring.requests,
+            [
+                (
+                    "provide",
+                    self.reactor._buffersAddress + 3 * iouringreactor._BUFFER_SIZE,
+                    iouringreactor._BUFFER_SIZE,
+                    1,
+                    iouringreactor._BUFFER_GROUP,
+                    3,
+                )
+            ],
+        )
+        self.receiveRequest()
+
+    def test_receiveWhilePaused(self) -> None:
+        """
+        Data received while a connection is not reading is kept until it
+        reads again.
+        """
+        identifier = self.receiveRequest()
+        self.connection.stopReading()
+        self.complete(identifier, b"hello")
+        self.reactor.doPoll(0)
+        self.assertEqual(self.protocol.received, [])
+
+        self.connection.startReading()
+        self.receiveRequest()
+        self.assertEqual(self.protocol.received, [b"hello"])
+
+    def test_receiveClosed(self) -> None:
+        """
+        A request to receive which completes with no data means the other
+        side has closed the connection.
+        """
+        self.ring.completions = [(self.receiveRequest(), 0)]
+        self.reactor.doPoll(0)
+        reason = self.protocol.lostReason
+        assert reason is not None
+        reason.trap(ConnectionDone)
+
+    def test_noBuffers(self) -> None:
+        """
+        When the kernel runs out of buffers to receive into, the reactor waits
+        for the connection to become readable instead, and reads from it
+        itself.
+        """
+        self.ring.completions = [(self.receiveRequest(), -ENOBUFS)]
+        self.reactor.doPoll(0)
+        [(kind, fd, events, identifier)] = self.ring.requests
+        self.assertEqual((kind, fd, events), ("add", self.fd, POLLIN))
+
+        self.client.send(b"hello")
+        self.ring.completions = [(identifier, POLLIN)]
+        self.reactor.doPoll(0)
+        self.assertEqual(self.protocol.received, [b"hello"])
+
+    def test_sendRest(self) -> None:
+        """
+        What a connection cannot send straight away is sent by a request, and
+        once that completes, the connection sends what follows it.
+        """
+        self.connection.socket.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+        data = os.urandom(self.connection.SEND_LIMIT * 2)
+        self.connection.write(data)
+        self.reactor.doPoll(0)
+        [(kind, fd, sending, identifier)] = [
+            r for r in self.ring.requests if r[0] == "send"
+        ]
+        self.assertEqual((kind, fd), ("send", self.fd))
+        sent = self.connection.SEND_LIMIT - len(sending)
+        self.assertEqual(sending, data[sent : self.connection.SEND_LIMIT])
+        self.ring.requests = []
+
+        # The socket is still full, so what follows is sent by a request
+        # too.
+        self.ring.completions = [(identifier, len(sending))]
+        self.reactor.doPoll(0)
+        [(kind, fd, sending, identifier)] = [
+            r for r in self.ring.requests if r[0] == "send"
+        ]
+        self.assertEqual(
+            sending, data[self.connection.SEND_LIMIT : self.connection.SEND_LIMIT * 2]
+        )
+
+    def test_closeCancels(self) -> None:
+        """
+        Closing a connection's socket cancels its outstanding requests at
+        once, and what they complete with is ignored.
+        """
+        identifier = self.receiveRequest()
+        self.connection.abortConnection()
+        self.reactor.runUntilCurrent()
+        self.assertEqual(self.ring.requests[-2:], [("cancel", identifier), ("submit",)])
+
+        self.complete(identifier, b"hello")
+        self.assertEqual(self.protocol.received, [])
+
+
+@skipIf(not iouringreactor, "io_uring is not supported in this environment.")
+class RingTests(SynchronousTestCase):
+    """
+    Tests for L{_iouring.Ring}.
+    """
+
+    def setUp(self) -> None:
+        self.ring = _iouring.Ring(4)
+        self.addCleanup(self.ring.close)
+        self.client, self.server = socket.socketpair()
+        self.addCleanup(self.client.close)
+        self.addCleanup(self.server.close)
+
+    def test_pollAdd(self) -> None:
+        """
+        A poll request completes with the events which have occurred when the
+        file descriptor becomes ready.
+        """
+        self.ring.pollAdd(self.server.fileno(), POLLIN, 1)
+        self.assertEqual(self.ring.submitAndWait(0), [])
+
+        self.client.send(b"x")
+        self.assertEqual(self.ring.submitAndWait(1), [(1, POLLIN, 0)])
+
+    def test_cancel(self) -> None:
+        """
+        A cancelled request completes with C{-ECANCELED}.  The cancellation
+        itself completes with a user data of 0, unless the kernel can skip
+        reporting its success.
+        """
+        self.ring.pollAdd(self.server.fileno(), POLLIN, 1)
+        self.ring.cancel(1)
+        completions = self.ring.submitAndWait(1)
+        self.assertIn((1, -ECANCELED, 0), completions)
+        self.assertIn(
+            sorted(completions), [[(1, -ECANCELED, 0)], [(0, 0, 0), (1, -ECANCELED, 0)]]
+        )
+
+    def test_recv(self) -> None:
+        """
+        A receive request completes, once there is data to receive, with the
+        number of bytes received into one of the buffers provided, whose
+        number is in the completion's flags.
+        """
+        buffers = ctypes.create_string_buffer(32)
+        self.ring.provideBuffers(ctypes.addressof(buffers), 16, 2, 0, 0)
+        self.ring.recv(self.server.fileno(), 16, 0, 1)
+        self.assertEqual(
+            [completion for completion in self.ring.submitAndWait(0) if completion[0]],
+            [],
+        )
+
+        self.client.send(b"hello")
+        [(userData, result, flags)] = [
+            completion for completion in self.ring.submitAndWait(1) if completion[0]
+        ]
+        self.assertEqual((userData, result), (1, 5))
+        self.assertTrue(flags & _iouring.IORING_CQE_F_BUFFER)
+        buffer = flags >> _iouring.IORING_CQE_BUFFER_SHIFT
+        self.assertIn(buffer, (0, 1))
+        self.assertEqual(buffers.raw[buffer * 16 : buffer * 16 + 5], b"hello")
+
+    def test_send(self) -> None:
+        """
+        A send request completes with the number of bytes sent.
+        """
+        data = ctypes.create_string_buffer(b"hello", 5)
+        self.ring.send(self.client.fileno(), ctypes.addressof(data), 5, 1)
+        self.assertEqual(self.ring.submitAndWait(1), [(1, 5, 0)])
+        self.assertEqual(self.server.recv(5), b"hello")
+
+    def test_accept(self) -> None:
+        """
+        An accept request completes with the file descriptor of the connection
+        accepted.
+        """
+        port = socket.socket()
+        self.addCleanup(port.close)
+        port.bind(("127.0.0.1", 0))
+        port.listen(1)
+        self.ring.accept(port.fileno(), 1)
+        self.assertEqual(self.ring.submitAndWait(0), [])
+
+        client = socket.create_connection(port.getsockname())
+        self.addCleanup(client.close)
+        [(userData, result, flags)] = self.ring.submitAndWait(1)
+        self.assertEqual(userData, 1)
+        accepted = socket.socket(fileno=result)
+        self.addCleanup(accepted.close)
+        self.assertEqual(accepted.getpeername(), client.getsockname())
+
+    def test_pollClosed(self) -> None:
+        """
+        A poll request for a file descriptor which is not open completes with
+        C{-EBADF}, or reports C{POLLNVAL}.
+        """
+        fd = self.server.fileno()
+        self.server.close()
+        self.ring.pollAdd(fd, POLLIN, 1)
+        [(userData, result, flags)] = self.ring.submitAndWait(1)
+        self.assertEqual(userData, 1)
+        self.assertIn(result, (-EBADF, POLLNVAL))
+
+    def test_moreRequestsThanEntries(self) -> None:
+        """
+        When more requests are queued than the submission queue holds, those
+        already queued are submitted to make room.
+        """
+        for userData in range(1, 11):
+            self.ring.pollAdd(self.client.fileno(), POLLOUT, userData)
+        self.assertEqual(
+            sorted(self.ring.submitAndWait(1)),
+            [(userData, POLLOUT, 0) for userData in range(1, 11)],
+        )
+
+    def test_close(self) -> None:
+        """
+        L{_iouring.Ring.close} closes the ring's file descriptor, and may be
+        called more than once.
+        """
+        fd = self.ring.fileno
+        self.ring.close()
+        self.ring.close()
+        self.assertRaises(OSError, os.fstat, fd)
+
+
+@skipIf(not iouringreactor, "io_uring is not supported in this environment.")
+class SyscallNumbersTests(SynchronousTestCase):
+    """
+    Tests for L{_iouring._syscallNumbers}.
+    """
+
+    def test_generic(self) -> None:
+        """
+        Architectures using the common system call numbers get them.
+        """
+        for machine in ["x86_64", "i686", "aarch64", "armv7l", "ppc64le"]:
+            self.assertEqual(_iouring._syscallNumbers(machine), (425, 426))
+
+    def test_offset(self) -> None:
+        """
+        Architectures which offset the system call numbers get their own.
+        """
+        self.assertEqual(_iouring._syscallNumbers("alpha"), (535, 536))
+        self.assertEqual(_iouring._syscallNumbers("ia64"), (1449, 1450))
+
+    def test_unknown(self) -> None:
+        """
+        Architectures whose numbers are not known, or depend on the ABI, get
+        L{None}.
+        """
+        self.assertIsNone(_iouring._syscallNumbers("mips64"))
+        self.assertIsNone(_iouring._syscallNumbers("mips"))
+        self.assertIsNone(_iouring._syscallNumbers("unknown"))
@@ -0,0 +1,252 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.internet._loopmonitor} and its use by
+L{twisted.internet.base.ReactorBase}.
+"""
+
+from typing import Any, Callable, List, Optional, Tuple, cast
+
+from twisted.internet._loopmonitor import LoopStatistics
+from twisted.internet.base import ReactorBase, _SignalReactorMixin
+from twisted.logger import ILogObserver, Logger, LogEvent
+from twisted.trial.unittest import SynchronousTestCase
+
+
+class Selectable:
+    """
+    Something a reactor can dispatch to.
+    """
+
+    def logPrefix(self) -> str:
+        return "Selectable"
+
+    def work(self, sleep: Callable[[float], None], seconds: float) -> None:
+        sleep(seconds)
+
+
+class MonitoredReactor(_SignalReactorMixin, ReactorBase):
+    """
+    A reactor with a fake notion of time, which dispatches to the selectables
+    in C{ready} each iteration, each of them taking C{dispatchTime} seconds.
+    """
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        self.ready = []  # type: List[Selectable]
+        self.dispatchTime = 0.0
+        self.dispatched = []  # type: List[Tuple[Selectable, str]]
+        self.iterations = 0
+        ReactorBase.__init__(self)
+
+    def installWaker(self) -> None:
+        pass
+
+    def removeAll(self) -> List[Any]:
+        return []
+
+    def seconds(self) -> float:  # type: ignore[override]
+        return self.now
+
+    def doIteration(self, delay: Optional[float]) -> None:
+        self.iterations += 1
+        for selectable in self.ready:
+            self._doReadOrWrite(selectable, "doRead")
+
+    def _doReadOrWrite(self, selectable: Selectable, method: str) -> None:
+        self.now += self.dispatchTime
+        self.dispatched.append((selectable, method))
+
+
+class LoopMonitorTests(SynchronousTestCase):
+    """
+    Tests for L{ReactorBase.installLoopMonitor}.
+    """
+
+    def setUp(self) -> None:
+        self.reactor = MonitoredReactor()
+        self.monitor = self.reactor.installLoopMonitor(slowThreshold=0.5)
+        self.events = []  # type: List[LogEvent]
+        self.monitor._log = Logger(observer=cast(ILogObserver, self.events.append))
+
+    def sleep(self, seconds: float) -> None:
+        """
+        Take C{seconds} of the reactor's time.
+        """
+        self.reactor.now += seconds
+
+    def test_timedCalls(self) -> None:
+        """
+        The number of timed calls run and how late they ran are measured.
+        """
+        self.reactor.callLater(1, lambda: None)
+        self.reactor.callLater(1, lambda: None)
+        self.reactor.runUntilCurrent()
+        self.sleep(1.25)
+        self.reactor.runUntilCurrent()
+        statistics = self.monitor.statistics
+        self.assertEqual(statistics.timedCalls, 2)
+        self.assertEqual(statistics.timerLag, 0.5)
+        self.assertEqual(statistics.longestTimerLag, 0.25)
+        self.assertEqual(statistics.slowCalls, 0)
+
+    def test_slowTimedCall(self) -> None:
+        """
+        A timed call which takes at least the threshold is logged, naming the
+        function called.
+        """
+        self.reactor.callLater(0, self.sleep, 0.5)
+        self.reactor.runUntilCurrent()
+        [event] = self.events
+        self.assertEqual(event["kind"], "timed call")
+        self.assertEqual(
+            event["logPrefix"],
+            "twisted.internet.test.test_loopmonitor.LoopMonitorTests.sleep",
+        )
+        self.assertEqual(event["duration"], 0.5)
+        self.assertEqual(self.monitor.statistics.slowCalls, 1)
+
+    def test_slowTimedCallLogPrefix(self) -> None:
+        """
+        A slow timed call which is a method of an object with a C{logPrefix}
+        is logged with that prefix.
+        """
+        self.reactor.callLater(0, Selectable().work, self.sleep, 1)
+        self.reactor.runUntilCurrent()
+        [event] = self.events
+        self.assertEqual(event["logPrefix"], "Selectable")
+
+    def test_slowCallFromThread(self) -> None:
+        """
+        A call from another thread which takes at least the threshold is
+        logged.
+        """
+        self.reactor.callFromThread(self.sleep, 1)
+        self.reactor.runUntilCurrent()
+        [event] = self.events
+        self.assertEqual(event["kind"], "call from thread")
+        self.assertEqual(event["duration"], 1)
+
+    def test_failingCall(self) -> None:
+        """
+        A timed call which raises an exception is still measured, and the
+        exception is logged as usual.
+        """
+        self.reactor.callLater(0, lambda: 1 // 0)
+        self.reactor.runUntilCurrent()
+        self.assertEqual(len(self.flushLoggedErrors(ZeroDivisionError)), 1)
+        self.assertEqual(self.monitor.statistics.timedCalls, 1)
+
+    def test_dispatches(self) -> None:
+        """
+        Dispatches to descriptors are counted and timed, and are still made.
+        """
+        selectable = Selectable()
+        self.reactor.ready = [selectable, selectable]
+        self.reactor.dispatchTime = 0.125
+        self.monitor._iterate()
+        statistics = self.monitor.statistics
+        self.assertEqual(statistics.dispatches, 2)
+        self.assertEqual(statistics.mostDispatches, 2)
+        self.assertEqual(statistics.dispatchTime, 0.25)
+        self.assertEqual(
+            self.reactor.dispatched, [(selectable, "doRead"), (selectable, "doRead")]
+        )
+
+        self.reactor.ready = [selectable]
+        self.monitor._iterate()
+        self.assertEqual(statistics.dispatches, 3)
+        self.assertEqual(statistics.mostDispatches, 2)
+
+    def test_slowDispatch(self) -> None:
+        """
+        A dispatch to a descriptor which takes at least the threshold is
+        logged with the descriptor's C{logPrefix}.
+        """
+        self.reactor.ready = [Selectable()]
+        self.reactor.dispatchTime = 0.5
+        self.monitor._iterate()
+        [event] = self.events
+        self.assertEqual(event["kind"], "I/O")
+        self.assertEqual(event["logPrefix"], "Selectable")
+
+    def test_iteration(self) -> None:
+        """
+        How long each iteration takes, and how much of that is spent in
+        C{runUntilCurrent}, is measured.
+        """
+        self.reactor.callLater(0, self.sleep, 0.25)
+        self.reactor.ready = [Selectable()]
+        self.reactor.dispatchTime = 0.125
+        self.monitor._iterate()
+        self.monitor._iterate()
+        statistics = self.monitor.statistics
+        self.assertEqual(statistics.iterations, 2)
+        self.assertEqual(statistics.iterationTime, 0.5)
+        self.assertEqual(statistics.longestIteration, 0.375)
+        self.assertEqual(statistics.runUntilCurrentTime, 0.25)
+        self.assertEqual(statistics.longestRunUntilCurrent, 0.25)
+
+    def test_mainLoop(self) -> None:
+        """
+        While a monitor is installed, the reactor's main loop is measured.
+        """
+        self.reactor.callLater(0, self.reactor.stop)
+        self.reactor.run(installSignalHandlers=False)
+        self.assertEqual(self.monitor.statistics.iterations, self.reactor.iterations)
+        self.assertGreater(self.reactor.iterations, 0)
+
+    def test_report(self) -> None:
+        """
+        L{LoopMonitor.report} logs what has been measured, and starts
+        measuring afresh.
+        """
+        self.monitor._iterate()
+        statistics = self.monitor.report()
+        self.assertEqual(statistics.iterations, 1)
+        self.assertEqual(self.monitor.statistics, LoopStatistics())
+        [event] = self.events
+        self.assertEqual(event["iterations"], 1)
+        self.assertEqual(event["slowCalls"], 0)
+
+    def test_reportInterval(self) -> None:
+        """
+        A monitor installed with a C{reportInterval} reports that often.
+        """
+        monitor = self.reactor.installLoopMonitor(reportInterval=10)
+        monitor._log = Logger(observer=cast(ILogObserver, self.events.append))
+        self.reactor.runUntilCurrent()
+        self.sleep(10)
+        self.reactor.runUntilCurrent()
+        self.sleep(10)
+        self.reactor.runUntilCurrent()
+        # Each report is made by a timed call, which counts itself.
+        self.assertEqual([event["timedCalls"] for event in self.events], [1, 1])
+
+        monitor.uninstall()
+        self.assertEqual(self.reactor.getDelayedCalls(), [])
+
+    def test_uninstall(self) -> None:
+        """
+        Once a monitor is uninstalled, nothing more is measured.
+        """
+        self.monitor.uninstall()
+        self.assertIsNone(self.reactor._loopMonitor)
+        self.reactor.ready = [Selectable()]
+        self.reactor.callLater(0, lambda: None)
+        self.reactor.runUntilCurrent()
+        self.reactor.doIteration(0)
+        self.assertEqual(self.monitor.statistics, LoopStatistics())
+        self.assertEqual(len(self.reactor.dispatched), 1)
+
+    def test_installReplaces(self) -> None:
+        """
+        Installing a monitor uninstalls the one installed before it.
+        """
+        monitor = self.reactor.installLoopMonitor()
+        self.assertIs(self.reactor._loopMonitor, monitor)
+        self.reactor.ready = [Selectable()]
+        self.reactor.doIteration(0)
+        self.assertEqual(self.monitor.statistics.dispatches, 0)
+        self.assertEqual(monitor.statistics.dispatches, 1)
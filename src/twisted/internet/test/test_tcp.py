@@ -38,6 +38,7 @@ from twisted.internet.error import (
     NoProtocol,
     ConnectBindError,
     ConnectionClosed,
+    SendfileUnavailable,
 )
 from twisted.internet.test.connectionmixins import (
     LogObserverMixin,
@@ -79,7 +80,9 @@ from twisted.internet.interfaces import (
     IPushProducer,
     IPullProducer,
     IHalfCloseableProtocol,
+    ISendfileTransport,
 )
+from twisted.internet import main, tcp
 from twisted.internet.tcp import (
     _BuffersLogs,
     Connection,
@@ -189,6 +192,16 @@ class FakeSocket:
     def recv(self, size):
         return self.data
 
+    def recv_into(self, buffer, size):
+        """
+        Copy up to C{size} bytes of C{self.data} into C{buffer}.
+
+        @return: The number of bytes copied.
+        """
+        data = self.data[:size]
+        buffer[: len(data)] = data
+        return len(data)
+
     def send(self, bytes):
         """
         I{Send} all of C{bytes} by accumulating it into C{self.sendBuffer}.
@@ -401,6 +414,114 @@ class TCPConnectionTests(TestCase):
         conn = Connection(skt, protocol)
         self.assertFalse(conn.TLS)
 
+    def test_readIntoBuffer(self):
+        """
+        If L{Connection.readIntoBuffer} is set, L{Connection.doRead} reads into
+        a shared buffer and passes a copy of the bytes read to the protocol.
+        """
+        received = []
+        protocol = Protocol()
+        protocol.dataReceived = received.append
+        first = Connection(FakeSocket(b"first"), protocol)
+        first.readIntoBuffer = True
+        second = Connection(FakeSocket(b"2nd"), protocol)
+        second.readIntoBuffer = True
+        first.doRead()
+        second.doRead()
+        self.assertEqual(received, [b"first", b"2nd"])
+        self.assertIsInstance(received[0], bytes)
+
+    def test_readIntoBufferConnectionDone(self):
+        """
+        If L{Connection.readIntoBuffer} is set, L{Connection.doRead} returns
+        C{CONNECTION_DONE} when the socket reaches the end of the stream.
+        """
+        conn = Connection(FakeSocket(b""), Protocol())
+        conn.readIntoBuffer = True
+        self.assertIs(conn.doRead(), main.CONNECTION_DONE)
+
+    def test_readIntoBufferAdapts(self):
+        """
+        If L{Connection.readIntoBuffer} is set, the number of bytes
+        L{Connection.doRead} asks for doubles each time a read fills it, up to
+        C{bufferSize}, and halves each time a read uses less than a quarter of
+        it, down to C{_minimumReadSize}.
+        """
+        skt = FakeSocket(b"x" * (Connection.bufferSize * 2))
+        received = []
+        protocol = Protocol()
+        protocol.dataReceived = lambda data: received.append(len(data))
+        conn = Connection(skt, protocol)
+        conn.readIntoBuffer = True
+        for _ in range(6):
+            conn.doRead()
+        self.assertEqual(received, [4096, 8192, 16384, 32768, 65536, 65536])
+
+        skt.data = b"x" * 100
+        for _ in range(6):
+            conn.doRead()
+        self.assertEqual(conn._readSize, conn._minimumReadSize)
+
+    def test_shortReadNotReadable(self):
+        """
+        L{Connection.doRead} clears C{_readable} when it reads less than
+        C{bufferSize} bytes, and leaves it set when it reads that many, so
+        that an edge-triggered reactor reads again.
+        """
+        skt = FakeSocket(b"x" * Connection.bufferSize)
+        conn = Connection(skt, Protocol())
+        conn._readable = True
+        conn.doRead()
+        self.assertTrue(conn._readable)
+        skt.data = b"x"
+        conn.doRead()
+        self.assertFalse(conn._readable)
+
+    def test_shortReadIntoBufferNotReadable(self):
+        """
+        If L{Connection.readIntoBuffer} is set, L{Connection.doRead} clears
+        C{_readable} when it reads less than it asked for.
+        """
+        skt = FakeSocket(b"x" * Connection._minimumReadSize)
+        conn = Connection(skt, Protocol())
+        conn.readIntoBuffer = True
+        conn._readable = True
+        conn.doRead()
+        self.assertTrue(conn._readable)
+        skt.data = b"x"
+        conn.doRead()
+        self.assertFalse(conn._readable)
+
+    def test_shortWriteNotWritable(self):
+        """
+        L{Connection.writeSomeData} clears C{_writable} when the socket accepts
+        less than it was given.
+        """
+        skt = FakeSocket(b"")
+        conn = Connection(skt, Protocol())
+        conn._writable = True
+        self.assertEqual(conn.writeSomeData(b"data"), 4)
+        self.assertTrue(conn._writable)
+        skt.send = lambda data: 2
+        self.assertEqual(conn.writeSomeData(b"data"), 2)
+        self.assertFalse(conn._writable)
+
+    def test_blockedWriteNotWritable(self):
+        """
+        L{Connection.writeSomeData} clears C{_writable} when the write would
+        block.
+        """
+        skt = FakeSocket(b"")
+
+        def send(data):
+            raise OSError(errno.EWOULDBLOCK, "")
+
+        skt.send = send
+        conn = Connection(skt, Protocol())
+        conn._writable = True
+        self.assertEqual(conn.writeSomeData(b"data"), 0)
+        self.assertFalse(conn._writable)
+
     @skipIf(not useSSL, "No SSL support available")
     def test_tlsAfterStartTLS(self):
         """
@@ -415,6 +536,186 @@ class TCPConnectionTests(TestCase):
         self.assertTrue(conn.TLS)
 
 
+@skipIf(tcp._sendfile is None, "sendfile() is not available")
+class SendfileTests(SynchronousTestCase):
+    """
+    Tests for L{Connection.sendfile}.
+    """
+
+    def setUp(self):
+        self.reactor = _FakeFDSetReactor()
+        self.local, self.remote = socket.socketpair()
+        # Keep the send buffer small so that sending takes many writes.
+        self.local.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+        self.remote.setblocking(False)
+        self.addCleanup(self.remote.close)
+        self.connection = Connection(self.local, Protocol(), self.reactor)
+        self.connection.connected = True
+        self.addCleanup(self.connection.connectionLost, Failure(ConnectionDone()))
+
+        self.contents = os.urandom(256 * 1024)
+        path = self.mktemp()
+        with open(path, "wb") as f:
+            f.write(self.contents)
+        self.fileObject = open(path, "rb")
+        self.addCleanup(self.fileObject.close)
+
+    def flush(self):
+        """
+        Let the connection write until it stops, reading everything it sends.
+
+        @return: The bytes received from the connection.
+        """
+        received = []
+        while self.connection in self.reactor.getWriters():
+            self.assertIsNone(self.connection.doWrite())
+            while True:
+                try:
+                    data = self.remote.recv(1024 * 1024)
+                except BlockingIOError:
+                    break
+                received.append(data)
+        return b"".join(received)
+
+    def test_interface(self):
+        """
+        L{Connection} provides L{ISendfileTransport}.
+        """
+        self.assertTrue(verifyObject(ISendfileTransport, self.connection))
+
+    def test_ordering(self):
+        """
+        The part of the file sent by L{Connection.sendfile} is sent after
+        bytes written before it and before bytes written after it, and the
+        returned L{Deferred} fires with the number of bytes of the file sent.
+        """
+        self.connection.write(b"before")
+        self.connection.writeSequence([b"-", b"more"])
+        d = self.connection.sendfile(self.fileObject, 100, 200000)
+        self.connection.write(b"after")
+        self.assertNoResult(d)
+        received = self.flush()
+        self.assertEqual(self.successResultOf(d), 200000)
+        self.assertEqual(
+            received, b"before-more" + self.contents[100:200100] + b"after"
+        )
+        self.assertEqual(self.fileObject.tell(), 0)
+
+    def test_endOfFile(self):
+        """
+        If the end of the file is reached before C{count} bytes are sent, the
+        L{Deferred} returned by L{Connection.sendfile} fires with the number
+        of bytes which were sent.
+        """
+        d = self.connection.sendfile(self.fileObject, 1000, 10 ** 9)
+        received = self.flush()
+        self.assertEqual(self.successResultOf(d), len(self.contents) - 1000)
+        self.assertEqual(received, self.contents[1000:])
+
+    def test_fileClosed(self):
+        """
+        The file passed to L{Connection.sendfile} may be closed as soon as the
+        call returns.
+        """
+        d = self.connection.sendfile(self.fileObject, 0, len(self.contents))
+        self.fileObject.close()
+        self.assertEqual(self.flush(), self.contents)
+        self.assertEqual(self.successResultOf(d), len(self.contents))
+
+    def test_copying(self):
+        """
+        If C{sendfile()} does not support the file or socket, L{Connection}
+        copies the file instead.
+        """
+
+        def sendfile(*args):
+            raise OSError(errno.EINVAL, os.strerror(errno.EINVAL))
+
+        self.patch(tcp, "_sendfile", sendfile)
+        self.connection.write(b"before")
+        d = self.connection.sendfile(self.fileObject, 10, 100000)
+        self.connection.write(b"after")
+        received = self.flush()
+        self.assertEqual(self.successResultOf(d), 100000)
+        self.assertEqual(received, b"before" + self.contents[10:100010] + b"after")
+
+    def test_unavailable(self):
+        """
+        L{Connection.sendfile} raises L{SendfileUnavailable} if the connection
+        uses TLS, if the file has no descriptor, or if another file is being
+        sent, leaving any buffered bytes alone.
+        """
+        self.connection.write(b"buffered")
+        self.assertRaises(
+            SendfileUnavailable, self.connection.sendfile, io.BytesIO(b"x"), 0, 1
+        )
+
+        self.connection.TLS = True
+        self.assertRaises(
+            SendfileUnavailable, self.connection.sendfile, self.fileObject, 0, 1
+        )
+        self.connection.TLS = False
+
+        self.connection.sendfile(self.fileObject, 0, 1)
+        self.assertRaises(
+            SendfileUnavailable, self.connection.sendfile, self.fileObject, 0, 1
+        )
+        self.assertEqual(self.flush(), b"buffered" + self.contents[:1])
+
+    def test_producer(self):
+        """
+        A pull producer registered with the connection is not asked for more
+        data until the file has been sent.
+        """
+
+        @implementer(IPullProducer)
+        class Producer:
+            resumed = 0
+
+            def resumeProducing(self):
+                self.resumed += 1
+
+            def stopProducing(self):
+                pass
+
+        producer = Producer()
+        self.connection.registerProducer(producer, False)
+        producer.resumed = 0
+        self.connection.sendfile(self.fileObject, 0, len(self.contents))
+        self.connection.doWrite()
+        self.assertEqual(producer.resumed, 0)
+        self.flush()
+        self.assertEqual(producer.resumed, 1)
+
+    def test_nextTransfer(self):
+        """
+        A callback on the L{Deferred} returned by L{Connection.sendfile} can
+        start sending another file.
+        """
+        second = []
+        d = self.connection.sendfile(self.fileObject, 0, 10)
+        d.addCallback(
+            lambda ignored: second.append(
+                self.connection.sendfile(self.fileObject, 20, 10)
+            )
+        )
+        self.assertEqual(self.flush(), self.contents[:10] + self.contents[20:30])
+        self.assertEqual(self.successResultOf(second[0]), 10)
+
+    def test_connectionLost(self):
+        """
+        If the connection is lost while a file is being sent, the L{Deferred}
+        returned by L{Connection.sendfile} fails, and L{Connection.sendfile}
+        fails immediately afterwards.
+        """
+        d = self.connection.sendfile(self.fileObject, 0, len(self.contents))
+        self.connection.connectionLost(Failure(ConnectionLost()))
+        self.failureResultOf(d, ConnectionLost)
+        self.failureResultOf(
+            self.connection.sendfile(self.fileObject, 0, 1), ConnectionDone
+        )
+
+
 class TCPCreator(EndpointCreator):
     """
     Create IPv4 TCP endpoints for L{runProtocolsWithReactor}-based tests.
@@ -0,0 +1,340 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.internet._timerwheel} and its use by
+L{twisted.internet.base.ReactorBase}.
+"""
+
+import random
+from typing import List
+
+from twisted.internet._timerwheel import TimerWheel
+from twisted.internet.base import DelayedCall, ReactorBase
+from twisted.internet.error import AlreadyCancelled
+from twisted.trial.unittest import SynchronousTestCase
+
+
+def fakeCall(time: float) -> DelayedCall:
+    """
+    Make a L{DelayedCall} which is due at C{time}, for L{TimerWheel} to keep
+    track of.  It is never run, cancelled or reset.
+
+    @param time: The time at which the call is due.
+
+    @return: The call.
+    """
+
+    def noop(call: DelayedCall) -> None:
+        pass
+
+    return DelayedCall(time, lambda: None, (), {}, noop, noop)
+
+
+class TimerWheelTests(SynchronousTestCase):
+    """
+    Tests for L{TimerWheel}.
+    """
+
+    def test_invalidResolution(self) -> None:
+        """
+        L{TimerWheel} raises L{ValueError} if the resolution is not positive.
+        """
+        self.assertRaises(ValueError, TimerWheel, 0, 0)
+        self.assertRaises(ValueError, TimerWheel, 0, -1)
+
+    def test_addDue(self) -> None:
+        """
+        L{TimerWheel.add} refuses calls which are due in the current tick.
+        """
+        wheel = TimerWheel(10.0, 1.0)
+        self.assertFalse(wheel.add(fakeCall(9.0)))
+        self.assertFalse(wheel.add(fakeCall(10.5)))
+        self.assertEqual(len(wheel), 0)
+
+    def test_addBeyondSpan(self) -> None:
+        """
+        L{TimerWheel.add} refuses calls which are due after the span covered by
+        the highest level.
+        """
+        wheel = TimerWheel(0.0, 1.0, bits=2, levels=2)
+        self.assertTrue(wheel.add(fakeCall(15.0)))
+        self.assertFalse(wheel.add(fakeCall(16.0)))
+
+    def test_addRemove(self) -> None:
+        """
+        Calls added with L{TimerWheel.add} are tracked until they are removed
+        with L{TimerWheel.remove}.
+        """
+        wheel = TimerWheel(0.0, 1.0)
+        calls = [fakeCall(t) for t in (5.0, 500.0, 500000.0)]
+        for call in calls:
+            self.assertTrue(wheel.add(call))
+        self.assertEqual(len(wheel), 3)
+        self.assertEqual(set(wheel), set(calls))
+        self.assertIn(calls[1], wheel)
+
+        self.assertTrue(wheel.remove(calls[1]))
+        self.assertFalse(wheel.remove(calls[1]))
+        self.assertNotIn(calls[1], wheel)
+        self.assertEqual(set(wheel), {calls[0], calls[2]})
+
+    def test_advanceReleasesDueCalls(self) -> None:
+        """
+        L{TimerWheel.advance} releases the calls due no later than the tick it
+        advances to, and no others.
+        """
+        wheel = TimerWheel(0.0, 1.0, bits=2, levels=3)
+        calls = [fakeCall(t + 0.5) for t in range(1, 64)]
+        for call in calls:
+            self.assertTrue(wheel.add(call))
+
+        released = []
+        for now in range(1, 64):
+            batch = wheel.advance(now)
+            self.assertEqual(batch, [calls[now - 1]])
+            released.extend(batch)
+        self.assertEqual(released, calls)
+        self.assertEqual(len(wheel), 0)
+
+    def test_advanceSkips(self) -> None:
+        """
+        L{TimerWheel.advance} can move over many ticks at once, releasing every
+        call due in any of them.
+        """
+        wheel = TimerWheel(0.0, 0.01)
+        times = [random.uniform(0, 100000) for _ in range(1000)]
+        calls = [fakeCall(t) for t in times]
+        for call in calls:
+            wheel.add(call)
+
+        released = wheel.advance(50000)
+        self.assertEqual(
+            sorted(released, key=DelayedCall.getTime),
+            sorted(
+                [call for call in calls if call.time < 50000 and call.time >= 0.01],
+                key=DelayedCall.getTime,
+            ),
+        )
+        for call in wheel:
+            self.assertGreaterEqual(call.time, 50000)
+
+    def test_advanceBackwards(self) -> None:
+        """
+        L{TimerWheel.advance} does nothing if given a time earlier than one it
+        has already advanced to.
+        """
+        wheel = TimerWheel(10.0, 1.0)
+        call = fakeCall(20.5)
+        wheel.add(call)
+        self.assertEqual(wheel.advance(5.0), [])
+        self.assertEqual(list(wheel), [call])
+
+    def test_advanceRefilesLaterCalls(self) -> None:
+        """
+        If the time a call is due has moved later since it was added, the
+        wheel keeps tracking it when the tick it was originally filed under is
+        reached.
+        """
+        wheel = TimerWheel(0.0, 1.0)
+        call = fakeCall(5.5)
+        wheel.add(call)
+        call.time = 300.5
+        self.assertEqual(wheel.advance(100), [])
+        self.assertEqual(wheel.advance(300), [call])
+
+    def test_nextTime(self) -> None:
+        """
+        L{TimerWheel.nextTime} returns the start of a tick no later than the
+        tick in which the earliest call is due, or L{None} if there are no
+        calls.
+        """
+        wheel = TimerWheel(0.0, 1.0, bits=4, levels=3)
+        self.assertIsNone(wheel.nextTime())
+        late = fakeCall(1000.5)
+        wheel.add(late)
+        nextTime = wheel.nextTime()
+        self.assertLessEqual(nextTime, 1000)
+        self.assertGreater(nextTime, 0)
+
+        early = fakeCall(3.5)
+        wheel.add(early)
+        self.assertEqual(wheel.nextTime(), 3.0)
+        wheel.remove(early)
+        self.assertEqual(wheel.nextTime(), nextTime)
+
+    def test_nextTimeReachesAllCalls(self) -> None:
+        """
+        Repeatedly advancing L{TimerWheel} to the time given by
+        L{TimerWheel.nextTime} eventually releases every call, each no earlier
+        than the tick it is due in.
+        """
+        wheel = TimerWheel(0.0, 0.25, bits=3, levels=3)
+        calls = [fakeCall(random.uniform(0.25, 120)) for _ in range(200)]
+        for call in calls:
+            wheel.add(call)
+
+        released = []
+        while len(wheel):
+            now = wheel.nextTime()
+            assert now is not None
+            for call in wheel.advance(now):
+                self.assertLess(call.time - now, 0.25)
+                released.append(call)
+        self.assertEqual(set(released), set(calls))
+
+
+class JustEnoughReactor(ReactorBase):
+    """
+    A reactor which can be used to exercise the timed call support of
+    L{ReactorBase} with a fake notion of time.
+    """
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+        ReactorBase.__init__(self)
+
+    def installWaker(self) -> None:
+        pass
+
+    def seconds(self) -> float:  # type: ignore[override]
+        return self.now
+
+
+class ReactorTimerWheelTests(SynchronousTestCase):
+    """
+    Tests for L{ReactorBase.installTimerWheel}.
+    """
+
+    def setUp(self) -> None:
+        self.reactor = JustEnoughReactor()
+        self.reactor.installTimerWheel(0.5)
+
+    def advance(self, amount: float) -> None:
+        """
+        Move the reactor's time forward by C{amount} and run any due calls.
+        """
+        self.reactor.now += amount
+        self.reactor.runUntilCurrent()
+
+    def test_ordering(self) -> None:
+        """
+        Calls kept in the timer wheel run in the order of their scheduled
+        times, once those times have been reached.
+        """
+        calls: List[object] = []
+        delays = [random.uniform(0, 300) for _ in range(500)]
+        for delay in delays:
+            self.reactor.callLater(delay, calls.append, delay)
+        self.reactor.runUntilCurrent()
+
+        elapsed = 0.0
+        while elapsed < 301:
+            self.advance(0.1)
+            elapsed += 0.1
+            self.assertEqual(calls, sorted(d for d in delays if d <= elapsed))
+
+    def test_cancel(self) -> None:
+        """
+        A call in the timer wheel which is cancelled does not run and is no
+        longer reported by L{ReactorBase.getDelayedCalls}.
+        """
+        calls: List[object] = []
+        call = self.reactor.callLater(60, calls.append, None)
+        self.reactor.runUntilCurrent()
+        self.assertIn(call, self.reactor._timerWheel)
+
+        call.cancel()
+        self.assertRaises(AlreadyCancelled, call.cancel)
+        self.assertEqual(self.reactor.getDelayedCalls(), [])
+        self.assertEqual(self.reactor._cancellations, 0)
+        self.advance(61)
+        self.assertEqual(calls, [])
+
+    def test_resetLater(self) -> None:
+        """
+        A call in the timer wheel which is reset to a later time runs at that
+        later time.
+        """
+        calls: List[object] = []
+        call = self.reactor.callLater(10, calls.append, None)
+        self.reactor.runUntilCurrent()
+        for _ in range(20):
+            self.advance(5)
+            call.reset(10)
+        self.assertEqual(calls, [])
+        self.assertIn(call, self.reactor.getDelayedCalls())
+        self.advance(9.9)
+        self.assertEqual(calls, [])
+        self.advance(0.1)
+        self.assertEqual(calls, [None])
+
+    def test_resetSooner(self) -> None:
+        """
+        A call in the timer wheel which is reset to an earlier time runs at
+        that earlier time.
+        """
+        calls: List[object] = []
+        call = self.reactor.callLater(100, calls.append, None)
+        self.reactor.runUntilCurrent()
+        call.reset(2)
+        self.advance(1.9)
+        self.assertEqual(calls, [])
+        self.advance(0.1)
+        self.assertEqual(calls, [None])
+
+    def test_delay(self) -> None:
+        """
+        A call in the timer wheel which is delayed runs at its new time.
+        """
+        calls: List[object] = []
+        call = self.reactor.callLater(10, calls.append, None)
+        self.reactor.runUntilCurrent()
+        call.delay(-5)
+        self.advance(5)
+        self.assertEqual(calls, [None])
+
+    def test_timeout(self) -> None:
+        """
+        L{ReactorBase.timeout} never asks the reactor to sleep past the time at
+        which a call in the timer wheel is due.
+        """
+        self.reactor.callLater(1000.25, lambda: None)
+        self.reactor.runUntilCurrent()
+        timeout = self.reactor.timeout()
+        self.assertGreater(timeout, 0)
+        self.assertLessEqual(timeout, 1000.25)
+
+        self.reactor.callLater(30.25, lambda: None)
+        self.assertLessEqual(self.reactor.timeout(), 30.25)
+
+    def test_sleepUntilTimeout(self) -> None:
+        """
+        Sleeping for the timeout reported by L{ReactorBase.timeout} and then
+        running due calls eventually runs a call kept in the timer wheel, at
+        the time it was scheduled for.
+        """
+        calls: List[object] = []
+        self.reactor.callLater(4321.3, lambda: calls.append(self.reactor.seconds()))
+        iterations = 0
+        while not calls:
+            iterations += 1
+            timeout = self.reactor.timeout()
+            assert timeout is not None
+            self.reactor.now += timeout
+            self.reactor.runUntilCurrent()
+        self.assertEqual(len(calls), 1)
+        self.assertAlmostEqual(calls[0], 1000.0 + 4321.3)
+        self.assertLess(iterations, 10)
+
+    def test_reinstall(self) -> None:
+        """
+        Installing a new timer wheel keeps the calls from the previous one.
+        """
+        calls: List[object] = []
+        self.reactor.callLater(100, calls.append, None)
+        self.reactor.runUntilCurrent()
+        self.reactor.installTimerWheel(1.0)
+        self.assertEqual(len(self.reactor.getDelayedCalls()), 1)
+        self.advance(100)
+        self.assertEqual(calls, [None])
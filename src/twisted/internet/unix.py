@@ -70,6 +70,10 @@ class _SendmsgMixin:
     _writeSomeDataBase = None  # type: Optional[Type[FileDescriptor]]
     _fileDescriptorBufferSize = 64
 
+    # recvmsg and sendmsg do not keep track of whether the socket is ready for
+    # reactors which watch it edge-triggered.
+    _edgeTriggerable = False
+
     def __init__(self):
         self._sendmsgQueue = []
 
@@ -152,6 +156,16 @@ class _SendmsgMixin:
         except TypeError:
             return result
 
+    def _writeSomeDataVector(self, vector):
+        """
+        Send as much of the data in C{vector} as possible.  If there are file
+        descriptors waiting to be sent, fall back to L{writeSomeData} so they
+        are sent along with the data.
+        """
+        if self._sendmsgQueue:
+            return self.writeSomeData(b"".join(vector))
+        return self._writeSomeDataBase._writeSomeDataVector(self, vector)
+
     def doRead(self):
         """
         Calls {IProtocol.dataReceived} with all available data and
@@ -63,6 +63,8 @@ __all__ = [
     "LimitedHistoryLogObserver",
     # From ._file
     "FileLogObserver",
+    "QueuedFileLogObserver",
+    "QueueOverflow",
     "textFileLogObserver",
     # From ._filter
     "PredicateResult",
@@ -84,6 +86,8 @@ __all__ = [
     "eventFromJSON",
     "jsonFileLogObserver",
     "eventsFromJSONLogFile",
+    "JSONLogReader",
+    "JSONLogIndex",
     # From ._capture
     "capturedLogs",
 ]
@@ -108,7 +112,12 @@ from ._observer import LogPublisher
 
 from ._buffer import LimitedHistoryLogObserver
 
-from ._file import FileLogObserver, textFileLogObserver
+from ._file import (
+    FileLogObserver,
+    QueuedFileLogObserver,
+    QueueOverflow,
+    textFileLogObserver,
+)
 
 from ._filter import (
     PredicateResult,
@@ -130,6 +139,8 @@ from ._json import (
     eventFromJSON,
     jsonFileLogObserver,
     eventsFromJSONLogFile,
+    JSONLogReader,
+    JSONLogIndex,
 )
 
 from ._capture import capturedLogs
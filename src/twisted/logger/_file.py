@@ -6,16 +6,22 @@
 File log observer.
 """
 
-from typing import Any, Callable, IO, Optional
+import threading
+from collections import deque
+from time import monotonic
+from typing import Any, Callable, Deque, IO, List, Optional
 
+from constantly import NamedConstant, Names
 from zope.interface import implementer
 
+from twisted.internet.interfaces import IReactorCore
 from twisted.python.compat import ioType
 
 from ._format import formatTime
 from ._format import timeFormatRFC3339
 from ._format import formatEventAsClassicLogText
 from ._interfaces import ILogObserver, LogEvent
+from ._levels import LogLevel
 
 
 @implementer(ILogObserver)
@@ -56,6 +62,231 @@ class FileLogObserver:
             self._outFile.flush()
 
 
+class QueueOverflow(Names):
+    """
+    What a L{QueuedFileLogObserver} does with an event when its queue is full.
+
+    @cvar block: Wait until the writer thread has made room for the event.
+
+    @cvar dropOldest: Discard the oldest queued event to make room for the
+        new one.
+
+    @cvar dropBelowLevel: Discard the event if its level is below the
+        observer's C{overflowLevel}, or it has none, and otherwise wait as for
+        C{block}.
+    """
+
+    block = NamedConstant()
+    dropOldest = NamedConstant()
+    dropBelowLevel = NamedConstant()
+
+
+@implementer(ILogObserver)
+class QueuedFileLogObserver(FileLogObserver):
+    """
+    Log observer that writes to a file-like object from a thread of its own.
+
+    Observing an event only queues it, so the thread which logs it does not
+    wait for the file unless the queue is full and the overflow policy is to
+    block.  The writer thread formats the queued events and writes their
+    text in batches, flushing the file once C{bufferSize} characters have
+    built up, or C{flushInterval} seconds after the first of them was
+    queued.
+
+    Events are formatted in the writer thread some time after they are
+    observed, so the objects they refer to should not be changed once they
+    have been logged.
+
+    Call L{stop} to write the queued events and stop the writer thread, or
+    pass a reactor to have it called once the reactor has shut down.
+
+    @ivar maxQueued: The number of events which may be queued before the
+        overflow policy applies.
+    @type maxQueued: L{int}
+
+    @ivar overflow: What to do with an event observed while the queue is
+        full; a L{QueueOverflow} constant.
+
+    @ivar overflowLevel: The lowest level of event kept while the queue is
+        full, if C{overflow} is L{QueueOverflow.dropBelowLevel}.
+
+    @ivar bufferSize: The number of characters of formatted text to write
+        before flushing the file.
+    @type bufferSize: L{int}
+
+    @ivar flushInterval: The longest time, in seconds, for which text is
+        held before the file is flushed.
+    @type flushInterval: L{float}
+
+    @ivar dropped: The number of events discarded because the queue was full.
+    @type dropped: L{int}
+
+    @ivar lost: The number of events discarded because they could not be
+        formatted or written.
+    @type lost: L{int}
+    """
+
+    def __init__(
+        self,
+        outFile: IO[Any],
+        formatEvent: Callable[[LogEvent], Optional[str]],
+        maxQueued: int = 10000,
+        overflow: NamedConstant = QueueOverflow.block,
+        overflowLevel: NamedConstant = LogLevel.warn,
+        bufferSize: int = 64 * 1024,
+        flushInterval: float = 1.0,
+        reactor: Optional[IReactorCore] = None,
+    ) -> None:
+        """
+        @param outFile: A file-like object.  Ideally one should be passed which
+            accepts text data.  Otherwise, UTF-8 L{bytes} will be used.
+        @param formatEvent: A callable that formats an event.  It is called
+            in the writer thread.
+        @param maxQueued: See L{QueuedFileLogObserver.maxQueued}.
+        @param overflow: See L{QueuedFileLogObserver.overflow}.
+        @param overflowLevel: See L{QueuedFileLogObserver.overflowLevel}.
+        @param bufferSize: See L{QueuedFileLogObserver.bufferSize}.
+        @param flushInterval: See L{QueuedFileLogObserver.flushInterval}.
+        @param reactor: If not L{None}, a reactor after whose shutdown
+            L{stop} is called.
+        """
+        super().__init__(outFile, formatEvent)
+        self.maxQueued = maxQueued
+        self.overflow = overflow
+        self.overflowLevel = overflowLevel
+        self.bufferSize = bufferSize
+        self.flushInterval = flushInterval
+        self.dropped = 0
+        self.lost = 0
+        self._queue = deque()  # type: Deque[LogEvent]
+        self._condition = threading.Condition()
+        self._stopping = False
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._writeEvents, name="QueuedFileLogObserver"
+        )
+        self._thread.daemon = True
+        self._thread.start()
+        if reactor is not None:
+            reactor.addSystemEventTrigger("after", "shutdown", self.stop)
+
+    def __call__(self, event: LogEvent) -> None:
+        """
+        Queue an event to be written, applying the overflow policy if the
+        queue is full.  Once the observer has been stopped, the event is
+        written at once.
+
+        @param event: An event.
+        """
+        with self._condition:
+            if self._stopped:
+                super().__call__(event)
+                return
+            queue = self._queue
+            if len(queue) >= self.maxQueued and not self._stopping:
+                overflow = self.overflow
+                if overflow is QueueOverflow.dropOldest:
+                    queue.popleft()
+                    self.dropped += 1
+                elif (
+                    overflow is QueueOverflow.dropBelowLevel
+                    and not self._atOverflowLevel(event)
+                ) or threading.current_thread() is self._thread:
+                    # The writer thread must not wait for itself, which it
+                    # would if writing an event caused another to be logged.
+                    self.dropped += 1
+                    return
+                else:
+                    while len(queue) >= self.maxQueued and not self._stopping:
+                        self._condition.wait()
+            queue.append(dict(event))
+            self._condition.notify_all()
+
+    def _atOverflowLevel(self, event: LogEvent) -> bool:
+        """
+        Whether an event is important enough to keep while the queue is full.
+        """
+        level = event.get("log_level", None)
+        return level is not None and level >= self.overflowLevel
+
+    def _writeEvents(self) -> None:
+        """
+        Write the queued events until stopped, in the writer thread.
+        """
+        buffered = []  # type: List[str]
+        size = 0
+        deadline = None  # type: Optional[float]
+        while True:
+            with self._condition:
+                while not self._queue and not self._stopping:
+                    if deadline is None:
+                        self._condition.wait()
+                        continue
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                events = list(self._queue)
+                self._queue.clear()
+                stopping = self._stopping
+                self._condition.notify_all()
+
+            for event in events:
+                try:
+                    text = self.formatEvent(event)
+                except Exception:
+                    self.lost += 1
+                    continue
+                if text:
+                    if deadline is None:
+                        deadline = monotonic() + self.flushInterval
+                    buffered.append(text)
+                    size += len(text)
+
+            if buffered and (
+                stopping
+                or size >= self.bufferSize
+                or monotonic() >= deadline  # type: ignore[operator]
+            ):
+                self._write(buffered)
+                buffered, size, deadline = [], 0, None
+
+            if stopping and not events:
+                return
+
+    def _write(self, texts: List[str]) -> None:
+        """
+        Write and flush some formatted events.
+        """
+        text = "".join(texts)
+        try:
+            if self._encoding is None:
+                self._outFile.write(text)
+            else:
+                self._outFile.write(text.encode(self._encoding))
+            self._outFile.flush()
+        except Exception:
+            self.lost += len(texts)
+
+    def stop(self) -> None:
+        """
+        Write the events queued so far and stop the writer thread.  Events
+        observed from now on are written as soon as they are observed.
+        """
+        with self._condition:
+            if self._stopped:
+                return
+            self._stopping = True
+            self._condition.notify_all()
+        self._thread.join()
+        with self._condition:
+            self._stopped = True
+            events = list(self._queue)
+            self._queue.clear()
+        for event in events:
+            super().__call__(event)
+
+
 def textFileLogObserver(
     outFile: IO[Any], timeFormat: Optional[str] = timeFormatRFC3339
 ) -> FileLogObserver:
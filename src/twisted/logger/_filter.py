@@ -7,14 +7,20 @@ Filtering log observer.
 """
 
 from functools import partial
-from typing import Dict, Iterable
+from typing import Dict, Iterable, cast
 
 from zope.interface import Interface, implementer
 
 from constantly import NamedConstant, Names
 
 from ._interfaces import ILogObserver, LogEvent
-from ._levels import InvalidLogLevelError, LogLevel
+from ._levels import (
+    InvalidLogLevelError,
+    LogLevel,
+    _levelPriorities,
+    _minimumLevelFor,
+    _minimumLevelsChanged,
+)
 from ._observer import bitbucketLogObserver
 
 
@@ -110,7 +116,8 @@ class FilteringLogObserver:
             forward events when C{predictates} yield a negative result.
         """
         self._observer = observer
-        self._shouldLogEvent = partial(shouldLogEvent, list(predicates))
+        self._predicates = list(predicates)
+        self._shouldLogEvent = partial(shouldLogEvent, self._predicates)
         self._negativeObserver = negativeObserver
 
     def __call__(self, event: LogEvent) -> None:
@@ -124,6 +131,35 @@ class FilteringLogObserver:
         else:
             self._negativeObserver(event)
 
+    def _minimumLevel(self, namespace: str) -> NamedConstant:
+        """
+        Get the lowest level of event from C{namespace} that may get past the
+        L{LogLevelFilterPredicate}s this observer starts with and be wanted by
+        the observer it forwards events to.
+
+        Events which are filtered out are given to the negative observer, so
+        if there is one, events of every level are wanted.
+
+        @param namespace: A logging namespace.
+
+        @return: A L{LogLevel}.
+        """
+        if self._negativeObserver is not bitbucketLogObserver:
+            return LogLevel.debug
+        minimumLevel = _minimumLevelFor(self._observer, namespace)
+        for predicate in self._predicates:
+            # Any other predicate might let events through whatever their
+            # level.
+            if type(predicate) is not LogLevelFilterPredicate:
+                break
+            levelPredicate = cast(LogLevelFilterPredicate, predicate)
+            minimumLevel = max(
+                minimumLevel,
+                levelPredicate.logLevelForNamespace(namespace),
+                key=_levelPriorities.__getitem__,
+            )
+        return minimumLevel
+
 
 @implementer(ILogFilterPredicate)
 class LogLevelFilterPredicate:
@@ -187,6 +223,7 @@ class LogLevelFilterPredicate:
             self._logLevelsByNamespace[namespace] = level
         else:
             self._logLevelsByNamespace[""] = level
+        _minimumLevelsChanged()
 
     def clearLogLevels(self) -> None:
         """
@@ -194,6 +231,7 @@ class LogLevelFilterPredicate:
         """
         self._logLevelsByNamespace.clear()
         self._logLevelsByNamespace[""] = self.defaultLogLevel
+        _minimumLevelsChanged()
 
     def __call__(self, event: LogEvent) -> NamedConstant:
         eventLevel = event.get("log_level", None)
@@ -9,8 +9,9 @@ examination.
 """
 
 from collections import defaultdict
+from functools import lru_cache
 from string import Formatter
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from ._interfaces import LogEvent
 
@@ -62,27 +63,26 @@ class KeyFlattener:
         return result
 
 
-def flattenEvent(event: LogEvent) -> None:
+@lru_cache(maxsize=1024)
+def _flattenedFields(
+    logFormat: str,
+) -> List[Tuple[str, str, str, bool, Callable[[object], str]]]:
     """
-    Flatten the given event by pre-associating format fields with specific
-    objects and callable results in a L{dict} put into the C{"log_flattened"}
-    key in the event.
+    Parse a format string into the fields which L{flattenEvent} records.
 
-    @param event: A logging event.
-    """
-    if event.get("log_format", None) is None:
-        return
+    Log format strings are nearly always literals, so this is cached rather
+    than done again for every event.
 
-    if "log_flattened" in event:
-        fields = event["log_flattened"]
-    else:
-        fields = {}
+    @param logFormat: A PEP-3101-style format string.
 
+    @return: For each field in C{logFormat}: its name (without any trailing
+        C{"()"}), its flattened and structured keys, whether it is called,
+        and the function converting its value to text.
+    """
     keyFlattener = KeyFlattener()
+    result = []
 
-    for (literalText, fieldName, formatSpec, conversion) in aFormatter.parse(
-        event["log_format"]
-    ):
+    for (literalText, fieldName, formatSpec, conversion) in aFormatter.parse(logFormat):
         if fieldName is None:
             continue
 
@@ -92,24 +92,54 @@ def flattenEvent(event: LogEvent) -> None:
         flattenedKey = keyFlattener.flatKey(fieldName, formatSpec, conversion)
         structuredKey = keyFlattener.flatKey(fieldName, formatSpec, "")
 
-        if flattenedKey in fields:
-            # We've already seen and handled this key
-            continue
-
         if fieldName.endswith("()"):
             fieldName = fieldName[:-2]
             callit = True
         else:
             callit = False
 
-        field = aFormatter.get_field(fieldName, (), event)
-        fieldValue = field[0]
-
         if conversion == "r":
-            conversionFunction = repr
+            conversionFunction = repr  # type: Callable[[object], str]
         else:  # Above: if conversion is not "r", it's "s"
             conversionFunction = str
 
+        result.append(
+            (fieldName, flattenedKey, structuredKey, callit, conversionFunction)
+        )
+
+    return result
+
+
+def flattenEvent(event: LogEvent) -> None:
+    """
+    Flatten the given event by pre-associating format fields with specific
+    objects and callable results in a L{dict} put into the C{"log_flattened"}
+    key in the event.
+
+    @param event: A logging event.
+    """
+    if event.get("log_format", None) is None:
+        return
+
+    if "log_flattened" in event:
+        fields = event["log_flattened"]
+    else:
+        fields = {}
+
+    for (
+        fieldName,
+        flattenedKey,
+        structuredKey,
+        callit,
+        conversionFunction,
+    ) in _flattenedFields(event["log_format"]):
+        if flattenedKey in fields:
+            # We've already seen and handled this key
+            continue
+
+        field = aFormatter.get_field(fieldName, (), event)
+        fieldValue = field[0]
+
         if callit:
             fieldValue = fieldValue()
 
@@ -6,10 +6,27 @@
 Tools for saving and loading log events in a structured format.
 """
 
+import os
+from bisect import bisect_left
+from math import inf
+from mmap import ACCESS_READ, mmap
+
 from constantly import NamedConstant
-from json import dumps, loads
+from json import JSONEncoder, loads
 from uuid import UUID
-from typing import Any, AnyStr, Dict, IO, Iterable, Optional, Union, cast
+from typing import (
+    Any,
+    AnyStr,
+    Dict,
+    IO,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
 
 from ._file import FileLogObserver
 from ._flatten import flattenEvent
@@ -19,6 +36,11 @@ from ._logger import Logger
 
 from twisted.python.failure import Failure
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 log = Logger()
 
 
@@ -80,6 +102,9 @@ classInfo = [
 
 uuidToLoader = {uuid: loader for (predicate, uuid, saver, loader) in classInfo}
 
+# The same, keyed by the text objectSaveHook saves, which saves parsing it.
+_textToLoader = {str(uuid): loader for (predicate, uuid, saver, loader) in classInfo}
+
 
 def objectLoadHook(aDict: JSONDict) -> object:
     """
@@ -93,7 +118,11 @@ def objectLoadHook(aDict: JSONDict) -> object:
     @return: C{aDict} itself, or the object represented by C{aDict}
     """
     if "__class_uuid__" in aDict:
-        return uuidToLoader[UUID(aDict["__class_uuid__"])](aDict)
+        uuidText = aDict["__class_uuid__"]
+        loader = _textToLoader.get(uuidText)
+        if loader is None:
+            loader = uuidToLoader[UUID(uuidText)]
+        return loader(aDict)
     return aDict
 
 
@@ -118,6 +147,71 @@ def objectSaveHook(pythonObject: object) -> JSONDict:
     return {"unpersistable": True}
 
 
+def _default(unencodable: object) -> Union[JSONDict, str]:
+    """
+    Serialize an object not otherwise serializable by L{JSONEncoder}.
+
+    @param unencodable: An unencodable object.
+
+    @return: C{unencodable}, serialized
+    """
+    if isinstance(unencodable, bytes):
+        return unencodable.decode("charmap")
+    try:
+        return _levelsAsJSON[unencodable]
+    except (KeyError, TypeError):
+        return objectSaveHook(unencodable)
+
+
+# Every event has a level, so their serialized forms are worked out once.
+_levelsAsJSON = {
+    level: objectSaveHook(level) for level in LogLevel.iterconstants()
+}  # type: Dict[object, JSONDict]
+
+_encoder = JSONEncoder(default=_default, skipkeys=True)
+
+
+class _WideNumber(Exception):
+    """
+    A number was loaded by C{orjson} which L{json} may have loaded
+    differently.
+    """
+
+
+# orjson loads integers too wide for 64 bits as floats.
+_wideNumber = float(2 ** 63)
+
+
+def _loadObjects(value: Any) -> Any:
+    """
+    Apply L{objectLoadHook} to every dictionary within a value loaded by
+    C{orjson}, innermost first, as L{loads} would with C{object_hook}.
+
+    @param value: A value loaded from JSON.
+
+    @return: C{value}, with its objects loaded.
+
+    @raise _WideNumber: If C{value} contains a float which might have been
+        an integer.
+    """
+    if type(value) is dict:
+        items = value.items()  # type: Iterable[Tuple[Any, Any]]
+    elif type(value) is list:
+        items = enumerate(value)
+    elif type(value) is float and abs(value) >= _wideNumber:
+        raise _WideNumber()
+    else:
+        return value
+    for key, item in items:
+        if type(item) is dict or type(item) is list:
+            value[key] = _loadObjects(item)
+        elif type(item) is float and abs(item) >= _wideNumber:
+            raise _WideNumber()
+    if type(value) is dict and "__class_uuid__" in value:
+        return objectLoadHook(value)
+    return value
+
+
 def eventAsJSON(event: LogEvent) -> str:
     """
     Encode an event as JSON, flattening it if necessary to preserve as much
@@ -132,31 +226,26 @@ def eventAsJSON(event: LogEvent) -> str:
         newline characters, and may thus safely be stored in a line-delimited
         file.
     """
-
-    def default(unencodable: object) -> Union[JSONDict, str]:
-        """
-        Serialize an object not otherwise serializable by L{dumps}.
-
-        @param unencodable: An unencodable object.
-
-        @return: C{unencodable}, serialized
-        """
-        if isinstance(unencodable, bytes):
-            return unencodable.decode("charmap")
-        return objectSaveHook(unencodable)
-
     flattenEvent(event)
-    return dumps(event, default=default, skipkeys=True)
+    return _encoder.encode(event)
 
 
 def eventFromJSON(eventText: str) -> JSONDict:
     """
     Decode a log event from JSON.
 
+    If C{orjson} is installed, it is used to parse C{eventText}, unless it
+    is text that C{orjson} would load differently from L{json}.
+
     @param eventText: The output of a previous call to L{eventAsJSON}
 
     @return: A reconstructed version of the log event.
     """
+    if orjson is not None:
+        try:
+            return cast(JSONDict, _loadObjects(orjson.loads(eventText)))
+        except (ValueError, _WideNumber):
+            pass
     return cast(JSONDict, loads(eventText, object_hook=objectLoadHook))
 
 
@@ -187,6 +276,48 @@ def jsonFileLogObserver(
     )
 
 
+def _eventFromRecord(record: bytes) -> Optional[LogEvent]:
+    """
+    Decode a record read from a file written by L{jsonFileLogObserver},
+    logging an error if it is not a valid event.
+
+    @param record: A record, without its record separator.
+
+    @return: The event in C{record}, or L{None} if it could not be read.
+    """
+    try:
+        text = record.decode("utf-8")
+    except UnicodeDecodeError:
+        log.error(
+            "Unable to decode UTF-8 for JSON record: {record!r}",
+            record=record,
+        )
+        return None
+
+    try:
+        return eventFromJSON(text)
+    except ValueError:
+        log.error("Unable to read JSON record: {record!r}", record=record)
+        return None
+
+
+def _eventFromSeparatedRecord(record: bytes) -> Optional[LogEvent]:
+    """
+    Decode a record which was followed by a record separator other than a
+    newline, checking that it is not truncated.
+
+    @see: L{_eventFromRecord}
+    """
+    if record[-1] == ord("\n"):
+        return _eventFromRecord(record)
+    else:
+        log.error(
+            "Unable to read truncated JSON record: {record!r}",
+            record=record,
+        )
+    return None
+
+
 def eventsFromJSONLogFile(
     inFile: IO[Any],
     recordSeparator: Optional[str] = None,
@@ -213,22 +344,6 @@ def eventsFromJSONLogFile(
         else:
             return s.encode("utf-8")
 
-    def eventFromBytearray(record: bytearray) -> Optional[LogEvent]:
-        try:
-            text = bytes(record).decode("utf-8")
-        except UnicodeDecodeError:
-            log.error(
-                "Unable to decode UTF-8 for JSON record: {record!r}",
-                record=bytes(record),
-            )
-            return None
-
-        try:
-            return eventFromJSON(text)
-        except ValueError:
-            log.error("Unable to read JSON record: {record!r}", record=bytes(record))
-            return None
-
     if recordSeparator is None:
         first = asBytes(inFile.read(1))
 
@@ -246,20 +361,9 @@ def eventsFromJSONLogFile(
 
     if recordSeparatorBytes == b"":
         recordSeparatorBytes = b"\n"  # Split on newlines below
-
-        eventFromRecord = eventFromBytearray
-
+        eventFromRecord = _eventFromRecord
     else:
-
-        def eventFromRecord(record: bytearray) -> Optional[LogEvent]:
-            if record[-1] == ord("\n"):
-                return eventFromBytearray(record)
-            else:
-                log.error(
-                    "Unable to read truncated JSON record: {record!r}",
-                    record=bytes(record),
-                )
-            return None
+        eventFromRecord = _eventFromSeparatedRecord
 
     buffer = bytearray(first)
 
@@ -268,7 +372,7 @@ def eventsFromJSONLogFile(
 
         if not newData:
             if len(buffer) > 0:
-                event = eventFromRecord(buffer)
+                event = eventFromRecord(bytes(buffer))
                 if event is not None:
                     yield event
             break
@@ -278,8 +382,291 @@ def eventsFromJSONLogFile(
 
         for record in records[:-1]:
             if len(record) > 0:
-                event = eventFromRecord(record)
+                event = eventFromRecord(bytes(record))
                 if event is not None:
                     yield event
 
         buffer = records[-1]
+
+
+class JSONLogReader:
+    """
+    A reader of events from a file previously saved with
+    L{jsonFileLogObserver}, which maps the file into memory and decodes only
+    the records it is asked for.
+
+    Each event is read along with the offset of its record in the file,
+    which may be given to L{JSONLogReader.events} later to read from that
+    record onwards without reading the records before it.  If the file
+    grows, later calls to L{JSONLogReader.events} read what was added.
+
+    As with L{eventsFromJSONLogFile}, records that are truncated or otherwise
+    unreadable are ignored.
+
+    @ivar path: The path of the file being read.
+    """
+
+    def __init__(self, path: str, recordSeparator: Optional[str] = None) -> None:
+        """
+        @param path: The path of the file to read.
+        @param recordSeparator: The expected record separator.
+            If L{None}, attempt to automatically detect the record separator
+            from one of C{"\\x1e"} or C{""}.
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        self._data = b""  # type: Union[bytes, mmap]
+        if recordSeparator is None:
+            self._separator = None  # type: Optional[bytes]
+        else:
+            self._separator = recordSeparator.encode("utf-8")
+
+    def close(self) -> None:
+        """
+        Close the file.  Reading events from it afterwards is an error.
+        """
+        self._file.close()
+        if isinstance(self._data, mmap):
+            self._data.close()
+        self._data = b""
+
+    def __enter__(self) -> "JSONLogReader":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def _mapped(self) -> Union[bytes, mmap]:
+        """
+        Map the file into memory, again if its size has changed since it was
+        last mapped.
+
+        A previous mapping is left to be unmapped when nothing refers to it,
+        so that any L{JSONLogReader.events} iterator still reading it is not
+        disturbed.
+
+        @return: The contents of the file.
+        """
+        size = os.fstat(self._file.fileno()).st_size
+        if size != len(self._data):
+            if size == 0:
+                self._data = b""
+            else:
+                self._data = mmap(self._file.fileno(), 0, access=ACCESS_READ)
+        return self._data
+
+    def _records(self, offset: int = 0) -> Iterator[Tuple[int, bytes]]:
+        """
+        Split the file into records.
+
+        @param offset: The offset of the first record to read.
+
+        @return: The offset of each non-empty record, and the record without
+            its record separator.
+        """
+        data = self._mapped()
+        end = len(data)
+        separator = self._separator
+        if separator is None:
+            # Like eventsFromJSONLogFile, look at the start of the file.
+            separator = b"\x1e" if data[:1] == b"\x1e" else b""
+            if data:
+                self._separator = separator
+
+        if separator == b"":
+            while offset < end:
+                nextOffset = data.find(b"\n", offset)
+                if nextOffset == -1:
+                    nextOffset = end
+                if nextOffset > offset:
+                    yield offset, data[offset:nextOffset]
+                offset = nextOffset + 1
+        else:
+            width = len(separator)
+            while offset < end:
+                start = offset
+                if data[start : start + width] == separator:
+                    start += width
+                nextOffset = data.find(separator, start)
+                if nextOffset == -1:
+                    nextOffset = end
+                if nextOffset > start:
+                    yield offset, data[start:nextOffset]
+                offset = nextOffset
+
+    def _decode(self, record: bytes) -> Optional[LogEvent]:
+        """
+        Decode a record returned by L{JSONLogReader._records}.
+
+        @param record: A record.
+
+        @return: The event in C{record}, or L{None} if it could not be read.
+        """
+        if self._separator:
+            return _eventFromSeparatedRecord(record)
+        return _eventFromRecord(record)
+
+    def events(self, offset: int = 0) -> Iterator[Tuple[int, LogEvent]]:
+        """
+        Read events from the file, as they are iterated over.
+
+        @param offset: The offset of the first record to read: either C{0},
+            or an offset previously returned by this method.
+
+        @return: Each event from C{offset} onwards, with the offset of its
+            record.
+        """
+        for recordOffset, record in self._records(offset):
+            event = self._decode(record)
+            if event is not None:
+                yield recordOffset, event
+
+
+class _IndexedLog:
+    """
+    A sparse index of the times of the events in one log file, as used by
+    L{JSONLogIndex}.
+
+    @ivar reader: The reader of the file.
+    @ivar size: The size of the file when it was indexed.
+    @ivar times: The times of every few events, in the order they were read.
+    @ivar offsets: The offsets of the events in C{times}.
+    @ivar first: The time of the first event with one, or L{None} if there
+        is none.
+    @ivar last: The time of the last event, or infinity if it could not be
+        read.
+    """
+
+    def __init__(self, reader: JSONLogReader) -> None:
+        self.reader = reader
+        self.size = -1
+        self.times = []  # type: List[float]
+        self.offsets = []  # type: List[int]
+        self.first = None  # type: Optional[float]
+        self.last = inf
+
+    def update(self, interval: int) -> None:
+        """
+        Index the file, if it has changed size since it was last indexed.
+
+        @param interval: The number of records between the events indexed.
+        """
+        size = os.fstat(self.reader._file.fileno()).st_size
+        if size == self.size:
+            return
+        self.size = size
+        self.times = []
+        self.offsets = []
+        lastRecord = None
+        sinceIndexed = interval
+        for offset, record in self.reader._records():
+            lastRecord = record
+            sinceIndexed += 1
+            if sinceIndexed < interval:
+                continue
+            time = _eventTime(self.reader._decode(record))
+            if time is not None:
+                self.times.append(time)
+                self.offsets.append(offset)
+                sinceIndexed = 0
+        self.first = self.times[0] if self.times else None
+        self.last = inf
+        if lastRecord is not None:
+            time = _eventTime(self.reader._decode(lastRecord))
+            if time is not None:
+                self.last = time
+
+
+def _eventTime(event: Optional[LogEvent]) -> Optional[float]:
+    """
+    @param event: An event, or L{None}.
+
+    @return: The C{"log_time"} of C{event}, if it has one which is a number.
+    """
+    if event is None:
+        return None
+    time = event.get("log_time")
+    if isinstance(time, (int, float)) and not isinstance(time, bool):
+        return time
+    return None
+
+
+class JSONLogIndex:
+    """
+    A reader of the events in a time range from several files previously
+    saved with L{jsonFileLogObserver}, such as a log file and its rotated
+    predecessors.
+
+    Each file is read with a L{JSONLogReader}, and the times of every few of
+    its events are indexed, so that a query reads only the files, and the
+    parts of them, which might have events in the range.  A file is indexed
+    again if its size changes.
+
+    The events in each file are expected to be in the order of their
+    C{"log_time"}, as they are when written by a L{jsonFileLogObserver};
+    events without a C{"log_time"} are never returned.
+    """
+
+    def __init__(
+        self,
+        paths: Iterable[str],
+        recordSeparator: Optional[str] = None,
+        interval: int = 256,
+    ) -> None:
+        """
+        @param paths: The paths of the files to read.
+        @param recordSeparator: The expected record separator, as for
+            L{JSONLogReader}.
+        @param interval: The number of records between the events indexed.
+            Smaller intervals make for bigger indexes, and make queries read
+            fewer events which are not in their range.
+        """
+        self._logs = [
+            _IndexedLog(JSONLogReader(path, recordSeparator)) for path in paths
+        ]
+        self._interval = interval
+
+    def close(self) -> None:
+        """
+        Close all the files.
+        """
+        for indexed in self._logs:
+            indexed.reader.close()
+
+    def __enter__(self) -> "JSONLogIndex":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def eventsBetween(self, start: float, end: float) -> Iterator[LogEvent]:
+        """
+        Read the events logged in a range of times.
+
+        @param start: The earliest C{"log_time"} to return an event for.
+        @param end: The time after the latest C{"log_time"} to return an event
+            for.
+
+        @return: The events whose C{"log_time"} is at least C{start} and less
+            than C{end}, ordered by file (oldest first) and then as they are
+            in the file.
+        """
+        for indexed in self._logs:
+            indexed.update(self._interval)
+        overlapping = [
+            indexed
+            for indexed in self._logs
+            if indexed.first is not None
+            and indexed.first < end
+            and indexed.last >= start
+        ]
+        overlapping.sort(key=lambda indexed: cast(float, indexed.first))
+        for indexed in overlapping:
+            position = max(bisect_left(indexed.times, start) - 1, 0)
+            for offset, event in indexed.reader.events(indexed.offsets[position]):
+                time = _eventTime(event)
+                if time is None or time < start:
+                    continue
+                if time >= end:
+                    break
+                yield event
@@ -6,6 +6,8 @@
 Log levels.
 """
 
+from typing import Dict
+
 from constantly import NamedConstant, Names
 
 
@@ -79,3 +81,46 @@ class LogLevel(Names):
             return cls.lookupByName(name)
         except ValueError:
             raise InvalidLogLevelError(name)
+
+
+# The priority of each level, for comparing levels without calling into
+# constantly.
+_levelPriorities = {
+    level: priority for priority, level in enumerate(LogLevel.iterconstants())
+}  # type: Dict[NamedConstant, int]
+
+
+# Incremented whenever the lowest levels of event that observers want may
+# have changed; see _minimumLevelFor.
+_minimumLevelsVersion = 0
+
+
+def _minimumLevelsChanged() -> None:
+    """
+    Note that the lowest levels of event that observers want may have
+    changed, so that the levels cached by L{Logger} and L{LogPublisher} are
+    looked up again.
+    """
+    global _minimumLevelsVersion
+    _minimumLevelsVersion += 1
+
+
+def _minimumLevelFor(observer: object, namespace: str) -> NamedConstant:
+    """
+    Get the lowest level of event from C{namespace} that C{observer} may do
+    anything with, so that a L{Logger} need not emit events below it.
+
+    An observer tells by having a C{_minimumLevel} method which takes a
+    namespace and returns a level, and which calls L{_minimumLevelsChanged}
+    whenever its results may change.  Observers without one want events of
+    every level.
+
+    @param observer: An L{ILogObserver}.
+    @param namespace: A logging namespace.
+
+    @return: A L{LogLevel}.
+    """
+    minimumLevel = getattr(observer, "_minimumLevel", None)
+    if minimumLevel is None:
+        return LogLevel.debug
+    return minimumLevel(namespace)
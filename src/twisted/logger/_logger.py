@@ -7,13 +7,19 @@ Logger class.
 """
 
 from time import time
-from typing import Any, Optional, cast
+from typing import Any, Dict, Optional, cast
 
 from twisted.python.compat import currentframe
 from twisted.python.failure import Failure
 
+from . import _levels
 from ._interfaces import ILogObserver, LogTrace
-from ._levels import InvalidLogLevelError, LogLevel
+from ._levels import (
+    InvalidLogLevelError,
+    LogLevel,
+    _levelPriorities,
+    _minimumLevelFor,
+)
 
 
 class Logger:
@@ -22,11 +28,20 @@ class Logger:
     as a class or module attribute, as documented in L{this module's
     documentation <twisted.logger>}.
 
+    Events below the lowest level the observer may do anything with, as
+    reported by L{_minimumLevelFor}, are not emitted at all, so that calls
+    such as C{log.debug(...)} cost little while debug events are being
+    filtered out.
+
     @ivar namespace: the namespace for this logger
     @ivar source: The object which is emitting events via this logger
     @ivar observer: The observer that this logger will send events to.
     """
 
+    _minimumPriority = 0
+    _minimumLevelsVersion = -1
+    _minimumLevelsObserver = None  # type: Optional[ILogObserver]
+
     @staticmethod
     def _namespaceFromCallingContext() -> str:
         """
@@ -103,6 +118,31 @@ class Logger:
     def __repr__(self) -> str:
         return "<{} {!r}>".format(self.__class__.__name__, self.namespace)
 
+    def _isSuppressed(self, level: LogLevel, kwargs: Dict[str, object]) -> bool:
+        """
+        Whether an event at C{level} need not be emitted, because no observer
+        would do anything with it.
+
+        Events being traced are always emitted.
+
+        @param level: a L{LogLevel}
+        @param kwargs: the event's other keys and values.
+        """
+        observer = self.observer
+        if (
+            self._minimumLevelsVersion != _levels._minimumLevelsVersion
+            or self._minimumLevelsObserver is not observer
+        ):
+            self._minimumLevelsVersion = _levels._minimumLevelsVersion
+            self._minimumLevelsObserver = observer
+            self._minimumPriority = _levelPriorities[
+                _minimumLevelFor(observer, self.namespace)
+            ]
+        return (
+            _levelPriorities[level] < self._minimumPriority
+            and "log_trace" not in kwargs
+        )
+
     def emit(
         self, level: LogLevel, format: Optional[str] = None, **kwargs: object
     ) -> None:
@@ -127,6 +167,9 @@ class Logger:
             )
             return
 
+        if self._isSuppressed(level, kwargs):
+            return
+
         event = kwargs
         event.update(
             log_logger=self,
@@ -203,6 +246,8 @@ class Logger:
             non-deterministic behavior from observers that schedule work for
             later execution.
         """
+        if self._isSuppressed(LogLevel.debug, kwargs):
+            return
         self.emit(LogLevel.debug, format, **kwargs)
 
     def info(self, format: Optional[str] = None, **kwargs: object) -> None:
@@ -218,6 +263,8 @@ class Logger:
             non-deterministic behavior from observers that schedule work for
             later execution.
         """
+        if self._isSuppressed(LogLevel.info, kwargs):
+            return
         self.emit(LogLevel.info, format, **kwargs)
 
     def warn(self, format: Optional[str] = None, **kwargs: object) -> None:
@@ -233,6 +280,8 @@ class Logger:
             non-deterministic behavior from observers that schedule work for
             later execution.
         """
+        if self._isSuppressed(LogLevel.warn, kwargs):
+            return
         self.emit(LogLevel.warn, format, **kwargs)
 
     def error(self, format: Optional[str] = None, **kwargs: object) -> None:
@@ -248,6 +297,8 @@ class Logger:
             non-deterministic behavior from observers that schedule work for
             later execution.
         """
+        if self._isSuppressed(LogLevel.error, kwargs):
+            return
         self.emit(LogLevel.error, format, **kwargs)
 
     def critical(self, format: Optional[str] = None, **kwargs: object) -> None:
@@ -263,6 +314,8 @@ class Logger:
             non-deterministic behavior from observers that schedule work for
             later execution.
         """
+        if self._isSuppressed(LogLevel.critical, kwargs):
+            return
         self.emit(LogLevel.critical, format, **kwargs)
 
 
@@ -6,12 +6,15 @@
 Basic log observers.
 """
 
-from typing import Callable, Optional
+from typing import Callable, Dict, Optional
 
+from constantly import NamedConstant
 from zope.interface import implementer
 
 from twisted.python.failure import Failure
+from . import _levels
 from ._interfaces import ILogObserver, LogEvent
+from ._levels import LogLevel, _levelPriorities, _minimumLevelFor
 from ._logger import Logger
 
 
@@ -31,6 +34,8 @@ class LogPublisher:
 
     def __init__(self, *observers: ILogObserver) -> None:
         self._observers = list(observers)
+        self._minimumLevels = {}  # type: Dict[str, NamedConstant]
+        self._minimumLevelsVersion = -1
         self.log = Logger(observer=self)
 
     def addObserver(self, observer: ILogObserver) -> None:
@@ -43,6 +48,7 @@ class LogPublisher:
             raise TypeError("Observer is not callable: {!r}".format(observer))
         if observer not in self._observers:
             self._observers.append(observer)
+            _levels._minimumLevelsChanged()
 
     def removeObserver(self, observer: ILogObserver) -> None:
         """
@@ -54,6 +60,32 @@ class LogPublisher:
             self._observers.remove(observer)
         except ValueError:
             pass
+        else:
+            _levels._minimumLevelsChanged()
+
+    def _minimumLevel(self, namespace: str) -> NamedConstant:
+        """
+        Get the lowest level of event from C{namespace} that any of this
+        publisher's observers may do anything with.
+
+        @param namespace: A logging namespace.
+
+        @return: A L{LogLevel}.
+        """
+        if self._minimumLevelsVersion != _levels._minimumLevelsVersion:
+            self._minimumLevels = {}
+            self._minimumLevelsVersion = _levels._minimumLevelsVersion
+        try:
+            return self._minimumLevels[namespace]
+        except KeyError:
+            pass
+        minimumLevel = min(
+            (_minimumLevelFor(observer, namespace) for observer in self._observers),
+            key=_levelPriorities.__getitem__,
+            default=LogLevel.debug,
+        )
+        self._minimumLevels[namespace] = minimumLevel
+        return minimumLevel
 
     def __call__(self, event: LogEvent) -> None:
         """
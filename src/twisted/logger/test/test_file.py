@@ -5,18 +5,26 @@
 Test cases for L{twisted.logger._file}.
 """
 
-from io import StringIO
+import threading
+from io import BytesIO, StringIO
 from types import TracebackType
-from typing import Any, AnyStr, IO, Optional, Type, cast
+from typing import Any, AnyStr, IO, List, Optional, Type, cast
 
 from zope.interface.exceptions import BrokenMethodImplementation
 from zope.interface.verify import verifyObject
 
 from twisted.trial.unittest import TestCase
 
+from twisted.internet.testing import MemoryReactor
 from twisted.python.failure import Failure
-from .._file import FileLogObserver, textFileLogObserver
-from .._interfaces import ILogObserver
+from .._file import (
+    FileLogObserver,
+    QueuedFileLogObserver,
+    QueueOverflow,
+    textFileLogObserver,
+)
+from .._interfaces import ILogObserver, LogEvent
+from .._levels import LogLevel
 
 
 class FileLogObserverTests(TestCase):
@@ -85,6 +93,193 @@ class FileLogObserverTests(TestCase):
             self.assertEqual(fileHandle.flushes, 1)
 
 
+class QueuedFileLogObserverTests(TestCase):
+    """
+    Tests for L{QueuedFileLogObserver}.
+    """
+
+    def observer(self, outFile: Any, **kwargs: Any) -> QueuedFileLogObserver:
+        """
+        Make a L{QueuedFileLogObserver} which writes each event's
+        C{"text"} to C{outFile}, and stop it once the test is done.
+        """
+        observer = QueuedFileLogObserver(
+            cast(IO[Any], outFile), lambda e: e.get("text"), **kwargs
+        )
+        self.addCleanup(observer.stop)
+        return observer
+
+    def blockedObserver(self, **kwargs: Any) -> QueuedFileLogObserver:
+        """
+        Make an observer whose writer thread is blocked writing the event
+        C{"first"}, leaving its queue, of one event, empty.
+        """
+        self.outFile = GatedFile()
+        self.addCleanup(self.outFile.gate.set)
+        observer = self.observer(
+            self.outFile, maxQueued=1, bufferSize=1, flushInterval=0, **kwargs
+        )
+        observer(dict(text="first", log_level=LogLevel.info))
+        self.assertTrue(self.outFile.writing.wait(10))
+        return observer
+
+    def test_interface(self) -> None:
+        """
+        L{QueuedFileLogObserver} is an L{ILogObserver}.
+        """
+        observer = self.observer(RecordingFile())
+        try:
+            verifyObject(ILogObserver, observer)
+        except BrokenMethodImplementation as e:
+            self.fail(e)
+
+    def test_batchedWrite(self) -> None:
+        """
+        Events are formatted and written by the writer thread in batches:
+        text is held until L{QueuedFileLogObserver.stop} is called if
+        neither C{bufferSize} nor C{flushInterval} has been reached.
+        """
+        outFile = RecordingFile()
+        observer = self.observer(outFile, flushInterval=3600)
+        for text in ["a", None, "b", "", "c"]:
+            observer(dict(text=text))
+        observer.stop()
+        self.assertEqual(outFile.written, ["abc"])
+        self.assertEqual(outFile.flushes, 1)
+
+    def test_bufferSize(self) -> None:
+        """
+        Text is written once C{bufferSize} characters have built up.
+        """
+        outFile = RecordingFile()
+        observer = self.observer(outFile, bufferSize=5, flushInterval=3600)
+        observer(dict(text="hello"))
+        self.assertTrue(outFile.wrote.wait(10))
+        self.assertEqual(outFile.written, ["hello"])
+
+    def test_flushInterval(self) -> None:
+        """
+        Text is written C{flushInterval} seconds after it was formatted.
+        """
+        outFile = RecordingFile()
+        observer = self.observer(outFile, flushInterval=0.01)
+        observer(dict(text="hello"))
+        self.assertTrue(outFile.wrote.wait(10))
+        self.assertEqual(outFile.written, ["hello"])
+
+    def test_bytes(self) -> None:
+        """
+        Text is encoded as UTF-8 for a file which does not accept text.
+        """
+        with BytesIO() as fileHandle:
+            observer = self.observer(fileHandle)
+            observer(dict(text="\N{SNOWMAN}"))
+            observer.stop()
+            self.assertEqual(fileHandle.getvalue(), "\N{SNOWMAN}".encode("utf-8"))
+
+    def test_block(self) -> None:
+        """
+        With L{QueueOverflow.block}, an event observed while the queue is full
+        waits for room.
+        """
+        observer = self.blockedObserver()
+        observer(dict(text="second"))
+        blocked = threading.Thread(target=observer, args=(dict(text="third"),))
+        blocked.start()
+        blocked.join(0.05)
+        self.assertTrue(blocked.is_alive())
+        self.outFile.gate.set()
+        blocked.join(10)
+        self.assertFalse(blocked.is_alive())
+        observer.stop()
+        self.assertEqual("".join(self.outFile.written), "firstsecondthird")
+        self.assertEqual(observer.dropped, 0)
+
+    def test_dropOldest(self) -> None:
+        """
+        With L{QueueOverflow.dropOldest}, an event observed while the queue is
+        full replaces the oldest queued event.
+        """
+        observer = self.blockedObserver(overflow=QueueOverflow.dropOldest)
+        observer(dict(text="second"))
+        observer(dict(text="third"))
+        self.outFile.gate.set()
+        observer.stop()
+        self.assertEqual("".join(self.outFile.written), "firstthird")
+        self.assertEqual(observer.dropped, 1)
+
+    def test_dropBelowLevel(self) -> None:
+        """
+        With L{QueueOverflow.dropBelowLevel}, an event observed while the
+        queue is full is discarded if its level is below C{overflowLevel} or
+        it has none.
+        """
+        observer = self.blockedObserver(
+            overflow=QueueOverflow.dropBelowLevel, overflowLevel=LogLevel.error
+        )
+        observer(dict(text="second", log_level=LogLevel.debug))
+        observer(dict(text="third", log_level=LogLevel.warn))
+        observer(dict(text="fourth"))
+        self.outFile.gate.set()
+        observer.stop()
+        self.assertEqual("".join(self.outFile.written), "firstsecond")
+        self.assertEqual(observer.dropped, 2)
+
+    def test_eventCopied(self) -> None:
+        """
+        Events are copied when they are queued, so later changes to them are
+        not seen by the writer thread.
+        """
+        outFile = RecordingFile()
+        observer = self.observer(outFile)
+        event = dict(text="before")  # type: LogEvent
+        observer(event)
+        event["text"] = "after"
+        observer.stop()
+        self.assertEqual(outFile.written, ["before"])
+
+    def test_formatFailure(self) -> None:
+        """
+        Events which cannot be formatted are counted as lost, and the others
+        are still written.
+        """
+
+        def formatEvent(event: LogEvent) -> str:
+            return cast(str, event["text"])
+
+        outFile = RecordingFile()
+        observer = QueuedFileLogObserver(cast(IO[Any], outFile), formatEvent)
+        self.addCleanup(observer.stop)
+        observer(dict(text="a"))
+        observer(dict())
+        observer(dict(text="b"))
+        observer.stop()
+        self.assertEqual(outFile.written, ["ab"])
+        self.assertEqual(observer.lost, 1)
+
+    def test_afterStop(self) -> None:
+        """
+        Events observed after L{QueuedFileLogObserver.stop} has been called
+        are written at once.
+        """
+        outFile = RecordingFile()
+        observer = self.observer(outFile)
+        observer.stop()
+        observer(dict(text="late"))
+        self.assertEqual(outFile.written, ["late"])
+        self.assertEqual(outFile.flushes, 1)
+
+    def test_reactorShutdown(self) -> None:
+        """
+        If given a reactor, the observer is stopped after it shuts down.
+        """
+        reactor = MemoryReactor()
+        observer = self.observer(RecordingFile(), reactor=reactor)
+        self.assertEqual(
+            reactor.triggers["after"]["shutdown"], [(observer.stop, (), {})]
+        )
+
+
 class TextFileLogObserverTests(TestCase):
     """
     Tests for L{textFileLogObserver}.
@@ -183,3 +378,57 @@ class DummyFile:
         traceback: Optional[TracebackType],
     ) -> Optional[bool]:
         pass
+
+
+class RecordingFile:
+    """
+    Text file that records what is written to it.
+
+    @ivar wrote: A L{threading.Event} set once something has been written.
+    """
+
+    def __init__(self) -> None:
+        self.written = []  # type: List[str]
+        self.flushes = 0
+        self.wrote = threading.Event()
+
+    def write(self, data: str) -> None:
+        """
+        Write data.
+
+        @param data: data
+        """
+        if not isinstance(data, str):
+            raise TypeError(data)
+        self.written.append(data)
+        self.wrote.set()
+
+    def flush(self) -> None:
+        """
+        Flush buffers.
+        """
+        self.flushes += 1
+
+
+class GatedFile(RecordingFile):
+    """
+    Text file whose writes wait until its gate is opened.
+
+    @ivar writing: A L{threading.Event} set once a write has started.
+    @ivar gate: A L{threading.Event} to set to let writes finish.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.writing = threading.Event()
+        self.gate = threading.Event()
+
+    def write(self, data: str) -> None:
+        """
+        Write data once the gate is opened.
+
+        @param data: data
+        """
+        self.writing.set()
+        self.gate.wait()
+        super().write(data)
@@ -255,6 +255,47 @@ class FilteringLogObserverTests(unittest.TestCase):
         publisher = LogPublisher(yesFilter, noFilter, testObserver)
         publisher(event)
 
+    def test_minimumLevel(self) -> None:
+        """
+        The lowest level of event a L{FilteringLogObserver} wants from a
+        namespace is the highest of the levels of the
+        L{LogLevelFilterPredicate}s it starts with, and the level its
+        observer wants.
+        """
+        info = LogLevelFilterPredicate(defaultLogLevel=LogLevel.info)
+        warn = LogLevelFilterPredicate(defaultLogLevel=LogLevel.warn)
+        inner = FilteringLogObserver(cast(ILogObserver, lambda e: None), [warn])
+        self.assertIs(
+            FilteringLogObserver(inner, [info])._minimumLevel("x"), LogLevel.warn
+        )
+        warn.setLogLevelForNamespace("x", LogLevel.debug)
+        self.assertIs(
+            FilteringLogObserver(inner, [info])._minimumLevel("x"), LogLevel.info
+        )
+
+    def test_minimumLevelOtherPredicate(self) -> None:
+        """
+        L{LogLevelFilterPredicate}s after another kind of predicate, which
+        might let events through whatever their level, are not taken into
+        account.
+        """
+        observer = cast(ILogObserver, lambda e: None)
+        info = LogLevelFilterPredicate(defaultLogLevel=LogLevel.info)
+        error = LogLevelFilterPredicate(defaultLogLevel=LogLevel.error)
+        yes = cast(ILogFilterPredicate, lambda e: PredicateResult.yes)
+        other = FilteringLogObserver(observer, [info, yes, error])._minimumLevel("x")
+        self.assertIs(other, LogLevel.info)
+
+    def test_minimumLevelNegativeObserver(self) -> None:
+        """
+        A L{FilteringLogObserver} with a negative observer does not filter by
+        level.
+        """
+        observer = cast(ILogObserver, lambda e: None)
+        predicate = LogLevelFilterPredicate(defaultLogLevel=LogLevel.error)
+        filtering = FilteringLogObserver(observer, [predicate], observer)
+        self.assertIs(filtering._minimumLevel("x"), LogLevel.debug)
+
 
 class LogLevelFilterPredicateTests(unittest.TestCase):
     """
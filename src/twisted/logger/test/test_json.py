@@ -6,7 +6,7 @@ Tests for L{twisted.logger._json}.
 """
 
 from io import StringIO, BytesIO
-from typing import Any, IO, List, Optional, Sequence, cast
+from typing import Any, IO, List, Optional, Sequence, Tuple, cast
 from unittest import skipIf
 
 from zope.interface import implementer
@@ -21,11 +21,14 @@ from .._flatten import extractField
 from .._format import formatEvent
 from .._global import globalLogPublisher
 from .._interfaces import ILogObserver, LogEvent
+from .. import _json
 from .._json import (
     eventAsJSON,
     eventFromJSON,
     jsonFileLogObserver,
     eventsFromJSONLogFile,
+    JSONLogIndex,
+    JSONLogReader,
     log as jsonLog,
 )
 from .._levels import LogLevel
@@ -195,6 +198,47 @@ class SaveLoadTests(TestCase):
         )
         self.assertEqual(loadedEvent, dict(log_level=None))
 
+    def test_saveLoadLevels(self) -> None:
+        """
+        Every L{LogLevel} is loaded as itself, wherever it is in the event.
+        """
+        inputEvent = dict(
+            log_level=LogLevel.info,
+            levels=list(LogLevel.iterconstants()),
+            nested={"level": LogLevel.critical},
+        )
+        loadedEvent = eventFromJSON(self.savedEventJSON(inputEvent))
+        self.assertEqual(loadedEvent, inputEvent)
+        self.assertIs(loadedEvent["nested"]["level"], LogLevel.critical)
+
+    def test_saveLoadWideIntegers(self) -> None:
+        """
+        Integers too wide for 64 bits are loaded exactly.
+        """
+        inputEvent = dict(big=2 ** 70, small=-(2 ** 70), items=[2 ** 64])
+        loadedEvent = eventFromJSON(self.savedEventJSON(inputEvent))
+        self.assertEqual(loadedEvent, inputEvent)
+        self.assertIsInstance(loadedEvent["items"][0], int)
+
+    def test_saveLoadNonFinite(self) -> None:
+        """
+        Non-finite floats are saved and loaded.
+        """
+        inputEvent = dict(x=float("inf"), y=[float("-inf")])
+        loadedEvent = eventFromJSON(self.savedEventJSON(inputEvent))
+        self.assertEqual(loadedEvent, inputEvent)
+
+    def test_loadWithoutOrjson(self) -> None:
+        """
+        Events are loaded the same way if C{orjson} is not installed.
+        """
+        inputEvent = dict(
+            log_level=LogLevel.warn, values=[1, 2.5, "three", None, {"x": [4]}]
+        )
+        text = self.savedEventJSON(inputEvent)
+        self.patch(_json, "orjson", None)
+        self.assertEqual(eventFromJSON(text), inputEvent)
+
 
 class FileLogObserverTests(TestCase):
     """
@@ -489,3 +533,253 @@ class LogFileReaderTests(TestCase):
 
             self.assertEqual(tuple(events), (event,))
             self.assertEqual(len(self.errorEvents), 0)
+
+
+class JSONLogReaderTests(TestCase):
+    """
+    Tests for L{JSONLogReader}.
+    """
+
+    def setUp(self) -> None:
+        self.errorEvents = []  # type: List[LogEvent]
+
+        @implementer(ILogObserver)
+        def observer(event: LogEvent) -> None:
+            if event["log_namespace"] == jsonLog.namespace and "record" in event:
+                self.errorEvents.append(event)
+
+        self.addCleanup(globalLogPublisher.removeObserver, observer)
+        globalLogPublisher.addObserver(observer)
+
+    def reader(
+        self, data: bytes, recordSeparator: Optional[str] = None
+    ) -> JSONLogReader:
+        """
+        Write a file and make a reader for it.
+
+        @param data: The contents of the file.
+        @param recordSeparator: C{recordSeparator} argument to
+            L{JSONLogReader}
+
+        @return: The reader, which is closed when the test is done.
+        """
+        path = self.mktemp()
+        with open(path, "wb") as f:
+            f.write(data)
+        reader = JSONLogReader(path, recordSeparator)
+        self.addCleanup(reader.close)
+        return reader
+
+    def test_recordSeparator(self) -> None:
+        """
+        L{JSONLogReader.events} reads events from a file using C{"\x1e"} as
+        the record separator, with the offset of each record.
+        """
+        reader = self.reader(b'\x1e{"x": 1}\n\x1e{"y": 2}\n')
+        self.assertEqual(list(reader.events()), [(0, {"x": 1}), (10, {"y": 2})])
+
+    def test_newlines(self) -> None:
+        """
+        L{JSONLogReader.events} reads events from a file which uses no record
+        separator, with the offset of each line.
+        """
+        reader = self.reader(b'{"x": 1}\n\n{"y": 2}\n')
+        self.assertEqual(list(reader.events()), [(0, {"x": 1}), (10, {"y": 2})])
+
+    def test_explicitRecordSeparator(self) -> None:
+        """
+        L{JSONLogReader.events} reads events from a file using the record
+        separator it is given.
+        """
+        reader = self.reader(b'\x08{"x": 1}\n\x08{"y": 2}\n', "\x08")
+        self.assertEqual(list(reader.events()), [(0, {"x": 1}), (10, {"y": 2})])
+
+    def test_offset(self) -> None:
+        """
+        Given an offset it returned, L{JSONLogReader.events} reads events from
+        that record onwards.
+        """
+        reader = self.reader(b"")
+        with open(reader.path, "w") as f:
+            observer = jsonFileLogObserver(f)
+            for i in range(5):
+                observer(dict(i=i))
+        offsets = [offset for offset, event in reader.events()]
+        self.assertEqual(
+            [event for offset, event in reader.events(offsets[3])],
+            [dict(i=3), dict(i=4)],
+        )
+
+    def test_empty(self) -> None:
+        """
+        L{JSONLogReader.events} reads no events from an empty file.
+        """
+        self.assertEqual(list(self.reader(b"").events()), [])
+
+    def test_unreadable(self) -> None:
+        """
+        L{JSONLogReader.events} skips records which are truncated or not
+        JSON, and logs errors about them.
+        """
+        reader = self.reader(b'\x1e{"x": }\n\x1e{"y": 2}\n\x1e{"z": 3}')
+        self.assertEqual(list(reader.events()), [(9, {"y": 2})])
+        self.assertEqual(
+            [event["record"] for event in self.errorEvents],
+            [b'{"x": }\n', b'{"z": 3}'],
+        )
+
+    def test_growing(self) -> None:
+        """
+        L{JSONLogReader.events} reads records added to the file since it was
+        last called.
+        """
+        reader = self.reader(b'\x1e{"x": 1}\n')
+        self.assertEqual(list(reader.events()), [(0, {"x": 1})])
+        with open(reader.path, "ab") as f:
+            f.write(b'\x1e{"y": 2}\n')
+        self.assertEqual(list(reader.events(10)), [(10, {"y": 2})])
+
+    def test_growingFromEmpty(self) -> None:
+        """
+        L{JSONLogReader} detects the record separator once a file which was
+        empty has records.
+        """
+        reader = self.reader(b"")
+        self.assertEqual(list(reader.events()), [])
+        with open(reader.path, "ab") as f:
+            f.write(b'\x1e{"x": 1}\n')
+        self.assertEqual(list(reader.events()), [(0, {"x": 1})])
+
+
+class JSONLogIndexTests(TestCase):
+    """
+    Tests for L{JSONLogIndex}.
+    """
+
+    def write(self, times: Sequence[float]) -> str:
+        """
+        Write a log file with an event at each of the given times.
+
+        @param times: The C{"log_time"} of each event.
+
+        @return: The path of the file.
+        """
+        path = self.mktemp()  # type: str
+        with open(path, "w") as f:
+            observer = jsonFileLogObserver(f)
+            for time in times:
+                observer(dict(log_time=time))
+        return path
+
+    def index(self, paths: Sequence[str], interval: int = 2) -> JSONLogIndex:
+        """
+        Make an index of some files.
+
+        @return: The index, which is closed when the test is done.
+        """
+        index = JSONLogIndex(paths, interval=interval)
+        self.addCleanup(index.close)
+        return index
+
+    def times(self, index: JSONLogIndex, start: float, end: float) -> List[float]:
+        """
+        @return: The times of the events in C{index} between C{start} and
+            C{end}.
+        """
+        return [event["log_time"] for event in index.eventsBetween(start, end)]
+
+    def test_eventsBetween(self) -> None:
+        """
+        L{JSONLogIndex.eventsBetween} returns the events at or after the start
+        time and before the end time.
+        """
+        index = self.index([self.write(range(20))])
+        self.assertEqual(self.times(index, 5, 9), [5, 6, 7, 8])
+        self.assertEqual(self.times(index, 4.5, 5.5), [5])
+        self.assertEqual(self.times(index, 0, 1), [0])
+        self.assertEqual(self.times(index, 19, 100), [19])
+        self.assertEqual(self.times(index, 20, 100), [])
+        self.assertEqual(self.times(index, -10, 0), [])
+
+    def test_files(self) -> None:
+        """
+        L{JSONLogIndex.eventsBetween} returns events from each file which has
+        any in the range, oldest file first.
+        """
+        index = self.index(
+            [self.write(range(20, 30)), self.write(range(10, 20)), self.write([])]
+        )
+        self.assertEqual(self.times(index, 18, 22), [18, 19, 20, 21])
+        self.assertEqual(self.times(index, 12, 14), [12, 13])
+
+    def test_skipsFiles(self) -> None:
+        """
+        L{JSONLogIndex.eventsBetween} does not read files which have no events
+        in the range.
+        """
+        old, new = self.write(range(10)), self.write(range(10, 20))
+        index = self.index([old, new])
+        self.times(index, 0, 20)
+        read = []  # type: List[str]
+        for indexed in index._logs:
+            reader = indexed.reader
+
+            def events(
+                offset: int, reader: JSONLogReader = reader
+            ) -> List[Tuple[int, LogEvent]]:
+                read.append(reader.path)
+                return []
+
+            self.patch(reader, "events", events)
+        self.times(index, 12, 14)
+        self.assertEqual(read, [new])
+
+    def test_startsNearStart(self) -> None:
+        """
+        L{JSONLogIndex.eventsBetween} starts reading a file at the indexed
+        event before the start of the range.
+        """
+        path = self.write(range(100))
+        index = self.index([path], interval=10)
+        [indexed] = index._logs
+        offsets = []  # type: List[int]
+        events = indexed.reader.events
+
+        def recordingEvents(offset: int) -> Any:
+            offsets.append(offset)
+            return events(offset)
+
+        self.patch(indexed.reader, "events", recordingEvents)
+        self.assertEqual(self.times(index, 55, 57), [55, 56])
+        self.assertEqual(offsets, [indexed.offsets[5]])
+
+    def test_untimed(self) -> None:
+        """
+        L{JSONLogIndex.eventsBetween} never returns events without a
+        C{"log_time"}.
+        """
+        path = self.mktemp()
+        with open(path, "w") as f:
+            observer = jsonFileLogObserver(f)
+            events = [
+                {},
+                dict(log_time=1),
+                dict(log_time="2"),
+                dict(log_time=3),
+            ]  # type: List[LogEvent]
+            for event in events:
+                observer(event)
+        self.assertEqual(self.times(self.index([path]), 0, 10), [1, 3])
+
+    def test_growing(self) -> None:
+        """
+        L{JSONLogIndex} indexes a file again when it grows.
+        """
+        path = self.write(range(5))
+        index = self.index([path])
+        self.assertEqual(self.times(index, 5, 10), [])
+        with open(path, "a") as f:
+            observer = jsonFileLogObserver(f)
+            for time in range(5, 10):
+                observer(dict(log_time=time))
+        self.assertEqual(self.times(index, 5, 10), [5, 6, 7, 8, 9])
@@ -15,9 +15,12 @@ from twisted.trial import unittest
 
 from .._interfaces import ILogObserver, LogEvent
 from .._levels import InvalidLogLevelError, LogLevel
+from .. import _logger
+from .._filter import FilteringLogObserver, LogLevelFilterPredicate
 from .._format import formatEvent
 from .._logger import Logger
 from .._global import globalLogPublisher
+from .._observer import LogPublisher
 
 
 class TestLogger(Logger):
@@ -60,6 +63,22 @@ class LogComposedObject:
         return "<LogComposedObject {state}>".format(state=self.state)
 
 
+class CountingLogger(Logger):
+    """
+    L{Logger} which counts the events passed to C{emit} which it does not
+    suppress.
+    """
+
+    emitted = 0
+
+    def emit(
+        self, level: NamedConstant, format: Optional[str] = None, **kwargs: object
+    ) -> None:
+        if not self._isSuppressed(level, kwargs):
+            self.emitted += 1
+        Logger.emit(self, level, format, **kwargs)
+
+
 class LoggerTests(unittest.TestCase):
     """
     Tests for L{Logger}.
@@ -275,3 +294,81 @@ class LoggerTests(unittest.TestCase):
 
         log = TestLogger(observer=publisher)
         log.info("Hello.", log_trace=[])
+
+
+class LoggerLevelTests(unittest.TestCase):
+    """
+    Tests for L{Logger} not emitting events below the lowest level its
+    observer wants.
+    """
+
+    def setUp(self) -> None:
+        self.events = []  # type: List[LogEvent]
+        self.predicate = LogLevelFilterPredicate(defaultLogLevel=LogLevel.info)
+        self.observer = FilteringLogObserver(
+            cast(ILogObserver, self.events.append), [self.predicate]
+        )
+        self.log = CountingLogger(namespace="test", observer=self.observer)
+
+    def test_suppressed(self) -> None:
+        """
+        Events below the level for the logger's namespace are not emitted,
+        and others are.
+        """
+        self.log.debug("debug")
+        self.assertEqual(self.log.emitted, 0)
+        self.log.info("info")
+        self.log.critical("critical")
+        self.assertEqual(self.log.emitted, 2)
+        self.assertEqual([e["log_format"] for e in self.events], ["info", "critical"])
+
+    def test_emitSuppressed(self) -> None:
+        """
+        L{Logger.emit} returns without building an event for a level below
+        the level for the logger's namespace.
+        """
+        log = Logger(namespace="test", observer=self.observer)
+        self.patch(_logger, "time", lambda: self.fail("Event built"))
+        log.emit(LogLevel.debug, "debug")
+
+    def test_levelChanged(self) -> None:
+        """
+        Changing the level for the logger's namespace takes effect at once.
+        """
+        self.log.debug("first")
+        self.predicate.setLogLevelForNamespace("test", LogLevel.debug)
+        self.log.debug("second")
+        self.predicate.clearLogLevels()
+        self.log.debug("third")
+        self.assertEqual([e["log_format"] for e in self.events], ["second"])
+
+    def test_observerChanged(self) -> None:
+        """
+        Changing the logger's observer takes effect at once.
+        """
+        self.log.debug("first")
+        self.log.observer = cast(ILogObserver, self.events.append)
+        self.log.debug("second")
+        self.assertEqual([e["log_format"] for e in self.events], ["second"])
+
+    def test_publisherObserversChanged(self) -> None:
+        """
+        Adding an observer which wants every level to the logger's publisher
+        takes effect at once.
+        """
+        publisher = LogPublisher(self.observer)
+        log = CountingLogger(namespace="test", observer=publisher)
+        log.debug("first")
+        publisher.addObserver(cast(ILogObserver, self.events.append))
+        log.debug("second")
+        self.assertEqual(log.emitted, 1)
+        publisher.removeObserver(cast(ILogObserver, self.events.append))
+        log.debug("third")
+        self.assertEqual(log.emitted, 1)
+
+    def test_traceNotSuppressed(self) -> None:
+        """
+        Events being traced are emitted whatever their level.
+        """
+        self.log.debug("debug", log_trace=[])
+        self.assertEqual(self.log.emitted, 1)
@@ -13,7 +13,9 @@ from zope.interface.verify import verifyObject
 
 from twisted.trial import unittest
 
+from .._filter import FilteringLogObserver, LogLevelFilterPredicate
 from .._interfaces import ILogObserver, LogEvent
+from .._levels import LogLevel
 from .._logger import Logger
 from .._observer import LogPublisher
 
@@ -191,3 +193,34 @@ class LogPublisherTests(unittest.TestCase):
 
         self.assertEqual(traces[1], ((publisher, o1),))
         self.assertEqual(traces[2], ((publisher, o1), (publisher, o2)))
+
+    def test_minimumLevel(self) -> None:
+        """
+        The lowest level of event a L{LogPublisher} wants from a namespace is
+        the lowest level any of its observers wants.
+        """
+        predicate = LogLevelFilterPredicate(defaultLogLevel=LogLevel.error)
+        predicate.setLogLevelForNamespace("chatty", LogLevel.info)
+        publisher = LogPublisher(
+            FilteringLogObserver(cast(ILogObserver, lambda e: None), [predicate])
+        )
+        self.assertIs(publisher._minimumLevel("quiet"), LogLevel.error)
+        self.assertIs(publisher._minimumLevel("chatty"), LogLevel.info)
+
+        predicate.setLogLevelForNamespace("quiet", LogLevel.warn)
+        self.assertIs(publisher._minimumLevel("quiet"), LogLevel.warn)
+
+        @implementer(ILogObserver)
+        def everything(e: LogEvent) -> None:
+            pass
+
+        publisher.addObserver(everything)
+        self.assertIs(publisher._minimumLevel("quiet"), LogLevel.debug)
+        publisher.removeObserver(everything)
+        self.assertIs(publisher._minimumLevel("quiet"), LogLevel.warn)
+
+    def test_minimumLevelNoObservers(self) -> None:
+        """
+        A L{LogPublisher} with no observers does not filter by level.
+        """
+        self.assertIs(LogPublisher()._minimumLevel("test"), LogLevel.debug)
@@ -6,91 +6,315 @@
 An in-memory caching resolver.
 """
 
+import heapq
+from collections import OrderedDict
+from math import ceil
 
-from twisted.names import dns, common
+import attr
+
+from twisted.names import dns, common, error
 from twisted.python import failure, log
 from twisted.internet import defer
 
 
+@attr.s
+class CacheResolverStatistics:
+    """
+    What a L{CacheResolver} has counted.
+
+    @ivar hits: The number of lookups answered from the cache.
+    @ivar negativeHits: The number of those which were answered with a
+        cached negative response: a name error, or no records of the type
+        asked for.
+    @ivar misses: The number of lookups not answered from the cache.
+    @ivar evictions: The number of entries removed from the cache to make
+        room for others.
+    @ivar expirations: The number of entries removed from the cache because
+        they expired.
+    @ivar prefetches: The number of entries looked up again before they
+        expired.
+    """
+
+    hits = attr.ib(default=0)  # type: int
+    negativeHits = attr.ib(default=0)  # type: int
+    misses = attr.ib(default=0)  # type: int
+    evictions = attr.ib(default=0)  # type: int
+    expirations = attr.ib(default=0)  # type: int
+    prefetches = attr.ib(default=0)  # type: int
+
+    @property
+    def hitRate(self):
+        """
+        The fraction of lookups answered from the cache, or C{0.0} if there
+        have been none.
+        """
+        lookups = self.hits + self.misses
+        if not lookups:
+            return 0.0
+        return self.hits / lookups
+
+
+class _CacheEntry(tuple):
+    """
+    An entry in L{CacheResolver.cache}: a 2-tuple of the time the entry was
+    added and its answer, authority and additional records, which also knows
+    how the cache should treat it.
+
+    @ivar lifetime: How many seconds the entry lasts for after it was added.
+    @ivar expires: When the entry expires.
+    @ivar hasRecords: Whether the entry has any records.  An entry without
+        any is served until it is removed, as it has no TTL to count down.
+    @ivar negative: Whether the entry is a negative response.
+    @ivar nameError: Whether the entry is a name error.
+    @ivar hits: How many times the entry has been served.
+    @ivar referenced: Whether the entry has been served since it was added
+        or last given a second chance.
+    @ivar elapsed: The whole number of seconds since the entry was added
+        that C{adjusted} was made for, or L{None}.
+    @ivar adjusted: The entry's records with their TTLs reduced by
+        C{elapsed}.
+    """
+
+    def __new__(cls, when, payload, lifetime, hasRecords, negative, nameError):
+        self = tuple.__new__(cls, (when, payload))
+        self.lifetime = lifetime
+        self.expires = when + lifetime
+        self.hasRecords = hasRecords
+        self.negative = negative
+        self.nameError = nameError
+        self.hits = 0
+        self.referenced = False
+        self.elapsed = None
+        self.adjusted = None
+        return self
+
+
 class CacheResolver(common.ResolverBase):
     """
     A resolver that serves records from a local, memory cache.
 
+    The cache holds at most C{maxEntries} entries, and evicts entries which
+    have not been used recently to make room for more.  Least recently used
+    order is approximated with the second chance algorithm, so that serving
+    an entry does not move it: when the oldest entry is to be evicted, it
+    is kept and moved to the back instead if it has been served since it
+    was last there.  Negative responses are
+    cached as described by RFC 2308: see L{CacheResolver.cacheResult} and
+    L{CacheResolver.cacheNameError}.  Entries are removed when they expire
+    by a single timed call, which is due when the next entry expires.
+
+    If it is given a C{resolver}, popular entries are looked up again when
+    they are close to expiring, and are served until the new answer comes.
+
+    @ivar cache: The cached entries, next to be considered for eviction
+        first: a mapping of L{dns.Query} to a 2-tuple of the time the entry
+        was added and its answer, authority and additional records.
+    @type cache: L{OrderedDict}
+
+    @ivar maxEntries: The most entries to cache, one for each query, or
+        L{None} for no limit.  If it is not positive, nothing is cached.
+
+    @ivar maxNegativeTTL: The longest time in seconds to cache a negative
+        response for.
+
+    @ivar resolver: The L{IResolver} to look up entries again with, or
+        L{None} not to.
+
+    @ivar prefetchHits: How many times an entry must have been served to be
+        looked up again.
+
+    @ivar prefetchFraction: The fraction of its lifetime that an entry
+        must have left to be looked up again when it is served.
+
+    @ivar statistics: What the cache has counted.  It may be replaced with a
+        new L{CacheResolverStatistics} to start again.
+    @type statistics: L{CacheResolverStatistics}
+
     @ivar _reactor: A provider of L{interfaces.IReactorTime}.
+
+    @ivar _expiries: A heap of the time each entry expires at, a serial
+        number to order entries expiring at the same time, the query and
+        the L{_CacheEntry}.  Entries which have been replaced or removed
+        are left to be discarded when their time comes.
+
+    @ivar _sweeper: The L{IDelayedCall} which removes expired entries, or
+        L{None}.
+
+    @ivar _sweepAt: The expiry time C{_sweeper} was scheduled for.
+
+    @ivar _prefetching: The queries being looked up again.
     """
 
     cache = None
+    maxEntries = 10000
+    maxNegativeTTL = 10800
+    resolver = None
+    prefetchHits = 3
+    prefetchFraction = 0.1
 
-    def __init__(self, cache=None, verbose=0, reactor=None):
+    def __init__(
+        self,
+        cache=None,
+        verbose=0,
+        reactor=None,
+        maxEntries=10000,
+        maxNegativeTTL=10800,
+        resolver=None,
+        prefetchHits=3,
+        prefetchFraction=0.1,
+    ):
+        """
+        @param cache: Entries to start with: a mapping of L{dns.Query} to
+            the time the entry was added and its answer, authority and
+            additional records.
+        @param verbose: How much to log about the cache: C{1} logs hits, and
+            C{2} logs misses and additions too.
+        @param reactor: A provider of L{interfaces.IReactorTime}.
+        @param maxEntries: See L{CacheResolver.maxEntries}.
+        @param maxNegativeTTL: See L{CacheResolver.maxNegativeTTL}.
+        @param resolver: See L{CacheResolver.resolver}.
+        @param prefetchHits: See L{CacheResolver.prefetchHits}.
+        @param prefetchFraction: See L{CacheResolver.prefetchFraction}.
+        """
         common.ResolverBase.__init__(self)
 
-        self.cache = {}
         self.verbose = verbose
-        self.cancel = {}
         if reactor is None:
             from twisted.internet import reactor
         self._reactor = reactor
+        self.maxEntries = maxEntries
+        self.maxNegativeTTL = maxNegativeTTL
+        self.resolver = resolver
+        self.prefetchHits = prefetchHits
+        self.prefetchFraction = prefetchFraction
+        self.statistics = CacheResolverStatistics()
+        self._reset()
 
         if cache:
             for query, (seconds, payload) in cache.items():
                 self.cacheResult(query, payload, seconds)
 
+    def _reset(self):
+        """
+        Empty the cache.
+        """
+        self.cache = OrderedDict()
+        self._expiries = []
+        self._serial = 0
+        self._sweeper = None
+        self._sweepAt = None
+        self._prefetching = set()
+
     def __setstate__(self, state):
+        cache = state.pop("cache")
+        nameErrors = set(state.pop("_nameErrors", ()))
+        # Timers from before entries shared one.
+        state.pop("cancel", None)
         self.__dict__ = state
+        self._reset()
+        if "statistics" not in state:
+            self.statistics = CacheResolverStatistics()
 
         now = self._reactor.seconds()
-        for (k, (when, (ans, add, ns))) in self.cache.items():
-            diff = now - when
-            for rec in ans + add + ns:
-                if rec.ttl < diff:
-                    del self.cache[k]
-                    break
+        for query, (when, payload) in cache.items():
+            if any(rec.ttl < now - when for rec in _records(payload)):
+                continue
+            if query in nameErrors:
+                self.cacheNameError(query, payload[1], when)
+            else:
+                self.cacheResult(query, payload, when)
 
     def __getstate__(self):
-        for c in self.cancel.values():
-            c.cancel()
-        self.cancel.clear()
-        return self.__dict__
+        state = self.__dict__.copy()
+        for transient in (
+            "_expiries",
+            "_serial",
+            "_sweeper",
+            "_sweepAt",
+            "_prefetching",
+        ):
+            del state[transient]
+        state["cache"] = OrderedDict(
+            (query, (entry[0], entry[1])) for query, entry in self.cache.items()
+        )
+        state["_nameErrors"] = [
+            query for query, entry in self.cache.items() if entry.nameError
+        ]
+        return state
 
     def _lookup(self, name, cls, type, timeout):
         now = self._reactor.seconds()
         q = dns.Query(name, type, cls)
         try:
-            when, (ans, auth, add) = self.cache[q]
+            entry = self.cache[q]
         except KeyError:
-            if self.verbose > 1:
-                log.msg("Cache miss for " + repr(name))
-            return defer.fail(failure.Failure(dns.DomainError(name)))
-        else:
-            if self.verbose:
-                log.msg("Cache hit for " + repr(name))
-            diff = now - when
-
-            try:
-                result = (
-                    [
-                        dns.RRHeader(
-                            r.name.name, r.type, r.cls, r.ttl - diff, r.payload
-                        )
-                        for r in ans
-                    ],
-                    [
-                        dns.RRHeader(
-                            r.name.name, r.type, r.cls, r.ttl - diff, r.payload
-                        )
-                        for r in auth
-                    ],
-                    [
-                        dns.RRHeader(
-                            r.name.name, r.type, r.cls, r.ttl - diff, r.payload
-                        )
-                        for r in add
-                    ],
-                )
-            except ValueError:
-                return defer.fail(failure.Failure(dns.DomainError(name)))
-            else:
-                return defer.succeed(result)
+            return self._miss(name)
+
+        when, payload = entry
+        if entry.hasRecords and now - when > entry.lifetime:
+            # Expired, but not removed yet.
+            return self._miss(name)
+
+        if self.verbose:
+            log.msg("Cache hit for " + repr(name))
+        self.statistics.hits += 1
+        entry.hits += 1
+        entry.referenced = True
+        if entry.negative:
+            self.statistics.negativeHits += 1
+
+        if (
+            self.resolver is not None
+            and entry.hits >= self.prefetchHits
+            and entry.expires - now <= entry.lifetime * self.prefetchFraction
+            and q not in self._prefetching
+            and not entry.nameError
+        ):
+            self._prefetch(q)
+
+        if entry.nameError:
+            return defer.fail(failure.Failure(error.AuthoritativeDomainError(name)))
+
+        # RRHeader truncates TTLs to whole seconds, so the records for a given
+        # whole number of elapsed seconds can be reused until it changes.  They
+        # are only kept for entries served more than once, since keeping them
+        # for every entry costs more than it saves.
+        elapsed = ceil(now - when)
+        if elapsed != entry.elapsed:
+            ans, auth, add = payload
+            adjusted = (
+                [
+                    dns.RRHeader(r.name.name, r.type, r.cls, r.ttl - elapsed, r.payload)
+                    for r in ans
+                ],
+                [
+                    dns.RRHeader(r.name.name, r.type, r.cls, r.ttl - elapsed, r.payload)
+                    for r in auth
+                ],
+                [
+                    dns.RRHeader(r.name.name, r.type, r.cls, r.ttl - elapsed, r.payload)
+                    for r in add
+                ],
+            )
+            if entry.hits == 1:
+                return defer.succeed(adjusted)
+            entry.adjusted = adjusted
+            entry.elapsed = elapsed
+        ans, auth, add = entry.adjusted
+        return defer.succeed((ans[:], auth[:], add[:]))
+
+    def _miss(self, name):
+        """
+        Fail a lookup which the cache cannot answer.
+
+        @param name: The name looked up.
+
+        @return: A L{Deferred} failing with L{dns.DomainError}.
+        """
+        if self.verbose > 1:
+            log.msg("Cache miss for " + repr(name))
+        self.statistics.misses += 1
+        return defer.fail(failure.Failure(dns.DomainError(name)))
 
     def lookupAllRecords(self, name, timeout=None):
         return defer.fail(failure.Failure(dns.DomainError(name)))
@@ -99,6 +323,11 @@ class CacheResolver(common.ResolverBase):
         """
         Cache a DNS entry.
 
+        An entry with no answers but with an C{SOA} record in its authority
+        section is a negative response, as described by RFC 2308: there are
+        no records of the type asked for.  It is cached for no longer than
+        the C{SOA} record's minimum field or than L{maxNegativeTTL}.
+
         @param query: a L{dns.Query} instance.
 
         @param payload: a 3-tuple of lists of L{dns.RRHeader} records, the
@@ -111,21 +340,171 @@ class CacheResolver(common.ResolverBase):
         if self.verbose > 1:
             log.msg("Adding %r to cache" % query)
 
-        self.cache[query] = (cacheTime or self._reactor.seconds(), payload)
+        records = _records(payload)
+        lifetime = min([r.ttl for r in records], default=0)
+        negative = not payload[0] and _negativeTTL(payload[1]) is not None
+        if negative:
+            lifetime = min(lifetime, _negativeTTL(payload[1]), self.maxNegativeTTL)
+        self._add(query, payload, cacheTime, lifetime, bool(records), negative, False)
+
+    def cacheNameError(self, query, authority, cacheTime=None):
+        """
+        Cache a name error: a response saying that the name queried for does
+        not exist.  Lookups of the same query will fail with
+        L{error.AuthoritativeDomainError} until it expires, so that a
+        L{ResolverChain<twisted.names.resolve.ResolverChain>} does not go on
+        to ask other resolvers.
+
+        As described by RFC 2308, the response is only cached if its
+        authority section has an C{SOA} record, and for no longer than that
+        record's minimum field or than L{maxNegativeTTL}.
 
-        if query in self.cancel:
-            self.cancel[query].cancel()
+        @param query: The L{dns.Query} which failed.
 
-        s = list(payload[0]) + list(payload[1]) + list(payload[2])
-        if s:
-            m = s[0].ttl
-            for r in s:
-                m = min(m, r.ttl)
-        else:
-            m = 0
+        @param authority: The L{dns.RRHeader} records from the authority
+            section of the response.
+
+        @param cacheTime: The time (seconds since epoch) at which the entry is
+            considered to have been added to the cache. If L{None} is given,
+            the current time is used.
+        """
+        ttl = _negativeTTL(authority)
+        if ttl is None:
+            return
+        if self.verbose > 1:
+            log.msg("Adding name error for %r to cache" % query)
+        payload = ([], list(authority), [])
+        lifetime = min(ttl, self.maxNegativeTTL)
+        self._add(query, payload, cacheTime, lifetime, True, True, True)
 
-        self.cancel[query] = self._reactor.callLater(m, self.clearEntry, query)
+    def _add(
+        self, query, payload, cacheTime, lifetime, hasRecords, negative, nameError
+    ):
+        """
+        Add an entry to the cache, evicting others if it is full, and make
+        sure it is removed when it expires.
+
+        @see: L{_CacheEntry}
+        """
+        if self.maxEntries is not None and self.maxEntries <= 0:
+            self.cache.pop(query, None)
+            return
+        when = cacheTime or self._reactor.seconds()
+        entry = _CacheEntry(when, payload, lifetime, hasRecords, negative, nameError)
+        cache = self.cache
+        # Replace any entry for the query, and put this one at the back.
+        cache.pop(query, None)
+        cache[query] = entry
+
+        if self.maxEntries is not None:
+            while len(cache) > self.maxEntries:
+                oldest, oldestEntry = cache.popitem(last=False)
+                if oldestEntry.referenced:
+                    oldestEntry.referenced = False
+                    cache[oldest] = oldestEntry
+                else:
+                    self.statistics.evictions += 1
+
+        if len(self._expiries) > 2 * len(cache) + 64:
+            # Too many of them are for entries which are gone.
+            self._expiries = [
+                item for item in self._expiries if cache.get(item[2]) is item[3]
+            ]
+            heapq.heapify(self._expiries)
+        self._serial += 1
+        heapq.heappush(self._expiries, (entry.expires, self._serial, query, entry))
+        self._schedule()
+
+    def _schedule(self):
+        """
+        Make sure that L{_sweep} will be called when the next entry expires.
+        """
+        if not self._expiries:
+            return
+        when = self._expiries[0][0]
+        sweeper = self._sweeper
+        if sweeper is not None and sweeper.active():
+            if self._sweepAt <= when:
+                return
+            sweeper.cancel()
+        self._sweepAt = when
+        self._sweeper = self._reactor.callLater(
+            max(0, when - self._reactor.seconds()), self._sweep
+        )
+
+    def _sweep(self):
+        """
+        Remove the entries which have expired.
+        """
+        self._sweeper = None
+        now = self._reactor.seconds()
+        expiries = self._expiries
+        while expiries and expiries[0][0] <= now:
+            _, _, query, entry = heapq.heappop(expiries)
+            if self.cache.get(query) is entry:
+                self.clearEntry(query)
+                self.statistics.expirations += 1
+        self._schedule()
 
     def clearEntry(self, query):
+        """
+        Remove an entry from the cache.
+
+        @param query: The L{dns.Query} of the entry.
+        """
         del self.cache[query]
-        del self.cancel[query]
+
+    def _prefetch(self, query):
+        """
+        Look up an entry again, and cache the new answer.
+
+        @param query: The L{dns.Query} of the entry.
+        """
+        if self.verbose > 1:
+            log.msg("Prefetching %r" % query)
+        self.statistics.prefetches += 1
+        self._prefetching.add(query)
+
+        def failed(reason):
+            if reason.check(error.DNSNameError) and reason.value.args:
+                message = reason.value.args[0]
+                if isinstance(message, dns.Message):
+                    self.cacheNameError(query, message.authority)
+                    return
+            # The old entry will expire as usual.
+            if self.verbose > 1:
+                log.msg("Prefetching %r failed: %s" % (query, reason.value))
+
+        d = defer.maybeDeferred(self.resolver.query, query)
+        d.addCallbacks(lambda result: self.cacheResult(query, result), failed)
+        d.addBoth(lambda ignored: self._prefetching.discard(query))
+
+
+def _records(payload):
+    """
+    @param payload: A 3-tuple of lists of L{dns.RRHeader} records.
+
+    @return: All of the records in C{payload}.
+    """
+    return list(payload[0]) + list(payload[1]) + list(payload[2])
+
+
+def _negativeTTL(authority):
+    """
+    Work out how long to cache a negative response for, as described by
+    RFC 2308 section 5: the smaller of the TTL of its C{SOA} record and that
+    record's minimum field.
+
+    @param authority: The L{dns.RRHeader} records from the authority section
+        of the response.
+
+    @return: The TTL in seconds, or L{None} if there is no C{SOA} record.
+    """
+    ttls = [
+        min(record.ttl, record.payload.minimum)
+        for record in authority
+        if record.type == dns.SOA
+    ]
+    if not ttls:
+        return None
+    return min(ttls)
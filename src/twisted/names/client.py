@@ -35,6 +35,14 @@ from twisted.internet.abstract import isIPv6Address
 moduleProvides(interfaces.IResolver)
 
 
+# How far a server's smoothed round trip time moves towards each new
+# measurement, and how many seconds it takes to halve while the server is not
+# measured, so that servers which were slow or did not answer are tried again
+# in the end.
+_RTT_GAIN = 0.3
+_RTT_HALF_LIFE = 60.0
+
+
 class Resolver(common.ResolverBase):
     """
     @ivar _waiting: A C{dict} mapping tuple keys of query name/type/class to
@@ -48,6 +56,17 @@ class Resolver(common.ResolverBase):
     @ivar _reactor: A provider of L{IReactorTCP}, L{IReactorUDP}, and
         L{IReactorTime} which will be used to set up network resources and
         track timeouts.
+
+    @ivar _portPoolSize: The most long-lived UDP ports to send queries from
+        for each interface, or C{0} to open a new port for every query.
+
+    @ivar _portPools: A C{dict} mapping interfaces to C{list}s of the
+        L{_PooledDNSDatagramProtocol}s listening on them.
+
+    @ivar _rtts: A C{dict} mapping server addresses to C{tuple}s of the
+        smoothed time, in seconds, they have taken to answer queries, and when
+        that was last measured.  Servers which have not been asked anything
+        yet are missing from it.
     """
 
     index = 0
@@ -63,13 +82,21 @@ class Resolver(common.ResolverBase):
     _lastResolvTime = None
     _resolvReadInterval = 60
 
-    def __init__(self, resolv=None, servers=None, timeout=(1, 3, 11, 45), reactor=None):
+    def __init__(
+        self,
+        resolv=None,
+        servers=None,
+        timeout=(1, 3, 11, 45),
+        reactor=None,
+        portPoolSize=0,
+    ):
         """
         Construct a resolver which will query domain name servers listed in
         the C{resolv.conf(5)}-format file given by C{resolv} as well as
-        those in the given C{servers} list.  Servers are queried in a
-        round-robin fashion.  If given, C{resolv} is periodically checked
-        for modification and re-parsed if it is noticed to have changed.
+        those in the given C{servers} list.  Servers which have answered
+        quickest are queried first, and servers which have not been queried
+        yet before those.  If given, C{resolv} is periodically checked for
+        modification and re-parsed if it is noticed to have changed.
 
         @type servers: C{list} of C{(str, int)} or L{None}
         @param servers: If not None, interpreted as a list of (host, port)
@@ -91,6 +118,17 @@ class Resolver(common.ResolverBase):
             for DNS datagrams, and enforce timeouts.  If not provided, the
             global reactor will be used.
 
+        @type portPoolSize: C{int}
+        @param portPoolSize: If not C{0}, send UDP queries from up to this
+            many long-lived ports, each bound to a random port number and
+            chosen at random for each query, rather than from a new port
+            for every query.  Opening a port is much of the cost of a query,
+            but a fixed set of ports is easier for an attacker to guess, so
+            only responses from the server queried with the ID of an
+            outstanding query to it are accepted.  Server addresses must be
+            IP addresses for them to match.  Call L{stopListening} to close
+            the ports.
+
         @raise ValueError: Raised if no nameserver addresses can be found.
         """
         common.ResolverBase.__init__(self)
@@ -119,16 +157,24 @@ class Resolver(common.ResolverBase):
 
         self._waiting = {}
 
+        self._portPoolSize = portPoolSize
+        self._portPools = {}
+        self._rtts = {}
+
         self.maybeParseConfig()
 
     def __getstate__(self):
         d = self.__dict__.copy()
         d["connections"] = []
+        d["_portPools"] = {}
         d["_parseCall"] = None
         return d
 
     def __setstate__(self, state):
         self.__dict__.update(state)
+        self.__dict__.setdefault("_portPoolSize", 0)
+        self.__dict__.setdefault("_portPools", {})
+        self.__dict__.setdefault("_rtts", {})
         self.maybeParseConfig()
 
     def _openFile(self, path):
@@ -187,13 +233,13 @@ class Resolver(common.ResolverBase):
 
     def pickServer(self):
         """
-        Return the address of a nameserver.
-
-        TODO: Weight servers for response time so faster ones can be
-        preferred.
+        Return the address of a nameserver: the one L{_byRTT} puts first once
+        any server has answered a UDP query, and each in turn before then.
         """
         if not self.servers and not self.dynServers:
             return None
+        if self._rtts:
+            return self._byRTT(self.servers + list(self.dynServers))[0]
         serverL = len(self.servers)
         dynL = len(self.dynServers)
 
@@ -209,9 +255,31 @@ class Resolver(common.ResolverBase):
         Return a new L{DNSDatagramProtocol} bound to a randomly selected port
         number.
         """
-        failures = 0
         proto = dns.DNSDatagramProtocol(self, reactor=self._reactor)
+        self._listenRandomPort(proto, interface)
+        return proto
 
+    def _pooledProtocol(self, interface=""):
+        """
+        Return one of the L{_PooledDNSDatagramProtocol}s listening on
+        C{interface}, chosen at random, listening on a new one bound to a
+        randomly selected port number first if there are fewer than
+        C{portPoolSize} of them.
+        """
+        pool = self._portPools.setdefault(interface, [])
+        if len(pool) < self._portPoolSize:
+            proto = _PooledDNSDatagramProtocol(self, reactor=self._reactor)
+            self._listenRandomPort(proto, interface)
+            pool.append(proto)
+            return proto
+        return pool[dns.randomSource() % len(pool)]
+
+    def _listenRandomPort(self, proto, interface):
+        """
+        Listen for UDP datagrams with C{proto} on C{interface}, bound to a
+        cryptographically secure random port number.
+        """
+        failures = 0
         while True:
             try:
                 self._reactor.listenUDP(dns.randomSource(), proto, interface=interface)
@@ -231,7 +299,22 @@ class Resolver(common.ResolverBase):
                     # else weird is going on. Raise, as to not infinite loop.
                     raise
             else:
-                return proto
+                return
+
+    def stopListening(self):
+        """
+        Stop listening on the ports kept open for queries if the resolver was
+        constructed with a C{portPoolSize}.  Queries made afterwards listen on
+        new ones.
+
+        @return: A L{Deferred} which fires when all of the ports have
+            stopped listening.
+        """
+        protocols = [proto for pool in self._portPools.values() for proto in pool]
+        self._portPools = {}
+        return defer.gatherResults(
+            [defer.maybeDeferred(proto.transport.stopListening) for proto in protocols]
+        )
 
     def connectionMade(self, protocol):
         """
@@ -252,31 +335,107 @@ class Resolver(common.ResolverBase):
     def messageReceived(self, message, protocol, address=None):
         log.msg("Unexpected message (%d) received from %r" % (message.id, address))
 
-    def _query(self, *args):
+    def _query(self, address, queries, timeout, id=None):
         """
         Get a new L{DNSDatagramProtocol} instance from L{_connectedProtocol},
-        issue a query to it using C{*args}, and arrange for it to be
-        disconnected from its transport after the query completes.
+        issue a query to it, and arrange for it to be disconnected from its
+        transport after the query completes; or, with a C{portPoolSize}, issue
+        the query to one from L{_pooledProtocol} which is left listening.
+        Either way, note how long the server took to answer in L{_rtts}.
+
+        @param address: The address of the server to query.
+
+        @param queries: The L{dns.Query}s to issue.
 
-        @param args: Positional arguments to be passed to
-            L{DNSDatagramProtocol.query}.
+        @param timeout: The number of seconds to wait for a response.
+
+        @param id: The ID to give the query, or L{None} to pick one.
 
         @return: A L{Deferred} which will be called back with the result of the
             query.
         """
-        if isIPv6Address(args[0][0]):
-            protocol = self._connectedProtocol(interface="::")
+        interface = "::" if isIPv6Address(address[0]) else ""
+        if self._portPoolSize:
+            d = self._pooledProtocol(interface).query(address, queries, timeout, id)
         else:
-            protocol = self._connectedProtocol()
-        d = protocol.query(*args)
+            if interface:
+                protocol = self._connectedProtocol(interface=interface)
+            else:
+                protocol = self._connectedProtocol()
+            d = protocol.query(address, queries, timeout, id)
 
-        def cbQueried(result):
-            protocol.transport.stopListening()
-            return result
+            def cbQueried(result):
+                protocol.transport.stopListening()
+                return result
 
-        d.addBoth(cbQueried)
+            d.addBoth(cbQueried)
+        d.addBoth(self._measureRTT, address, timeout, self._reactor.seconds())
         return d
 
+    def _measureRTT(self, result, address, timeout, sent):
+        """
+        Fold the time a server took to answer a query into its smoothed round
+        trip time, which is doubled, to at least the query's timeout, if it
+        did not answer in time.
+
+        @param result: The result of the query, passed through.
+
+        @param address: The address of the server queried.
+
+        @param timeout: The number of seconds the server had to answer.
+
+        @param sent: When the query was sent.
+        """
+        address = tuple(address)
+        now = self._reactor.seconds()
+        rtt = self._currentRTT(address, now)
+        if not isinstance(result, failure.Failure):
+            sample = now - sent
+            if rtt is None:
+                self._rtts[address] = (sample, now)
+            else:
+                self._rtts[address] = (rtt + (sample - rtt) * _RTT_GAIN, now)
+        elif result.check(dns.DNSQueryTimeoutError):
+            self._rtts[address] = (max(timeout, (rtt or 0) * 2), now)
+        return result
+
+    def _currentRTT(self, address, now):
+        """
+        Find a server's smoothed round trip time, halved for every
+        L{_RTT_HALF_LIFE} seconds since it was last measured.
+
+        @param address: The address of the server, as a C{tuple}.
+
+        @param now: The current time.
+
+        @return: The time, or L{None} if the server has not been measured.
+        """
+        measured = self._rtts.get(address)
+        if measured is None:
+            return None
+        rtt, when = measured
+        return rtt * 0.5 ** ((now - when) / _RTT_HALF_LIFE)
+
+    def _byRTT(self, addresses):
+        """
+        Order server addresses by their smoothed round trip times, as
+        L{_currentRTT} decays them, those not yet measured first, and
+        otherwise as given.
+
+        @param addresses: A C{list} of server addresses.
+
+        @return: The reordered C{list}.
+        """
+        if not self._rtts:
+            return addresses
+        now = self._reactor.seconds()
+
+        def key(address):
+            rtt = self._currentRTT(tuple(address), now)
+            return 0 if rtt is None else rtt
+
+        return sorted(addresses, key=key)
+
     def queryUDP(self, queries, timeout=None):
         """
         Make a number of DNS queries via UDP.
@@ -295,12 +454,12 @@ class Resolver(common.ResolverBase):
         if timeout is None:
             timeout = self.timeout
 
-        addresses = self.servers + list(self.dynServers)
+        addresses = self._byRTT(self.servers + list(self.dynServers))
         if not addresses:
             return defer.fail(IOError("No domain name servers available"))
 
         # Make sure we go through servers in the list in the order they were
-        # specified.
+        # ranked.
         addresses.reverse()
 
         used = addresses.pop()
@@ -451,6 +610,103 @@ class Resolver(common.ResolverBase):
         return (result, [], [])
 
 
+class _PooledDNSDatagramProtocol(dns.DNSDatagramProtocol):
+    """
+    A L{dns.DNSDatagramProtocol} which is kept listening for queries to many
+    servers, so tracks its outstanding queries by server as well as by ID.
+
+    @ivar liveMessages: A C{dict} mapping C{(id, (host, port))} tuples of
+        outstanding queries to their L{Deferred}s and timeout calls.
+    """
+
+    def stopProtocol(self):
+        """
+        Stop protocol: reset state variables, and take this protocol out of
+        the controller's pool of them.
+        """
+        dns.DNSDatagramProtocol.stopProtocol(self)
+        for pool in self.controller._portPools.values():
+            if self in pool:
+                pool.remove(self)
+
+    def pickID(self, address):
+        """
+        Return a random ID for a query to C{address} which no outstanding
+        query to it has.
+        """
+        while True:
+            id = dns.randomSource()
+            if (id, address) not in self.liveMessages:
+                return id
+
+    def query(self, address, queries, timeout=10, id=None):
+        """
+        Send out a message with the given queries.
+
+        @type address: L{tuple} of L{str} and L{int}
+        @param address: The address to which to send the query
+
+        @type queries: L{list} of C{Query} instances
+        @param queries: The queries to transmit
+
+        @param id: The ID to give the query, if no outstanding query to
+            C{address} has it already.
+
+        @rtype: C{Deferred}
+        """
+        if self.transport is None:
+            return defer.fail(error.NotListeningError())
+
+        address = tuple(address[:2])
+        if id is None or (id, address) in self.liveMessages:
+            id = self.pickID(address)
+
+        m = dns.Message(id, recDes=1)
+        m.queries = queries
+        try:
+            self.writeMessage(m, address)
+        except BaseException:
+            return defer.fail()
+
+        key = (id, address)
+        resultDeferred = defer.Deferred()
+        cancelCall = self.callLater(timeout, self._clearFailed, resultDeferred, key)
+        self.liveMessages[key] = (resultDeferred, cancelCall)
+        return resultDeferred
+
+    def _clearFailed(self, deferred, key):
+        """
+        Clean the Deferred after a timeout.
+        """
+        self.liveMessages.pop(key, None)
+        deferred.errback(failure.Failure(dns.DNSQueryTimeoutError(key[0])))
+
+    def datagramReceived(self, data, addr):
+        """
+        Read a datagram, extract the message in it and trigger the Deferred
+        of the outstanding query to C{addr} with its ID.  Messages from any
+        other address, including ones spoofed to look like answers to a query
+        to another server, are passed to the controller.
+        """
+        m = dns.Message()
+        try:
+            m.fromStr(data)
+        except EOFError:
+            log.msg("Truncated packet (%d bytes) from %s" % (len(data), addr))
+            return
+        except BaseException:
+            log.err(failure.Failure(), "Unexpected decoding error")
+            return
+
+        key = (m.id, addr[:2])
+        if key in self.liveMessages:
+            d, canceller = self.liveMessages.pop(key)
+            canceller.cancel()
+            d.callback(m)
+        else:
+            self.controller.messageReceived(m, self, addr)
+
+
 class AXFRController:
     timeoutCall = None
 
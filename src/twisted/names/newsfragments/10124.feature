@@ -0,0 +1 @@
+twisted.names.cache.CacheResolver now holds at most maxEntries entries, caches negative responses, and refreshes popular entries before they expire.
@@ -0,0 +1 @@
+twisted.names.client.Resolver now sends queries to the nameserver which has been answering quickest, and can keep a pool of UDP ports open to send queries from, with its new portPoolSize argument.
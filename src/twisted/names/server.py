@@ -20,7 +20,7 @@ for resolvers to deal with.  Fix it.
 import time
 
 from twisted.internet import protocol
-from twisted.names import dns, resolve
+from twisted.names import dns, error, resolve
 from twisted.python import log
 
 
@@ -31,8 +31,10 @@ class DNSServerFactory(protocol.ServerFactory):
 
     @ivar cache: A L{Cache<twisted.names.cache.CacheResolver>} instance whose
         C{cacheResult} method is called when a response is received from one of
-        C{clients}. Defaults to L{None} if no caches are specified. See
-        C{caches} of L{__init__} for more details.
+        C{clients}, and whose C{cacheNameError} method is called when one of
+        them fails with L{twisted.names.error.DNSNameError}. Defaults to
+        L{None} if no caches are specified. See C{caches} of L{__init__} for
+        more details.
     @type cache: L{Cache<twisted.names.cache.CacheResolver>} or L{None}
 
     @ivar canRecurse: A flag indicating whether this server is capable of
@@ -305,6 +307,9 @@ class DNSServerFactory(protocol.ServerFactory):
 
         An error message will be logged if C{DNSServerFactory.verbose} is C{>1}.
 
+        Name errors with a response message are given to
+        C{DNSServerFactory.cache}, if there is one.
+
         @param failure: The reason for the failed resolution (as reported by
             C{self.resolver.query}).
         @type failure: L{Failure<twisted.python.failure.Failure>}
@@ -332,6 +337,13 @@ class DNSServerFactory(protocol.ServerFactory):
         self.sendReply(protocol, response, address)
         self._verboseLog("Lookup failed")
 
+        if self.cache and failure.check(error.DNSNameError) and failure.value.args:
+            nameErrorMessage = failure.value.args[0]
+            if isinstance(nameErrorMessage, dns.Message):
+                self.cache.cacheNameError(
+                    message.queries[0], nameErrorMessage.authority
+                )
+
     def handleQuery(self, message, protocol, address):
         """
         Called by L{DNSServerFactory.messageReceived} when a query message is
@@ -28,6 +28,7 @@ class Options(usage.Options):
             "Override location of resolv.conf (implies --recursive)",
         ],
         ["hosts-file", None, None, "Perform lookups with a hosts file"],
+        ["cache-size", None, "10000", "The most query responses to cache"],
     ]
 
     optFlags = [
@@ -112,6 +113,16 @@ class Options(usage.Options):
             self["port"] = int(self["port"])
         except ValueError:
             raise usage.UsageError("Invalid port: {!r}".format(self["port"]))
+        try:
+            self["cache-size"] = int(self["cache-size"])
+        except ValueError:
+            raise usage.UsageError(
+                "Invalid cache size: {!r}".format(self["cache-size"])
+            )
+        if self["cache-size"] < 0:
+            raise usage.UsageError(
+                "Invalid cache size: {!r}".format(self["cache-size"])
+            )
 
 
 def _buildResolvers(config):
@@ -125,15 +136,23 @@ def _buildResolvers(config):
     @return: Two-item tuple of a list of cache resovers and a list of client
         resolvers
     """
-    from twisted.names import client, cache, hosts
+    from twisted.names import client, cache, hosts, resolve
 
     ca, cl = [], []
-    if config["cache"]:
-        ca.append(cache.CacheResolver(verbose=config["verbose"]))
     if config["hosts-file"]:
         cl.append(hosts.Resolver(file=config["hosts-file"]))
     if config["recursive"]:
         cl.append(client.createResolver(resolvconf=config["resolv-conf"]))
+    if config["cache"]:
+        # Popular records are looked up again with the clients before they
+        # expire.
+        ca.append(
+            cache.CacheResolver(
+                verbose=config["verbose"],
+                maxEntries=config["cache-size"],
+                resolver=resolve.ResolverChain(cl) if cl else None,
+            )
+        )
     return ca, cl
 
 
@@ -12,8 +12,8 @@ from zope.interface.verify import verifyClass
 
 from twisted.trial import unittest
 
-from twisted.names import dns, cache
-from twisted.internet import task, interfaces
+from twisted.names import dns, cache, error, resolve
+from twisted.internet import defer, task, interfaces
 
 
 class CachingTests(unittest.TestCase):
@@ -189,3 +189,345 @@ class CachingTests(unittest.TestCase):
         clock.advance(60.1)
 
         return self.assertFailure(c.lookupAddress(b"example.com"), dns.DomainError)
+
+
+def _answer(name=b"example.com", ttl=60):
+    """
+    Make a response with one A record.
+
+    @return: A 3-tuple of lists of L{dns.RRHeader} records.
+    """
+    return (
+        [dns.RRHeader(name, dns.A, dns.IN, ttl, dns.Record_A("127.0.0.1", ttl))],
+        [],
+        [],
+    )
+
+
+def _soa(ttl=3600, minimum=300):
+    """
+    Make the authority section of a negative response.
+
+    @return: A L{list} with one C{SOA} L{dns.RRHeader}.
+    """
+    return [
+        dns.RRHeader(
+            b"example.com",
+            dns.SOA,
+            dns.IN,
+            ttl,
+            dns.Record_SOA(b"ns.example.com", minimum=minimum, ttl=ttl),
+        )
+    ]
+
+
+def _query(name=b"example.com", type=dns.A):
+    return dns.Query(name=name, type=type, cls=dns.IN)
+
+
+class FakeResolver:
+    """
+    A resolver whose queries are answered by the test.
+
+    @ivar queries: The queries made, with the L{defer.Deferred} for each.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def query(self, query, timeout=None):
+        d = defer.Deferred()
+        self.queries.append((query, d))
+        return d
+
+
+class BoundedCachingTests(unittest.TestCase):
+    """
+    Tests for the size limit, negative caching, expiry, prefetching and
+    statistics of L{cache.CacheResolver}.
+    """
+
+    def setUp(self):
+        self.clock = task.Clock()
+
+    def resolver(self, **kwargs):
+        return cache.CacheResolver(reactor=self.clock, **kwargs)
+
+    def test_evictsLeastRecentlyUsed(self):
+        """
+        Once there are more than C{maxEntries} entries, the oldest entry
+        which has not been served since it was added or last given a second
+        chance is evicted.
+        """
+        c = self.resolver(maxEntries=2)
+        names = [b"a.example.com", b"b.example.com", b"c.example.com"]
+        c.cacheResult(_query(names[0]), _answer(names[0]))
+        c.cacheResult(_query(names[1]), _answer(names[1]))
+        self.successResultOf(c.lookupAddress(names[0]))
+        c.cacheResult(_query(names[2]), _answer(names[2]))
+
+        self.assertEqual(list(c.cache), [_query(names[2]), _query(names[0])])
+        self.failureResultOf(c.lookupAddress(names[1]), dns.DomainError)
+        self.assertEqual(c.statistics.evictions, 1)
+
+        # a.example.com has had its second chance.
+        c.cacheResult(_query(names[1]), _answer(names[1]))
+        self.assertEqual(list(c.cache), [_query(names[0]), _query(names[1])])
+
+    def test_unbounded(self):
+        """
+        If C{maxEntries} is L{None}, nothing is evicted.
+        """
+        c = self.resolver(maxEntries=None)
+        for i in range(20000):
+            name = b"%d.example.com" % (i,)
+            c.cacheResult(_query(name), _answer(name))
+        self.assertEqual(len(c.cache), 20000)
+        self.assertEqual(c.statistics.evictions, 0)
+
+    def test_noEntries(self):
+        """
+        If C{maxEntries} is not positive, nothing is cached.
+        """
+        for maxEntries in [0, -1]:
+            c = self.resolver(maxEntries=maxEntries)
+            c.cacheResult(_query(b"example.com"), _answer(b"example.com"))
+            c.cacheNameError(_query(b"example.org"), _soa())
+            self.assertEqual(len(c.cache), 0)
+            self.assertEqual(self.clock.getDelayedCalls(), [])
+
+    def test_oneTimer(self):
+        """
+        However many entries there are, one timed call removes them when they
+        expire, and it is due when the first of them expires.
+        """
+        c = self.resolver()
+        for ttl in [60, 30, 90, 30]:
+            name = b"%d.example.com" % (ttl,)
+            c.cacheResult(_query(name), _answer(name, ttl))
+        [call] = self.clock.getDelayedCalls()
+        self.assertEqual(call.getTime(), 30)
+
+        self.clock.advance(30)
+        self.assertEqual(len(c.cache), 2)
+        [call] = self.clock.getDelayedCalls()
+        self.assertEqual(call.getTime(), 60)
+
+        self.clock.advance(60)
+        self.assertEqual(len(c.cache), 0)
+        self.assertEqual(self.clock.getDelayedCalls(), [])
+        self.assertEqual(c.statistics.expirations, 3)
+
+    def test_replacedEntryExpiry(self):
+        """
+        An entry which is cached again expires when the new entry does.
+        """
+        c = self.resolver()
+        c.cacheResult(_query(), _answer(ttl=10))
+        self.clock.advance(5)
+        c.cacheResult(_query(), _answer(ttl=10))
+        self.clock.advance(5)
+        self.assertIn(_query(), c.cache)
+        self.clock.advance(5)
+        self.assertNotIn(_query(), c.cache)
+
+    def test_clearEntry(self):
+        """
+        L{cache.CacheResolver.clearEntry} removes an entry before it expires.
+        """
+        c = self.resolver()
+        c.cacheResult(_query(), _answer())
+        c.clearEntry(_query())
+        self.failureResultOf(c.lookupAddress(b"example.com"), dns.DomainError)
+        self.clock.advance(60)
+        self.assertEqual(c.statistics.expirations, 0)
+
+    def test_sameSecond(self):
+        """
+        Lookups of an entry which has been served before are given the same
+        records, in new lists, until another second has passed.
+        """
+        c = self.resolver()
+        c.cacheResult(_query(), _answer())
+        self.clock.advance(0.2)
+        first = self.successResultOf(c.lookupAddress(b"example.com"))
+        second = self.successResultOf(c.lookupAddress(b"example.com"))
+        self.clock.advance(0.5)
+        third = self.successResultOf(c.lookupAddress(b"example.com"))
+        self.assertIsNot(first[0][0], second[0][0])
+        self.assertIs(second[0][0], third[0][0])
+        self.assertIsNot(second[0], third[0])
+        self.assertEqual(first[0][0].ttl, 59)
+        self.assertEqual(third[0][0].ttl, 59)
+
+        self.clock.advance(0.5)
+        fourth = self.successResultOf(c.lookupAddress(b"example.com"))
+        self.assertEqual(fourth[0][0].ttl, 58)
+
+    def test_noData(self):
+        """
+        A response with no answers and an C{SOA} record is cached for no
+        longer than the C{SOA} record's minimum field.
+        """
+        c = self.resolver()
+        c.cacheResult(_query(), ([], _soa(minimum=300), []))
+        self.clock.advance(299)
+        ans, auth, add = self.successResultOf(c.lookupAddress(b"example.com"))
+        self.assertEqual((ans, add), ([], []))
+        self.assertEqual(auth[0].type, dns.SOA)
+        self.assertEqual(c.statistics.negativeHits, 1)
+        self.clock.advance(1)
+        self.failureResultOf(c.lookupAddress(b"example.com"), dns.DomainError)
+
+    def test_negativeTTLFromSOA(self):
+        """
+        A negative response is cached for no longer than its C{SOA} record's
+        TTL, if that is shorter than its minimum field.
+        """
+        c = self.resolver()
+        c.cacheResult(_query(), ([], _soa(ttl=100, minimum=300), []))
+        self.clock.advance(99)
+        self.assertIn(_query(), c.cache)
+        self.clock.advance(1)
+        self.assertNotIn(_query(), c.cache)
+
+    def test_maxNegativeTTL(self):
+        """
+        A negative response is cached for no longer than C{maxNegativeTTL}.
+        """
+        c = self.resolver(maxNegativeTTL=60)
+        c.cacheResult(_query(), ([], _soa(minimum=300), []))
+        c.cacheNameError(_query(b"other.example.com"), _soa(minimum=300))
+        self.clock.advance(60)
+        self.assertEqual(len(c.cache), 0)
+
+    def test_nameError(self):
+        """
+        A name error cached with L{cache.CacheResolver.cacheNameError} fails
+        lookups with L{error.AuthoritativeDomainError} until it expires.
+        """
+        c = self.resolver()
+        c.cacheNameError(_query(), _soa(minimum=300))
+        self.failureResultOf(
+            c.lookupAddress(b"example.com"), error.AuthoritativeDomainError
+        )
+        self.assertEqual(c.statistics.hits, 1)
+        self.assertEqual(c.statistics.negativeHits, 1)
+        self.clock.advance(300)
+        self.assertNotIn(_query(), c.cache)
+        self.failureResultOf(c.lookupAddress(b"example.com"), dns.DomainError)
+
+    def test_nameErrorWithoutSOA(self):
+        """
+        A name error without an C{SOA} record is not cached.
+        """
+        c = self.resolver()
+        c.cacheNameError(_query(), [])
+        self.assertEqual(len(c.cache), 0)
+
+    def test_nameErrorStopsChain(self):
+        """
+        A L{resolve.ResolverChain} does not ask the resolvers after a cache
+        which has a name error cached.
+        """
+        c = self.resolver()
+        c.cacheNameError(_query(), _soa())
+        after = FakeResolver()
+        chain = resolve.ResolverChain([c, after])
+        self.failureResultOf(
+            chain.lookupAddress(b"example.com"), error.AuthoritativeDomainError
+        )
+        self.assertEqual(after.queries, [])
+
+    def test_statistics(self):
+        """
+        L{cache.CacheResolver.statistics} counts hits and misses.
+        """
+        c = self.resolver()
+        self.assertEqual(c.statistics.hitRate, 0.0)
+        c.cacheResult(_query(), _answer())
+        for name in [b"example.com", b"example.com", b"example.org"]:
+            c.lookupAddress(name).addErrback(lambda f: None)
+        self.assertEqual(c.statistics, cache.CacheResolverStatistics(hits=2, misses=1))
+        self.assertEqual(c.statistics.hitRate, 2 / 3)
+
+    def test_prefetch(self):
+        """
+        An entry served C{prefetchHits} times in the last C{prefetchFraction}
+        of its lifetime is looked up again once, and served until the new
+        answer is cached.
+        """
+        resolver = FakeResolver()
+        c = self.resolver(resolver=resolver, prefetchHits=2, prefetchFraction=0.5)
+        c.cacheResult(_query(), _answer(ttl=60))
+        self.successResultOf(c.lookupAddress(b"example.com"))
+        self.clock.advance(29)
+        self.successResultOf(c.lookupAddress(b"example.com"))
+        self.assertEqual(resolver.queries, [])
+
+        self.clock.advance(1)
+        self.successResultOf(c.lookupAddress(b"example.com"))
+        self.successResultOf(c.lookupAddress(b"example.com"))
+        [(query, d)] = resolver.queries
+        self.assertEqual(query, _query())
+        self.assertEqual(c.statistics.prefetches, 1)
+
+        d.callback(_answer(ttl=60))
+        self.clock.advance(40)
+        ans, auth, add = self.successResultOf(c.lookupAddress(b"example.com"))
+        self.assertEqual(ans[0].ttl, 20)
+
+    def test_prefetchNameError(self):
+        """
+        If looking up an entry again finds that the name does not exist, the
+        name error is cached.
+        """
+        resolver = FakeResolver()
+        c = self.resolver(resolver=resolver, prefetchHits=1, prefetchFraction=1)
+        c.cacheResult(_query(), _answer(ttl=60))
+        self.successResultOf(c.lookupAddress(b"example.com"))
+        [(query, d)] = resolver.queries
+        response = dns.Message(rCode=dns.ENAME)
+        response.authority = _soa()
+        d.errback(error.DNSNameError(response))
+        self.failureResultOf(
+            c.lookupAddress(b"example.com"), error.AuthoritativeDomainError
+        )
+
+    def test_prefetchFailure(self):
+        """
+        If looking up an entry again fails, the entry is served until it
+        expires.
+        """
+        resolver = FakeResolver()
+        c = self.resolver(resolver=resolver, prefetchHits=1, prefetchFraction=1)
+        c.cacheResult(_query(), _answer(ttl=60))
+        self.successResultOf(c.lookupAddress(b"example.com"))
+        [(query, d)] = resolver.queries
+        d.errback(error.DNSServerError())
+        self.successResultOf(c.lookupAddress(b"example.com"))
+        self.clock.advance(60)
+        self.failureResultOf(c.lookupAddress(b"example.com"), dns.DomainError)
+
+    def test_pickle(self):
+        """
+        A pickled L{cache.CacheResolver} is unpickled with its unexpired
+        entries, including name errors.
+        """
+        c = self.resolver()
+        c.cacheResult(_query(), _answer(ttl=60))
+        c.cacheResult(_query(b"short.example.com"), _answer(ttl=5))
+        c.cacheNameError(_query(b"missing.example.com"), _soa())
+        state = c.__getstate__()
+        self.clock.advance(10)
+
+        restored = cache.CacheResolver.__new__(cache.CacheResolver)
+        restored.__setstate__(state)
+        self.assertEqual(
+            list(restored.cache), [_query(), _query(b"missing.example.com")]
+        )
+        self.failureResultOf(
+            restored.lookupAddress(b"missing.example.com"),
+            error.AuthoritativeDomainError,
+        )
+        self.assertEqual(len(self.clock.getDelayedCalls()), 2)
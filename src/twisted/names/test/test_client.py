@@ -823,6 +823,243 @@ class ResolverTests(unittest.TestCase):
         self.assertEqual(len(prePending), 0)
 
 
+class PortPoolTests(unittest.TestCase):
+    """
+    Tests for L{client.Resolver} constructed with a C{portPoolSize}.
+    """
+
+    def setUp(self):
+        self.reactor = test_util.MemoryReactor()
+        self.server = ("127.0.0.1", 53)
+        self.resolver = client.Resolver(
+            servers=[self.server], reactor=self.reactor, portPoolSize=2
+        )
+
+    def sent(self):
+        """
+        Return the messages sent so far, with the ports they were sent from
+        and the addresses they were sent to.
+        """
+        sent = []
+        for port, transport in self.reactor.udpPorts.items():
+            for data, address in transport._sentPackets:
+                message = dns.Message()
+                message.fromStr(data)
+                sent.append((message, port, address))
+        return sent
+
+    def respond(self, message, port, address):
+        """
+        Deliver a response to C{message} from C{address} to C{port}.
+        """
+        response = dns.Message(message.id, answer=1)
+        response.queries = message.queries
+        protocol = self.reactor.udpPorts[port]._protocol
+        protocol.datagramReceived(response.toStr(), address)
+
+    def test_portsReused(self):
+        """
+        Queries are sent from no more than C{portPoolSize} ports, which keep
+        listening after they are answered.
+        """
+        for i in range(5):
+            self.resolver.lookupAddress(b"host%d.example.com" % (i,))
+        self.assertEqual(len(self.reactor.udpPorts), 2)
+        self.assertEqual(len(self.sent()), 5)
+
+        for message, port, address in self.sent():
+            self.respond(message, port, address)
+        self.resolver.lookupAddress(b"example.com")
+        self.assertEqual(len(self.reactor.udpPorts), 2)
+        self.assertEqual(len(self.sent()), 6)
+
+    def test_response(self):
+        """
+        A response from the server queried with the ID of the query answers
+        it.
+        """
+        d = self.resolver.lookupAddress(b"example.com")
+        [(message, port, address)] = self.sent()
+        self.assertEqual(address, self.server)
+        self.respond(message, port, address)
+        self.assertEqual(self.successResultOf(d), ([], [], []))
+
+    def test_responseFromOtherAddress(self):
+        """
+        A response with the ID of an outstanding query from an address other
+        than the one queried is ignored, and the query times out.
+        """
+        d = self.resolver.lookupAddress(b"example.com", timeout=[1])
+        [(message, port, address)] = self.sent()
+        self.respond(message, port, ("127.0.0.2", 53))
+        self.assertNoResult(d)
+        self.reactor.advance(1)
+        self.failureResultOf(d, defer.TimeoutError)
+
+    def test_ipv6Response(self):
+        """
+        A response from an IPv6 server is matched to its query although the
+        address it comes from includes the flow information and scope ID.
+        """
+        self.resolver.servers = [("::1", 53)]
+        d = self.resolver.lookupAddress(b"example.com")
+        [(message, port, address)] = self.sent()
+        self.respond(message, port, ("::1", 53, 0, 0))
+        self.assertEqual(self.successResultOf(d), ([], [], []))
+
+    def test_timeout(self):
+        """
+        An unanswered query fails with L{DNSQueryTimeoutError} and is no
+        longer outstanding.
+        """
+        protocol = self.resolver._pooledProtocol()
+        d = protocol.query(self.server, [dns.Query(b"example.com")], 1, 1234)
+        self.assertEqual(list(protocol.liveMessages), [(1234, self.server)])
+        self.reactor.advance(1)
+        self.assertEqual(self.failureResultOf(d, DNSQueryTimeoutError).value.id, 1234)
+        self.assertEqual(protocol.liveMessages, {})
+
+    def test_pickID(self):
+        """
+        The ID picked for a query is not that of an outstanding query to the
+        same server, but may be that of one to another server.
+        """
+        protocol = self.resolver._pooledProtocol()
+        ids = iter([7, 7, 8])
+        self.patch(dns, "randomSource", lambda: next(ids))
+        protocol.query(("127.0.0.2", 53), [dns.Query(b"example.com")])
+        protocol.query(self.server, [dns.Query(b"example.com")])
+        protocol.query(self.server, [dns.Query(b"example.com")])
+        self.assertEqual(
+            sorted(protocol.liveMessages),
+            [(7, ("127.0.0.1", 53)), (7, ("127.0.0.2", 53)), (8, ("127.0.0.1", 53))],
+        )
+
+    def test_stopListening(self):
+        """
+        L{client.Resolver.stopListening} stops the pooled ports listening, and
+        later queries listen on new ones.
+        """
+        self.resolver.lookupAddress(b"example.com")
+        [transport] = self.reactor.udpPorts.values()
+        protocol = transport._protocol
+        self.successResultOf(self.resolver.stopListening())
+        self.assertIsNone(protocol.transport)
+
+        self.resolver.lookupAddress(b"other.example.com")
+        self.assertEqual(len(self.reactor.udpPorts), 2)
+        self.assertEqual(len(self.resolver._portPools[""]), 1)
+
+
+class RoundTripTimeTests(unittest.TestCase):
+    """
+    Tests for the ordering of servers by L{client.Resolver} by how quickly
+    they answer.
+    """
+
+    def setUp(self):
+        self.clock = Clock()
+        self.protocol = StubDNSDatagramProtocol()
+        self.servers = [("127.0.0.1", 53), ("127.0.0.2", 53)]
+        self.resolver = client.Resolver(servers=self.servers, reactor=self.clock)
+        self.resolver._connectedProtocol = lambda: self.protocol
+
+    def answer(self, after):
+        """
+        Answer the last query issued after C{after} seconds.
+
+        @return: The address the query was issued to.
+        """
+        address, queries, timeout, id, result = self.protocol.queries.pop()
+        self.clock.advance(after)
+        result.callback(dns.Message())
+        return address
+
+    def test_unmeasuredFirst(self):
+        """
+        Servers which have not been queried are tried before those which
+        have answered.
+        """
+        self.resolver.queryUDP([dns.Query(b"example.com")])
+        self.assertEqual(self.answer(0.5), self.servers[0])
+        self.resolver.queryUDP([dns.Query(b"example.com")])
+        self.assertEqual(self.answer(0.1), self.servers[1])
+        self.assertAlmostEqual(self.resolver._rtts[self.servers[1]][0], 0.1)
+
+    def test_fastestFirst(self):
+        """
+        Once all servers have answered, the one which answered quickest is
+        queried first, and remains so while it answers quickest.
+        """
+        self.resolver.queryUDP([dns.Query(b"example.com")])
+        self.answer(0.5)
+        self.resolver.queryUDP([dns.Query(b"example.com")])
+        self.answer(0.1)
+        for i in range(3):
+            self.resolver.queryUDP([dns.Query(b"example.com")])
+            self.assertEqual(self.answer(0.2), self.servers[1])
+        self.assertEqual(self.resolver.pickServer(), self.servers[1])
+
+    def test_smoothed(self):
+        """
+        A server's round trip time moves part of the way towards each new
+        measurement of it.
+        """
+        self.resolver.servers = self.servers[:1]
+        self.resolver.queryUDP([dns.Query(b"example.com")])
+        self.answer(1.0)
+        self.resolver.queryUDP([dns.Query(b"example.com")])
+        self.answer(0.0)
+        self.assertAlmostEqual(
+            self.resolver._rtts[self.servers[0]][0], 1.0 - client._RTT_GAIN
+        )
+
+    def test_timeoutPenalized(self):
+        """
+        A server which does not answer in time is tried after those which do,
+        until enough time has passed for its round trip time to decay past
+        theirs.
+        """
+        self.resolver.queryUDP([dns.Query(b"example.com")], timeout=[1, 1])
+        address, queries, timeout, id, result = self.protocol.queries.pop()
+        self.assertEqual(address, self.servers[0])
+        result.errback(DNSQueryTimeoutError(id))
+        self.assertEqual(self.answer(0.5), self.servers[1])
+        self.assertEqual(self.resolver._rtts[self.servers[0]][0], 1)
+
+        # Its time of 1 second halves to the other's 0.5 seconds in one half
+        # life, however many queries the other answers meanwhile.
+        for i in range(1000):
+            self.resolver.queryUDP([dns.Query(b"example.com")])
+            asked = self.clock.seconds()
+            if self.answer(0.5) == self.servers[0]:
+                break
+        self.assertGreaterEqual(asked, client._RTT_HALF_LIFE)
+        self.assertLess(asked, client._RTT_HALF_LIFE + 2)
+
+    def test_pickServerUnchanged(self):
+        """
+        L{client.Resolver.pickServer} does not change the round trip times it
+        orders servers by, however often it is called.
+        """
+        self.resolver.queryUDP([dns.Query(b"example.com")])
+        self.answer(0.5)
+        self.resolver.queryUDP([dns.Query(b"example.com")])
+        self.answer(0.1)
+        rtts = dict(self.resolver._rtts)
+        for i in range(1000):
+            self.assertEqual(self.resolver.pickServer(), self.servers[1])
+        self.assertEqual(self.resolver._rtts, rtts)
+
+    def test_unmeasuredPickServer(self):
+        """
+        Before any server has answered, L{client.Resolver.pickServer} picks
+        each server in turn.
+        """
+        picked = [self.resolver.pickServer() for i in range(4)]
+        self.assertEqual(picked, self.servers[1:] + self.servers + self.servers[:1])
+
+
 class ClientTests(unittest.TestCase):
     def setUp(self):
         """
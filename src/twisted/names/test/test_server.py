@@ -183,6 +183,18 @@ class RaisingCache:
         """
         raise self.CacheResultArguments(args, kwargs)
 
+    def cacheNameError(self, *args, **kwargs):
+        """
+        Raises the supplied arguments.
+
+        @param args: Positional arguments
+        @type args: L{tuple}
+
+        @param kwargs: Keyword args
+        @type kwargs: L{dict}
+        """
+        raise self.CacheResultArguments(args, kwargs)
+
 
 def assertLogMessage(testCase, expectedMessages, callable, *args, **kwargs):
     """
@@ -905,6 +917,50 @@ class DNSServerFactoryTests(unittest.TestCase):
         self.assertIs(authority, expectedAuthority)
         self.assertIs(additional, expectedAdditional)
 
+    def test_gotResolverErrorCaching(self):
+        """
+        L{server.DNSServerFactory.gotResolverError} caches a name error which
+        has a response message, with the message's authority records, if at
+        least one cache was provided in the constructor.
+        """
+        f = NoResponseDNSServerFactory(caches=[RaisingCache()])
+
+        m = dns.Message()
+        m.addQuery(b"example.com")
+        response = dns.Message(rCode=dns.ENAME)
+        expectedAuthority = [dns.RRHeader(type=dns.SOA, payload=dns.Record_SOA())]
+        response.authority = expectedAuthority
+
+        e = self.assertRaises(
+            RaisingCache.CacheResultArguments,
+            f.gotResolverError,
+            failure.Failure(error.DNSNameError(response)),
+            protocol=NoopProtocol(),
+            message=m,
+            address=None,
+        )
+        (query, authority), kwargs = e.args
+
+        self.assertEqual(query.name.name, b"example.com")
+        self.assertIs(authority, expectedAuthority)
+
+    def test_gotResolverErrorNotCaching(self):
+        """
+        L{server.DNSServerFactory.gotResolverError} does not cache errors other
+        than name errors with a response message.
+        """
+        f = NoResponseDNSServerFactory(caches=[RaisingCache()])
+        m = dns.Message()
+        m.addQuery(b"example.com")
+        for reason in [error.DNSNameError(), error.DomainError(), KeyError()]:
+            f.gotResolverError(
+                failure.Failure(reason),
+                protocol=NoopProtocol(),
+                message=m,
+                address=None,
+            )
+        self.assertEqual(len(self.flushLoggedErrors(KeyError)), 1)
+
     def test_gotResolverErrorCallsResponseFromMessage(self):
         """
         L{server.DNSServerFactory.gotResolverError} calls
@@ -6,6 +6,7 @@ Tests for L{twisted.names.tap}.
 """
 
 from twisted.internet.base import ThreadedResolver
+from twisted.names.cache import CacheResolver
 from twisted.names.client import Resolver
 from twisted.names.dns import PORT
 from twisted.names.resolve import ResolverChain
@@ -117,3 +118,47 @@ class OptionsTests(SynchronousTestCase):
                 x.cancel()
 
         self.assertIsInstance(cl[-1], ResolverChain)
+
+    def test_cache(self):
+        """
+        The cache, if enabled, holds at most C{--cache-size} entries, and
+        looks popular entries up again with the other resolvers.
+        """
+        options = Options()
+        options.parseOptions(
+            ["--cache", "--cache-size", "100", "--hosts-file", "hosts.txt"]
+        )
+        [ca], cl = _buildResolvers(options)
+        self.assertIsInstance(ca, CacheResolver)
+        self.assertEqual(ca.maxEntries, 100)
+        self.assertIsInstance(ca.resolver, ResolverChain)
+        self.assertEqual(ca.resolver.resolvers, cl)
+
+    def test_cacheWithoutClients(self):
+        """
+        The cache does not look entries up again if there are no other
+        resolvers.
+        """
+        options = Options()
+        options.parseOptions(["--cache"])
+        [ca], cl = _buildResolvers(options)
+        self.assertEqual(ca.maxEntries, 10000)
+        self.assertIsNone(ca.resolver)
+
+    def test_invalidCacheSize(self):
+        """
+        An error is raised if C{--cache-size} is not an integer.
+        """
+        options = Options()
+        self.assertRaises(
+            UsageError, options.parseOptions, ["--cache", "--cache-size", "lots"]
+        )
+
+    def test_negativeCacheSize(self):
+        """
+        An error is raised if C{--cache-size} is negative.
+        """
+        options = Options()
+        self.assertRaises(
+            UsageError, options.parseOptions, ["--cache", "--cache-size", "-1"]
+        )
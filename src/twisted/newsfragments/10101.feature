@@ -0,0 +1 @@
+twisted.internet.base.ReactorBase.installTimerWheel makes a reactor keep timed calls which are not yet due in a hierarchical timing wheel, so that scheduling, cancelling and resetting them takes constant time.
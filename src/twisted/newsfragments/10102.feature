@@ -0,0 +1 @@
+TCP and UNIX connections now send the data queued by write() and writeSequence() with sendmsg() where it is available, rather than joining it into a single buffer first.
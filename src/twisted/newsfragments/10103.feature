@@ -0,0 +1 @@
+twisted.internet.interfaces.ISendfileTransport is a new interface for transports which can send a region of a file with os.sendfile(), and twisted.internet.tcp.Connection now provides it.
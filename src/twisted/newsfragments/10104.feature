@@ -0,0 +1 @@
+twisted.internet.tcp.Connection.readIntoBuffer can be set to make connections read with recv_into() into a buffer shared by every connection, sized to suit the traffic they receive.
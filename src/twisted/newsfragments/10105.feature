@@ -0,0 +1 @@
+TCP server endpoints, and the tcp: endpoint description, accept a reusePort option which sets SO_REUSEPORT on the listening socket, and "twist --workers=N" runs an application in N supervised worker processes which share its listening ports.
@@ -0,0 +1 @@
+twisted.internet.tcp.Port now counts the connections it accepts, refuses and drops in its acceptStatistics attribute, and on Linux its acceptQueue method reports the length and limit of its listen queue.
@@ -0,0 +1 @@
+twisted.internet.iouringreactor is a new reactor for Linux 5.11 and later, installed with --reactor=iouring, which accepts and receives from TCP connections, and sends what does not fit in their send buffers, with io_uring requests.
@@ -0,0 +1 @@
+twisted.internet.epollreactor.EPollReactor accepts edgeTriggered=True, and twisted.internet.epollreactor.install accepts True, to register TCP connections for edge-triggered notifications once, rather than making an epoll_ctl() call each time they start or stop reading or writing.
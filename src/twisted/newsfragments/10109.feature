@@ -0,0 +1 @@
+twisted.internet.base.ReactorBase.installLoopMonitor measures how long each iteration of the reactor's loop takes and what it spends that time on, and logs a warning naming the object responsible for every call which takes too long.
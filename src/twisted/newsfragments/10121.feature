@@ -0,0 +1 @@
+twisted.logger.QueuedFileLogObserver is a new log observer which formats and writes events to a file from a separate thread, so that logging does not block the reactor thread.
@@ -0,0 +1 @@
+twisted.logger.Logger no longer builds and publishes events below the level which a twisted.logger.FilteringLogObserver with twisted.logger.LogLevelFilterPredicate filters would let through, making disabled debug logging much cheaper.
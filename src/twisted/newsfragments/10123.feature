@@ -0,0 +1 @@
+twisted.logger.JSONLogReader reads events back from JSON log files starting from any event's offset, and twisted.logger.JSONLogIndex indexes a set of such files by time so that the events logged between two times can be read without reading whole files.
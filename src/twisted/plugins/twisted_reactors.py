@@ -22,6 +22,11 @@ __all__.append("poll")
 epoll = Reactor("epoll", "twisted.internet.epollreactor", "epoll(4) based reactor.")
 __all__.append("epoll")
 
+iouring = Reactor(
+    "iouring", "twisted.internet.iouringreactor", "io_uring(7) based reactor."
+)
+__all__.append("iouring")
+
 kqueue = Reactor("kqueue", "twisted.internet.kqreactor", "kqueue(2) based reactor.")
 __all__.append("kqueue")
 
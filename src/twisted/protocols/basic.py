@@ -10,9 +10,10 @@ Basic protocols, such as line-oriented, netstring, and int prefixed strings.
 
 # System imports
 import re
-from struct import pack, unpack, calcsize
+from struct import pack, unpack_from, calcsize
 from io import BytesIO
 import math
+from typing import List, Sequence, cast
 
 from zope.interface import implementer
 
@@ -499,10 +500,25 @@ class LineReceiver(protocol.Protocol, _PauseableMixin):
     @cvar MAX_LENGTH: The maximum length of a line to allow (If a
                       sent line is longer than this, the connection is dropped).
                       Default is 16384.
+
+    @ivar _buffer: Data received but not yet delivered, from
+        C{_bufferOffset} onwards.  Between calls to L{dataReceived} this may
+        be a C{bytearray} rather than C{bytes}, holding only the start of a
+        line which has already been searched for the delimiter, so that a
+        long line received a little at a time can be added to in place and
+        is not searched again from its beginning.
+    @type _buffer: C{bytes} or C{bytearray}
+
+    @ivar _bufferOffset: The offset within C{_buffer} of the data not yet
+        delivered.  Lines are delivered by moving this along rather than by
+        copying the rest of the buffer each time, so that a chunk of data
+        holding many lines is split up in time proportional to its length.
+    @type _bufferOffset: C{int}
     """
 
     line_mode = 1
     _buffer = b""
+    _bufferOffset = 0
     _busyReceiving = False
     delimiter = b"\r\n"
     MAX_LENGTH = 16384
@@ -514,7 +530,9 @@ class LineReceiver(protocol.Protocol, _PauseableMixin):
         @return: All of the cleared buffered data.
         @rtype: C{bytes}
         """
-        b, self._buffer = self._buffer, b""
+        b = bytes(self._buffer[self._bufferOffset :])
+        self._buffer = b""
+        self._bufferOffset = 0
         return b
 
     def dataReceived(self, data):
@@ -529,33 +547,69 @@ class LineReceiver(protocol.Protocol, _PauseableMixin):
 
         try:
             self._busyReceiving = True
-            self._buffer += data
-            while self._buffer and not self.paused:
+            buffer = self._buffer
+            if type(buffer) is bytearray:
+                # Only the new data, and where it joins the old, can hold the
+                # end of the line.
+                delimiter = self.delimiter
+                start = max(len(buffer) - len(delimiter) + 1, 0)
+                buffer += data
+                if (
+                    self.line_mode
+                    and not self.paused
+                    and buffer.find(delimiter, start) == -1
+                ):
+                    if len(buffer) >= (self.MAX_LENGTH + len(delimiter)):
+                        self._buffer = b""
+                        return self.lineLengthExceeded(bytes(buffer))
+                    return
+                self._buffer = bytes(buffer)
+            else:
+                self._buffer = buffer + data
+            while not self.paused:
+                buffer = self._buffer
+                offset = self._bufferOffset
                 if self.line_mode:
-                    try:
-                        line, self._buffer = self._buffer.split(self.delimiter, 1)
-                    except ValueError:
-                        if len(self._buffer) >= (self.MAX_LENGTH + len(self.delimiter)):
-                            line, self._buffer = self._buffer, b""
+                    delimiter = self.delimiter
+                    end = buffer.find(delimiter, offset)
+                    if end == -1:
+                        if len(buffer) - offset >= (self.MAX_LENGTH + len(delimiter)):
+                            line = buffer[offset:]
+                            self._buffer = b""
+                            self._bufferOffset = 0
                             return self.lineLengthExceeded(line)
+                        if offset or not buffer:
+                            self._buffer = buffer[offset:]
+                        else:
+                            # Nothing but the start of a line has arrived
+                            # since the last line; keep it where more can be
+                            # added to it in place.
+                            self._buffer = bytearray(buffer)
+                        self._bufferOffset = 0
                         return
-                    else:
-                        lineLength = len(line)
-                        if lineLength > self.MAX_LENGTH:
-                            exceeded = line + self.delimiter + self._buffer
-                            self._buffer = b""
-                            return self.lineLengthExceeded(exceeded)
-                        why = self.lineReceived(line)
-                        if why or self.transport and self.transport.disconnecting:
-                            return why
-                else:
-                    data = self._buffer
+                    if end - offset > self.MAX_LENGTH:
+                        exceeded = buffer[offset:]
+                        self._buffer = b""
+                        self._bufferOffset = 0
+                        return self.lineLengthExceeded(exceeded)
+                    self._bufferOffset = end + len(delimiter)
+                    why = self.lineReceived(buffer[offset:end])
+                    if why or self.transport and self.transport.disconnecting:
+                        return why
+                elif offset < len(buffer):
+                    data = buffer[offset:]
                     self._buffer = b""
+                    self._bufferOffset = 0
                     why = self.rawDataReceived(data)
                     if why:
                         return why
+                else:
+                    break
         finally:
             self._busyReceiving = False
+            if self._bufferOffset:
+                self._buffer = self._buffer[self._bufferOffset :]
+                self._bufferOffset = 0
 
     def setLineMode(self, extra=b""):
         """
@@ -643,7 +697,10 @@ class _RecvdCompatHack:
     """
 
     def __get__(self, oself, type=None):
-        return oself._unprocessed[oself._compatibilityOffset :]
+        unprocessed = oself._unprocessed[oself._compatibilityOffset :]
+        if oself._pending:
+            unprocessed += b"".join(oself._pending)
+        return unprocessed
 
 
 class IntNStringReceiver(protocol.Protocol, _PauseableMixin):
@@ -667,11 +724,25 @@ class IntNStringReceiver(protocol.Protocol, _PauseableMixin):
     @ivar _compatibilityOffset: the offset within C{_unprocessed} to the next
         message to be parsed. (used to generate the recvd attribute)
     @type _compatibilityOffset: C{int}
+
+    @ivar _pending: bytes received after C{_unprocessed}, while it holds the
+        start of a message which they do not complete.  They are only joined
+        onto C{_unprocessed} once the message is complete, so that a large
+        message received a little at a time is copied a bounded number of
+        times rather than once for every chunk.  Each protocol gets a
+        L{list} of its own when it first has to set bytes aside.
+    @type _pending: C{list} of C{bytes}, or an empty C{tuple}
+
+    @ivar _missing: the number of bytes still to be received to complete the
+        message at the start of C{_unprocessed}, or 0 if that is not known.
+    @type _missing: C{int}
     """
 
     MAX_LENGTH = 99999
     _unprocessed = b""
     _compatibilityOffset = 0
+    _pending = ()  # type: Sequence[bytes]
+    _missing = 0
 
     # Backwards compatibility support for applications which directly touch the
     # "internal" parse buffer.
@@ -702,10 +773,20 @@ class IntNStringReceiver(protocol.Protocol, _PauseableMixin):
         """
         Convert int prefixed strings into calls to stringReceived.
         """
+        if len(data) < self._missing:
+            # _missing is only set along with a new list for _pending.
+            cast(List[bytes], self._pending).append(data)
+            self._missing -= len(data)
+            return
         # Try to minimize string copying (via slices) by keeping one buffer
         # containing all the data we have so far and a separate offset into that
         # buffer.
-        alldata = self._unprocessed + data
+        if self._pending:
+            alldata = b"".join([self._unprocessed, *self._pending, data])
+            self._pending = ()
+        else:
+            alldata = self._unprocessed + data
+        self._missing = 0
         currentOffset = 0
         prefixLength = self.prefixLength
         fmt = self.structFormat
@@ -713,7 +794,7 @@ class IntNStringReceiver(protocol.Protocol, _PauseableMixin):
 
         while len(alldata) >= (currentOffset + prefixLength) and not self.paused:
             messageStart = currentOffset + prefixLength
-            (length,) = unpack(fmt, alldata[currentOffset:messageStart])
+            (length,) = unpack_from(fmt, alldata, currentOffset)
             if length > self.MAX_LENGTH:
                 self._unprocessed = alldata
                 self._compatibilityOffset = currentOffset
@@ -721,6 +802,10 @@ class IntNStringReceiver(protocol.Protocol, _PauseableMixin):
                 return
             messageEnd = messageStart + length
             if len(alldata) < messageEnd:
+                # Set the rest of the message aside as it arrives, until
+                # there is all of it.
+                self._missing = messageEnd - len(alldata)
+                self._pending = []
                 break
 
             # Here we have to slice the working buffer so we can send just the
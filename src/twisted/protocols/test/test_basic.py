@@ -295,6 +295,57 @@ a"""
         self.assertEqual(protocol.line, b"quux")
         self.assertEqual(protocol.rest, b"")
 
+    def test_clearLineBufferPartialLine(self):
+        """
+        L{LineReceiver.clearLineBuffer} returns the start of a line received
+        a little at a time as C{bytes}, and the rest of the line is received
+        as a line of its own.
+        """
+        protocol = LineTester()
+        protocol.makeConnection(proto_helpers.StringTransport())
+        protocol.dataReceived(b"foo\nba")
+        protocol.dataReceived(b"r")
+        rest = protocol.clearLineBuffer()
+        self.assertEqual(rest, b"bar")
+        self.assertIsInstance(rest, bytes)
+
+        protocol.dataReceived(b"baz\n")
+        self.assertEqual(protocol.received, [b"foo", b"baz"])
+
+    def test_lineInPieces(self):
+        """
+        A line received a byte at a time, whose delimiter is split across
+        calls to C{dataReceived}, is delivered once it is complete, along with
+        the lines received with the end of it.
+        """
+        protocol = basic.LineReceiver()
+        received = []
+        protocol.lineReceived = received.append
+        line = b"x" * 100
+        for byte in iterbytes(line + b"\r"):
+            protocol.dataReceived(byte)
+        self.assertEqual(received, [])
+        protocol.dataReceived(b"\nfoo\r\nbar\r\nba")
+        self.assertEqual(received, [line, b"foo", b"bar"])
+        protocol.dataReceived(b"z\r\n")
+        self.assertEqual(received, [line, b"foo", b"bar", b"baz"])
+        for value in received:
+            self.assertIsInstance(value, bytes)
+
+    def test_manyLines(self):
+        """
+        Every line of a chunk of data holding many lines is delivered, and
+        the start of the line after them is kept until the rest arrives.
+        """
+        protocol = basic.LineReceiver()
+        received = []
+        protocol.lineReceived = received.append
+        lines = [b"%d" % (i,) for i in range(10000)]
+        protocol.dataReceived(b"\r\n".join(lines))
+        self.assertEqual(received, lines[:-1])
+        protocol.dataReceived(b"\r\n")
+        self.assertEqual(received, lines)
+
     def test_stackRecursion(self):
         """
         Test switching modes many times on the same data.
@@ -432,6 +483,18 @@ class LineReceiverLineLengthExceededTests(unittest.SynchronousTestCase):
         self.proto.dataReceived(excessive)
         self.assertEqual([excessive], self.proto.longLines)
 
+    def test_longUnendedLineInPieces(self):
+        """
+        If more bytes than C{LineReceiver.MAX_LENGTH} arrive containing no line
+        delimiter a few at a time, all of the bytes are passed as a single
+        string to L{LineReceiver.lineLengthExceeded}.
+        """
+        excessive = b"x" * (self.proto.MAX_LENGTH + len(self.proto.delimiter))
+        for byte in iterbytes(excessive):
+            self.proto.dataReceived(byte)
+        self.assertEqual([excessive], self.proto.longLines)
+        self.assertIsInstance(self.proto.longLines[0], bytes)
+
     def test_longLineAfterShortLine(self):
         """
         If L{LineReceiver.dataReceived} is called with bytes representing a
@@ -826,6 +889,38 @@ class IntNTestCaseMixin(LPTestCaseMixin):
                 r.dataReceived(c)
             self.assertEqual(r.received, [])
 
+    def test_receiveInPieces(self):
+        """
+        A string received a byte at a time is delivered when its last byte
+        arrives, followed by any other strings received with that byte.
+        """
+        r = self.getProtocol()
+        data = b"".join(struct.pack(r.structFormat, len(s)) + s for s in self.strings)
+        first = self.strings[0]
+        firstLength = r.prefixLength + len(first)
+        for byte in iterbytes(data[: firstLength - 1]):
+            r.dataReceived(byte)
+        self.assertEqual(r.received, [])
+        r.dataReceived(data[firstLength - 1 :])
+        self.assertEqual(r.received, self.strings)
+
+    def test_pendingNotShared(self):
+        """
+        Bytes set aside while a string is received in pieces belong to the
+        protocol receiving them, not to others of its class.
+        """
+        first = self.getProtocol()
+        second = self.getProtocol()
+        s = self.strings[0]
+        data = struct.pack(first.structFormat, len(s)) + s
+        for byte in iterbytes(data[:-1]):
+            first.dataReceived(byte)
+        self.assertEqual(basic.IntNStringReceiver._pending, ())
+        second.dataReceived(data)
+        first.dataReceived(data[-1:])
+        self.assertEqual(first.received, [s])
+        self.assertEqual(second.received, [s])
+
     def test_send(self):
         """
         Test sending data over protocol.
@@ -901,6 +996,20 @@ class RecvdAttributeMixin:
         r.dataReceived(completeMessage + incompleteMessage)
         self.assertEqual(result, [incompleteMessage])
 
+    def test_recvdContainsDataReceivedInPieces(self):
+        """
+        Between calls to C{dataReceived}, recvd contains all of the data
+        received so far which is not yet part of a complete message.
+        """
+        r = self.getProtocol()
+        message = self.makeMessage(r, b"a" * 5)
+        for byte in iterbytes(message[:-1]):
+            r.dataReceived(byte)
+        self.assertEqual(r.recvd, message[:-1])
+        r.dataReceived(message[-1:])
+        self.assertEqual(r.received, [b"a" * 5])
+        self.assertEqual(r.recvd, b"")
+
     def test_recvdChanged(self):
         """
         In stringReceived, if recvd is changed, messages should be parsed from
@@ -349,17 +349,18 @@ class Failure(BaseException):
                 globalz = globalz.items()
             else:
                 localz = globalz = ()
-            stack.insert(
-                0,
+            stack.append(
                 (
                     f.f_code.co_name,
                     f.f_code.co_filename,
                     f.f_lineno,
                     localz,
                     globalz,
-                ),
+                )
             )
             f = f.f_back
+        # The stack was walked from the innermost frame outwards.
+        stack.reverse()
 
         while tb is not None:
             f = tb.tb_frame
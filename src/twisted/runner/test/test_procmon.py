@@ -6,8 +6,11 @@ Tests for L{twisted.runner.procmon}.
 """
 import pickle
 
+from zope.interface import implementer
+
 from twisted.trial import unittest
 from twisted.runner.procmon import LoggingProtocol, ProcessMonitor
+from twisted.internet.interfaces import IReactorProcess
 from twisted.internet.error import ProcessDone, ProcessTerminated, ProcessExitedAlready
 from twisted.internet.task import Clock
 from twisted.python.failure import Failure
@@ -90,6 +93,7 @@ class DummyProcess:
         self.proto.processEnded(Failure(statusMap[status](status)))
 
 
+@implementer(IReactorProcess)
 class DummyProcessReactor(MemoryReactor, Clock):
     """
     @ivar spawnedProcesses: a list that keeps track of the fake process
@@ -894,6 +894,62 @@ class DeferredTests(unittest.SynchronousTestCase, ImmediateFailureMixin):
         exception = self.assertImmediateFailure(deferred, Exception)
         self.assertEqual(exception.args, (exceptionMessage,))
 
+    def test_callbacksRemovedWhenRun(self):
+        """
+        Callbacks are removed from a L{Deferred}'s callback chain once they
+        have been run, leaving only those still to run when the chain stops
+        to wait for another L{Deferred}.
+        """
+        deferred = defer.Deferred()
+        waiting = defer.Deferred()
+        called = []
+        deferred.addCallback(lambda result: waiting)
+        deferred.addCallback(called.append)
+        deferred.callback(None)
+        self.assertEqual(len(deferred.callbacks), 1)
+
+        waiting.callback(1)
+        self.assertEqual(called, [1])
+        self.assertEqual(deferred.callbacks, [])
+
+    def test_longCallbackChain(self):
+        """
+        A long chain of callbacks, with more added by the callbacks as they
+        run, is run in order.
+        """
+        deferred = defer.Deferred()
+        called = []
+
+        def callback(result, n):
+            called.append(n)
+            if n < 10000 and n % 2:
+                deferred.addCallback(callback, n + 10000)
+
+        for n in range(10000):
+            deferred.addCallback(callback, n)
+        deferred.callback(None)
+        self.assertEqual(called, list(range(10000)) + list(range(10001, 20000, 2)))
+        self.assertEqual(deferred.callbacks, [])
+
+    def test_succeed(self):
+        """
+        L{defer.succeed} returns a L{Deferred} which has been called back with
+        the given result.
+        """
+        deferred = defer.succeed(1)
+        self.assertTrue(deferred.called)
+        self.assertEqual(self.successResultOf(deferred), 1)
+
+    def test_succeedWhenDebugging(self):
+        """
+        When debugging, the L{Deferred} returned by L{defer.succeed} records
+        where it was called back from.
+        """
+        self.addCleanup(defer.setDebugging, defer.getDebugging())
+        defer.setDebugging(True)
+        deferred = defer.succeed(1)
+        self.assertIn("test_succeedWhenDebugging", "".join(deferred._debugInfo.invoker))
+
     def test_synchronousImplicitChain(self):
         """
         If a first L{Deferred} with a result is returned from a callback on a
@@ -185,6 +185,23 @@ class ListeningTests(TestCase):
         self.addCleanup(p1.stopListening)
         self.assertTrue(interfaces.IListeningPort.providedBy(p1))
 
+    @skipIf(not hasattr(socket, "SO_REUSEPORT"), "SO_REUSEPORT is not available.")
+    def test_listenReusePort(self):
+        """
+        L{IReactorTCP.listenTCP} with C{reusePort=True} sets C{SO_REUSEPORT}
+        on the listening socket, so another port can listen on the same
+        address the same way.
+        """
+        f = MyServerFactory()
+        p1 = reactor.listenTCP(0, f, interface="127.0.0.1", reusePort=True)
+        self.addCleanup(p1.stopListening)
+        self.assertTrue(p1.socket.getsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT))
+        p2 = reactor.listenTCP(
+            p1.getHost().port, f, interface="127.0.0.1", reusePort=True
+        )
+        self.addCleanup(p2.stopListening)
+        self.assertEqual(p1.getHost(), p2.getHost())
+
     def testStopListening(self):
         """
         The L{IListeningPort} returned by L{IReactorTCP.listenTCP} can be
@@ -9,6 +9,7 @@ Whitebox tests for TCP APIs.
 import errno
 import os
 import socket
+import sys
 
 try:
     import resource
@@ -17,7 +18,7 @@ except ImportError:
 
 from unittest import skipIf
 
-from twisted.trial.unittest import TestCase
+from twisted.trial.unittest import SkipTest, TestCase
 
 from twisted.python import log
 from twisted.internet.tcp import (
@@ -36,7 +37,8 @@ from twisted.internet.tcp import (
 from twisted.internet.protocol import Protocol, ServerFactory
 from twisted.python.runtime import platform
 from twisted.internet.defer import maybeDeferred, gatherResults
-from twisted.internet import reactor, interfaces
+from twisted.internet import reactor, interfaces, tcp
+from twisted.internet.error import CannotListenError
 
 
 @skipIf(
@@ -162,6 +164,14 @@ class SelectReactorTests(TestCase):
         self.ports.append(p)
         return p
 
+    def closeServer(self, protocol):
+        """
+        Stop reading from and close the connection which a protocol built
+        by a port's factory was given, without waiting for the reactor.
+        """
+        protocol.transport.stopReading()
+        protocol.transport.socket.close()
+
     def _acceptFailureTest(self, socketErrorNumber):
         """
         Test behavior in the face of an exception from C{accept(2)}.
@@ -202,6 +212,8 @@ class SelectReactorTests(TestCase):
             0,
             "Log event for failed accept not found in " "%r" % (self.messages,),
         )
+        self.assertEqual(port.acceptStatistics.failures, 1)
+        self.assertEqual(port.acceptStatistics.accepted, 0)
 
     def test_tooManyFilesFromAccept(self):
         """
@@ -304,6 +316,107 @@ class SelectReactorTests(TestCase):
         # accept should be tried next.
         self.assertEqual(port.numberAccepts, 1)
 
+    def test_acceptStatistics(self):
+        """
+        L{tcp.Port.doRead} counts the connections it accepts and the
+        connections the factory refuses in the port's C{acceptStatistics}.
+        """
+        protocols = [Protocol(), None, Protocol(), Protocol()]
+        for protocol in protocols:
+            if protocol is not None:
+                self.addCleanup(self.closeServer, protocol)
+        factory = ServerFactory()
+        factory.buildProtocol = lambda addr: protocols.pop(0)
+        port = self.port(0, factory, interface="127.0.0.1")
+
+        clients = []
+        self.addCleanup(lambda: [client.close() for client in clients])
+        for _ in range(3):
+            clients.append(socket.create_connection(("127.0.0.1", port.getHost().port)))
+        port.doRead()
+        clients.append(socket.create_connection(("127.0.0.1", port.getHost().port)))
+        port.doRead()
+
+        statistics = port.acceptStatistics
+        self.assertEqual(statistics.accepted, 4)
+        self.assertEqual(statistics.refused, 1)
+        self.assertEqual(statistics.batches, 2)
+        self.assertEqual(statistics.largestBatch, 3)
+        self.assertEqual(statistics.failures, 0)
+        self.assertEqual(statistics.dropped, 0)
+
+    def test_acceptedSocketNotInheritable(self):
+        """
+        The sockets accepted by L{tcp.Port.doRead} are not inherited by child
+        processes.
+        """
+        protocol = Protocol()
+        factory = ServerFactory()
+        factory.buildProtocol = lambda addr: protocol
+        port = self.port(0, factory, interface="127.0.0.1")
+        client = socket.create_connection(("127.0.0.1", port.getHost().port))
+        self.addCleanup(client.close)
+
+        port.doRead()
+
+        self.addCleanup(self.closeServer, protocol)
+        self.assertFalse(protocol.transport.socket.get_inheritable())
+
+    @skipIf(not socket.has_ipv6, "IPv6 is not available.")
+    def test_acceptIPv6WithoutNameInfo(self):
+        """
+        L{tcp.Port.doRead} does not look up the name of an IPv6 peer without
+        a scope ID, whose address is already in numeric form.
+        """
+        self.patch(socket, "getnameinfo", lambda *args: self.fail("getnameinfo"))
+        addresses = []
+        protocol = Protocol()
+        factory = ServerFactory()
+        factory.buildProtocol = lambda addr: addresses.append(addr) or protocol
+        try:
+            port = self.port(0, factory, interface="::1")
+        except CannotListenError:
+            raise SkipTest("Cannot listen on ::1.")
+        client = socket.create_connection(("::1", port.getHost().port))
+        self.addCleanup(client.close)
+
+        port.doRead()
+        self.addCleanup(self.closeServer, protocol)
+
+        [address] = addresses
+        self.assertEqual(address.host, "::1")
+        self.assertEqual(address.port, client.getsockname()[1])
+        self.assertEqual(address.scopeID, 0)
+
+    @skipIf(not sys.platform.startswith("linux"), "TCP_INFO is specific to Linux.")
+    def test_acceptQueue(self):
+        """
+        L{tcp.Port.acceptQueue} reports the number of connections waiting to
+        be accepted and the size of the listen queue.
+        """
+        factory = ServerFactory()
+        factory.protocol = Protocol
+        port = Port(0, factory, backlog=7, interface="127.0.0.1")
+        port.startListening()
+        self.ports.append(port)
+        self.assertEqual(port.acceptQueue(), (0, 7))
+
+        client = socket.create_connection(("127.0.0.1", port.getHost().port))
+        self.addCleanup(client.close)
+        self.assertEqual(port.acceptQueue(), (1, 7))
+
+    def test_acceptQueueUnknown(self):
+        """
+        L{tcp.Port.acceptQueue} returns L{None} on platforms other than
+        Linux, and when the port is not listening.
+        """
+        factory = ServerFactory()
+        port = Port(0, factory, interface="127.0.0.1")
+        self.assertIsNone(port.acceptQueue())
+        port = self.port(0, factory, interface="127.0.0.1")
+        self.patch(tcp, "_isLinux", False)
+        self.assertIsNone(port.acceptQueue())
+
     @skipIf(platform.getType() == "win32", "Windows accept(2) cannot generate EPERM")
     def test_permissionFailure(self):
         """
@@ -176,8 +176,21 @@ class Element:
         separately as the object to lookup renderers on and call
         L{Element.renderer} to look them up.  The resulting object from this
         method is not directly associated with this L{Element}.)
+
+        Templates loaded by L{XMLString <twisted.web.template.XMLString>} and
+        L{XMLFile <twisted.web.template.XMLFile>} are compiled the first time
+        they are rendered, and their loaders keep the compiled documents for
+        every L{Element} which uses them.  The static parts of a compiled
+        document are flattened from bytes prepared beforehand; tags with
+        renderers are left as they are, so render methods receive the same
+        tags whether or not a document was compiled, but copies of those tags
+        made with L{Tag.clone <twisted.web.template.Tag.clone>} are flattened
+        from compiled children for as long as their children are unchanged.
         """
         loader = self.loader
         if loader is None:
             raise MissingTemplateLoader(self)
+        loadCompiled = getattr(loader, "_loadCompiled", None)
+        if loadCompiled is not None:
+            return loadCompiled()
         return loader.load()
@@ -14,13 +14,21 @@ from sys import exc_info
 from types import GeneratorType
 from traceback import extract_tb
 from inspect import iscoroutine
+from typing import Any, List, Optional, Tuple
+
+from zope.interface import implementer
 
 from twisted.python.compat import nativeString
+from twisted.python.failure import Failure
 from twisted.internet.defer import Deferred, ensureDeferred
+from twisted.internet.interfaces import IPushProducer
 from twisted.web._stan import Tag, slot, voidElements, Comment, CDATA, CharRef
 from twisted.web.error import UnfilledSlot, UnsupportedType, FlattenerError
 from twisted.web.iweb import IRenderable
 
+# The number of bytes flatten collects before writing them.
+BUFFER_SIZE = 2 ** 16
+
 
 def escapeForContent(data):
     """
@@ -148,7 +156,7 @@ def _getSlotValue(name, slotData, default=None):
     """
     Find the value of the named slot in the given stack of slot data.
     """
-    for slotFrame in slotData[::-1]:
+    for slotFrame in reversed(slotData):
         if slotFrame is not None and name in slotFrame:
             return slotFrame[name]
     else:
@@ -157,6 +165,273 @@ def _getSlotValue(name, slotData, default=None):
         raise UnfilledSlot(name)
 
 
+class _Compiled:
+    """
+    Part of a template, compiled by L{_compile} so that flattening it writes
+    precomputed bytes rather than walking the static parts of its tree.
+
+    @ivar parts: What to do to flatten this, in order: L{bytes} to write;
+        L{int}s, numbers of empty frames to push onto the slot data, as
+        flattening each L{Tag} would; L{_AttributeValue}s to flatten as the
+        values of attributes; and anything else, to flatten as usual.
+    @type parts: L{tuple}
+
+    @ivar paths: For each of L{parts}, the objects which the flattener would
+        have been flattening when it reached that part if the template had
+        not been compiled, outermost first, for L{FlattenerError}s to report.
+    @type paths: L{tuple} of L{tuple}s
+
+    @ivar original: The part of the template this was compiled from, which
+        is flattened instead in contexts which L{parts} would not suit.
+    """
+
+    def __init__(self, parts, paths, original):
+        self.parts = parts
+        self.paths = paths
+        self.original = original
+
+    def clone(self, deep=True):
+        """
+        Compiled parts of templates are never changed, so they need not be
+        copied.
+
+        @return: C{self}
+        """
+        return self
+
+    def __repr__(self) -> str:
+        return "_Compiled({!r})".format(self.original)
+
+
+class _AttributeValue:
+    """
+    The value of an attribute which cannot be compiled, to be flattened as
+    the value of an attribute.
+
+    @ivar value: The value.
+    """
+
+    def __init__(self, value):
+        self.value = value
+
+
+def _compile(root):
+    """
+    Compile a template, or part of one, so that it can be flattened more
+    quickly, and to the same output.
+
+    Text, comments, CDATA, character references and L{Tag}s without
+    renderers or slot data are serialized to bytes.  L{Tag}s with renderers
+    are kept as they are, children and all, so that render methods receive
+    the same tags whether or not the template was compiled, but their
+    children are compiled too, for flattening the copies of those tags which
+    render methods return; see L{_compiledChildren}.  Anything else,
+    such as slots, is left to be flattened at rendering time.
+
+    @param root: The template, such as the result of
+        L{ITemplateLoader.load}.
+
+    @return: A L{_Compiled} which flattens as C{root} does.
+    """
+    parts = []  # type: List[Any]
+    paths = []  # type: List[Tuple[Any, ...]]
+    _compileInto(root, parts, paths, ())
+    merged = []  # type: List[Any]
+    mergedPaths = []  # type: List[Tuple[Any, ...]]
+    chunks = []  # type: List[bytes]
+    frames = 0
+    # Writing does not depend on the slot data, so the bytes up to each part
+    # which must be flattened can be written together, and the frames pushed
+    # up to it can be pushed together.
+    for part, path in zip(parts + [None], paths + [()]):
+        if type(part) is bytes:
+            chunks.append(part)
+        elif type(part) is int:
+            frames += part
+        else:
+            if chunks:
+                merged.append(b"".join(chunks))
+                mergedPaths.append(())
+                chunks = []
+            if frames:
+                merged.append(frames)
+                mergedPaths.append(())
+                frames = 0
+            if part is not None:
+                merged.append(part)
+                mergedPaths.append(path)
+    return _Compiled(tuple(merged), tuple(mergedPaths), root)
+
+
+def _compileInto(root, parts, paths, path):
+    """
+    Compile C{root} as L{_compile} does, appending to C{parts}, and to
+    C{paths} the path to each part.
+
+    @param path: The objects the flattener would be flattening when it
+        reached C{root}, not including C{root}.
+    """
+    if isinstance(root, (bytes, str)):
+        parts.append(escapeForContent(root))
+        paths.append(path)
+    elif isinstance(root, (tuple, list)):
+        path = path + (root,)
+        for element in root:
+            _compileInto(element, parts, paths, path)
+    elif isinstance(root, CDATA):
+        parts.append(b"<![CDATA[" + escapedCDATA(root.data) + b"]]>")
+        paths.append(path)
+    elif isinstance(root, Comment):
+        parts.append(b"<!--" + escapedComment(root.data) + b"-->")
+        paths.append(path)
+    elif isinstance(root, CharRef):
+        parts.append(("&#%d;" % (root.ordinal,)).encode("ascii"))
+        paths.append(path)
+    elif isinstance(root, Tag) and root.slotData is None and root.render is None:
+        tagParts = []  # type: List[Any]
+        tagPaths = []  # type: List[Tuple[Any, ...]]
+        try:
+            _compileTag(root, tagParts, tagPaths, path + (root,))
+        except Exception:
+            # Leave it to fail when it is flattened, as it would have.
+            parts.append(root)
+            paths.append(path)
+        else:
+            parts.extend(tagParts)
+            paths.extend(tagPaths)
+    else:
+        if isinstance(root, Tag) and root.slotData is None:
+            # Render methods must receive the tag as it is, but the copies
+            # of it which they return are usually flattened with the same
+            # children; see _compiledChildren.
+            root._compiledChildren = _compile(root.children)
+        parts.append(root)
+        paths.append(path)
+
+
+def _compiledChildren(root):
+    """
+    Find a compiled form of the children of a L{Tag}, if they have not been
+    changed since they were compiled.
+
+    L{_compile} compiles the children of L{Tag}s with renderers, and
+    L{Tag.clone} keeps the compiled children with the copies it makes, so
+    that the copies which render methods fill slots in and return need not
+    have their children walked again.
+
+    @param root: The L{Tag}.
+
+    @return: A L{_Compiled} which flattens as C{root.children} does, or
+        L{None} if there is none.
+    """
+    compiled = root._compiledChildren
+    if compiled is not None and _unchanged(root.children, compiled.original):
+        return compiled
+    return None
+
+
+def _unchanged(new, old):
+    """
+    Determine whether C{new}, a copy of C{old} made by L{Tag.clone}, is still
+    the same as C{old}, so that it flattens to the same output.
+
+    @return: L{True} if it is, or L{False} if it has been changed, or might
+        have been.
+    """
+    if new is old:
+        return True
+    if isinstance(new, (bytes, str)):
+        return type(new) is type(old) and new == old
+    if isinstance(new, list):
+        return (
+            isinstance(old, (list, tuple))
+            and len(new) == len(old)
+            and all(_unchanged(n, o) for n, o in zip(new, old))
+        )
+    if type(new) is Tag:
+        return (
+            type(old) is Tag
+            and new.tagName == old.tagName
+            and new.render == old.render
+            and new.slotData is None
+            and old.slotData is None
+            and new.attributes.keys() == old.attributes.keys()
+            and all(
+                _unchanged(value, old.attributes[key])
+                for key, value in new.attributes.items()
+            )
+            and _unchanged(new.children, old.children)
+        )
+    return False
+
+
+def _compileTag(root, parts, paths, path):
+    """
+    Compile a L{Tag} without slot data or a renderer as L{_compile} does,
+    appending to C{parts} and C{paths} as L{_compileInto} does.
+
+    @param path: The objects the flattener would be flattening when it
+        reached the contents of C{root}, including C{root}.
+    """
+    parts.append(1)
+    paths.append(path)
+    if not root.tagName:
+        _compileInto(root.children, parts, paths, path)
+        return
+
+    if isinstance(root.tagName, str):
+        tagName = root.tagName.encode("ascii")
+    else:
+        tagName = root.tagName
+    parts.append(b"<" + tagName)
+    paths.append(path)
+    for k, v in root.attributes.items():
+        if isinstance(k, str):
+            k = k.encode("ascii")
+        parts.append(b" " + k + b'="')
+        paths.append(path)
+        if isinstance(v, (bytes, str)):
+            parts.append(escapeForContent(v).replace(b'"', b"&quot;"))
+        else:
+            parts.append(_AttributeValue(v))
+        paths.append(path)
+        parts.append(b'"')
+        paths.append(path)
+    if root.children or nativeString(tagName) not in voidElements:
+        parts.append(b">")
+        paths.append(path)
+        _compileInto(root.children, parts, paths, path)
+        parts.append(b"</" + tagName + b">")
+        paths.append(path)
+    else:
+        parts.append(b" />")
+        paths.append(path)
+
+
+def _compiledRoots(root, index, failed):
+    """
+    Find the objects which the flattener would have been flattening, had
+    C{root} not been compiled, when it reached one of C{root}'s parts.
+
+    @param root: The L{_Compiled} being flattened.
+
+    @param index: The index in C{root.parts} of the part being flattened, or
+        L{None} if C{root.original} is being flattened instead.
+
+    @param failed: Whether flattening the part itself failed, rather than
+        something the part was flattened to.
+
+    @return: A L{list} of the objects, outermost first.
+    """
+    if index is None:
+        return []
+    part = root.parts[index]
+    roots = list(root.paths[index]) or [root.original]
+    if failed and type(part) is slot and roots[-1] is not part:
+        roots.append(part)
+    return roots
+
+
 def _flattenElement(request, root, write, slotData, renderFactory, dataEscaper):
     """
     Make C{root} slightly more flat by yielding all its immediate contents as
@@ -206,6 +481,31 @@ def _flattenElement(request, root, write, slotData, renderFactory, dataEscaper):
 
     if isinstance(root, (bytes, str)):
         write(dataEscaper(root))
+    elif isinstance(root, _Compiled):
+        if dataEscaper is not escapeForContent:
+            # The compiled bytes are escaped for content, not attributes.
+            yield keepGoing(root.original)
+            return
+        # The index is used to report errors; see _flattenTree.
+        for index, part in enumerate(root.parts):
+            if type(part) is bytes:
+                write(part)
+            elif type(part) is slot:
+                slotValue = _getSlotValue(part.name, slotData, part.default)
+                if isinstance(slotValue, (bytes, str)):
+                    write(escapeForContent(slotValue))
+                else:
+                    yield keepGoing(slotValue)
+            elif type(part) is int:
+                slotData.extend([None] * part)
+            elif type(part) is _AttributeValue:
+                yield keepGoing(
+                    part.value,
+                    attributeEscapingDoneOutside,
+                    write=writeWithAttributeEscaping(write),
+                )
+            else:
+                yield keepGoing(part)
     elif isinstance(root, slot):
         slotValue = _getSlotValue(root.name, slotData, root.default)
         yield keepGoing(slotValue)
@@ -229,8 +529,12 @@ def _flattenElement(request, root, write, slotData, renderFactory, dataEscaper):
             slotData.pop()
             return
 
+        children = root.children
+        if root._compiledChildren is not None:
+            children = _compiledChildren(root) or children
+
         if not root.tagName:
-            yield keepGoing(root.children)
+            yield keepGoing(children)
             return
 
         write(b"<")
@@ -258,7 +562,7 @@ def _flattenElement(request, root, write, slotData, renderFactory, dataEscaper):
             # be quoted so that after applying the *un*-quoting required to re-
             # parse the tag within the attribute, all the quoting is still
             # correct.
-            yield keepGoing(root.children, escapeForContent)
+            yield keepGoing(children, escapeForContent)
             write(b"</" + tagName + b">")
         else:
             write(b" />")
@@ -281,7 +585,25 @@ def _flattenElement(request, root, write, slotData, renderFactory, dataEscaper):
         raise UnsupportedType(root)
 
 
-def _flattenTree(request, root, write):
+def _frameRoots(frame, failed):
+    """
+    Find the objects being flattened by a frame of L{_flattenElement}, for a
+    L{FlattenerError} to report.
+
+    @param frame: The frame.
+
+    @param failed: Whether flattening failed in this frame.
+
+    @return: A L{list} of the objects, outermost first.  This is just the
+        frame's C{root}, unless it is a compiled template.
+    """
+    root = frame.f_locals["root"]
+    if isinstance(root, _Compiled):
+        return _compiledRoots(root, frame.f_locals.get("index"), failed)
+    return [root]
+
+
+def _flattenTree(request, root, write, producer=None):
     """
     Make C{root} into an iterable of L{bytes} and L{Deferred} by doing a depth
     first traversal of the tree.
@@ -297,13 +619,22 @@ def _flattenTree(request, root, write):
     @param write: A callable which will be invoked with each L{bytes} produced
         by flattening C{root}.
 
+    @param producer: If not L{None}, a L{_FlattenProducer} which, while it is
+        paused, pauses flattening, and which, once stopped, stops it.
+
     @return: An iterator which yields objects of type L{bytes} and L{Deferred}.
         A L{Deferred} is only yielded when one is encountered in the process of
-        flattening C{root}.  The returned iterator must not be iterated again
-        until the L{Deferred} is called back.
+        flattening C{root}, or while C{producer} is paused.  The returned
+        iterator must not be iterated again until the L{Deferred} is called
+        back.
     """
     stack = [_flattenElement(request, root, write, [], None, escapeForContent)]
     while stack:
+        if producer is not None:
+            if producer._paused is not None:
+                yield producer._paused
+            if producer.stopped:
+                return
         try:
             frame = stack[-1].gi_frame
             element = next(stack[-1])
@@ -313,8 +644,8 @@ def _flattenTree(request, root, write):
             stack.pop()
             roots = []
             for generator in stack:
-                roots.append(generator.gi_frame.f_locals["root"])
-            roots.append(frame.f_locals["root"])
+                roots.extend(_frameRoots(generator.gi_frame, False))
+            roots.extend(_frameRoots(frame, True))
             raise FlattenerError(e, roots, extract_tb(exc_info()[2]))
         else:
             if isinstance(element, Deferred):
@@ -329,16 +660,17 @@ def _flattenTree(request, root, write):
                 stack.append(element)
 
 
-def _writeFlattenedData(state, write, result):
+def _writeFlattenedData(state, flush, result):
     """
-    Take strings from an iterator and pass them to a writer function.
+    Iterate a flattening iterator, waiting for the L{Deferred}s it yields.
 
-    @param state: An iterator of L{str} and L{Deferred}.  L{str} instances will
-        be passed to C{write}.  L{Deferred} instances will be waited on before
-        resuming iteration of C{state}.
+    @param state: An iterator of L{Deferred}s, as returned by
+        L{_flattenTree}, which will be waited on before resuming iteration of
+        C{state}.
 
-    @param write: A callable which will be invoked with each L{str}
-        produced by iterating C{state}.
+    @param flush: A callable which writes what C{state} has written to a
+        L{_BufferedWrite}, which will be invoked before waiting for a
+        L{Deferred} and when C{state} is done.
 
     @param result: A L{Deferred} which will be called back when C{state} has
         been completely flattened into C{write} or which will be errbacked if
@@ -351,19 +683,121 @@ def _writeFlattenedData(state, write, result):
         try:
             element = next(state)
         except StopIteration:
-            result.callback(None)
+            try:
+                flush()
+            except BaseException:
+                result.errback()
+            else:
+                result.callback(None)
         except BaseException:
-            result.errback()
+            failure = Failure()
+            try:
+                flush()
+            except BaseException:
+                pass
+            result.errback(failure)
         else:
 
             def cby(original):
-                _writeFlattenedData(state, write, result)
+                _writeFlattenedData(state, flush, result)
                 return original
 
+            if not element.called:
+                try:
+                    flush()
+                except BaseException:
+                    result.errback()
+                    break
             element.addCallbacks(cby, result.errback)
         break
 
 
+class _BufferedWrite:
+    """
+    Collect what is written, to write it in chunks of at least C{size} bytes.
+
+    @ivar _write: The callable to write chunks with.
+
+    @ivar _size: The number of bytes to collect before writing them.
+
+    @ivar _chunks: What has been written and not yet passed to C{_write}.
+
+    @ivar _length: The total length of C{_chunks}.
+    """
+
+    def __init__(self, write, size):
+        self._write = write
+        self._size = size
+        self._chunks = []  # type: List[bytes]
+        self._length = 0
+
+    def write(self, data):
+        """
+        Collect C{data}, writing what has been collected if there is enough of
+        it.
+        """
+        self._chunks.append(data)
+        self._length += len(data)
+        if self._length >= self._size:
+            self.flush()
+
+    def flush(self):
+        """
+        Write what has been collected, if anything.
+        """
+        if self._chunks:
+            data = b"".join(self._chunks)
+            self._chunks = []
+            self._length = 0
+            self._write(data)
+
+
+@implementer(IPushProducer)
+class _FlattenProducer:
+    """
+    A producer to register with the consumer flattened output is written
+    to, so that flattening pauses while the consumer is paused and stops if
+    it is stopped.
+
+    @ivar stopped: Whether the consumer has stopped this producer.
+
+    @ivar _paused: While paused, a L{Deferred} to fire when resumed;
+        otherwise L{None}.
+    """
+
+    stopped = False
+
+    def __init__(self):
+        self._paused = None  # type: Optional[Deferred]
+
+    def pauseProducing(self):
+        if self._paused is None:
+            self._paused = Deferred()
+
+    def resumeProducing(self):
+        paused, self._paused = self._paused, None
+        if paused is not None:
+            paused.callback(None)
+
+    def stopProducing(self):
+        self.stopped = True
+        self.resumeProducing()
+
+
+def _flatten(request, root, write, producer=None):
+    """
+    Flatten C{root} as L{flatten} does, pausing while C{producer} is paused
+    and stopping once it is stopped.
+
+    @param producer: A L{_FlattenProducer}, or L{None}.
+    """
+    result = Deferred()
+    buffered = _BufferedWrite(write, BUFFER_SIZE)
+    state = _flattenTree(request, root, buffered.write, producer)
+    _writeFlattenedData(state, buffered.flush, result)
+    return result
+
+
 def flatten(request, root, write):
     """
     Incrementally write out a string representation of C{root} using C{write}.
@@ -372,6 +806,10 @@ def flatten(request, root, write):
     simpler objects which will themselves be decomposed and so on until strings
     or objects which can easily be converted to strings are encountered.
 
+    What C{root} flattens to is collected and written in chunks of about
+    L{BUFFER_SIZE} bytes, as well as whenever flattening must wait for a
+    L{Deferred}, and when it is done.
+
     @param request: A request object which will be passed to the C{render}
         method of any L{IRenderable} provider which is encountered.
 
@@ -387,10 +825,7 @@ def flatten(request, root, write):
         completely flattened into C{write} or which will be errbacked if an
         unexpected exception occurs.
     """
-    result = Deferred()
-    state = _flattenTree(request, root, write)
-    _writeFlattenedData(state, write, result)
-    return result
+    return _flatten(request, root, write)
 
 
 def flattenString(request, root):
@@ -0,0 +1,752 @@
+# -*- test-case-name: twisted.web.test.test_http2client -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+HTTP/2 client implementation.
+
+This is the client-side counterpart of L{twisted.web._http2}, used by
+L{twisted.web.client.HTTPConnectionPool} for connections on which HTTP/2 has
+been negotiated with ALPN, in place of
+L{twisted.web._newclient.HTTP11ClientProtocol}.  Many requests are sent over
+one connection at once, each as its own stream with its own flow control.
+
+This API is currently considered private.
+"""
+
+
+from collections import deque
+from typing import List
+
+from zope.interface import implementer
+
+import h2.config
+import h2.connection
+import h2.errors
+import h2.events
+import h2.exceptions
+import h2.settings
+
+from twisted.internet.defer import CancelledError, Deferred, fail, succeed
+from twisted.internet.error import ConnectionLost
+from twisted.internet.interfaces import IConsumer, IPushProducer
+from twisted.internet.protocol import Protocol
+from twisted.logger import Logger
+from twisted.python.failure import Failure
+from twisted.web.http import NO_BODY_CODES, RESPONSES
+from twisted.web.http_headers import Headers
+from twisted.web.iweb import UNKNOWN_LENGTH
+from twisted.web._newclient import (
+    RequestGenerationFailed,
+    RequestNotSent,
+    Response,
+    ResponseFailed,
+    ResponseNeverReceived,
+)
+
+
+# This API is currently considered private.
+__all__ = []  # type: List[str]
+
+
+# Headers which only mean something to a single HTTP/1.1 connection, and which
+# HTTP/2 forbids.
+_CONNECTION_HEADERS = frozenset(
+    [
+        b"connection",
+        b"host",
+        b"keep-alive",
+        b"proxy-connection",
+        b"te",
+        b"transfer-encoding",
+        b"upgrade",
+    ]
+)
+
+
+def _requestHeaders(request):
+    """
+    Convert a request's method, URI and headers into an HTTP/2 header block.
+
+    @param request: The request.
+    @type request: L{twisted.web._newclient.Request}
+
+    @return: The header block.
+    @rtype: L{list} of L{tuple}s of header name and header value, both as
+        L{bytes}.
+    """
+    parsedURI = request._parsedURI
+    if parsedURI is not None:
+        scheme = parsedURI.scheme
+    else:
+        scheme = b"https"
+    authority = request.headers.getRawHeaders(b"host", [b""])[0]
+    headers = [
+        (b":method", request.method),
+        (b":scheme", scheme),
+        (b":authority", authority),
+        (b":path", request.uri),
+    ]
+    for name, values in request.headers.getAllRawHeaders():
+        name = name.lower()
+        if name not in _CONNECTION_HEADERS:
+            headers.extend((name, value) for value in values)
+    bodyProducer = request.bodyProducer
+    if bodyProducer is not None and bodyProducer.length is not UNKNOWN_LENGTH:
+        headers.append((b"content-length", b"%d" % (bodyProducer.length,)))
+    return headers
+
+
+@implementer(IConsumer, IPushProducer)
+class H2ClientStream:
+    """
+    A single request and its response, sent and received as one HTTP/2 stream
+    of an L{H2ClientProtocol}.
+
+    It is the L{IConsumer} to which the request body is written, and the
+    transport of the L{Response}, with which the response body may be paused,
+    resumed or stopped.  While it is paused, the data received is not
+    acknowledged, so the server stops sending once the stream's flow control
+    window is used up.
+
+    @ivar streamID: The stream ID.
+    @type streamID: L{int}
+
+    @ivar request: The request.
+    @type request: L{twisted.web._newclient.Request}
+
+    @ivar deferred: The L{Deferred} returned by L{H2ClientProtocol.request},
+        which fires with the response.
+
+    @ivar response: The response, once its headers have been received.
+    @type response: L{Response} or L{None}
+
+    @ivar _connection: The connection the stream belongs to.
+    @type _connection: L{H2ClientProtocol}
+
+    @ivar _outbound: Request body data not yet sent, because the stream's or
+        connection's flow control window is closed.
+    @type _outbound: L{collections.deque} of L{bytes}
+
+    @ivar _outboundSize: The number of bytes in C{_outbound}.
+    @type _outboundSize: L{int}
+
+    @ivar _bodyProducing: Whether the request body is still being produced.
+    @type _bodyProducing: L{bool}
+
+    @ivar _producerPaused: Whether the request body producer has been paused
+        because C{_outbound} is full.
+    @type _producerPaused: L{bool}
+
+    @ivar _paused: Whether delivery of the response body has been paused.
+    @type _paused: L{bool}
+
+    @ivar _unacknowledged: The flow controlled length of the response body
+        data received while paused, to be acknowledged once resumed.
+    @type _unacknowledged: L{int}
+
+    @ivar _ended: Whether this side has ended the stream.
+    @type _ended: L{bool}
+
+    @ivar _closed: Whether the stream has ended, been reset or lost.
+    @type _closed: L{bool}
+    """
+
+    _outboundLimit = 2 ** 16
+
+    def __init__(self, streamID, connection, request):
+        self.streamID = streamID
+        self.request = request
+        self.response = None
+        self.deferred = Deferred(self._cancel)
+        self._connection = connection
+        self._outbound = deque()
+        self._outboundSize = 0
+        self._bodyProducing = request.bodyProducer is not None
+        self._producerPaused = False
+        self._paused = False
+        self._unacknowledged = 0
+        self._ended = not self._bodyProducing
+        self._closed = False
+
+    def _startBody(self):
+        """
+        Start producing the request body, ending the stream once it has all
+        been sent.
+        """
+
+        def produced(ignored):
+            self._bodyProducing = False
+            self._sendOutbound()
+
+        def failed(reason):
+            if self._closed:
+                return
+            self._bodyProducing = False
+            self._reset(h2.errors.ErrorCodes.INTERNAL_ERROR)
+            if self.response is None:
+                self.deferred.errback(Failure(RequestGenerationFailed([reason])))
+            else:
+                self.response._bodyDataFinished(
+                    Failure(ResponseFailed([reason], self.response))
+                )
+
+        d = self.request.bodyProducer.startProducing(self)
+        d.addCallbacks(produced, failed)
+
+    def _sendOutbound(self):
+        """
+        Send as much buffered request body data as flow control allows, end
+        the stream once the body is complete, and resume or pause the body
+        producer depending on how much is left buffered.
+        """
+        if self._closed:
+            return
+        conn = self._connection.conn
+        while self._outbound:
+            window = min(
+                conn.local_flow_control_window(self.streamID),
+                conn.max_outbound_frame_size,
+            )
+            if window <= 0:
+                break
+            chunk = self._outbound.popleft()
+            if len(chunk) > window:
+                self._outbound.appendleft(chunk[window:])
+                chunk = chunk[:window]
+            self._outboundSize -= len(chunk)
+            conn.send_data(self.streamID, chunk)
+        if not self._outbound and not self._bodyProducing and not self._ended:
+            self._ended = True
+            conn.end_stream(self.streamID)
+        self._connection._flush()
+
+        producer = self.request.bodyProducer
+        if producer is None or not self._bodyProducing:
+            return
+        if self._outboundSize >= self._outboundLimit:
+            if not self._producerPaused:
+                self._producerPaused = True
+                producer.pauseProducing()
+        elif self._producerPaused:
+            self._producerPaused = False
+            producer.resumeProducing()
+
+    def _stopBody(self):
+        """
+        Stop producing the request body, if it is still being produced.
+        """
+        if self._bodyProducing:
+            self._bodyProducing = False
+            self.request.bodyProducer.stopProducing()
+
+    def _cancel(self, deferred):
+        """
+        Cancel the request before its response has been received, by
+        resetting the stream.
+        """
+        self._reset(h2.errors.ErrorCodes.CANCEL)
+        deferred.errback(Failure(ResponseNeverReceived([Failure(CancelledError())])))
+
+    def _reset(self, errorCode):
+        """
+        Reset the stream and forget it.
+        """
+        if self._closed:
+            return
+        self._connection._resetStream(self.streamID, errorCode)
+        self._close()
+
+    def _close(self):
+        """
+        Forget the stream, which has ended, been reset or lost.
+        """
+        self._closed = True
+        self._stopBody()
+        self._outbound.clear()
+        self._connection._streamClosed(self)
+
+    # Methods called by the H2ClientProtocol
+
+    def responseReceived(self, headers):
+        """
+        The response's headers have been received.  Fire C{deferred} with
+        the L{Response}, initially paused until a protocol is given to
+        L{Response.deliverBody}.
+
+        @param headers: The response header block.
+        @type headers: L{list} of L{tuple}s of header name and header value,
+            both as L{bytes}.
+        """
+        code = None
+        responseHeaders = Headers()
+        for name, value in headers:
+            if name == b":status":
+                code = int(value)
+            elif not name.startswith(b":"):
+                responseHeaders.addRawHeader(name, value)
+        response = Response._construct(
+            (b"HTTP", 2, 0),
+            code,
+            RESPONSES.get(code, b""),
+            responseHeaders,
+            self,
+            self.request,
+        )
+        if self.request.method == b"HEAD" or code in NO_BODY_CODES:
+            response.length = 0
+        else:
+            contentLength = responseHeaders.getRawHeaders(b"content-length")
+            if contentLength is not None and contentLength[0].isdigit():
+                response.length = int(contentLength[0])
+        self.response = response
+        self._paused = True
+        self.deferred.callback(response)
+
+    def dataReceived(self, data, flowControlledLength):
+        """
+        Some of the response body has been received.
+
+        @param data: The data.
+        @type data: L{bytes}
+
+        @param flowControlledLength: The flow controlled length of the data,
+            which may be more than C{len(data)} if it was padded.
+        @type flowControlledLength: L{int}
+        """
+        if self._paused:
+            self._unacknowledged += flowControlledLength
+        else:
+            self._connection._acknowledge(self.streamID, flowControlledLength)
+        self.response._bodyDataReceived(data)
+
+    def ended(self):
+        """
+        The server has sent all of the response.  If the request has not all
+        been sent, stop sending it.
+        """
+        if not self._ended:
+            self._connection._resetStream(self.streamID, h2.errors.ErrorCodes.NO_ERROR)
+        self._close()
+        if self.response is None:
+            self.deferred.errback(
+                Failure(
+                    ResponseNeverReceived(
+                        [Failure(ConnectionLost("Stream ended without a response"))]
+                    )
+                )
+            )
+        else:
+            self.response._bodyDataFinished()
+
+    def windowUpdated(self):
+        """
+        The flow control window has opened, so more of the request body may
+        be sent.
+        """
+        self._sendOutbound()
+
+    def connectionLost(self, reason):
+        """
+        The stream has been reset or the connection has been lost.
+
+        @param reason: Why.
+        @type reason: L{Failure}
+        """
+        if self._closed:
+            return
+        self._close()
+        if self.response is None:
+            self.deferred.errback(Failure(ResponseNeverReceived([reason])))
+        else:
+            self.response._bodyDataFinished(
+                Failure(ResponseFailed([reason], self.response))
+            )
+
+    # Implementation of IConsumer, for the request body producer
+
+    def registerProducer(self, producer, streaming):
+        """
+        Request body producers are registered by L{H2ClientProtocol}, so this
+        does nothing.
+        """
+
+    def unregisterProducer(self):
+        """
+        Request body producers are unregistered by L{H2ClientProtocol}, so
+        this does nothing.
+        """
+
+    def write(self, data):
+        """
+        Send some of the request body, buffering it until flow control allows.
+
+        @param data: The data.
+        @type data: L{bytes}
+        """
+        if self._closed or not data:
+            return
+        self._outbound.append(data)
+        self._outboundSize += len(data)
+        self._sendOutbound()
+
+    # Implementation of IPushProducer, for the response body protocol
+
+    def pauseProducing(self):
+        """
+        Stop acknowledging the response body data received.
+        """
+        self._paused = True
+
+    def resumeProducing(self):
+        """
+        Acknowledge the response body data received while paused, and any
+        received from now on.
+        """
+        self._paused = False
+        if self._unacknowledged and not self._closed:
+            self._connection._acknowledge(self.streamID, self._unacknowledged)
+        self._unacknowledged = 0
+
+    def stopProducing(self):
+        """
+        Stop receiving the response, by resetting the stream.
+        """
+        if self._closed:
+            return
+        self._reset(h2.errors.ErrorCodes.CANCEL)
+        self.response._bodyDataFinished(
+            Failure(ResponseFailed([Failure(CancelledError())], self.response))
+        )
+
+    loseConnection = abortConnection = stopProducing
+
+
+class H2ClientProtocol(Protocol):
+    """
+    An HTTP/2 client connection, which sends each request given to
+    L{request} as a new L{H2ClientStream}, without waiting for earlier
+    responses.
+
+    @ivar conn: The HTTP/2 connection state machine.
+    @type conn: L{h2.connection.H2Connection}
+
+    @ivar _streams: A mapping of stream IDs to L{H2ClientStream}s.
+    @type _streams: L{dict}
+
+    @ivar _pending: Streams which have not yet been sent, because the server
+        limits the number of concurrent streams, and the requests for them.
+    @type _pending: L{collections.deque} of L{tuple}s of L{Deferred} and
+        L{twisted.web._newclient.Request}
+
+    @ivar _sentPending: A mapping of the L{Deferred}s of requests which were
+        pending to the L{H2ClientStream}s they have since been sent as, until
+        the stream's response is received or it fails.
+    @type _sentPending: L{dict}
+
+    @ivar _state: C{'OPEN'} while new requests may be made,
+        C{'GOING_AWAY'} once the connection is closing, and C{'CONNECTION_LOST'} once the
+        connection has been lost.
+    @type _state: L{str}
+
+    @ivar _quiescentCallback: A one-argument callable called with this
+        protocol whenever it has no requests in progress while C{'OPEN'}.
+
+    @ivar _lostCallback: A one-argument callable called with this protocol
+        once its connection has been lost.
+
+    @ivar _abortDeferreds: L{Deferred}s which will fire when the connection
+        is lost.
+    @type _abortDeferreds: L{list}
+    """
+
+    _state = "OPEN"
+    _log = Logger()
+
+    def __init__(self, quiescentCallback=lambda c: None, lostCallback=lambda c: None):
+        config = h2.config.H2Configuration(client_side=True, header_encoding=None)
+        self.conn = h2.connection.H2Connection(config=config)
+        self._streams = {}
+        self._pending = deque()
+        self._sentPending = {}
+        self._quiescentCallback = quiescentCallback
+        self._lostCallback = lostCallback
+        self._abortDeferreds = []
+
+    @property
+    def state(self):
+        return self._state
+
+    def connectionMade(self):
+        """
+        Send the connection preface, refusing server push.
+        """
+        self.conn.initiate_connection()
+        self.conn.update_settings({h2.settings.SettingCodes.ENABLE_PUSH: 0})
+        self._flush()
+
+    def request(self, request):
+        """
+        Send C{request} as a new stream, or once one of the streams in
+        progress has ended, if the server allows no more.
+
+        @param request: The request.
+        @type request: L{twisted.web._newclient.Request}
+
+        @return: A L{Deferred} which fires with the L{Response} once its
+            headers have been received.  It fails with
+            L{RequestNotSent} if this connection will accept no more
+            requests, L{RequestGenerationFailed} if the request body could not
+            be produced, and L{ResponseFailed} if the response could not be
+            received.
+        """
+        if self._state != "OPEN":
+            return fail(RequestNotSent())
+        if self._atStreamLimit():
+            d = Deferred(lambda d: self._cancelPending(d, request))
+            self._pending.append((d, request))
+            return d
+        return self._sendRequest(request).deferred
+
+    def _cancelPending(self, d, request):
+        """
+        Cancel a request which was made while the server allowed no more
+        streams: forget it if it is still pending, or cancel its stream if it
+        has been sent since.
+        """
+        stream = self._sentPending.get(d)
+        if stream is None:
+            self._pending.remove((d, request))
+        else:
+            stream.deferred.cancel()
+
+    def _atStreamLimit(self):
+        """
+        Whether the server allows no more concurrent streams.
+        """
+        limit = self.conn.remote_settings.max_concurrent_streams
+        return self.conn.open_outbound_streams >= limit
+
+    def _sendRequest(self, request):
+        """
+        Send the headers of a request as a new stream, and start producing
+        its body.
+
+        @return: The stream.
+        @rtype: L{H2ClientStream}
+        """
+        streamID = self.conn.get_next_available_stream_id()
+        stream = H2ClientStream(streamID, self, request)
+        self._streams[streamID] = stream
+        try:
+            self.conn.send_headers(
+                streamID,
+                _requestHeaders(request),
+                end_stream=request.bodyProducer is None,
+            )
+        except h2.exceptions.ProtocolError:
+            del self._streams[streamID]
+            stream.deferred.errback(Failure(RequestGenerationFailed([Failure()])))
+            return stream
+        self._flush()
+        if request.bodyProducer is not None:
+            stream._startBody()
+        return stream
+
+    def _sendPending(self):
+        """
+        Send pending requests, while the server allows more streams.
+        """
+        while self._pending and not self._atStreamLimit():
+            d, request = self._pending.popleft()
+            stream = self._sendRequest(request)
+            if not stream.deferred.called:
+                self._sentPending[d] = stream
+                stream.deferred.addBoth(self._forgetSentPending, d)
+            stream.deferred.chainDeferred(d)
+
+    def _forgetSentPending(self, result, d):
+        """
+        Forget the stream a pending request was sent as, once its response
+        has been received or it has failed.
+        """
+        del self._sentPending[d]
+        return result
+
+    def _flush(self):
+        """
+        Write the data the state machine has to send to the transport.
+        """
+        data = self.conn.data_to_send()
+        if data:
+            self.transport.write(data)
+
+    def _acknowledge(self, streamID, flowControlledLength):
+        """
+        Acknowledge response body data, so that the server may send more.
+        """
+        if self._state == "CONNECTION_LOST":
+            return
+        self.conn.acknowledge_received_data(flowControlledLength, streamID)
+        self._flush()
+
+    def _resetStream(self, streamID, errorCode):
+        """
+        Reset a stream which is still open.
+        """
+        if self._state == "CONNECTION_LOST":
+            return
+        try:
+            self.conn.reset_stream(streamID, errorCode)
+        except h2.exceptions.StreamClosedError:
+            pass
+        else:
+            self._flush()
+
+    def _streamClosed(self, stream):
+        """
+        Forget a stream which has ended, been reset or lost, then send
+        pending requests, or close the connection if it is going away and
+        this was the last stream.
+        """
+        self._streams.pop(stream.streamID, None)
+        if self._state == "CONNECTION_LOST":
+            return
+        self._sendPending()
+        if self._streams or self._pending:
+            return
+        if self._state == "GOING_AWAY":
+            self.transport.loseConnection()
+        else:
+            self._quiescentCallback(self)
+
+    def dataReceived(self, data):
+        """
+        Process frames received from the server.
+        """
+        try:
+            events = self.conn.receive_data(data)
+        except h2.exceptions.ProtocolError:
+            self._flush()
+            self._state = "GOING_AWAY"
+            self.transport.loseConnection()
+            return
+
+        for event in events:
+            if isinstance(event, h2.events.ResponseReceived):
+                stream = self._streams.get(event.stream_id)
+                if stream is not None:
+                    stream.responseReceived(event.headers)
+            elif isinstance(event, h2.events.DataReceived):
+                self._dataReceived(event)
+            elif isinstance(event, h2.events.StreamEnded):
+                stream = self._streams.get(event.stream_id)
+                if stream is not None:
+                    stream.ended()
+            elif isinstance(event, h2.events.StreamReset):
+                self._streamReset(event)
+            elif isinstance(event, h2.events.WindowUpdated):
+                self._windowUpdated(event)
+            elif isinstance(event, h2.events.RemoteSettingsChanged):
+                self._windowUpdated(event)
+                self._sendPending()
+            elif isinstance(event, h2.events.PushedStreamReceived):
+                self.conn.reset_stream(
+                    event.pushed_stream_id, h2.errors.ErrorCodes.REFUSED_STREAM
+                )
+            elif isinstance(event, h2.events.ConnectionTerminated):
+                self._goAway(event)
+
+        if self._state != "CONNECTION_LOST":
+            self._flush()
+
+    def _dataReceived(self, event):
+        """
+        Deliver response body data to its stream, or just acknowledge it if
+        the stream has already been closed by this side.
+        """
+        stream = self._streams.get(event.stream_id)
+        if stream is None:
+            self._acknowledge(event.stream_id, event.flow_controlled_length)
+        else:
+            stream.dataReceived(event.data, event.flow_controlled_length)
+
+    def _streamReset(self, event):
+        """
+        Fail a stream which the server has reset.
+        """
+        stream = self._streams.get(event.stream_id)
+        if stream is not None:
+            stream.connectionLost(
+                Failure(
+                    ConnectionLost(
+                        "Stream reset by server with error code {}".format(
+                            event.error_code
+                        )
+                    )
+                )
+            )
+
+    def _windowUpdated(self, event):
+        """
+        Send more request body data on the streams whose flow control windows
+        have opened: all of them if the connection's window has.
+        """
+        streamID = getattr(event, "stream_id", 0)
+        if streamID:
+            streams = [self._streams.get(streamID)]
+        else:
+            streams = list(self._streams.values())
+        for stream in streams:
+            if stream is not None:
+                stream.windowUpdated()
+
+    def _goAway(self, event):
+        """
+        The server is closing the connection.  The state machine accepts no
+        more frames once it has, so fail the requests not yet sent and the
+        streams in progress, and close the connection.
+        """
+        self._state = "GOING_AWAY"
+        pending, self._pending = self._pending, deque()
+        for d, request in pending:
+            d.errback(Failure(RequestNotSent()))
+        reason = Failure(
+            ConnectionLost(
+                "Connection closed by server with error code {}".format(
+                    event.error_code
+                )
+            )
+        )
+        for stream in list(self._streams.values()):
+            stream.connectionLost(reason)
+        self.transport.loseConnection()
+
+    def connectionLost(self, reason):
+        """
+        Fail the streams in progress and the requests not yet sent, then call
+        C{_lostCallback}.
+        """
+        self._state = "CONNECTION_LOST"
+        pending, self._pending = self._pending, deque()
+        for d, request in pending:
+            d.errback(Failure(RequestNotSent()))
+        for stream in list(self._streams.values()):
+            stream.connectionLost(reason)
+        for d in self._abortDeferreds:
+            d.callback(None)
+        self._abortDeferreds = []
+        self._lostCallback(self)
+
+    def abort(self):
+        """
+        Close the connection and cause all outstanding L{request}
+        L{Deferred}s to fire with an error.
+        """
+        if self._state == "CONNECTION_LOST":
+            return succeed(None)
+        self._state = "GOING_AWAY"
+        self.transport.loseConnection()
+        d = Deferred()
+        self._abortDeferreds.append(d)
+        return d
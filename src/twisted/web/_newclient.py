@@ -733,8 +733,7 @@ class Request:
             requestLines.append(b"Connection: close\r\n")
         if TEorCL is not None:
             requestLines.append(TEorCL)
-        for name, values in self.headers.getAllRawHeaders():
-            requestLines.extend([name + b": " + v + b"\r\n" for v in values])
+        requestLines.extend(self.headers._headerLines())
         requestLines.append(b"\r\n")
         transport.writeSequence(requestLines)
 
@@ -1458,6 +1457,12 @@ class HTTP11ClientProtocol(Protocol):
 
     @ivar _abortDeferreds: A list of C{Deferred} instances that will fire when
         the connection is lost.
+
+    @ivar _quiescentCallback: A one-argument callable called with this
+        protocol whenever it becomes quiescent after a persistent request.
+
+    @ivar _lostCallback: A one-argument callable called with this protocol
+        once its connection has been lost, whatever state it was in.
     """
 
     _state = "QUIESCENT"
@@ -1468,8 +1473,9 @@ class HTTP11ClientProtocol(Protocol):
     _responseDeferred = None
     _log = Logger()
 
-    def __init__(self, quiescentCallback=lambda c: None):
+    def __init__(self, quiescentCallback=lambda c: None, lostCallback=lambda c: None):
         self._quiescentCallback = quiescentCallback
+        self._lostCallback = lostCallback
         self._abortDeferreds = []
 
     @property
@@ -1647,10 +1653,18 @@ class HTTP11ClientProtocol(Protocol):
     def connectionLost(self, reason):
         """
         The underlying transport went away.  If appropriate, notify the parser
-        object.
+        object, then call C{_lostCallback}.
+        """
+        self._connectionLost(reason)
+        self._lostCallback(self)
+
+    def _connectionLost(self, reason):
+        """
+        Handle the loss of the connection as is appropriate to the current
+        state.
         """
 
-    connectionLost = makeStatefulDispatcher("connectionLost", connectionLost)
+    _connectionLost = makeStatefulDispatcher("connectionLost", _connectionLost)
 
     def _connectionLost_QUIESCENT(self, reason):
         """
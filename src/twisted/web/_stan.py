@@ -111,9 +111,14 @@ class Tag:
         mapping slot names to renderable values.  The values in this dict might
         be anything that can be present as the child of a L{Tag}; strings,
         lists, L{Tag}s, generators, etc.
+
+    @ivar _compiledChildren: A compiled form of the children which this L{Tag}, or
+        the L{Tag} it was cloned from, had when its template was compiled, or
+        L{None}.  It is only used while the children are unchanged.
     """
 
     slotData = None
+    _compiledChildren = None
     filename = None
     lineNumber = None
     columnNumber = None
@@ -246,6 +251,8 @@ class Tag:
             columnNumber=self.columnNumber,
         )
         newtag.slotData = newslotdata
+        if self._compiledChildren is not None:
+            newtag._compiledChildren = self._compiledChildren
 
         return newtag
 
@@ -0,0 +1,639 @@
+# -*- test-case-name: twisted.web.test.test_cache -*-
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Caching of rendered responses.
+
+L{CachingResource} wraps a resource, and the children it returns, so that
+what they render is kept in memory and served again, without rendering it
+again, for as long as the response says it may be::
+
+    from twisted.web.cache import CachingResource
+    from twisted.web.server import Site
+
+    site = Site(CachingResource(root, maxSize=64 * 1024 * 1024))
+
+Only successful responses to I{GET} requests are stored, and only when the
+wrapped resource gives them a lifetime, with a I{Cache-Control} C{max-age} or
+C{s-maxage} directive or an I{Expires} header, or when the L{CachingResource}
+is given a default lifetime.
+"""
+
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import attr
+
+from twisted.python import failure
+from twisted.python.components import proxyForInterface
+from twisted.web import http
+from twisted.web.resource import IResource
+from twisted.web.server import NOT_DONE_YET
+
+# Response headers which are not stored with a response.  Content-Length is
+# worked out again when it is served, Date is set afresh for each request,
+# and the validators are stored separately, to answer conditional requests.
+_unstoredHeaders = frozenset(
+    [b"content-length", b"date", b"age", b"etag", b"last-modified"]
+)
+
+# Request headers which identify the client.  Responses to requests with
+# these are only shared with other clients if they are marked public or vary
+# by them.
+_credentialHeaders = (b"authorization", b"cookie")
+
+
+@attr.s
+class _CachedResponse:
+    """
+    A response stored by a L{CachingResource}.
+
+    @ivar code: The response code.
+    @ivar message: The response message.
+    @ivar headers: The response headers to send, as pairs of a lowercase name
+        and a list of values.
+    @ivar body: The response body, before any content encoding.
+    @ivar etag: The entity tag of the response, or L{None}.
+    @ivar lastModified: When the response was last modified, in seconds since
+        the epoch, or L{None}.
+    @ivar varyNames: The lowercase names of the request headers the response
+        varies by.
+    @ivar public: Whether the response may be given to requests with
+        credentials which it does not vary by.
+    @ivar storedAt: When the response was stored, in seconds since the epoch.
+    @ivar expires: When the response stops being fresh, in seconds since the
+        epoch.
+    @ivar size: The number of bytes the response counts for against the cache
+        size.
+    """
+
+    code = attr.ib()  # type: int
+    message = attr.ib()  # type: Optional[bytes]
+    headers = attr.ib()  # type: List[Tuple[bytes, List[bytes]]]
+    body = attr.ib()  # type: bytes
+    etag = attr.ib()  # type: Optional[bytes]
+    lastModified = attr.ib()  # type: Optional[float]
+    varyNames = attr.ib()  # type: Tuple[bytes, ...]
+    public = attr.ib()  # type: bool
+    storedAt = attr.ib()  # type: float
+    expires = attr.ib()  # type: float
+    size = attr.ib()  # type: int
+
+
+def _headerValues(headers, name):
+    """
+    Get the comma separated elements of the values of a header.
+
+    @param headers: The headers to look in.
+    @type headers: L{twisted.web.http_headers.Headers}
+
+    @param name: The name of the header.
+    @type name: L{bytes}
+
+    @return: The stripped elements, lowercased.
+    @rtype: L{list} of L{bytes}
+    """
+    return [
+        element.strip().lower()
+        for value in headers.getRawHeaders(name, [])
+        for element in value.split(b",")
+        if element.strip()
+    ]
+
+
+def _cacheControl(headers):
+    """
+    Parse the I{Cache-Control} directives of a response.
+
+    @param headers: The response headers.
+    @type headers: L{twisted.web.http_headers.Headers}
+
+    @return: The directives, mapped to their arguments, or to L{None} if they
+        have none.
+    @rtype: L{dict} of L{bytes} to L{bytes} or L{None}
+    """
+    directives = {}  # type: Dict[bytes, Optional[bytes]]
+    for directive in _headerValues(headers, b"cache-control"):
+        name, equals, argument = directive.partition(b"=")
+        directives[name.strip()] = argument.strip().strip(b'"') if equals else None
+    return directives
+
+
+class _ResponseRecorder:
+    """
+    Records the response a resource renders for a request, so that it may be
+    stored, by standing in for the request's C{write} and C{finish} methods.
+
+    @ivar _key: The key the response is stored under.
+    @ivar _entry: The response being recorded, without its body, or L{None}
+        if nothing has been written yet.
+    @ivar _chunks: The body written so far.
+    @ivar _recording: Whether the response may still be stored.
+    @ivar _done: Whether the response has finished or been abandoned.
+    """
+
+    def __init__(self, cache, key, request):
+        """
+        @param cache: The cache to store the response in.
+        @type cache: L{_ResponseCache}
+
+        @param key: See L{_ResponseCache._key}.
+
+        @param request: The request being responded to.
+        @type request: L{twisted.web.server.Request}
+        """
+        self._cache = cache
+        self._key = key
+        self._request = request
+        self._entry = None  # type: Optional[_CachedResponse]
+        self._chunks = []  # type: List[bytes]
+        self._size = 0
+        self._recording = True
+        self._done = False
+        self._write = request.write
+        self._finish = request.finish
+        request.write = self.write
+        request.finish = self.finish
+        request.notifyFinish().addErrback(self._lost)
+
+    def write(self, data):
+        """
+        Record and write some of the response body.
+        """
+        if self._recording:
+            if self._entry is None:
+                self._entry = self._cache._storable(self._request)
+                if self._entry is None:
+                    self._recording = False
+            if self._recording:
+                self._size += len(data)
+                if self._size > self._cache.maxSize:
+                    self._recording = False
+                    self._chunks = []
+                else:
+                    self._chunks.append(data)
+        self._write(data)
+
+    def finish(self):
+        """
+        Finish the response, and store it if it may be.
+        """
+        try:
+            self._finish()
+        except BaseException:
+            self.abandon()
+            raise
+        if self._done:
+            return
+        self._done = True
+        if self._recording and self._entry is not None:
+            self._entry.body = b"".join(self._chunks)
+            self._cache._store(self._request, self._entry)
+        self._cache._release(self._key)
+
+    def abandon(self):
+        """
+        Give up on storing the response, and let the requests waiting for it
+        be rendered.
+        """
+        self._recording = False
+        self._chunks = []
+        if not self._done:
+            self._done = True
+            self._cache._release(self._key)
+
+    def _lost(self, reason):
+        """
+        The response was not finished, because the connection was lost.
+        """
+        self.abandon()
+
+
+class _ResponseCache:
+    """
+    The responses stored by a L{CachingResource} and its children.
+
+    @ivar maxSize: See L{CachingResource.__init__}.
+    @ivar defaultLifetime: See L{CachingResource.__init__}.
+
+    @ivar size: The number of bytes the stored responses count for.
+
+    @ivar _entries: The stored responses, by L{_key}, from the least to the
+        most recently used.
+    @ivar _varyNames: The names of the request headers which the responses
+        stored for each request target vary by, for those which vary.
+    @ivar _variants: The number of responses stored for each request target.
+    @ivar _waiting: For each key with a response being rendered, the requests
+        waiting for it, with the resources to render them with.
+    """
+
+    def __init__(self, maxSize, defaultLifetime, reactor):
+        self.maxSize = maxSize
+        self.defaultLifetime = defaultLifetime
+        self.size = 0
+        self._reactor = reactor
+        self._entries = OrderedDict()  # type: OrderedDict
+        self._varyNames = {}  # type: Dict[Tuple[bytes, bytes], Tuple[bytes, ...]]
+        self._variants = {}  # type: Dict[Tuple[bytes, bytes], int]
+        self._waiting = {}  # type: Dict[tuple, list]
+
+    def _target(self, request):
+        """
+        @return: The host and URI a request is for.
+        """
+        return ((request.getHeader(b"host") or b"").lower(), request.uri)
+
+    def _key(self, target, varyNames, request):
+        """
+        @return: The key a response to a request is stored under: the request
+            target and the values of the request headers the response varies
+            by.
+        """
+        headers = request.requestHeaders
+        return (
+            target,
+            tuple(b",".join(headers.getRawHeaders(name, [])) for name in varyNames),
+        )
+
+    def render(self, resource, request):
+        """
+        Serve a stored response to a request, or render a resource to get one,
+        or wait for the response to an identical request which is being
+        rendered.
+
+        @param resource: The resource to render on a miss.
+        @type resource: L{IResource}
+
+        @param request: The request.
+        @type request: L{twisted.web.server.Request}
+
+        @return: See L{IResource.render}.
+        """
+        if request.method not in (b"GET", b"HEAD") or getattr(
+            request, "_inFakeHead", False
+        ):
+            return resource.render(request)
+        target = self._target(request)
+        key = self._key(target, self._varyNames.get(target, ()), request)
+        entry = self._lookup(key, request)
+        if entry is not None:
+            return self._serve(entry, request)
+        if request.method == b"HEAD":
+            return resource.render(request)
+
+        waiting = self._waiting.get(key)
+        if waiting is not None:
+            waiting.append((request, resource))
+            request.notifyFinish().addErrback(self._gone, key, request)
+            return NOT_DONE_YET
+
+        self._waiting[key] = []
+        recorder = _ResponseRecorder(self, key, request)
+        try:
+            return resource.render(request)
+        except BaseException:
+            recorder.abandon()
+            raise
+
+    def _renderAfterWaiting(self, resource, request):
+        """
+        Serve the response a request was waiting for, or render a resource
+        if it was not stored.
+        """
+        target = self._target(request)
+        key = self._key(target, self._varyNames.get(target, ()), request)
+        entry = self._lookup(key, request)
+        if entry is not None:
+            return self._serve(entry, request)
+        return resource.render(request)
+
+    def _gone(self, reason, key, request):
+        """
+        A request waiting for a response went away.
+        """
+        waiting = self._waiting.get(key)
+        if waiting:
+            waiting[:] = [pair for pair in waiting if pair[0] is not request]
+
+    def _release(self, key):
+        """
+        Render the requests waiting for the response under C{key}, now that
+        it has been stored or given up on.
+        """
+        for request, resource in self._waiting.pop(key, []):
+            try:
+                request.render(_AfterWaiting(self, resource))
+            except BaseException:
+                request.processingFailed(failure.Failure())
+
+    def _credentialed(self, request, varyNames):
+        """
+        @return: Whether a request has credentials which a response does not
+            vary by.
+        """
+        headers = request.requestHeaders
+        return any(
+            headers.hasHeader(name) and name not in varyNames
+            for name in _credentialHeaders
+        )
+
+    def _lookup(self, key, request):
+        """
+        Find a fresh response which may be served to a request.
+
+        @return: The L{_CachedResponse} or L{None}.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires <= self._reactor.seconds():
+            self._remove(key)
+            return None
+        if not entry.public and self._credentialed(request, entry.varyNames):
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _serve(self, entry, request):
+        """
+        Serve a stored response, or I{Not Modified} if the request is
+        conditional and the response has not changed.
+
+        @return: The body to render.
+        """
+        request.setResponseCode(entry.code, entry.message)
+        headers = request.responseHeaders
+        for name, values in entry.headers:
+            headers.setRawHeaders(name, values)
+        age = self._reactor.seconds() - entry.storedAt
+        headers.setRawHeaders(b"age", [b"%d" % (max(age, 0),)])
+        if entry.etag is not None and request.setETag(entry.etag) is http.CACHED:
+            return b""
+        if entry.lastModified is not None:
+            # If-None-Match takes precedence over If-Modified-Since.
+            if request.getHeader(b"if-none-match") is not None:
+                request.lastModified = entry.lastModified
+            elif request.setLastModified(entry.lastModified) is http.CACHED:
+                return b""
+        return entry.body
+
+    def _storable(self, request):
+        """
+        Decide whether the response to a request may be stored, when it
+        starts being written.
+
+        @return: A L{_CachedResponse} with no body yet, or L{None} if the
+            response may not be stored.
+        """
+        if request.code != http.OK or request.cookies:
+            return None
+        headers = request.responseHeaders
+        if headers.hasHeader(b"set-cookie"):
+            return None
+        directives = _cacheControl(headers)
+        if (
+            b"no-store" in directives
+            or b"no-cache" in directives
+            or b"private" in directives
+        ):
+            return None
+
+        varyNames = tuple(_headerValues(headers, b"vary"))
+        if b"*" in varyNames:
+            return None
+        public = b"public" in directives or b"s-maxage" in directives
+        if not public and self._credentialed(request, varyNames):
+            return None
+
+        if getattr(request, "_encoder", None) is not None:
+            # The encoder set Content-Encoding, and will do so again when the
+            # response is served, if the client accepts the encoding.
+            if headers.getRawHeaders(b"content-encoding") != [b"gzip"]:
+                return None
+            storedHeaders = [
+                (name, values)
+                for name, values in headers.getAllRawHeaders()
+                if name.lower() != b"content-encoding"
+            ]
+        else:
+            storedHeaders = list(headers.getAllRawHeaders())
+
+        now = self._reactor.seconds()
+        lifetime = self._lifetime(directives, headers, now)
+        if lifetime <= 0:
+            return None
+
+        etag = request.etag
+        if etag is None:
+            etag = headers.getRawHeaders(b"etag", [None])[0]
+        lastModified = request.lastModified
+        if lastModified is None:
+            value = headers.getRawHeaders(b"last-modified", [None])[0]
+            if value is not None:
+                try:
+                    lastModified = http.stringToDatetime(value)
+                except ValueError:
+                    pass
+
+        storedHeaders = [
+            (name.lower(), list(values))
+            for name, values in storedHeaders
+            if name.lower() not in _unstoredHeaders
+        ]
+        size = sum(
+            len(name) + sum(len(value) for value in values)
+            for name, values in storedHeaders
+        )
+        return _CachedResponse(
+            code=request.code,
+            message=request.code_message,
+            headers=storedHeaders,
+            body=b"",
+            etag=etag,
+            lastModified=lastModified,
+            varyNames=varyNames,
+            public=public,
+            storedAt=now,
+            expires=now + lifetime,
+            size=size,
+        )
+
+    def _lifetime(self, directives, headers, now):
+        """
+        @return: For how many seconds a response is fresh, according to its
+            I{Cache-Control} directives or its I{Expires} header, or else
+            L{defaultLifetime}.
+        """
+        for name in (b"s-maxage", b"max-age"):
+            if name in directives:
+                try:
+                    return int(directives[name] or b"")
+                except ValueError:
+                    return 0
+        expires = headers.getRawHeaders(b"expires")
+        if expires:
+            try:
+                return http.stringToDatetime(expires[-1]) - now
+            except ValueError:
+                return 0
+        return self.defaultLifetime
+
+    def _store(self, request, entry):
+        """
+        Store a response, evicting the least recently used responses to keep
+        within L{maxSize}.
+        """
+        entry.size += len(entry.body)
+        if entry.size > self.maxSize:
+            return
+        target = self._target(request)
+        key = self._key(target, entry.varyNames, request)
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = entry
+        self.size += entry.size
+        self._variants[target] = self._variants.get(target, 0) + 1
+        if entry.varyNames:
+            self._varyNames[target] = entry.varyNames
+        else:
+            self._varyNames.pop(target, None)
+        while self.size > self.maxSize:
+            self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        """
+        Remove a stored response.
+        """
+        entry = self._entries.pop(key)
+        self.size -= entry.size
+        target = key[0]
+        variants = self._variants[target] - 1
+        if variants:
+            self._variants[target] = variants
+        else:
+            del self._variants[target]
+            self._varyNames.pop(target, None)
+
+    def clear(self):
+        """
+        Remove all stored responses.
+        """
+        self._entries.clear()
+        self._varyNames.clear()
+        self._variants.clear()
+        self.size = 0
+
+
+class _AfterWaiting:
+    """
+    Renders a request which waited for an identical request's response.
+    """
+
+    def __init__(self, cache, resource):
+        self._cache = cache
+        self._resource = resource
+
+    def render(self, request):
+        return self._cache._renderAfterWaiting(self._resource, request)
+
+
+class CachingResource(proxyForInterface(IResource)):  # type: ignore[misc]
+    """
+    Wrap a L{IResource}, and the children it returns, storing the responses
+    they render and serving them again while they are fresh.
+
+    Responses are stored by the I{Host} and URI they were requested with, and
+    the values of the request headers they name in I{Vary}.  They are only
+    stored if they are I{OK} responses to I{GET} requests, without cookies,
+    whose I{Cache-Control} does not forbid it and which have a lifetime,
+    from C{s-maxage} or C{max-age}, from I{Expires}, or the default one.
+    Responses to requests with I{Authorization} or I{Cookie} headers are only
+    stored or served from storage if they are marked C{public}, or vary by
+    those headers.  I{Cache-Control} directives in requests are ignored.
+
+    Stored responses are also used for I{HEAD} requests, and conditional
+    requests get I{Not Modified} responses when the stored response has a
+    matching I{ETag} or I{Last-Modified}, without rendering.
+
+    While a response is being rendered, identical requests wait for it
+    rather than being rendered too.  If it turns out not to be storable, they
+    are then rendered.
+
+    The least recently used responses are evicted to keep the total size
+    within C{maxSize}.
+
+    @ivar maxSize: The largest number of bytes of responses to store.
+    @type maxSize: L{int}
+
+    @ivar defaultLifetime: The number of seconds for which responses which
+        do not give their own lifetime are stored.
+    @type defaultLifetime: L{float}
+    """
+
+    def __init__(
+        self, original, maxSize=16 * 1024 * 1024, defaultLifetime=0, reactor=None
+    ):
+        """
+        @param original: The resource to wrap.
+        @type original: L{IResource}
+
+        @param maxSize: See L{maxSize}.
+        @param defaultLifetime: See L{defaultLifetime}.
+
+        @param reactor: The reactor whose time is used, or L{None} for the
+            global reactor.
+        """
+        super().__init__(original)
+        if reactor is None:
+            from twisted.internet import reactor
+        self._cache = _ResponseCache(maxSize, defaultLifetime, reactor)
+
+    @property
+    def maxSize(self):
+        return self._cache.maxSize
+
+    @property
+    def defaultLifetime(self):
+        return self._cache.defaultLifetime
+
+    @property
+    def size(self):
+        """
+        The number of bytes of responses stored.
+        """
+        return self._cache.size
+
+    def clear(self):
+        """
+        Remove all stored responses.
+        """
+        self._cache.clear()
+
+    def getChildWithDefault(self, path, request):
+        """
+        Get a child of the wrapped resource, wrapped to store its responses
+        alongside this resource's.
+        """
+        return _CachingChild(
+            self.original.getChildWithDefault(path, request), self._cache
+        )
+
+    def render(self, request):
+        """
+        Serve a stored response, or render the wrapped resource.
+        """
+        return self._cache.render(self.original, request)
+
+
+class _CachingChild(CachingResource):
+    """
+    A child of a L{CachingResource}, sharing its stored responses.
+    """
+
+    def __init__(self, original, cache):
+        self.original = original
+        self._cache = cache
+
+
+__all__ = ["CachingResource"]
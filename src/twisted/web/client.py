@@ -16,6 +16,9 @@ from urllib.parse import urlunparse as _urlunparse
 
 import zlib
 from functools import wraps
+from typing import Optional
+
+import attr
 
 from zope.interface import implementer
 
@@ -29,7 +32,11 @@ from twisted.python.deprecate import getDeprecationWarningString
 from twisted.web import http
 from twisted.internet import defer, protocol, task
 from twisted.internet.abstract import isIPv6Address
-from twisted.internet.interfaces import IProtocol, IOpenSSLContextFactory
+from twisted.internet.interfaces import (
+    IHandshakeListener,
+    IOpenSSLContextFactory,
+    IProtocol,
+)
 from twisted.internet.endpoints import HostnameEndpoint, wrapClientTLS
 from twisted.python.util import InsensitiveDict
 from twisted.python.components import proxyForInterface
@@ -850,6 +857,13 @@ from twisted.web._newclient import (
     _WrapperException,
 )
 
+try:
+    from twisted.web._http2client import H2ClientProtocol
+
+    H2_ENABLED = True
+except ImportError:
+    H2_ENABLED = False
+
 
 try:
     from OpenSSL import SSL
@@ -861,6 +875,7 @@ else:
         platformTrust,
         optionsForClientTLS,
     )
+    from twisted.protocols.tls import TLSMemoryBIOProtocol
 
 
 def _requireSSL(decoratee):
@@ -936,10 +951,24 @@ class WebClientContextFactory:
 class BrowserLikePolicyForHTTPS:
     """
     SSL connection creator for web clients.
+
+    @ivar _http2: Whether to offer HTTP/2 with ALPN.
+    @type _http2: L{bool}
     """
 
-    def __init__(self, trustRoot=None):
+    def __init__(self, trustRoot=None, http2=False):
+        """
+        @param trustRoot: The trust root to verify servers' certificates
+            with, or L{None} for the platform's.
+
+        @param http2: If C{True}, and HTTP/2 support is available, offer
+            servers HTTP/2 as well as HTTP/1.1 with ALPN, so that L{Agent}
+            sends many requests to a server which accepts it over one
+            connection at once.
+        @type http2: L{bool}
+        """
         self._trustRoot = trustRoot
+        self._http2 = http2
 
     @_requireSSL
     def creatorForNetloc(self, hostname, port):
@@ -959,6 +988,12 @@ class BrowserLikePolicyForHTTPS:
         @rtype: L{client connection creator
             <twisted.internet.interfaces.IOpenSSLClientConnectionCreator>}
         """
+        if self._http2 and H2_ENABLED:
+            return optionsForClientTLS(
+                hostname.decode("ascii"),
+                trustRoot=self._trustRoot,
+                acceptableProtocols=[b"h2", b"http/1.1"],
+            )
         return optionsForClientTLS(hostname.decode("ascii"), trustRoot=self._trustRoot)
 
 
@@ -1221,9 +1256,76 @@ class FileBodyProducer:
         self._task.resume()
 
 
+def _isHTTP2(connection):
+    """
+    Whether a connection speaks HTTP/2, and so may be used for many requests
+    at once.
+    """
+    return H2_ENABLED and isinstance(connection, H2ClientProtocol)
+
+
+@implementer(IHandshakeListener)
+class _NegotiatingClientProtocol(protocol.Protocol):
+    """
+    A protocol which decides whether to speak HTTP/1.1 or HTTP/2 once its
+    connection is made, and then hands everything on to an
+    L{HTTP11ClientProtocol} or L{H2ClientProtocol}.
+
+    HTTP/2 is spoken if it was negotiated with ALPN, which is known once the
+    TLS handshake has completed.  Over a transport other than
+    L{TLSMemoryBIOProtocol}, HTTP/1.1 is spoken as soon as the connection is
+    made.
+
+    @ivar negotiated: A L{defer.Deferred} which fires with the protocol
+        chosen, or fails with L{ResponseNeverReceived} if the connection is
+        lost first.
+
+    @ivar _factory: The L{_HTTP11ClientFactory} which built this protocol,
+        and builds the protocol chosen.
+
+    @ivar _protocol: The protocol chosen, or L{None} if none has been yet.
+    """
+
+    _protocol = None
+
+    def __init__(self, factory):
+        self._factory = factory
+        self.negotiated = defer.Deferred()
+
+    def connectionMade(self):
+        if SSL is None or not isinstance(self.transport, TLSMemoryBIOProtocol):
+            self._choose(b"http/1.1")
+
+    def handshakeCompleted(self):
+        if self._protocol is None:
+            self._choose(self.transport.negotiatedProtocol)
+
+    def _choose(self, negotiatedProtocol):
+        """
+        Connect the protocol which speaks C{negotiatedProtocol}, and fire
+        C{negotiated} with it.
+        """
+        if negotiatedProtocol == b"h2" and H2_ENABLED:
+            self._protocol = self._factory.buildHTTP2Protocol()
+        else:
+            self._protocol = self._factory.buildHTTP11Protocol()
+        self._protocol.makeConnection(self.transport)
+        self.negotiated.callback(self._protocol)
+
+    def dataReceived(self, data):
+        self._protocol.dataReceived(data)
+
+    def connectionLost(self, reason):
+        if self._protocol is None:
+            self.negotiated.errback(Failure(ResponseNeverReceived([reason])))
+        else:
+            self._protocol.connectionLost(reason)
+
+
 class _HTTP11ClientFactory(protocol.Factory):
     """
-    A factory for L{HTTP11ClientProtocol}, used by L{HTTPConnectionPool}.
+    A factory for L{HTTP11ClientProtocol}, or L{H2ClientProtocol} if HTTP/2
+    is negotiated, used by L{HTTPConnectionPool}.
 
     @ivar _quiescentCallback: The quiescent callback to be passed to protocol
         instances, used to return them to the connection pool.
@@ -1231,12 +1333,16 @@ class _HTTP11ClientFactory(protocol.Factory):
     @ivar _metadata: Metadata about the low-level connection details,
         used to make the repr more useful.
 
+    @ivar _lostCallback: The lost callback to be passed to protocol
+        instances, used to tell the connection pool they are gone.
+
     @since: 11.1
     """
 
-    def __init__(self, quiescentCallback, metadata):
+    def __init__(self, quiescentCallback, metadata, lostCallback=lambda c: None):
         self._quiescentCallback = quiescentCallback
         self._metadata = metadata
+        self._lostCallback = lostCallback
 
     def __repr__(self) -> str:
         return "_HTTP11ClientFactory({}, {})".format(
@@ -1244,7 +1350,21 @@ class _HTTP11ClientFactory(protocol.Factory):
         )
 
     def buildProtocol(self, addr):
-        return HTTP11ClientProtocol(self._quiescentCallback)
+        return _NegotiatingClientProtocol(self)
+
+    def buildHTTP11Protocol(self):
+        """
+        Build an L{HTTP11ClientProtocol}, for a connection over which HTTP/1.1
+        has been chosen.
+        """
+        return HTTP11ClientProtocol(self._quiescentCallback, self._lostCallback)
+
+    def buildHTTP2Protocol(self):
+        """
+        Build an L{H2ClientProtocol}, for a connection over which HTTP/2 has
+        been negotiated.
+        """
+        return H2ClientProtocol(self._quiescentCallback, self._lostCallback)
 
 
 class _RetryingHTTP11ClientProtocol:
@@ -1311,6 +1431,74 @@ class _RetryingHTTP11ClientProtocol:
         return d
 
 
+@attr.s
+class HTTPConnectionPoolStatistics:
+    """
+    What an L{HTTPConnectionPool} has counted and measured, for all of its
+    keys.  All times are in seconds.
+
+    @ivar requested: The number of connections requested with
+        L{HTTPConnectionPool.getConnection}.
+    @ivar reused: The number of those supplied with a cached persistent
+        connection.
+    @ivar connected: The number of new connections made, including those
+        made by L{HTTPConnectionPool.preconnect} and for retries.
+    @ivar connectFailures: The number of new connections which could not be
+        made.
+    @ivar connectTime: The total time new connections took to be made.
+    @ivar longestConnectTime: The longest time one new connection took to be
+        made.
+    @ivar queued: The number of requested connections which had to wait
+        because C{maxActivePerHost} connections were already active.
+    @ivar queueTime: The total time those which have been supplied waited.
+    @ivar longestQueueTime: The longest time one of them waited.
+    """
+
+    requested = attr.ib(default=0)  # type: int
+    reused = attr.ib(default=0)  # type: int
+    connected = attr.ib(default=0)  # type: int
+    connectFailures = attr.ib(default=0)  # type: int
+    connectTime = attr.ib(default=0.0)  # type: float
+    longestConnectTime = attr.ib(default=0.0)  # type: float
+    queued = attr.ib(default=0)  # type: int
+    queueTime = attr.ib(default=0.0)  # type: float
+    longestQueueTime = attr.ib(default=0.0)  # type: float
+
+    @property
+    def reuseRate(self):
+        """
+        The fraction of requested connections which were supplied with a
+        cached persistent connection, or C{0.0} if none have been requested.
+        """
+        if not self.requested:
+            return 0.0
+        return self.reused / self.requested
+
+
+class _ConnectionWaiter:
+    """
+    A request for a connection from an L{HTTPConnectionPool} which is waiting
+    for one of the active connections for its key to be released.
+
+    @ivar endpoint: The endpoint to open a new connection with, if no cached
+        connection is available when it is served.
+
+    @ivar queuedAt: When it started waiting.
+
+    @ivar deferred: The L{defer.Deferred} returned by
+        L{HTTPConnectionPool.getConnection}.
+
+    @ivar connecting: Once it is served, a L{defer.Deferred} which fires
+        with the connection it has been given.
+    """
+
+    def __init__(self, endpoint, queuedAt):
+        self.endpoint = endpoint
+        self.queuedAt = queuedAt
+        self.deferred = None  # type: Optional[defer.Deferred]
+        self.connecting = None  # type: Optional[defer.Deferred]
+
+
 class HTTPConnectionPool:
     """
     A pool of persistent HTTP connections.
@@ -1318,6 +1506,11 @@ class HTTPConnectionPool:
     Features:
      - Cached connections will eventually time out.
      - Limits on maximum number of persistent connections.
+     - Optional limits on the number of active connections, with requests
+       for more waiting their turn.
+     - Statistics about connection reuse, connection setup and waiting.
+     - HTTP/2, when it is negotiated with ALPN, with one connection for each
+       C{host:port} destination shared by all requests to it.
 
     Connections are stored using keys, which should be chosen such that any
     connections stored under a given key can be used interchangeably.
@@ -1333,12 +1526,30 @@ class HTTPConnectionPool:
         connections for a C{host:port} destination.
     @type maxPersistentPerHost: C{int}
 
+    @ivar maxActivePerHost: The maximum number of connections for a
+        C{host:port} destination which may be in use or being made at once,
+        or L{None} for no limit.  Connections requested beyond it are
+        supplied in the order they were requested as active connections are
+        released.  A retry may briefly exceed it, as it connects before the
+        connection which failed is released.  It should be set before the
+        pool is used.
+    @type maxActivePerHost: C{int} or L{None}
+
+    @ivar lifo: If C{True}, reuse the most recently cached connection first,
+        keeping the fewest connections busy and letting the rest time out;
+        otherwise, reuse the least recently cached connection first.
+    @type lifo: C{bool}
+
     @ivar cachedConnectionTimeout: Number of seconds a cached persistent
         connection will stay open before disconnecting.
 
     @ivar retryAutomatically: C{boolean} indicating whether idempotent
         requests should be retried once if no response was received.
 
+    @ivar statistics: What the pool has counted and measured.  It may be
+        replaced with a new L{HTTPConnectionPoolStatistics} to start again.
+    @type statistics: L{HTTPConnectionPoolStatistics}
+
     @ivar _factory: The factory used to connect to the proxy.
 
     @ivar _connections: Map (scheme, host, port) to lists of
@@ -1347,11 +1558,26 @@ class HTTPConnectionPool:
     @ivar _timeouts: Map L{HTTP11ClientProtocol} instances to a
         C{IDelayedCall} instance of their timeout.
 
+    @ivar _active: Map keys to the number of connections for them which are
+        in use or being made, while C{maxActivePerHost} is set.
+
+    @ivar _inUse: Map L{HTTP11ClientProtocol} instances which are in use to
+        their keys, while C{maxActivePerHost} is set.
+
+    @ivar _waiting: Map keys to L{collections.deque}s of the
+        L{_ConnectionWaiter}s for them, in the order they were requested.
+
+    @ivar _http2Connections: Map keys to the L{H2ClientProtocol} shared by
+        all requests for them.  An L{H2ClientProtocol} is also in
+        C{_timeouts} while it has no requests in progress.
+
     @since: 12.1
     """
 
     _factory = _HTTP11ClientFactory
     maxPersistentPerHost = 2
+    maxActivePerHost = None  # type: Optional[int]
+    lifo = False
     cachedConnectionTimeout = 240
     retryAutomatically = True
     _log = Logger()
@@ -1361,6 +1587,11 @@ class HTTPConnectionPool:
         self.persistent = persistent
         self._connections = {}
         self._timeouts = {}
+        self._active = {}
+        self._inUse = {}
+        self._waiting = {}
+        self._http2Connections = {}
+        self.statistics = HTTPConnectionPoolStatistics()
 
     def getConnection(self, key, endpoint):
         """
@@ -1374,6 +1605,10 @@ class HTTPConnectionPool:
         Afterwards, if the connection is still open, it will automatically be
         added to the pool.
 
+        If C{maxActivePerHost} connections for C{key} are already active, the
+        connection is supplied once one of them is released and any
+        connections requested earlier have been supplied.
+
         @param key: A unique key identifying connections that can be used
             interchangeably.
 
@@ -1383,26 +1618,84 @@ class HTTPConnectionPool:
         @return: A C{Deferred} that will fire with a L{HTTP11ClientProtocol}
            (or a wrapper) that can be used to send a single HTTP request.
         """
-        # Try to get cached version:
+        self.statistics.requested += 1
+        limit = self.maxActivePerHost
+        if (
+            limit is not None
+            and self._active.get(key, 0) >= limit
+            and self._sharedConnection(key) is None
+        ):
+            return self._wait(key, endpoint)
+        return self._activate(key, endpoint)
+
+    def _sharedConnection(self, key):
+        """
+        Get the HTTP/2 connection for C{key}, if there is one which will take
+        more requests, cancelling its timeout.
+        """
+        connection = self._http2Connections.get(key)
+        if connection is None:
+            return None
+        if connection.state != "OPEN":
+            del self._http2Connections[key]
+            return None
+        timeout = self._timeouts.pop(connection, None)
+        if timeout is not None:
+            timeout.cancel()
+        return connection
+
+    def _activate(self, key, endpoint):
+        """
+        Supply a connection for C{key}: a shared HTTP/2 connection, a cached
+        connection, or otherwise a new connection which will be active until
+        it is released.
+        """
+        connection = self._sharedConnection(key)
+        if connection is not None:
+            self.statistics.reused += 1
+            return defer.succeed(self._retrying(key, endpoint, connection))
+
         connections = self._connections.get(key)
         while connections:
-            connection = connections.pop(0)
+            if self.lifo:
+                connection = connections.pop()
+            else:
+                connection = connections.pop(0)
             # Cancel timeout:
             self._timeouts[connection].cancel()
             del self._timeouts[connection]
             if connection.state == "QUIESCENT":
-                if self.retryAutomatically:
-                    newConnection = lambda: self._newConnection(key, endpoint)
-                    connection = _RetryingHTTP11ClientProtocol(
-                        connection, newConnection
-                    )
-                return defer.succeed(connection)
+                self.statistics.reused += 1
+                if self.maxActivePerHost is not None:
+                    self._active[key] = self._active.get(key, 0) + 1
+                    self._inUse[connection] = key
+                return defer.succeed(self._retrying(key, endpoint, connection))
 
         return self._newConnection(key, endpoint)
 
+    def _seconds(self):
+        """
+        Get the current time according to the pool's reactor.
+
+        @return: The time, or C{0.0} if the pool has no reactor, in which
+            case nothing it measures takes any time.
+        """
+        if self._reactor is None:
+            return 0.0
+        return self._reactor.seconds()
+
+    def _retrying(self, key, endpoint, connection):
+        """
+        Wrap a cached connection, if requests made with it should be retried.
+        """
+        if self.retryAutomatically:
+            newConnection = lambda: self._newConnection(key, endpoint)
+            connection = _RetryingHTTP11ClientProtocol(connection, newConnection)
+        return connection
+
     def _newConnection(self, key, endpoint):
         """
-        Create a new connection.
+        Create a new connection, which will be active until it is released.
 
         This implements the new connection code path for L{getConnection}.
         """
@@ -1410,8 +1703,130 @@ class HTTPConnectionPool:
         def quiescentCallback(protocol):
             self._putConnection(key, protocol)
 
-        factory = self._factory(quiescentCallback, repr(endpoint))
-        return endpoint.connect(factory)
+        def lostCallback(protocol):
+            self._lostConnection(key, protocol)
+
+        def negotiate(connection):
+            if isinstance(connection, _NegotiatingClientProtocol):
+                return connection.negotiated
+            return connection
+
+        def connected(connection):
+            elapsed = self._seconds() - started
+            statistics = self.statistics
+            statistics.connected += 1
+            statistics.connectTime += elapsed
+            statistics.longestConnectTime = max(statistics.longestConnectTime, elapsed)
+            if _isHTTP2(connection):
+                # Share it for every request for this key, rather than
+                # holding one of the key's active connections.
+                if self.persistent:
+                    self._http2Connections.setdefault(key, connection)
+                if limited:
+                    self._release(key)
+            elif limited:
+                self._inUse[connection] = key
+            return connection
+
+        def failed(reason):
+            self.statistics.connectFailures += 1
+            if limited:
+                self._release(key)
+            return reason
+
+        factory = self._factory(quiescentCallback, repr(endpoint), lostCallback)
+        limited = self.maxActivePerHost is not None
+        if limited:
+            self._active[key] = self._active.get(key, 0) + 1
+        started = self._seconds()
+        try:
+            d = endpoint.connect(factory)
+        except BaseException:
+            self.statistics.connectFailures += 1
+            if limited:
+                self._release(key)
+            raise
+        return d.addCallback(negotiate).addCallbacks(connected, failed)
+
+    def _wait(self, key, endpoint):
+        """
+        Wait for an active connection for C{key} to be released, then supply
+        a connection as L{_activate} does.
+        """
+        waiters = self._waiting.setdefault(key, collections.deque())
+        waiter = _ConnectionWaiter(endpoint, self._seconds())
+
+        def cancel(d):
+            if waiter.connecting is None:
+                self._waiting[key].remove(waiter)
+            else:
+                waiter.connecting.cancel()
+
+        waiter.deferred = defer.Deferred(cancel)
+        waiters.append(waiter)
+        self.statistics.queued += 1
+        return waiter.deferred
+
+    def _serve(self, key, waiter, connecting):
+        """
+        Give a waiter the connection which C{connecting} fires with.
+
+        If the waiter has given up by the time it fires, put the connection
+        back in the pool.
+        """
+        elapsed = self._seconds() - waiter.queuedAt
+        statistics = self.statistics
+        statistics.queueTime += elapsed
+        statistics.longestQueueTime = max(statistics.longestQueueTime, elapsed)
+        waiter.connecting = connecting
+
+        def deliver(result):
+            if not waiter.deferred.called:
+                waiter.deferred.callback(result)
+            elif not isinstance(result, Failure):
+                self._putConnection(key, result)
+
+        connecting.addBoth(deliver)
+
+    def _release(self, key):
+        """
+        Release one of the active connections for C{key}, and supply
+        connections to waiters while the limit allows.
+        """
+        active = self._active[key] - 1
+        if active:
+            self._active[key] = active
+        else:
+            del self._active[key]
+        waiters = self._waiting.get(key)
+        if waiters is None:
+            return
+        limit = self.maxActivePerHost
+        while waiters and (limit is None or self._active.get(key, 0) < limit):
+            waiter = waiters.popleft()
+            self._serve(
+                key, waiter, defer.maybeDeferred(self._activate, key, waiter.endpoint)
+            )
+        if not waiters:
+            del self._waiting[key]
+
+    def _lostConnection(self, key, connection):
+        """
+        Forget a connection which has been lost.  This will be called by
+        L{HTTP11ClientProtocol} or L{H2ClientProtocol} when its connection is
+        lost.
+        """
+        if self._inUse.pop(connection, None) is not None:
+            self._release(key)
+            return
+        if self._http2Connections.get(key) is connection:
+            del self._http2Connections[key]
+        connections = self._connections.get(key)
+        if connections and connection in connections:
+            connections.remove(connection)
+        timeout = self._timeouts.pop(connection, None)
+        if timeout is not None:
+            timeout.cancel()
 
     def _removeConnection(self, key, connection):
         """
@@ -1425,7 +1840,17 @@ class HTTPConnectionPool:
         """
         Return a persistent connection to the pool. This will be called by
         L{HTTP11ClientProtocol} when the connection becomes quiescent.
+
+        If a request for a connection for C{key} is waiting, it is given this
+        one instead.
+
+        An L{H2ClientProtocol}, which calls this when it has no requests in
+        progress, stays shared rather than being cached, and times out in
+        the same way.
         """
+        if _isHTTP2(connection):
+            self._putHTTP2Connection(key, connection)
+            return
         if connection.state != "QUIESCENT":
             # Log with traceback for debugging purposes:
             try:
@@ -1437,6 +1862,18 @@ class HTTPConnectionPool:
                     "BUG: Non-quiescent protocol added to connection pool."
                 )
             return
+        if self._inUse.pop(connection, None) is not None:
+            waiters = self._waiting.get(key)
+            if waiters:
+                waiter = waiters.popleft()
+                if not waiters:
+                    del self._waiting[key]
+                self.statistics.reused += 1
+                self._inUse[connection] = key
+                connection = self._retrying(key, waiter.endpoint, connection)
+                self._serve(key, waiter, defer.succeed(connection))
+                return
+            self._release(key)
         connections = self._connections.setdefault(key, [])
         if len(connections) == self.maxPersistentPerHost:
             dropped = connections.pop(0)
@@ -1449,6 +1886,69 @@ class HTTPConnectionPool:
         )
         self._timeouts[connection] = cid
 
+    def _putHTTP2Connection(self, key, connection):
+        """
+        Start the timeout of an HTTP/2 connection with no requests in
+        progress, or close it if it is not the one shared for C{key}.
+        """
+        if self._http2Connections.get(key) is not connection:
+            connection.transport.loseConnection()
+            return
+        if connection not in self._timeouts:
+            self._timeouts[connection] = self._reactor.callLater(
+                self.cachedConnectionTimeout,
+                self._removeHTTP2Connection,
+                key,
+                connection,
+            )
+
+    def _removeHTTP2Connection(self, key, connection):
+        """
+        Stop sharing an HTTP/2 connection and disconnect it.
+        """
+        del self._timeouts[connection]
+        del self._http2Connections[key]
+        connection.transport.loseConnection()
+
+    def preconnect(self, key, endpoint, count=1):
+        """
+        Open new persistent connections ahead of time and add them to the
+        pool, so that requests need not wait for connections to be made.
+
+        No more are opened than the pool would cache alongside those already
+        cached for C{key}, nor than C{maxActivePerHost} allows.
+
+        @param key: A unique key identifying connections that can be used
+            interchangeably.
+
+        @param endpoint: An endpoint that can be used to open the new
+            connections.
+
+        @param count: The number of connections to open.
+        @type count: C{int}
+
+        @return: A C{Deferred} that will fire with the number of connections
+            which were opened.
+        """
+        if not self.persistent:
+            return defer.succeed(0)
+        count = min(
+            count, self.maxPersistentPerHost - len(self._connections.get(key, ()))
+        )
+        if self.maxActivePerHost is not None:
+            count = min(count, self.maxActivePerHost - self._active.get(key, 0))
+
+        def connected(connection):
+            self._putConnection(key, connection)
+            return connection
+
+        results = []
+        for _ in range(count):
+            d = defer.maybeDeferred(self._newConnection, key, endpoint)
+            results.append(d.addCallback(connected))
+        d = defer.DeferredList(results, consumeErrors=True)
+        return d.addCallback(lambda results: sum(1 for ok, _ in results if ok))
+
     def closeCachedConnections(self):
         """
         Close all persistent connections and remove them from the pool.
@@ -1461,6 +1961,9 @@ class HTTPConnectionPool:
             for p in protocols:
                 results.append(p.abort())
         self._connections = {}
+        for p in self._http2Connections.values():
+            results.append(p.abort())
+        self._http2Connections = {}
         for dc in self._timeouts.values():
             dc.cancel()
         self._timeouts = {}
@@ -1764,6 +2267,29 @@ class Agent(_AgentBase):
             parsedURI.originForm,
         )
 
+    def preconnect(self, uri, count=1):
+        """
+        Open persistent connections to the server indicated by the given
+        C{uri} ahead of time, with L{HTTPConnectionPool.preconnect}, so that
+        requests to it need not wait for connections to be made.
+
+        @param uri: A URI of the server, as for L{request}.
+        @type uri: L{bytes}
+
+        @param count: The number of connections to open.
+        @type count: C{int}
+
+        @return: A C{Deferred} that will fire with the number of connections
+            which were opened.
+        """
+        parsedURI = URI.fromBytes(_ensureValidURI(uri.strip()))
+        try:
+            endpoint = self._getEndpoint(parsedURI)
+        except SchemeNotSupported:
+            return defer.fail(Failure())
+        key = (parsedURI.scheme, parsedURI.host, parsedURI.port)
+        return self._pool.preconnect(key, endpoint, count)
+
 
 @implementer(IAgent)
 class ProxyAgent(_AgentBase):
@@ -2342,6 +2868,7 @@ __all__ = [
     "GzipDecoder",
     "HTTPClientFactory",
     "HTTPConnectionPool",
+    "HTTPConnectionPoolStatistics",
     "HTTPDownloader",
     "HTTPPageDownloader",
     "HTTPPageGetter",
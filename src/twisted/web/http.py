@@ -106,6 +106,7 @@ import tempfile
 import time
 import warnings
 from io import BytesIO
+from typing import List
 from urllib.parse import (
     ParseResultBytes,
     urlparse as _urlparse,
@@ -175,7 +176,11 @@ from twisted.web._responses import (
     UNSUPPORTED_MEDIA_TYPE,
     USE_PROXY,
 )
-from twisted.web.http_headers import Headers, _sanitizeLinearWhitespace
+from twisted.web.http_headers import (
+    Headers,
+    _encodedNames,
+    _sanitizeLinearWhitespace,
+)
 from twisted.web.iweb import IAccessLogFormatter, INonQueuedRequestFactory, IRequest
 
 
@@ -2140,6 +2145,7 @@ class HTTPChannel(basic.LineReceiver, policies.TimeoutMixin):
             self._command = command
             self._path = request
             self._version = version
+            self._headerBlockReceived()
         elif line == b"":
             # End of headers.
             if self.__header:
@@ -2165,6 +2171,99 @@ class HTTPChannel(basic.LineReceiver, policies.TimeoutMixin):
                 self.headerReceived(self.__header)
             self.__header = line
 
+    def _headerBlockReceived(self):
+        """
+        Parse all of the current request's headers in one pass, straight out
+        of the line buffer, if they have all been received, rather than one
+        line at a time with L{lineReceived} and L{headerReceived}.
+
+        The headers are left for L{lineReceived} if parsing them all at once
+        might make any difference: if any are folded over more than one line,
+        contain a lone CR or LF, or take the request over C{totalHeadersSize}
+        or C{maxHeaders}, or if L{lineReceived} or L{headerReceived} is
+        overridden.
+        """
+        cls = type(self)
+        if (
+            cls.lineReceived is not HTTPChannel.lineReceived
+            or cls.headerReceived is not HTTPChannel.headerReceived
+        ):
+            return
+
+        buffer = self._buffer
+        start = self._bufferOffset
+        if buffer[start : start + 2] == b"\r\n":
+            lines = []  # type: List[bytes]
+            size = 0
+            self._bufferOffset = start + 2
+        else:
+            # The end of the headers can be no further away than this if they
+            # are within the limits.
+            window = (
+                self.totalHeadersSize
+                - self._receivedHeaderSize
+                + 2 * self.maxHeaders
+                + 4
+            )
+            end = buffer.find(b"\r\n\r\n", start, start + window)
+            if end == -1 or end - start > self.MAX_LENGTH:
+                return
+            block = buffer[start:end]
+            lines = block.split(b"\r\n")
+            breaks = len(lines) - 1
+            size = end - start - 2 * breaks
+            if (
+                len(lines) > self.maxHeaders
+                or self._receivedHeaderSize + size > self.totalHeadersSize
+                or block.count(b"\r") != breaks
+                or block.count(b"\n") != breaks
+                or block[:1] in (b" ", b"\t")
+                or b"\n " in block
+                or b"\n\t" in block
+            ):
+                return
+            self._bufferOffset = end + 4
+
+        self._receivedHeaderSize += size
+        self._receivedHeaderCount += len(lines)
+        reqHeaders = self.requests[-1].requestHeaders
+        # The names and values cannot contain line breaks, so need none of
+        # the sanitizing Headers.setRawHeaders does, and can be stored
+        # directly unless Headers has been replaced with something else.
+        if type(reqHeaders) is Headers:
+            rawHeaders = reqHeaders._rawHeaders
+        else:
+            rawHeaders = None
+        for line in lines:
+            header, colon, data = line.partition(b":")
+            if not colon or not header or header[-1:].isspace():
+                self._respondToBadRequestAndDisconnect()
+                return
+            # Use the shared lowercase name if it is a common one.
+            header = _encodedNames.get(header) or header.lower()
+            data = data.strip()
+            if header == b"content-length" or header == b"transfer-encoding":
+                if not self._maybeChooseTransferDecoder(header, data):
+                    return
+            if rawHeaders is None:
+                values = reqHeaders.getRawHeaders(header)
+                if values is not None:
+                    values.append(data)
+                else:
+                    reqHeaders.setRawHeaders(header, [data])
+            else:
+                values = rawHeaders.get(header)
+                if values is not None:
+                    values.append(data)
+                else:
+                    rawHeaders[header] = [data]
+
+        self.allHeadersReceived()
+        if self.length == 0:
+            self.allContentReceived()
+        else:
+            self.setRawMode()
+
     def _finishRequestBody(self, data):
         self.allContentReceived()
         self._dataBuffer.append(data)
@@ -2460,11 +2559,7 @@ class HTTPChannel(basic.LineReceiver, policies.TimeoutMixin):
 
         responseLine = version + b" " + code + b" " + reason + b"\r\n"
         headerSequence = [responseLine]
-        headerSequence.extend(
-            name + b": " + value + b"\r\n"
-            for name, values in sanitizedHeaders.getAllRawHeaders()
-            for value in values
-        )
+        headerSequence.extend(sanitizedHeaders._headerLines())
         headerSequence.append(b"\r\n")
         self.transport.writeSequence(headerSequence)
 
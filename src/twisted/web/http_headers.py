@@ -43,9 +43,119 @@ def _sanitizeLinearWhitespace(headerComponent: bytes) -> bytes:
 
     @return: The sanitized header key or value.
     """
+    if b"\n" not in headerComponent and b"\r" not in headerComponent:
+        return headerComponent
     return b" ".join(headerComponent.splitlines())
 
 
+# Header names given a canonical capitalization other than that of
+# _dashCapitalize.
+_caseMappings = {
+    b"content-md5": b"Content-MD5",
+    b"dnt": b"DNT",
+    b"etag": b"ETag",
+    b"p3p": b"P3P",
+    b"te": b"TE",
+    b"www-authenticate": b"WWW-Authenticate",
+    b"x-xss-protection": b"X-XSS-Protection",
+}
+
+# The header names most requests and responses use.
+_commonNames = [
+    b"accept",
+    b"accept-charset",
+    b"accept-encoding",
+    b"accept-language",
+    b"accept-ranges",
+    b"access-control-allow-credentials",
+    b"access-control-allow-headers",
+    b"access-control-allow-methods",
+    b"access-control-allow-origin",
+    b"access-control-expose-headers",
+    b"access-control-max-age",
+    b"access-control-request-headers",
+    b"access-control-request-method",
+    b"age",
+    b"allow",
+    b"authorization",
+    b"cache-control",
+    b"connection",
+    b"content-disposition",
+    b"content-encoding",
+    b"content-language",
+    b"content-length",
+    b"content-location",
+    b"content-range",
+    b"content-security-policy",
+    b"content-type",
+    b"cookie",
+    b"date",
+    b"expect",
+    b"expires",
+    b"forwarded",
+    b"host",
+    b"if-match",
+    b"if-modified-since",
+    b"if-none-match",
+    b"if-range",
+    b"if-unmodified-since",
+    b"keep-alive",
+    b"last-modified",
+    b"link",
+    b"location",
+    b"origin",
+    b"pragma",
+    b"proxy-authenticate",
+    b"proxy-authorization",
+    b"range",
+    b"referer",
+    b"referrer-policy",
+    b"retry-after",
+    b"sec-websocket-accept",
+    b"sec-websocket-extensions",
+    b"sec-websocket-key",
+    b"sec-websocket-protocol",
+    b"sec-websocket-version",
+    b"server",
+    b"set-cookie",
+    b"strict-transport-security",
+    b"trailer",
+    b"transfer-encoding",
+    b"upgrade",
+    b"user-agent",
+    b"vary",
+    b"via",
+    b"warning",
+    b"x-content-type-options",
+    b"x-forwarded-for",
+    b"x-forwarded-host",
+    b"x-forwarded-proto",
+    b"x-frame-options",
+    b"x-real-ip",
+    b"x-requested-with",
+] + list(_caseMappings)
+
+# The capitalization _dashCapitalize gives header names, by their lowercase
+# form.  As well as the common names, up to _maxCapitalizedNames others are
+# remembered as they are used.
+_capitalizedNames = {
+    name: _dashCapitalize(name) for name in _commonNames
+}  # type: Dict[bytes, bytes]
+_maxCapitalizedNames = len(_capitalizedNames) + 1000
+
+# The lowercase form of the common header names, by their lowercase and
+# canonical forms, as bytes and as text.  Looking names up here, rather than
+# lowercasing them, saves making a copy of the name and lets every L{Headers}
+# share the same one.
+_encodedNames = {}  # type: Dict[bytes, bytes]
+_encodedTextNames = {}  # type: Dict[str, bytes]
+for _name in _commonNames:
+    for _form in {_name, _capitalizedNames[_name], _caseMappings.get(_name, _name)}:
+        _encodedNames[_form] = _name
+        _encodedTextNames[_form.decode("ascii")] = _name
+del _name, _form
+
+
 @comparable
 class Headers:
     """
@@ -68,15 +178,7 @@ class Headers:
         header values as L{bytes}.
     """
 
-    _caseMappings = {
-        b"content-md5": b"Content-MD5",
-        b"dnt": b"DNT",
-        b"etag": b"ETag",
-        b"p3p": b"P3P",
-        b"te": b"TE",
-        b"www-authenticate": b"WWW-Authenticate",
-        b"x-xss-protection": b"X-XSS-Protection",
-    }
+    _caseMappings = _caseMappings
 
     def __init__(
         self,
@@ -117,8 +219,14 @@ class Headers:
         @return: C{name}, encoded if required, lowercased
         """
         if isinstance(name, str):
-            return name.lower().encode("iso-8859-1")
-        return name.lower()
+            encoded = _encodedTextNames.get(name)
+            if encoded is None:
+                encoded = name.lower().encode("iso-8859-1")
+            return encoded
+        encoded = _encodedNames.get(name)
+        if encoded is None:
+            encoded = name.lower()
+        return encoded
 
     def copy(self):
         """
@@ -215,14 +323,18 @@ class Headers:
                 "bytes or str" % (type(value),)
             )
 
-        values = self.getRawHeaders(name)
+        encodedName = _sanitizeLinearWhitespace(self._encodeName(name))
+        if isinstance(value, str):
+            _value = value.encode("utf8")
+        else:
+            _value = value
+        encodedValue = _sanitizeLinearWhitespace(_value)
 
+        values = self._rawHeaders.get(encodedName)
         if values is not None:
-            values.append(value)
+            values.append(encodedValue)
         else:
-            values = [value]
-
-        self.setRawHeaders(name, values)
+            self._rawHeaders[encodedName] = [encodedValue]
 
     _T = TypeVar("_T")
 
@@ -242,7 +354,7 @@ class Headers:
             values.  Otherwise, C{default}.
         """
         encodedName = self._encodeName(name)
-        values = self._rawHeaders.get(encodedName, [])
+        values = self._rawHeaders.get(encodedName)
         if not values:
             return default
 
@@ -268,7 +380,35 @@ class Headers:
 
         @return: The canonical name of the header.
         """
-        return self._caseMappings.get(name, _dashCapitalize(name))
+        canonical = self._caseMappings.get(name)
+        if canonical is None:
+            canonical = _capitalizedNames.get(name)
+            if canonical is None:
+                canonical = _dashCapitalize(name)
+                if len(_capitalizedNames) < _maxCapitalizedNames:
+                    _capitalizedNames[name] = canonical
+        return canonical
+
+    def _headerLines(self) -> List[bytes]:
+        """
+        Serialize these headers for an HTTP/1.x message.
+
+        @return: A line for each value of each header, giving the canonical
+            name of the header and the value, and ending with CRLF, in the
+            order L{getAllRawHeaders} gives them.
+        """
+        lines = []  # type: List[bytes]
+        if type(self) is not Headers:
+            # A subclass may override getAllRawHeaders.
+            for name, values in self.getAllRawHeaders():
+                lines.extend(name + b": " + value + b"\r\n" for value in values)
+            return lines
+        canonicalNameCaps = self._canonicalNameCaps
+        for name, values in self._rawHeaders.items():
+            prefix = canonicalNameCaps(name) + b": "
+            for value in values:
+                lines.append(prefix + value + b"\r\n")
+        return lines
 
 
 __all__ = ["Headers"]
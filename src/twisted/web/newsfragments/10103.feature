@@ -0,0 +1 @@
+twisted.web.static.File now sends files to plain TCP connections with sendfile() when the response body is not encoded.
@@ -0,0 +1 @@
+twisted.web.http_headers.Headers now stores common header names under shared lowercase names and caches their canonical capitalization, which makes building and serializing headers faster and uses less memory.
@@ -0,0 +1 @@
+twisted.web.cache.CachingResource wraps a resource and serves fresh copies of the successful responses to GET requests it has rendered from memory, following Cache-Control, Expires and Vary.
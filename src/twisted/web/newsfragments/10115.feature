@@ -0,0 +1 @@
+twisted.web.static.File accepts a cache argument, a twisted.web.static.FileCache, which keeps the results of stat calls, child resources and open files between requests.
@@ -0,0 +1 @@
+twisted.web.static.File.precompressedEncodings can be set to serve precompressed variants of files, such as index.html.br or index.html.gz, to clients which accept their encoding, and twisted.web.server.GzipEncoderFactory accepts compressLevel and cacheSize arguments, the latter making it keep recently compressed responses to send again.
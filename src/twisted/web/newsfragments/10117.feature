@@ -0,0 +1 @@
+twisted.web.template.XMLString and twisted.web.template.XMLFile now compile their templates the first time they are rendered, and copies of tags with renderers which render methods return, such as tag.clone().fillSlots(...), are flattened from the compiled form of their children unless those children were changed; in docs/core/benchmarks/templateflatten.py this renders the page about twice as fast.
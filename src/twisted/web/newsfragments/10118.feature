@@ -0,0 +1 @@
+twisted.web.template.renderElement now pauses flattening while the transport is paused, and twisted.web.template.flatten buffers its output into fewer, larger writes.
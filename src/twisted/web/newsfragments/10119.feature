@@ -0,0 +1 @@
+twisted.web.client.HTTPConnectionPool can now limit the number of active connections per host with maxActivePerHost, reuse the most recently cached connection first with lifo, open connections ahead of time with preconnect, and reports connection reuse and wait times through its new statistics attribute.
@@ -0,0 +1 @@
+twisted.web.client.Agent can now use HTTP/2 with HTTPS servers which support it, when h2 is installed and BrowserLikePolicyForHTTPS is created with http2=True.
@@ -14,6 +14,7 @@ This is a web server which integrates with the twisted.internet infrastructure.
 """
 
 
+import collections
 import copy
 import os
 import re
@@ -606,11 +607,31 @@ class GzipEncoderFactory:
     @cvar compressLevel: The compression level used by the compressor, default
         to 9 (highest).
 
+    @ivar cacheSize: The largest number of bytes of compressed response bodies
+        to keep, for responses with a strong entity tag, so that identical
+        responses need not be compressed again; or C{0} to keep none.
+    @type cacheSize: L{int}
+
     @since: 12.3
     """
 
     _gzipCheckRegex = re.compile(br"(:?^|[\s,])gzip(:?$|[\s,])")
     compressLevel = 9
+    _cache = None  # type: Optional[_EncodedBodies]
+
+    def __init__(self, compressLevel=None, cacheSize=0):
+        """
+        @param compressLevel: If not L{None}, the compression level to use
+            instead of L{compressLevel}.
+        @type compressLevel: L{int}
+
+        @param cacheSize: See L{cacheSize}.
+        """
+        if compressLevel is not None:
+            self.compressLevel = compressLevel
+        self.cacheSize = cacheSize
+        if cacheSize:
+            self._cache = _EncodedBodies(cacheSize)
 
     def encoderForRequest(self, request):
         """
@@ -628,7 +649,62 @@ class GzipEncoderFactory:
                 encoding = b"gzip"
 
             request.responseHeaders.setRawHeaders(b"content-encoding", [encoding])
-            return _GzipEncoder(self.compressLevel, request)
+            return _GzipEncoder(self.compressLevel, request, self._cache)
+
+
+class _EncodedBodies:
+    """
+    Response bodies compressed by a L{GzipEncoderFactory}, by the host, URI
+    and strong entity tag of the responses, from the least to the most
+    recently used.
+
+    @ivar maxSize: The largest number of bytes of bodies to keep.
+    @ivar size: The number of bytes of bodies kept.
+    """
+
+    def __init__(self, maxSize):
+        self.maxSize = maxSize
+        self.size = 0
+        self._bodies = collections.OrderedDict()  # type: collections.OrderedDict
+
+    @staticmethod
+    def key(request):
+        """
+        @return: The key the compressed body of the response to a request is
+            kept under, or L{None} if it is not to be kept.
+        """
+        if request.method != b"GET" or request.code != http.OK:
+            return None
+        etag = request.etag
+        if etag is None:
+            etag = request.responseHeaders.getRawHeaders(b"etag", [None])[-1]
+        if etag is None or etag.startswith(b"W/"):
+            return None
+        return (request.getHeader(b"host"), request.uri, etag)
+
+    def get(self, key):
+        """
+        @return: The compressed body kept under C{key}, or L{None}.
+        """
+        body = self._bodies.get(key)
+        if body is not None:
+            self._bodies.move_to_end(key)
+        return body
+
+    def put(self, key, body):
+        """
+        Keep a compressed body, evicting the least recently used bodies to
+        keep within L{maxSize}.
+        """
+        if len(body) > self.maxSize:
+            return
+        old = self._bodies.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self._bodies[key] = body
+        self.size += len(body)
+        while self.size > self.maxSize:
+            self.size -= len(self._bodies.popitem(last=False)[1])
 
 
 @implementer(iweb._IRequestEncoder)
@@ -637,38 +713,87 @@ class _GzipEncoder:
     An encoder which supports gzip.
 
     @ivar _zlibCompressor: The zlib compressor instance used to compress the
-        stream.
+        stream, created when there is something to compress.
 
     @ivar _request: A reference to the originating request.
 
+    @ivar _cache: The L{_EncodedBodies} to look compressed bodies up in and
+        keep them in, or L{None}.
+
+    @ivar _key: The key the compressed body is to be kept under, or L{None}.
+
+    @ivar _chunks: The compressed body so far, if it is to be kept.
+
+    @ivar _cached: The compressed body, if it was found in C{_cache}, in which
+        case what is written is ignored.
+
     @since: 12.3
     """
 
     _zlibCompressor = None
+    _key = None
+    _cached = None  # type: Optional[bytes]
 
-    def __init__(self, compressLevel, request):
-        self._zlibCompressor = zlib.compressobj(
-            compressLevel, zlib.DEFLATED, 16 + zlib.MAX_WBITS
-        )
+    def __init__(self, compressLevel, request, cache=None):
+        self._compressLevel = compressLevel
         self._request = request
+        self._cache = cache
+        self._chunks = []  # type: List[bytes]
+        self._size = 0
+
+    def _compressor(self):
+        """
+        @return: A new zlib compressor, producing gzip.
+        """
+        return zlib.compressobj(self._compressLevel, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
 
     def encode(self, data):
         """
         Write to the request, automatically compressing data on the fly.
         """
         if not self._request.startedWriting:
+            if self._cache is not None:
+                key = self._cache.key(self._request)
+                if key is not None:
+                    self._cached = self._cache.get(key)
+                    if self._cached is not None:
+                        self._request.responseHeaders.setRawHeaders(
+                            b"content-length", [b"%d" % (len(self._cached),)]
+                        )
+                        return b""
+                    self._key = key
             # Remove the content-length header, we can't honor it
             # because we compress on the fly.
             self._request.responseHeaders.removeHeader(b"content-length")
-        return self._zlibCompressor.compress(data)
+        if self._cached is not None:
+            return b""
+        if self._zlibCompressor is None:
+            self._zlibCompressor = self._compressor()
+        compressed = self._zlibCompressor.compress(data)
+        if self._key is not None and compressed:
+            self._size += len(compressed)
+            if self._size > self._cache.maxSize:
+                self._key = None
+                self._chunks = []
+            else:
+                self._chunks.append(compressed)
+        return compressed
 
     def finish(self):
         """
         Finish handling the request request, flushing any data from the zlib
         buffer.
         """
+        if self._cached is not None:
+            return self._cached
+        if self._zlibCompressor is None:
+            self._zlibCompressor = self._compressor()
         remain = self._zlibCompressor.flush()
         self._zlibCompressor = None
+        if self._key is not None:
+            self._chunks.append(remain)
+            self._cache.put(self._key, b"".join(self._chunks))
+            self._chunks = []
         return remain
 
 
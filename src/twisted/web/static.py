@@ -7,15 +7,17 @@ Static resources for L{twisted.web}.
 """
 
 
+import collections
 import errno
 import itertools
 import mimetypes
 import os
+import stat
 import time
 import warnings
 
 from html import escape
-from typing import Any, Dict, Callable
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from zope.interface import implementer
 
 from twisted.web import server
@@ -27,6 +29,7 @@ from twisted.python.compat import nativeString, networkString
 
 from twisted.python import components, filepath, log
 from twisted.internet import abstract, interfaces
+from twisted.internet.error import SendfileUnavailable
 from twisted.python.util import InsensitiveDict
 from twisted.python.runtime import platformType
 from twisted.python.url import URL
@@ -157,6 +160,46 @@ def loadMimeTypes(mimetype_locations=None, init=mimetypes.init):
     return mimetypes.types_map
 
 
+def _acceptedEncodings(request):
+    """
+    Parse the I{Accept-Encoding} header of a request.
+
+    @return: The lowercase content codings the request names, mapped to their
+        I{q} values.
+    @rtype: L{dict} of L{bytes} to L{float}
+    """
+    accepted = {}
+    for value in request.requestHeaders.getRawHeaders(b"accept-encoding", []):
+        for element in value.split(b","):
+            coding, _, parameters = element.partition(b";")
+            coding = coding.strip().lower()
+            if not coding:
+                continue
+            quality = 1.0
+            for parameter in parameters.split(b";"):
+                name, _, argument = parameter.partition(b"=")
+                if name.strip().lower() == b"q":
+                    try:
+                        quality = float(argument)
+                    except ValueError:
+                        quality = 0.0
+            accepted[coding] = quality
+    return accepted
+
+
+def _addVary(request, name):
+    """
+    Add a request header name to the I{Vary} header of a response, unless it
+    is there already.
+    """
+    values = request.responseHeaders.getRawHeaders(b"vary", [])
+    for value in values:
+        for element in value.split(b","):
+            if element.strip().lower() == name.lower():
+                return
+    request.responseHeaders.setRawHeaders(b"vary", values + [name])
+
+
 def getTypeAndEncoding(filename, types, encodings, defaultType):
     p, ext = filepath.FilePath(filename).splitext()
     ext = filepath._coerceToFilesystemEncoding("", ext.lower())
@@ -169,6 +212,333 @@ def getTypeAndEncoding(filename, types, encodings, defaultType):
     return type, enc
 
 
+class _SharedDescriptor:
+    """
+    A file descriptor kept open by a L{FileCache}, shared by the
+    L{_CachedFile}s reading from it, and closed once none of them or the
+    cache still use it.
+
+    @ivar fileno: The file descriptor.
+    @ivar identity: The device, inode, size and modification time of the file,
+        as compared with the results of L{os.stat} to find out whether the
+        file has changed.
+    @ivar references: The number of users of the descriptor.
+    """
+
+    def __init__(self, fileno, identity):
+        self.fileno = fileno
+        self.identity = identity
+        self.references = 1
+
+    def release(self):
+        """
+        Stop using the descriptor, closing it if nothing else uses it.
+        """
+        self.references -= 1
+        if not self.references:
+            os.close(self.fileno)
+
+
+def _identity(statinfo):
+    """
+    @return: The fields of a stat result which change when a file is replaced
+        or modified.
+    """
+    return (
+        statinfo.st_dev,
+        statinfo.st_ino,
+        statinfo.st_size,
+        statinfo.st_mtime_ns,
+    )
+
+
+class _CachedFile:
+    """
+    A read-only file object reading from a L{_SharedDescriptor} at its own
+    position, so that any number of responses may read the same file at
+    once.
+    """
+
+    def __init__(self, descriptor):
+        descriptor.references += 1
+        self._descriptor = descriptor
+        self._position = 0
+
+    def fileno(self):
+        return self._descriptor.fileno
+
+    def read(self, size=-1):
+        fileno = self._descriptor.fileno
+        if size < 0:
+            size = max(os.fstat(fileno).st_size - self._position, 0)
+        data = os.pread(fileno, size, self._position)
+        self._position += len(data)
+        return data
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        if whence == os.SEEK_CUR:
+            offset += self._position
+        elif whence == os.SEEK_END:
+            offset += os.fstat(self._descriptor.fileno).st_size
+        self._position = offset
+        return offset
+
+    def tell(self):
+        return self._position
+
+    def close(self):
+        if self._descriptor is not None:
+            self._descriptor.release()
+            self._descriptor = None
+
+
+_missing = object()
+
+
+class FileCache:
+    """
+    A cache of what a L{File} and the files it creates find out about the
+    filesystem, kept between requests: the results of C{stat}, the child
+    resources they find, and, for the most recently used files, open file
+    descriptors.
+
+    Each L{File} creates a new L{File} for every path segment of every request,
+    which stats the file, works out its content type, and opens the file.
+    With a cache those are only done again once the cache entry is older
+    than C{ttl} seconds, or has been evicted to keep within C{maxEntries}, or,
+    if C{watch} is set, once the directory holding the file has changed.
+    Until then, changes to the filesystem may not be noticed.
+
+    Files served with a cache are given an I{ETag} made from their
+    modification time and size.
+
+    A cache should only be given to one L{File}, which passes it on to the
+    files it creates, as its child resources are cached by path.
+
+    @ivar ttl: The number of seconds for which entries are used, or L{None}
+        to use them until they are evicted or their directory changes.
+    @type ttl: L{float} or L{None}
+
+    @ivar maxEntries: The largest number of C{stat} results, and of child
+        resources, to keep.
+    @type maxEntries: L{int}
+
+    @ivar maxOpenFiles: The largest number of file descriptors to keep open.
+        Descriptors are only kept open on platforms with L{os.pread}.
+    @type maxOpenFiles: L{int}
+
+    @ivar _stats: The results of C{stat}, or C{0} for paths which do not
+        exist, by path, as tuples of the time they were found, the
+        generation of their directory and the result, from the least to the
+        most recently used.
+    @ivar _children: The child resources found by L{File.getChild}, by the
+        path of the parent and the path segment, likewise.
+    @ivar _files: The L{_SharedDescriptor}s kept open, by path, from the
+        least to the most recently used.
+    @ivar _generations: For each watched directory which has changed, the
+        number of times it has; entries made before the latest change are
+        not used.
+    @ivar _notifier: The L{twisted.internet.inotify.INotify} watching
+        directories for changes, or L{None}.
+    @ivar _watched: The directories being watched, by their paths as bytes.
+    """
+
+    def __init__(
+        self, ttl=1.0, maxEntries=10000, maxOpenFiles=64, watch=False, reactor=None
+    ):
+        """
+        @param ttl: See L{ttl}.
+        @param maxEntries: See L{maxEntries}.
+        @param maxOpenFiles: See L{maxOpenFiles}.
+
+        @param watch: If true, watch the directories of cached entries with
+            L{twisted.internet.inotify}, and stop using the entries as soon as
+            their directories change.  Entries in directories which cannot be
+            watched are not kept.
+        @type watch: L{bool}
+
+        @param reactor: The reactor whose time is used, and which watches
+            directories, or L{None} for the global reactor.
+        """
+        if reactor is None:
+            from twisted.internet import reactor
+        self.ttl = ttl
+        self.maxEntries = maxEntries
+        self.maxOpenFiles = maxOpenFiles if hasattr(os, "pread") else 0
+        self._reactor = reactor
+        self._watch = watch
+        self._stats = collections.OrderedDict()  # type: collections.OrderedDict
+        self._children = collections.OrderedDict()  # type: collections.OrderedDict
+        self._files = collections.OrderedDict()  # type: collections.OrderedDict
+        self._generations = {}  # type: Dict[Any, int]
+        self._notifier = None  # type: Any
+        self._watched = {}  # type: Dict[bytes, Any]
+
+    def _get(self, entries, key, directory):
+        """
+        Get a fresh entry.
+
+        @return: The entry's value, or L{_missing}.
+        """
+        entry = entries.get(key)
+        if entry is None:
+            return _missing
+        found, generation, value = entry
+        if generation != self._generations.get(directory, 0) or (
+            self.ttl is not None and self._reactor.seconds() - found >= self.ttl
+        ):
+            del entries[key]
+            return _missing
+        entries.move_to_end(key)
+        return value
+
+    def _put(self, entries, key, directory, value):
+        """
+        Add an entry, evicting the least recently used entry if there are too
+        many.
+        """
+        if self._watch and not self._watchDirectory(directory):
+            return
+        entries[key] = (
+            self._reactor.seconds(),
+            self._generations.get(directory, 0),
+            value,
+        )
+        entries.move_to_end(key)
+        if len(entries) > self.maxEntries:
+            entries.popitem(last=False)
+
+    def _watchDirectory(self, directory):
+        """
+        Watch a directory for changes, if it is not being watched already.
+
+        @return: Whether the directory is being watched.
+        """
+        from twisted.internet import inotify
+
+        path = filepath.FilePath(directory).asBytesMode()
+        if path.path in self._watched:
+            return True
+        if self._notifier is None:
+            self._notifier = inotify.INotify(self._reactor)
+            self._notifier.startReading()
+        try:
+            self._notifier.watch(
+                path,
+                mask=inotify.IN_WATCH_MASK | inotify.IN_CLOSE_WRITE,
+                callbacks=[self._changed],
+            )
+        except inotify.INotifyError:
+            return False
+        self._watched[path.path] = directory
+        return True
+
+    def _changed(self, watch, path, mask):
+        """
+        Stop using the entries for a directory when something in it changes.
+
+        Files kept open need not be closed, as they are only used while they
+        match the result of C{stat}.
+
+        @param watch: The watch which reported the change.
+        @param path: The path which changed, as bytes.
+        @param mask: What changed.
+        """
+        from twisted.internet import inotify
+
+        if mask & (inotify.IN_DELETE_SELF | inotify.IN_MOVE_SELF | inotify.IN_UNMOUNT):
+            # A watched directory went away, which makes the notifier stop
+            # watching anything, so forget everything and start afresh.
+            self.close()
+            return
+        directory = self._watched.get(watch.path.path)
+        if directory is not None:
+            self._generations[directory] = self._generations.get(directory, 0) + 1
+
+    def stat(self, path):
+        """
+        Get the result of L{os.stat} for a path.
+
+        @return: The result, or C{0} if the path cannot be stat'ed.
+        """
+        directory = os.path.dirname(path)
+        statinfo = self._get(self._stats, path, directory)
+        if statinfo is _missing:
+            try:
+                statinfo = os.stat(path)
+            except OSError:
+                statinfo = 0
+            self._put(self._stats, path, directory, statinfo)
+        return statinfo
+
+    def _getChild(self, parent, segment):
+        """
+        @return: The child resource found for a path segment of a directory,
+            or L{None}.
+        """
+        child = self._get(self._children, (parent, segment), parent)
+        if child is _missing:
+            return None
+        return child
+
+    def _putChild(self, parent, segment, child):
+        """
+        Keep the child resource found for a path segment of a directory.
+        """
+        self._put(self._children, (parent, segment), parent, child)
+
+    def open(self, path):
+        """
+        Open a file for reading, sharing a file descriptor kept open since it
+        was last opened, if the file has not changed since.
+
+        @return: A file object.
+        """
+        if not self.maxOpenFiles:
+            return open(path, "rb")
+        descriptor = self._files.get(path)
+        statinfo = self.stat(path)
+        if descriptor is not None:
+            if statinfo and descriptor.identity == _identity(statinfo):
+                self._files.move_to_end(path)
+                return _CachedFile(descriptor)
+            self._closeFile(path)
+        fileno = os.open(path, os.O_RDONLY)
+        descriptor = _SharedDescriptor(fileno, _identity(os.fstat(fileno)))
+        self._files[path] = descriptor
+        if len(self._files) > self.maxOpenFiles:
+            self._files.popitem(last=False)[1].release()
+        return _CachedFile(descriptor)
+
+    def _closeFile(self, path):
+        """
+        Stop keeping the descriptor for a path open.
+        """
+        descriptor = self._files.pop(path, None)
+        if descriptor is not None:
+            descriptor.release()
+
+    def clear(self):
+        """
+        Forget everything cached, closing the file descriptors kept open.
+        """
+        self._stats.clear()
+        self._children.clear()
+        files, self._files = self._files, collections.OrderedDict()
+        for descriptor in files.values():
+            descriptor.release()
+
+    def close(self):
+        """
+        Forget everything cached, and stop watching directories.
+        """
+        self.clear()
+        if self._notifier is not None:
+            self._notifier.loseConnection()
+            self._notifier = None
+            self._watched = {}
+
+
 class File(resource.Resource, filepath.FilePath):
     """
     File is a resource that represents a plain non-interpreted file
@@ -197,6 +567,19 @@ class File(resource.Resource, filepath.FilePath):
     @ivar contentEncodings: a mapping of extensions to encoding types used to
         set default value for the Content-Encoding header.
     @type contentEncodings: C{dict}
+
+    @ivar cache: The cache of filesystem metadata, child resources and open
+        files this file and the files it creates use, or L{None}.
+    @type cache: L{FileCache} or L{None}
+
+    @ivar precompressedEncodings: Pairs of content codings and extensions,
+        such as C{("gzip", ".gz")}, for files kept compressed alongside the
+        files served.  When a file is requested, the first of these which
+        the request's I{Accept-Encoding} allows and which has a compressed
+        file is served instead, with that I{Content-Encoding}, and ranges of
+        it.  Responses for files with compressed variants have a I{Vary} of
+        I{Accept-Encoding}.  Empty by default.
+    @type precompressedEncodings: C{list} of C{tuple} of two C{str}
     """
 
     contentTypes = loadMimeTypes()
@@ -209,8 +592,18 @@ class File(resource.Resource, filepath.FilePath):
 
     type = None
 
+    cache = None  # type: Optional[FileCache]
+
+    precompressedEncodings = []  # type: List[Tuple[str, str]]
+
     def __init__(
-        self, path, defaultType="text/html", ignoredExts=(), registry=None, allowExt=0
+        self,
+        path,
+        defaultType="text/html",
+        ignoredExts=(),
+        registry=None,
+        allowExt=0,
+        cache=None,
     ):
         """
         Create a file with the given path.
@@ -238,6 +631,9 @@ class File(resource.Resource, filepath.FilePath):
 
         @param allowExt: Ignored parameter, only present for backwards
             compatibility.  Do not pass a value for this parameter.
+
+        @param cache: See L{cache}.
+        @type cache: L{FileCache} or L{None}
         """
         resource.Resource.__init__(self)
         filepath.FilePath.__init__(self, path)
@@ -251,6 +647,20 @@ class File(resource.Resource, filepath.FilePath):
         else:
             self.ignoredExts = list(ignoredExts)
         self.registry = registry or Registry()
+        self.cache = cache
+
+    def restat(self, reraise=True):
+        """
+        Re-calculate cached effects of 'stat', from L{cache} if this file has
+        one.
+
+        @see: L{filepath.FilePath.restat}
+        """
+        if self.cache is not None:
+            self._statinfo = self.cache.stat(self.path)
+            if self._statinfo or not reraise:
+                return
+        filepath.FilePath.restat(self, reraise)
 
     def ignoreExt(self, ext):
         """Ignore the given extension.
@@ -306,10 +716,15 @@ class File(resource.Resource, filepath.FilePath):
                 )
                 return self.childNotFound
 
+        if self.cache is not None:
+            child = self.cache._getChild(self.path, path)
+            if child is not None:
+                return child
+
         self.restat(reraise=False)
 
         if not self.isdir():
-            return self.childNotFound
+            return self._cacheChild(path, self.childNotFound)
 
         if path:
             try:
@@ -324,7 +739,7 @@ class File(resource.Resource, filepath.FilePath):
         if not fpath.exists():
             fpath = fpath.siblingExtensionSearch(*self.ignoredExts)
             if fpath is None:
-                return self.childNotFound
+                return self._cacheChild(path, self.childNotFound)
 
         extension = fpath.splitext()[1]
         if platformType == "win32":
@@ -335,11 +750,29 @@ class File(resource.Resource, filepath.FilePath):
             processor = self.processors.get(extension)
         if processor:
             return resource.IResource(processor(fpath.path, self.registry))
-        return self.createSimilarFile(fpath.path)
+        return self._cacheChild(path, self.createSimilarFile(fpath.path))
+
+    def _cacheChild(self, path, child):
+        """
+        Keep a child resource found by L{getChild} in L{cache}, if this file
+        has one.
+
+        @param path: The path segment the child was found for.
+        @type path: L{str}
+
+        @param child: The child resource.
+
+        @return: C{child}
+        """
+        if self.cache is not None:
+            self.cache._putChild(self.path, path, child)
+        return child
 
     # methods to allow subclasses to e.g. decrypt files on the fly:
     def openForReading(self):
         """Open a file and return it."""
+        if self.cache is not None:
+            return self.cache.open(self.path)
         return self.open()
 
     def getFileSize(self):
@@ -638,6 +1071,11 @@ class File(resource.Resource, filepath.FilePath):
         if self.isdir():
             return self.redirect(request)
 
+        if self.precompressedEncodings and self.encoding is None:
+            variant = self._precompressedVariant(request)
+            if variant is not None:
+                return variant.render_GET(request)
+
         request.setHeader(b"accept-ranges", b"bytes")
 
         try:
@@ -648,6 +1086,10 @@ class File(resource.Resource, filepath.FilePath):
             else:
                 raise
 
+        if self.cache is not None and request.setETag(self._etag()) is http.CACHED:
+            fileForReading.close()
+            return b""
+
         if request.setLastModified(self.getModificationTime()) is http.CACHED:
             # `setLastModified` also sets the response code for us, so if the
             # request is cached, we close the file now that we've made sure that
@@ -671,6 +1113,58 @@ class File(resource.Resource, filepath.FilePath):
 
     render_HEAD = render_GET
 
+    def _precompressedVariant(self, request):
+        """
+        Find the compressed variant of this file to serve, according to
+        L{precompressedEncodings} and the request's I{Accept-Encoding}, and
+        add I{Accept-Encoding} to the response's I{Vary} if there are any.
+
+        @return: A L{File} for the variant, or L{None}.
+        """
+        accepted = _acceptedEncodings(request)
+        anyVariants = False
+        for encoding, extension in self.precompressedEncodings:
+            path = self.path + filepath._coerceToFilesystemEncoding(
+                self.path, extension
+            )
+            if self.cache is not None:
+                statinfo = self.cache.stat(path)
+            else:
+                try:
+                    statinfo = os.stat(path)
+                except OSError:
+                    statinfo = 0
+            if not statinfo or stat.S_ISDIR(statinfo.st_mode):
+                continue
+            anyVariants = True
+            coding = networkString(encoding.lower())
+            if accepted.get(coding, accepted.get(b"*", 0)) > 0:
+                break
+        else:
+            if anyVariants:
+                _addVary(request, b"Accept-Encoding")
+            return None
+
+        _addVary(request, b"Accept-Encoding")
+        variant = self.createSimilarFile(path)
+        variant.precompressedEncodings = []
+        variant.type = self.type
+        variant.encoding = encoding
+        # The variant is already encoded, so it must not be encoded again by
+        # an encoder wrapping this resource.
+        if getattr(request, "_encoder", None) is not None:
+            request._encoder = None
+        return variant
+
+    def _etag(self):
+        """
+        @return: An entity tag for this file, made from its modification time
+            and size.
+        @rtype: L{bytes}
+        """
+        statinfo = self._statinfo
+        return b'"%x-%x"' % (statinfo.st_mtime_ns, statinfo.st_size)
+
     def redirect(self, request):
         return redirectTo(_addSlash(request), request)
 
@@ -697,6 +1191,8 @@ class File(resource.Resource, filepath.FilePath):
         f.processors = self.processors
         f.indexNames = self.indexNames[:]
         f.childNotFound = self.childNotFound
+        f.cache = self.cache
+        f.precompressedEncodings = self.precompressedEncodings
         return f
 
 
@@ -735,6 +1231,58 @@ class StaticProducer:
         self.fileObject.close()
         self.request = None
 
+    def _startSendfile(self, offset, size):
+        """
+        Send a chunk of the file straight to the request's connection with
+        L{interfaces.ISendfileTransport.sendfile}, if its transport supports
+        that and the chunk is to be sent unchanged as the whole response body.
+
+        @param offset: The offset into the file of the chunk to be written.
+        @param size: The size of the chunk to write.
+
+        @return: C{True} if the chunk is being sent, after which the request
+            will be finished; C{False} if it must be written to the request
+            instead.
+        """
+        request = self.request
+        transport = getattr(getattr(request, "channel", None), "transport", None)
+        if (
+            not interfaces.ISendfileTransport.providedBy(transport)
+            or getattr(request, "_encoder", None) is not None
+            or request.code in http.NO_BODY_CODES
+            or request.responseHeaders.getRawHeaders(b"content-length") is None
+        ):
+            return False
+        # Write the headers, which the transport sends ahead of the file.
+        request.write(b"")
+        try:
+            d = transport.sendfile(self.fileObject, offset, size)
+        except SendfileUnavailable:
+            return False
+        d.addCallbacks(self._sendfileDone, self._sendfileFailed)
+        return True
+
+    def _sendfileDone(self, sent):
+        """
+        Finish the request once the transport has sent the file.
+
+        @param sent: The number of bytes of the file which were sent.
+        """
+        if not self.request:
+            return
+        self.request.sentLength += sent
+        self.request.finish()
+        self.stopProducing()
+
+    def _sendfileFailed(self, reason):
+        """
+        Clean up after the connection is lost while the file is being sent.
+
+        @param reason: A L{Failure} describing why the connection was lost.
+        """
+        if self.request:
+            self.stopProducing()
+
 
 class NoRangeStaticProducer(StaticProducer):
     """
@@ -742,7 +1290,9 @@ class NoRangeStaticProducer(StaticProducer):
     """
 
     def start(self):
-        self.request.registerProducer(self, False)
+        length = self.request.responseHeaders.getRawHeaders(b"content-length")
+        if length is None or not self._startSendfile(0, int(length[-1])):
+            self.request.registerProducer(self, False)
 
     def resumeProducing(self):
         if not self.request:
@@ -777,9 +1327,10 @@ class SingleRangeStaticProducer(StaticProducer):
         self.size = size
 
     def start(self):
-        self.fileObject.seek(self.offset)
         self.bytesWritten = 0
-        self.request.registerProducer(self, 0)
+        if not self._startSendfile(self.offset, self.size):
+            self.fileObject.seek(self.offset)
+            self.request.registerProducer(self, 0)
 
     def resumeProducing(self):
         if not self.request:
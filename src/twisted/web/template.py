@@ -385,8 +385,35 @@ class TagLoader:
         return [self.tag]
 
 
+class _CompilingLoader:
+    """
+    Compile and keep the document an L{ITemplateLoader} loads, for
+    L{Element.render} to return.
+
+    @ivar _compiledFrom: The document last compiled, or L{None}.
+
+    @ivar _compiledTemplate: The compiled document, or L{None}.
+    """
+
+    _compiledFrom = None
+    _compiledTemplate = None
+
+    def _loadCompiled(self):
+        """
+        Load the document, and compile it unless it has been already.
+
+        @return: The compiled document, which flattens as the loaded document
+            does, but faster.
+        """
+        loaded = self.load()
+        if loaded is not self._compiledFrom:
+            self._compiledTemplate = _compile(loaded)
+            self._compiledFrom = loaded
+        return self._compiledTemplate
+
+
 @implementer(ITemplateLoader)
-class XMLString:
+class XMLString(_CompilingLoader):
     """
     An L{ITemplateLoader} that loads and parses XML from a string.
 
@@ -417,7 +444,7 @@ class XMLString:
 
 
 @implementer(ITemplateLoader)
-class XMLFile:
+class XMLFile(_CompilingLoader):
     """
     An L{ITemplateLoader} that loads and parses XML from a file.
 
@@ -639,6 +666,10 @@ def renderElement(request, element, doctype=b"<!DOCTYPE html>", _failElement=Non
         should not include a trailing newline and will default to the HTML5
         doctype C{'<!DOCTYPE html>'}.
 
+    The element is flattened in chunks, and not while C{request} is paused by
+    its transport; if the request's connection is lost while it is flattened,
+    flattening stops.
+
     @returns: NOT_DONE_YET
 
     @since: 12.1
@@ -650,7 +681,11 @@ def renderElement(request, element, doctype=b"<!DOCTYPE html>", _failElement=Non
     if _failElement is None:
         _failElement = twisted.web.util.FailureElement
 
-    d = flatten(request, element, request.write)
+    # Stop flattening while the request is paused, to render large pages
+    # without buffering them in memory.
+    producer = _FlattenProducer()
+    request.registerProducer(producer, True)
+    d = _flatten(request, element, request.write, producer)
 
     def eb(failure):
         _moduleLog.failure(
@@ -667,10 +702,17 @@ def renderElement(request, element, doctype=b"<!DOCTYPE html>", _failElement=Non
             )
 
     d.addErrback(eb)
-    d.addBoth(lambda _: request.finish())
+
+    def done(_):
+        request.unregisterProducer()
+        if not producer.stopped:
+            request.finish()
+
+    d.addBoth(done)
     return NOT_DONE_YET
 
 
 from twisted.web._element import Element, renderer
-from twisted.web._flatten import flatten, flattenString
+from twisted.web._flatten import flatten, flattenString, _compile
+from twisted.web._flatten import _flatten, _FlattenProducer
 import twisted.web.util
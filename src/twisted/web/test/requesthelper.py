@@ -209,24 +209,29 @@ class DummyRequest:
     uri = b"http://dummy/"
     method = b"GET"
     client = None  # type: Optional[IAddress]
+    producer = None
 
     def registerProducer(self, prod, s):
         """
         Call an L{IPullProducer}'s C{resumeProducing} method in a
-        loop until it unregisters itself.
+        loop until it unregisters itself, or remember an L{IPushProducer} in
+        C{producer}.
 
         @param prod: The producer.
-        @type prod: L{IPullProducer}
+        @type prod: L{IPullProducer} or L{IPushProducer}
 
         @param s: Whether or not the producer is streaming.
         """
-        # XXX: Handle IPushProducers
+        if s:
+            self.producer = prod
+            return
         self.go = 1
         while self.go:
             prod.resumeProducing()
 
     def unregisterProducer(self):
         self.go = 0
+        self.producer = None
 
     def __init__(self, postpath, session=None, client=None):
         self.sitepath = []
@@ -14,6 +14,7 @@ from zope.interface.verify import verifyObject
 
 from twisted.trial.unittest import TestCase, SynchronousTestCase
 from twisted.web import client, error, http_headers
+from twisted.web.resource import Resource
 from twisted.web._newclient import RequestNotSent, RequestTransmissionFailed
 from twisted.web._newclient import ResponseNeverReceived, ResponseFailed
 from twisted.web._newclient import PotentialDataLoss
@@ -37,6 +38,7 @@ from twisted.web.client import (
     FileBodyProducer,
     Request,
     HTTPConnectionPool,
+    HTTPConnectionPoolStatistics,
     ResponseDone,
     _HTTP11ClientFactory,
     URI,
@@ -79,7 +81,7 @@ else:
     ssl = _ssl
     sslPresent = True
     from twisted.internet._sslverify import ClientTLSOptions, IOpenSSLTrustRoot
-    from twisted.internet.ssl import optionsForClientTLS
+    from twisted.internet.ssl import CertificateOptions, optionsForClientTLS
     from twisted.protocols.tls import TLSMemoryBIOProtocol, TLSMemoryBIOFactory
 
     @implementer(IOpenSSLTrustRoot)
@@ -465,7 +467,7 @@ class DummyFactory(Factory):
     Create C{StubHTTPProtocol} instances.
     """
 
-    def __init__(self, quiescentCallback, metadata):
+    def __init__(self, quiescentCallback, metadata, lostCallback=None):
         pass
 
     protocol = StubHTTPProtocol
@@ -772,6 +774,334 @@ class HTTPConnectionPoolTests(TestCase, FakeReactorAndConnectMixin):
         self.assertEqual(self.failureResultOf(connectionResult).type, CancelledError)
 
 
+class ControlledEndpoint:
+    """
+    An endpoint whose connection attempts succeed or fail when a test says
+    so.
+
+    @ivar attempts: A list of the factories and L{Deferred}s of the attempts
+        which have not yet succeeded or failed, oldest first.
+    """
+
+    def __init__(self):
+        self.attempts = []
+
+    def connect(self, factory):
+        d = Deferred()
+        self.attempts.append((factory, d))
+        return d
+
+    def succeed(self):
+        """
+        Make the oldest connection attempt succeed.
+
+        @return: The L{HTTP11ClientProtocol} chosen for the connection.
+        """
+        factory, d = self.attempts.pop(0)
+        protocol = factory.buildProtocol(None)
+        protocol.makeConnection(StringTransport())
+        d.callback(protocol)
+        return protocol._protocol
+
+    def fail(self):
+        """
+        Make the oldest connection attempt fail.
+        """
+        factory, d = self.attempts.pop(0)
+        d.errback(ConnectionRefusedError())
+
+
+class HTTPConnectionPoolLimitTests(TestCase):
+    """
+    Tests for L{HTTPConnectionPool.maxActivePerHost},
+    L{HTTPConnectionPool.lifo}, L{HTTPConnectionPool.preconnect} and
+    L{HTTPConnectionPool.statistics}.
+    """
+
+    key = (b"http", b"example.com", 80)
+
+    def setUp(self):
+        self.clock = Clock()
+        self.pool = HTTPConnectionPool(self.clock)
+        self.pool.retryAutomatically = False
+        self.pool.maxActivePerHost = 2
+        self.endpoint = ControlledEndpoint()
+
+    def connections(self, count):
+        """
+        Get C{count} new connections from the pool.
+
+        @return: The connections.
+        """
+        ds = [self.pool.getConnection(self.key, self.endpoint) for _ in range(count)]
+        for _ in range(count):
+            self.endpoint.succeed()
+        return [self.successResultOf(d) for d in ds]
+
+    def test_limit(self):
+        """
+        Once C{maxActivePerHost} connections for a key are in use or being
+        made, requests for more wait, without connecting.
+        """
+        self.pool.getConnection(self.key, self.endpoint)
+        self.pool.getConnection(self.key, self.endpoint)
+        d = self.pool.getConnection(self.key, self.endpoint)
+        self.assertEqual(len(self.endpoint.attempts), 2)
+        self.assertNoResult(d)
+        self.assertEqual(self.pool.statistics.queued, 1)
+
+    def test_noLimit(self):
+        """
+        By default, there is no limit on the number of active connections.
+        """
+        self.pool.maxActivePerHost = None
+        for _ in range(10):
+            self.pool.getConnection(self.key, self.endpoint)
+        self.assertEqual(len(self.endpoint.attempts), 10)
+        self.assertEqual(self.pool.statistics.queued, 0)
+
+    def test_otherKeys(self):
+        """
+        The limit applies to each key separately.
+        """
+        self.connections(2)
+        d = self.pool.getConnection((b"http", b"example.net", 80), self.endpoint)
+        self.endpoint.succeed()
+        self.successResultOf(d)
+
+    def test_quiescentServesWaiter(self):
+        """
+        A connection which becomes quiescent while a request for a connection
+        is waiting is given to the request instead of being cached.
+        """
+        first, second = self.connections(2)
+        d = self.pool.getConnection(self.key, self.endpoint)
+        first._quiescentCallback(first)
+        self.assertIs(self.successResultOf(d), first)
+        self.assertEqual(self.pool._connections.get(self.key, []), [])
+        self.assertEqual(self.endpoint.attempts, [])
+        self.assertEqual(self.pool.statistics.reused, 1)
+
+    def test_lostServesWaiter(self):
+        """
+        A connection which is lost while a request for a connection is
+        waiting makes way for a new connection for the request.
+        """
+        first, second = self.connections(2)
+        d = self.pool.getConnection(self.key, self.endpoint)
+        first.connectionLost(Failure(ConnectionDone()))
+        self.assertEqual(len(self.endpoint.attempts), 1)
+        self.assertNoResult(d)
+        third = self.endpoint.succeed()
+        self.assertIs(self.successResultOf(d), third)
+
+    def test_connectFailureServesWaiter(self):
+        """
+        A connection which could not be made makes way for a new connection
+        for a waiting request.
+        """
+        failed = self.pool.getConnection(self.key, self.endpoint)
+        self.pool.getConnection(self.key, self.endpoint)
+        d = self.pool.getConnection(self.key, self.endpoint)
+        self.endpoint.fail()
+        self.failureResultOf(failed, ConnectionRefusedError)
+        self.assertEqual(len(self.endpoint.attempts), 2)
+        self.endpoint.attempts.pop(0)
+        protocol = self.endpoint.succeed()
+        self.assertIs(self.successResultOf(d), protocol)
+        self.assertEqual(self.pool.statistics.connectFailures, 1)
+
+    def test_firstInFirstOut(self):
+        """
+        Waiting requests are given connections in the order they were made.
+        """
+        first, second = self.connections(2)
+        results = []
+        for _ in range(3):
+            self.pool.getConnection(self.key, self.endpoint).addCallback(results.append)
+        second._quiescentCallback(second)
+        first._quiescentCallback(first)
+        self.assertEqual(results, [second, first])
+        results[0]._quiescentCallback(results[0])
+        self.assertEqual(results, [second, first, second])
+
+    def test_cancelWaiting(self):
+        """
+        Cancelling a waiting request removes it from the queue, so that the
+        next connection released is cached.
+        """
+        first, second = self.connections(2)
+        d = self.pool.getConnection(self.key, self.endpoint)
+        d.cancel()
+        self.failureResultOf(d, CancelledError)
+        first._quiescentCallback(first)
+        self.assertEqual(self.pool._connections[self.key], [first])
+        self.assertEqual(self.pool._waiting, {})
+
+    def test_cancelConnecting(self):
+        """
+        Cancelling a request which has stopped waiting, but whose connection
+        is still being made, cancels the connection attempt.
+        """
+        first, second = self.connections(2)
+        d = self.pool.getConnection(self.key, self.endpoint)
+        first.connectionLost(Failure(ConnectionDone()))
+        [(factory, connecting)] = self.endpoint.attempts
+        d.cancel()
+        self.failureResultOf(d, CancelledError)
+        self.assertTrue(connecting.called)
+        self.assertEqual(self.pool._active, {self.key: 1})
+
+    def test_lostCachedConnection(self):
+        """
+        A cached connection which is lost is removed from the pool and its
+        timeout is cancelled.
+        """
+        [protocol] = self.connections(1)
+        protocol._quiescentCallback(protocol)
+        protocol.connectionLost(Failure(ConnectionDone()))
+        self.assertEqual(self.pool._connections[self.key], [])
+        self.assertEqual(self.pool._timeouts, {})
+        self.assertEqual(self.clock.getDelayedCalls(), [])
+        self.assertEqual(self.pool._active, {})
+
+    def test_fifoReuse(self):
+        """
+        By default, the least recently cached connection is reused first.
+        """
+        first, second = self.connections(2)
+        first._quiescentCallback(first)
+        second._quiescentCallback(second)
+        d = self.pool.getConnection(self.key, self.endpoint)
+        self.assertIs(self.successResultOf(d), first)
+
+    def test_lifoReuse(self):
+        """
+        If L{HTTPConnectionPool.lifo} is C{True}, the most recently cached
+        connection is reused first.
+        """
+        self.pool.lifo = True
+        first, second = self.connections(2)
+        first._quiescentCallback(first)
+        second._quiescentCallback(second)
+        d = self.pool.getConnection(self.key, self.endpoint)
+        self.assertIs(self.successResultOf(d), second)
+
+    def test_preconnect(self):
+        """
+        L{HTTPConnectionPool.preconnect} opens connections and caches them,
+        and its result fires with the number opened.
+        """
+        d = self.pool.preconnect(self.key, self.endpoint, 2)
+        self.assertEqual(len(self.endpoint.attempts), 2)
+        first = self.endpoint.succeed()
+        second = self.endpoint.succeed()
+        self.assertEqual(self.successResultOf(d), 2)
+        self.assertEqual(self.pool._connections[self.key], [first, second])
+        self.assertEqual(self.pool._active, {})
+        self.assertIs(
+            self.successResultOf(self.pool.getConnection(self.key, self.endpoint)),
+            first,
+        )
+
+    def test_preconnectLimits(self):
+        """
+        L{HTTPConnectionPool.preconnect} opens no more connections than can be
+        cached alongside those already cached, nor than
+        C{maxActivePerHost} allows.
+        """
+        self.pool.maxActivePerHost = None
+        [protocol] = self.connections(1)
+        protocol._quiescentCallback(protocol)
+        self.pool.preconnect(self.key, self.endpoint, 5)
+        self.assertEqual(len(self.endpoint.attempts), 1)
+        self.endpoint.succeed()
+
+        self.pool.maxActivePerHost = 2
+        key = (b"http", b"example.net", 80)
+        self.pool.getConnection(key, self.endpoint)
+        self.pool.preconnect(key, self.endpoint, 2)
+        self.assertEqual(len(self.endpoint.attempts), 2)
+
+    def test_preconnectFailure(self):
+        """
+        Connections which L{HTTPConnectionPool.preconnect} cannot make are
+        not counted in its result.
+        """
+        d = self.pool.preconnect(self.key, self.endpoint, 2)
+        self.endpoint.fail()
+        self.endpoint.succeed()
+        self.assertEqual(self.successResultOf(d), 1)
+
+    def test_preconnectNonPersistent(self):
+        """
+        A pool which does not keep connections opens none ahead of time.
+        """
+        self.pool.persistent = False
+        d = self.pool.preconnect(self.key, self.endpoint, 2)
+        self.assertEqual(self.successResultOf(d), 0)
+        self.assertEqual(self.endpoint.attempts, [])
+
+    def test_agentPreconnect(self):
+        """
+        L{Agent.preconnect} opens connections with the endpoint for the given
+        URI and caches them under the key L{Agent.request} uses.
+        """
+        agent = client.Agent(self.clock, pool=self.pool)
+        agent._getEndpoint = lambda uri: self.endpoint
+        d = agent.preconnect(b"http://example.com/some/path")
+        protocol = self.endpoint.succeed()
+        self.assertEqual(self.successResultOf(d), 1)
+        self.assertEqual(self.pool._connections[self.key], [protocol])
+
+    def test_agentPreconnectUnsupportedScheme(self):
+        """
+        L{Agent.preconnect} fails with L{SchemeNotSupported} for a URI whose
+        scheme it does not support.
+        """
+        agent = client.Agent(self.clock, pool=self.pool)
+        d = agent.preconnect(b"gopher://example.com/")
+        self.failureResultOf(d, SchemeNotSupported)
+
+    def test_statistics(self):
+        """
+        L{HTTPConnectionPool.statistics} counts the connections requested,
+        made and reused, and measures how long connections took to make and
+        how long requests waited for them.
+        """
+        self.pool.getConnection(self.key, self.endpoint)
+        self.pool.getConnection(self.key, self.endpoint)
+        self.clock.advance(2)
+        first = self.endpoint.succeed()
+        self.clock.advance(1)
+        self.endpoint.succeed()
+        d = self.pool.getConnection(self.key, self.endpoint)
+        self.clock.advance(4)
+        first._quiescentCallback(first)
+        self.successResultOf(d)
+        self.assertEqual(
+            self.pool.statistics,
+            HTTPConnectionPoolStatistics(
+                requested=3,
+                reused=1,
+                connected=2,
+                connectTime=5.0,
+                longestConnectTime=3.0,
+                queued=1,
+                queueTime=4.0,
+                longestQueueTime=4.0,
+            ),
+        )
+        self.assertEqual(self.pool.statistics.reuseRate, 1 / 3)
+
+    def test_reuseRateNoRequests(self):
+        """
+        L{HTTPConnectionPoolStatistics.reuseRate} is C{0.0} if no connections
+        have been requested.
+        """
+        self.assertEqual(HTTPConnectionPoolStatistics().reuseRate, 0.0)
+
+
 class AgentTestsMixin:
     """
     Tests for any L{IAgent} implementation.
@@ -1583,6 +1913,159 @@ class AgentHTTPSTests(TestCase, FakeReactorAndConnectMixin, IntegrationTestingMi
         )
 
 
+class PathResource(Resource):
+    """
+    A resource which responds with the path of the request.
+    """
+
+    isLeaf = True
+
+    def render_GET(self, request):
+        return request.path
+
+
+@skipIf(not sslPresent, "SSL not present, cannot run SSL tests.")
+@skipIf(not client.H2_ENABLED, "HTTP/2 support not enabled")
+class AgentHTTP2Tests(TestCase, FakeReactorAndConnectMixin):
+    """
+    Tests for L{Agent} making requests over HTTP/2, negotiated with ALPN.
+    """
+
+    def setUp(self):
+        self.reactor = self.createReactor()
+        self.authority, self.server = certificatesForAuthorityAndServer("example.com")
+        self.pool = HTTPConnectionPool(self.reactor)
+        self.agent = client.Agent(
+            self.reactor,
+            contextFactory=BrowserLikePolicyForHTTPS(
+                trustRoot=self.authority, http2=True
+            ),
+            pool=self.pool,
+        )
+
+    def connect(self, serverProtocols):
+        """
+        Connect the last TCP connection the agent has started to a TLS server
+        which accepts the ALPN protocols C{serverProtocols} and serves
+        L{PathResource}.
+
+        @return: A callable which delivers the data each side has written
+            until neither has any more to write.
+        """
+        from twisted.web._http2 import H2Connection
+        from twisted.web.server import Site
+
+        host, port, factory, timeout, bind = self.reactor.tcpClients[-1]
+        peerAddress = IPv4Address("TCP", host, port)
+        clientProtocol = factory.buildProtocol(peerAddress)
+        clientTransport = FakeTransport(clientProtocol, False, peerAddress=peerAddress)
+        clientProtocol.makeConnection(clientTransport)
+
+        site = Site(PathResource(), reactor=self.reactor)
+
+        def buildProtocol(addr):
+            if serverProtocols != [b"h2"]:
+                return site.buildProtocol(addr)
+            protocol = H2Connection(self.reactor)
+            protocol.factory = protocol.site = site
+            protocol.requestFactory = site.requestFactory
+            return protocol
+
+        # The protocols are given to the certificate options, rather than by
+        # the site, so that the TLS context is not changed once it is in use.
+        siteFactory = Factory()
+        siteFactory.buildProtocol = buildProtocol
+        options = CertificateOptions(
+            privateKey=self.server.privateKey.original,
+            certificate=self.server.original,
+            acceptableProtocols=serverProtocols,
+        )
+        serverFactory = TLSMemoryBIOFactory(options, False, siteFactory)
+        serverProtocol = serverFactory.buildProtocol(None)
+        serverTransport = FakeTransport(serverProtocol, True)
+        serverProtocol.makeConnection(serverTransport)
+        pump = IOPump(
+            clientProtocol, serverProtocol, clientTransport, serverTransport, False
+        )
+
+        def flush():
+            for i in range(10):
+                pump.flush()
+                self.reactor.advance(0)
+
+        return flush
+
+    def get(self, path):
+        """
+        Make a I{GET} request for C{path} and collect its body.
+        """
+        d = self.agent.request(b"GET", b"https://example.com" + path)
+        d.addCallback(
+            lambda response: client.readBody(response).addCallback(
+                lambda body: (response.version, body)
+            )
+        )
+        return d
+
+    def test_http2(self):
+        """
+        When the server accepts HTTP/2, requests are sent concurrently over a
+        single connection.
+        """
+        first = self.get(b"/a")
+        flush = self.connect([b"h2"])
+        flush()
+        self.assertEqual(self.successResultOf(first), ((b"HTTP", 2, 0), b"/a"))
+        second = self.get(b"/b")
+        third = self.get(b"/c")
+        flush()
+        self.assertEqual(self.successResultOf(second), ((b"HTTP", 2, 0), b"/b"))
+        self.assertEqual(self.successResultOf(third), ((b"HTTP", 2, 0), b"/c"))
+        self.assertEqual(len(self.reactor.tcpClients), 1)
+        self.assertEqual(self.pool.statistics.reused, 2)
+
+    def test_http11(self):
+        """
+        When the server only accepts HTTP/1.1, it is used instead.
+        """
+        first = self.get(b"/a")
+        flush = self.connect([b"http/1.1"])
+        flush()
+        self.assertEqual(self.successResultOf(first), ((b"HTTP", 1, 1), b"/a"))
+        self.assertEqual(self.pool._http2Connections, {})
+
+    def test_closeCachedConnections(self):
+        """
+        L{HTTPConnectionPool.closeCachedConnections} closes HTTP/2
+        connections too.
+        """
+        first = self.get(b"/a")
+        flush = self.connect([b"h2"])
+        flush()
+        self.successResultOf(first)
+        [connection] = self.pool._http2Connections.values()
+        d = self.pool.closeCachedConnections()
+        flush()
+        self.successResultOf(d)
+        self.assertEqual(connection.state, "CONNECTION_LOST")
+        self.assertEqual(self.pool._http2Connections, {})
+
+    def test_cachedConnectionTimeout(self):
+        """
+        An idle HTTP/2 connection is closed after the pool's
+        C{cachedConnectionTimeout}.
+        """
+        first = self.get(b"/a")
+        flush = self.connect([b"h2"])
+        flush()
+        self.successResultOf(first)
+        [connection] = self.pool._http2Connections.values()
+        self.reactor.advance(self.pool.cachedConnectionTimeout)
+        flush()
+        self.assertEqual(connection.state, "CONNECTION_LOST")
+        self.assertEqual(self.pool._http2Connections, {})
+
+
 class WebClientContextFactoryTests(TestCase):
     """
     Tests for the context factory wrapper for web clients
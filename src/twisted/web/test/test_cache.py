@@ -0,0 +1,470 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.web.cache}.
+"""
+
+import zlib
+
+from twisted.internet.error import ConnectionDone
+from twisted.internet.task import Clock
+from twisted.python.failure import Failure
+from twisted.trial.unittest import SynchronousTestCase
+from twisted.web import http, server
+from twisted.web.cache import CachingResource
+from twisted.web.resource import EncodingResourceWrapper, Resource
+from twisted.web.test.requesthelper import DummyChannel
+
+
+class CountingResource(Resource):
+    """
+    Counts how many times it is rendered, and renders C{body} with C{code}
+    and C{headers}, or leaves the requests in C{pending} to be finished later
+    if C{delayed} is set.
+    """
+
+    isLeaf = True
+
+    def __init__(self, body=b"hello", headers=(), delayed=False):
+        Resource.__init__(self)
+        self.body = body
+        self.headers = list(headers)
+        self.delayed = delayed
+        self.code = http.OK
+        self.etag = None
+        self.lastModified = None
+        self.renders = 0
+        self.pending = []
+
+    def render_GET(self, request):
+        self.renders += 1
+        request.setResponseCode(self.code)
+        for name, value in self.headers:
+            request.setHeader(name, value)
+        if self.etag is not None and request.setETag(self.etag) is http.CACHED:
+            return b""
+        if (
+            self.lastModified is not None
+            and request.setLastModified(self.lastModified) is http.CACHED
+        ):
+            return b""
+        if self.delayed:
+            self.pending.append(request)
+            return server.NOT_DONE_YET
+        return self.body
+
+    def render_POST(self, request):
+        self.renders += 1
+        return self.body
+
+
+class CachingResourceTests(SynchronousTestCase):
+    """
+    Tests for L{CachingResource}.
+    """
+
+    def setUp(self):
+        self.clock = Clock()
+        self.clock.advance(1000000000)
+        self.original = CountingResource(
+            headers=[(b"cache-control", b"max-age=60"), (b"content-type", b"text/x")]
+        )
+        self.resource = CachingResource(self.original, reactor=self.clock)
+
+    def request(self, method=b"GET", uri=b"/", headers=()):
+        """
+        Make a request of L{resource}.
+
+        @return: The request, and a L{DummyChannel.TCP} which records the
+            response written.
+        """
+        channel = DummyChannel()
+        channel.site = server.Site(self.resource)
+        request = server.Request(channel, False)
+        request.requestHeaders.setRawHeaders(b"host", [b"example.com"])
+        for name, value in headers:
+            request.requestHeaders.setRawHeaders(name, [value])
+        request.gotLength(0)
+        request.requestReceived(method, uri, b"HTTP/1.0")
+        return request, channel.transport
+
+    def response(self, *args, **kwargs):
+        """
+        Make a request of L{resource}, which must be responded to straight
+        away.
+
+        @return: The response code, headers and body.
+        """
+        request, transport = self.request(*args, **kwargs)
+        self.assertTrue(request.finished)
+        return request.code, request.responseHeaders, self.body(transport)
+
+    def body(self, transport):
+        """
+        @return: The body of the response written to C{transport}.
+        """
+        return transport.written.getvalue().split(b"\r\n\r\n", 1)[1]
+
+    def test_hit(self):
+        """
+        A fresh response is served again without rendering, along with its
+        headers and its age.
+        """
+        code, headers, body = self.response()
+        self.assertEqual((code, body), (200, b"hello"))
+        self.clock.advance(5)
+        code, headers, body = self.response()
+        self.assertEqual((code, body), (200, b"hello"))
+        self.assertEqual(self.original.renders, 1)
+        self.assertEqual(headers.getRawHeaders(b"content-type"), [b"text/x"])
+        self.assertEqual(headers.getRawHeaders(b"content-length"), [b"5"])
+        self.assertEqual(headers.getRawHeaders(b"age"), [b"5"])
+        self.assertGreater(self.resource.size, len(b"hello"))
+
+    def test_keyedByTarget(self):
+        """
+        Responses are stored by the host and URI they were requested with.
+        """
+        self.response(uri=b"/?a=1")
+        self.response(uri=b"/?a=2")
+        self.response(headers=[(b"host", b"example.org")], uri=b"/?a=1")
+        self.assertEqual(self.original.renders, 3)
+        self.response(uri=b"/?a=1")
+        self.assertEqual(self.original.renders, 3)
+
+    def test_expiry(self):
+        """
+        A response is rendered again once its C{max-age} has passed.
+        """
+        self.response()
+        self.clock.advance(60)
+        self.response()
+        self.assertEqual(self.original.renders, 2)
+
+    def test_sharedMaxAge(self):
+        """
+        C{s-maxage} takes precedence over C{max-age}.
+        """
+        self.original.headers = [(b"cache-control", b"max-age=0, s-maxage=10")]
+        self.response()
+        self.response()
+        self.assertEqual(self.original.renders, 1)
+        self.clock.advance(10)
+        self.response()
+        self.assertEqual(self.original.renders, 2)
+
+    def test_expires(self):
+        """
+        Without C{max-age}, a response is fresh until its I{Expires} time, and
+        one with an invalid I{Expires} is not stored.
+        """
+        self.original.headers = [
+            (b"expires", http.datetimeToString(self.clock.seconds() + 30))
+        ]
+        self.response()
+        self.clock.advance(29)
+        self.response()
+        self.assertEqual(self.original.renders, 1)
+        self.clock.advance(1)
+        self.response()
+        self.assertEqual(self.original.renders, 2)
+
+        self.original.headers = [(b"expires", b"0")]
+        self.resource.clear()
+        self.response()
+        self.response()
+        self.assertEqual(self.original.renders, 4)
+
+    def test_noLifetime(self):
+        """
+        A response without a lifetime is not stored, unless the resource has a
+        default lifetime.
+        """
+        self.original.headers = []
+        self.response()
+        self.response()
+        self.assertEqual(self.original.renders, 2)
+
+        self.resource = CachingResource(
+            self.original, defaultLifetime=10, reactor=self.clock
+        )
+        self.response()
+        self.response()
+        self.assertEqual(self.original.renders, 3)
+
+    def test_forbidden(self):
+        """
+        Responses whose I{Cache-Control} forbids storing or reusing them are
+        not stored.
+        """
+        for directive in [b"no-store", b"no-cache", b"private"]:
+            self.original.headers = [(b"cache-control", b"max-age=60, " + directive)]
+            self.response()
+        self.response()
+        self.assertEqual(self.original.renders, 4)
+
+    def test_cookies(self):
+        """
+        Responses which set cookies are not stored.
+        """
+        self.original.headers.append((b"set-cookie", b"a=b"))
+        self.response()
+        self.response()
+        self.assertEqual(self.original.renders, 2)
+
+    def test_notOK(self):
+        """
+        Responses other than I{OK} are not stored.
+        """
+        self.original.code = http.NOT_FOUND
+        code, headers, body = self.response()
+        self.assertEqual(code, http.NOT_FOUND)
+        self.response()
+        self.assertEqual(self.original.renders, 2)
+
+    def test_post(self):
+        """
+        Requests other than I{GET} and I{HEAD} are always rendered.
+        """
+        self.response(b"POST")
+        self.response(b"POST")
+        self.response()
+        self.response(b"POST")
+        self.assertEqual(self.original.renders, 4)
+
+    def test_head(self):
+        """
+        I{HEAD} requests are answered from stored I{GET} responses, and do not
+        store responses themselves.
+        """
+        code, headers, body = self.response(b"HEAD")
+        self.assertEqual(self.original.renders, 1)
+        self.response(b"HEAD")
+        self.assertEqual(self.original.renders, 2)
+
+        self.response()
+        code, headers, body = self.response(b"HEAD")
+        self.assertEqual((code, body), (200, b""))
+        self.assertEqual(headers.getRawHeaders(b"content-length"), [b"5"])
+        self.assertEqual(self.original.renders, 3)
+
+    def test_vary(self):
+        """
+        Responses are stored separately for the values of the request headers
+        they vary by.
+        """
+        self.original.headers.append((b"vary", b"Accept-Language"))
+        english = [(b"accept-language", b"en")]
+        french = [(b"accept-language", b"fr")]
+        self.response(headers=english)
+        self.response(headers=french)
+        self.response(headers=english)
+        self.response(headers=french)
+        self.response()
+        self.assertEqual(self.original.renders, 3)
+
+    def test_varyStar(self):
+        """
+        Responses which vary by C{*} are not stored.
+        """
+        self.original.headers.append((b"vary", b"*"))
+        self.response()
+        self.response()
+        self.assertEqual(self.original.renders, 2)
+
+    def test_credentials(self):
+        """
+        Responses to requests with credentials are not stored, and stored
+        responses are not served to them, unless they are public.
+        """
+        cookie = [(b"cookie", b"session=1")]
+        self.response(headers=cookie)
+        self.response()
+        self.response(headers=cookie)
+        self.response(headers=[(b"authorization", b"Basic eDp5")])
+        self.assertEqual(self.original.renders, 4)
+
+        self.original.headers = [(b"cache-control", b"public, max-age=60")]
+        self.response(uri=b"/public", headers=cookie)
+        self.response(uri=b"/public")
+        self.assertEqual(self.original.renders, 5)
+
+    def test_varyCredentials(self):
+        """
+        Responses which vary by the credentials in a request are stored for
+        them.
+        """
+        self.original.headers.append((b"vary", b"Cookie"))
+        self.response(headers=[(b"cookie", b"session=1")])
+        self.response(headers=[(b"cookie", b"session=1")])
+        self.response(headers=[(b"cookie", b"session=2")])
+        self.assertEqual(self.original.renders, 2)
+
+    def test_ifNoneMatch(self):
+        """
+        A request with an I{If-None-Match} matching the stored response's
+        entity tag gets I{Not Modified}, without rendering.
+        """
+        self.original.etag = b'"abc"'
+        self.response()
+        code, headers, body = self.response(headers=[(b"if-none-match", b'"abc"')])
+        self.assertEqual((code, body), (http.NOT_MODIFIED, b""))
+        self.assertEqual(headers.getRawHeaders(b"etag"), [b'"abc"'])
+        code, headers, body = self.response(headers=[(b"if-none-match", b'"def"')])
+        self.assertEqual((code, body), (200, b"hello"))
+        self.assertEqual(self.original.renders, 1)
+
+    def test_ifModifiedSince(self):
+        """
+        A request with an I{If-Modified-Since} no earlier than the stored
+        response's I{Last-Modified} gets I{Not Modified}, without rendering,
+        unless it also has an I{If-None-Match} which does not match.
+        """
+        self.original.etag = b'"abc"'
+        self.original.lastModified = self.clock.seconds() - 100
+        self.response()
+        since = http.datetimeToString(self.clock.seconds() - 50)
+        code, headers, body = self.response(headers=[(b"if-modified-since", since)])
+        self.assertEqual(code, http.NOT_MODIFIED)
+        self.assertEqual(
+            headers.getRawHeaders(b"last-modified"),
+            [http.datetimeToString(self.original.lastModified)],
+        )
+        code, headers, body = self.response(
+            headers=[(b"if-modified-since", since), (b"if-none-match", b'"def"')]
+        )
+        self.assertEqual((code, body), (200, b"hello"))
+        earlier = http.datetimeToString(self.clock.seconds() - 150)
+        code, headers, body = self.response(headers=[(b"if-modified-since", earlier)])
+        self.assertEqual((code, body), (200, b"hello"))
+        self.assertEqual(self.original.renders, 1)
+
+    def test_eviction(self):
+        """
+        The least recently used responses are evicted to keep within the
+        maximum size, and responses larger than that are not stored.
+        """
+        self.original.headers = [(b"cache-control", b"max-age=60")]
+        self.original.body = b"x" * 80
+        self.response(uri=b"/z")
+        size = self.resource.size
+        self.resource = CachingResource(
+            self.original, maxSize=size * 3, reactor=self.clock
+        )
+        self.original.renders = 0
+        self.response(uri=b"/a")
+        self.response(uri=b"/b")
+        self.response(uri=b"/c")
+        self.response(uri=b"/a")
+        self.assertEqual(self.original.renders, 3)
+        self.response(uri=b"/d")
+        self.assertEqual(self.resource.size, size * 3)
+        self.response(uri=b"/a")
+        self.response(uri=b"/c")
+        self.response(uri=b"/d")
+        self.assertEqual(self.original.renders, 4)
+        self.response(uri=b"/b")
+        self.assertEqual(self.original.renders, 5)
+
+        self.original.body = b"x" * size * 3
+        self.response(uri=b"/e")
+        self.response(uri=b"/e")
+        self.assertEqual(self.original.renders, 7)
+
+    def test_encoded(self):
+        """
+        Responses are stored before they are encoded by an encoder wrapping
+        the resource, and encoded for the requests they are served to which
+        accept the encoding.
+        """
+        self.resource = EncodingResourceWrapper(
+            self.resource, [server.GzipEncoderFactory()]
+        )
+        gzip = [(b"accept-encoding", b"gzip")]
+        code, headers, body = self.response(headers=gzip)
+        self.assertEqual(headers.getRawHeaders(b"content-encoding"), [b"gzip"])
+        self.assertEqual(zlib.decompress(body, 16 + zlib.MAX_WBITS), b"hello")
+
+        code, headers, body = self.response()
+        self.assertEqual(body, b"hello")
+        self.assertFalse(headers.hasHeader(b"content-encoding"))
+
+        code, headers, body = self.response(headers=gzip)
+        self.assertEqual(zlib.decompress(body, 16 + zlib.MAX_WBITS), b"hello")
+        self.assertEqual(self.original.renders, 1)
+
+    def test_children(self):
+        """
+        The children of the wrapped resource share its stored responses.
+        """
+        root = Resource()
+        root.putChild(b"child", self.original)
+        self.resource = CachingResource(root, reactor=self.clock)
+        code, headers, body = self.response(uri=b"/child")
+        self.response(uri=b"/child")
+        self.assertEqual((code, body), (200, b"hello"))
+        self.assertEqual(self.original.renders, 1)
+
+    def test_coalescing(self):
+        """
+        Requests made while an identical one is being rendered wait for its
+        response rather than being rendered.
+        """
+        self.original.delayed = True
+        first, firstTransport = self.request()
+        second, secondTransport = self.request()
+        third, thirdTransport = self.request(b"HEAD")
+        fourth, fourthTransport = self.request(uri=b"/other")
+        self.assertEqual(self.original.renders, 3)
+
+        first.write(b"hel")
+        first.write(b"lo")
+        first.finish()
+        self.assertTrue(second.finished)
+        self.assertEqual(self.body(firstTransport), b"hello")
+        self.assertEqual(self.body(secondTransport), b"hello")
+        self.assertEqual(self.original.renders, 3)
+
+    def test_coalescingNotStored(self):
+        """
+        If the response requests were waiting for is not stored, they are
+        rendered.
+        """
+        self.original.delayed = True
+        self.original.headers = []
+        first, firstTransport = self.request()
+        second, secondTransport = self.request()
+        self.assertEqual(self.original.renders, 1)
+        first.finish()
+        self.assertEqual(self.original.renders, 2)
+        second.write(b"second")
+        second.finish()
+        self.assertEqual(self.body(secondTransport), b"second")
+
+    def test_coalescingLost(self):
+        """
+        If the connection a response was being rendered for is lost, the
+        requests waiting for it are rendered, and those which are lost while
+        they wait are not.
+        """
+        self.original.delayed = True
+        first, firstTransport = self.request()
+        second, secondTransport = self.request()
+        third, thirdTransport = self.request()
+        second.connectionLost(Failure(ConnectionDone()))
+        first.connectionLost(Failure(ConnectionDone()))
+        self.assertEqual(self.original.pending, [first, third])
+
+    def test_coalescingError(self):
+        """
+        If rendering a response fails, the requests waiting for it are
+        rendered.
+        """
+        self.original.delayed = True
+        first, firstTransport = self.request()
+        second, secondTransport = self.request()
+        first.processingFailed(Failure(RuntimeError("rendering failed")))
+        self.flushLoggedErrors(RuntimeError)
+        self.assertEqual(first.code, http.INTERNAL_SERVER_ERROR)
+        self.assertEqual(self.original.pending, [first, second])
@@ -18,13 +18,16 @@ from zope.interface import implementer
 from twisted.trial.unittest import TestCase
 from twisted.test.testutils import XMLAssertionMixin
 
-from twisted.internet.defer import passthru, succeed, gatherResults
+from twisted.internet.defer import Deferred, passthru, succeed, gatherResults
 
 from twisted.web.iweb import IRenderable
 from twisted.web.error import UnfilledSlot, UnsupportedType, FlattenerError
 
 from twisted.web.template import tags, Tag, Comment, CDATA, CharRef, slot
 from twisted.web.template import Element, renderer, TagLoader, flattenString
+from twisted.web.template import flatten
+from twisted.web._flatten import BUFFER_SIZE, _compile, _compiledChildren
+from twisted.web._flatten import _flatten, _FlattenProducer
 
 from twisted.web.test._util import FlattenTestCase
 
@@ -533,3 +536,295 @@ class FlattenerErrorTests(TestCase):
                 g.__code__.co_firstlineno + 1,
             ),
         )
+
+
+class CompileTests(FlattenTestCase):
+    """
+    Tests for L{_compile}.
+    """
+
+    def assertCompiledFlattensTo(self, root, target):
+        """
+        Assert that C{root} flattens to C{target}, both before and after it is
+        compiled.
+        """
+        self.assertFlattensImmediately(root, target)
+        self.assertFlattensImmediately(_compile(root), target)
+
+    def test_static(self):
+        """
+        Text, comments, CDATA, character references and tags are compiled to
+        a single string of bytes, which is what they flatten to, and the
+        number of tags.
+        """
+        root = [
+            tags.html(
+                tags.head(tags.title("A & B")),
+                tags.body(
+                    Comment("a -- comment"),
+                    CDATA("x ]]> y"),
+                    CharRef(233),
+                    tags.transparent("\N{SNOWMAN}", tags.br()),
+                    tags.img(src='"<&>"'),
+                    class_="page",
+                ),
+            )
+        ]
+        compiled = _compile(root)
+        self.assertEqual(len(compiled.parts), 2)
+        self.assertIsInstance(compiled.parts[0], bytes)
+        self.assertEqual(compiled.parts[1], 7)
+        self.assertCompiledFlattensTo(
+            root,
+            b'<html><head><title>A &amp; B</title></head><body class="page">'
+            b"<!--a - -  comment--><![CDATA[x ]]]]><![CDATA[> y]]>&#233;"
+            b'\xe2\x98\x83<br /><img src="&quot;&lt;&amp;&gt;&quot;" /></body>'
+            b"</html>",
+        )
+
+    def test_slots(self):
+        """
+        Slots in compiled templates, including slots in attributes, are
+        filled when the template is flattened.
+        """
+        root = tags.div(
+            tags.p(slot("text"), title=tags.transparent("<", slot("title"))),
+            slot("tag"),
+        ).fillSlots(text="<text>", title='"title"', tag=tags.br())
+        self.assertCompiledFlattensTo(
+            [tags.transparent(root)],
+            b'<div><p title="&lt;&quot;title&quot;">&lt;text&gt;</p><br /></div>',
+        )
+        self.assertCompiledFlattensTo(
+            tags.div(tags.p(slot("a", default="<default>")), tags.br()),
+            b"<div><p>&lt;default&gt;</p><br /></div>",
+        )
+
+    def test_renderers(self):
+        """
+        Tags with renderers are passed to their render methods as they would
+        have been if the template had not been compiled, children and all.
+        """
+        rendered = []
+
+        class Rows(Element):
+            @renderer
+            def rows(self, request, tag):
+                rendered.append(tag)
+                for i in range(2):
+                    yield tag.clone().fillSlots(i=str(i))
+
+            @renderer
+            def empty(self, request, tag):
+                return tag
+
+        template = [
+            tags.table(
+                tags.tr(tags.td("row ", slot("i")), render="rows", class_="row"),
+                tags.br(render="empty"),
+            )
+        ]
+        expected = (
+            b'<table><tr class="row"><td>row 0</td></tr>'
+            b'<tr class="row"><td>row 1</td></tr><br /></table>'
+        )
+        self.assertFlattensImmediately(Rows(TagLoader(template[0])), expected)
+        self.assertFlattensImmediately(Rows(TagLoader(_compile(template))), expected)
+        [original, compiled] = rendered
+        self.assertEqual(compiled.tagName, "tr")
+        self.assertEqual(compiled.attributes, {"class": "row"})
+        self.assertEqual(compiled.children, original.children)
+        self.assertIsInstance(compiled.children[0], Tag)
+
+    def test_rendererChildren(self):
+        """
+        The children of tags with renderers are compiled, and copies of those
+        tags made by L{Tag.clone} are flattened from the compiled children
+        while their children are unchanged.
+        """
+        row = tags.tr(tags.td("row ", slot("i"), class_="cell"), render="rows")
+        compiled = _compile([tags.table(row)])
+        self.assertIs(compiled.parts[2], row)
+        self.assertIsInstance(row._compiledChildren.parts[0], bytes)
+        self.assertIs(row._compiledChildren.original, row.children)
+        self.assertIs(_compiledChildren(row), row._compiledChildren)
+        for clone in [row.clone(), row.clone(False), row.clone().fillSlots(i="1")]:
+            self.assertIs(_compiledChildren(clone), row._compiledChildren)
+            self.assertIsInstance(clone.children[0], Tag)
+
+    def test_changedRendererChildren(self):
+        """
+        Copies of tags with renderers whose children have been changed are
+        flattened from their children, not from the compiled children.
+        """
+
+        class Rows(Element):
+            @renderer
+            def rows(self, request, tag):
+                def clone():
+                    return tag.clone().fillSlots(i="0")
+
+                yield clone()
+                changed = clone()
+                changed.children[0].attributes["class"] = "changed"
+                yield changed
+                changed = clone()
+                changed.children[0].children.append("!")
+                yield changed
+                yield clone()("more")
+                yield clone().clear()
+                changed = clone()
+                changed.children[0].fillSlots(i="slot")
+                yield changed
+
+        template = tags.table(
+            tags.tr(tags.td("row ", slot("i"), class_="cell"), render="rows")
+        )
+        expected = (
+            b'<table><tr><td class="cell">row 0</td></tr>'
+            b'<tr><td class="changed">row 0</td></tr>'
+            b'<tr><td class="cell">row 0!</td></tr>'
+            b'<tr><td class="cell">row 0</td>more</tr>'
+            b"<tr></tr>"
+            b'<tr><td class="cell">row slot</td></tr></table>'
+        )
+        self.assertFlattensImmediately(Rows(TagLoader(template)), expected)
+        compiled = _compile(template.clone())
+        self.assertFlattensImmediately(Rows(TagLoader(compiled)), expected)
+
+    def test_errorRoots(self):
+        """
+        A L{FlattenerError} raised while flattening a compiled template lists
+        the same objects as it would have if the template had not been
+        compiled.
+        """
+        template = tags.html(tags.body(tags.p("hello ", slot("missing"))))
+        failures = []
+        for root in [template, _compile(template)]:
+            failures.append(self.failureResultOf(flattenString(None, root)))
+        [original, compiled] = [f.value for f in failures]
+        self.assertIsInstance(compiled, FlattenerError)
+        self.assertEqual(compiled._roots, original._roots)
+
+    def test_inAttribute(self):
+        """
+        A compiled template flattened in an attribute is escaped as it would
+        have been if it had not been compiled.
+        """
+        compiled = _compile([tags.p("a & b", class_='"c"'), Comment("d")])
+        self.assertFlattensImmediately(
+            tags.img(alt=compiled),
+            b'<img alt="&lt;p class=&quot;&amp;quot;c&amp;quot;&quot;&gt;'
+            b'a &amp;amp; b&lt;/p&gt;&lt;!--d--&gt;" />',
+        )
+
+    def test_invalidTagName(self):
+        """
+        A tag which cannot be serialized is left to fail when it is flattened.
+        """
+        root = tags.div(Tag("\N{SNOWMAN}"))
+        compiled = _compile(root)
+        self.assertIn(root.children[0], compiled.parts)
+        self.assertFlatteningRaises(compiled, UnicodeEncodeError)
+
+    def test_clone(self):
+        """
+        Cloning a compiled template returns it, since it is never changed.
+        """
+        compiled = _compile(tags.p("text"))
+        self.assertIs(tags.div(compiled).clone().children[0], compiled)
+
+
+class BufferingTests(TestCase):
+    """
+    Tests for the buffering of output by L{flatten}, and for pausing it with
+    a L{_FlattenProducer}.
+    """
+
+    def test_coalesced(self):
+        """
+        The output of flattening many small pieces is written at once.
+        """
+        written = []
+        d = flatten(
+            None, tags.ul([tags.li(str(i)) for i in range(100)]), written.append
+        )
+        self.successResultOf(d)
+        self.assertEqual(len(written), 1)
+        self.assertTrue(written[0].startswith(b"<ul><li>0</li><li>1</li>"))
+
+    def test_bufferSize(self):
+        """
+        Output is written whenever at least L{BUFFER_SIZE} bytes of it have
+        been collected.
+        """
+        written = []
+        chunk = "x" * (BUFFER_SIZE // 4 + 1)
+        self.successResultOf(flatten(None, [chunk] * 9, written.append))
+        self.assertEqual(
+            [len(data) for data in written],
+            [len(chunk) * 4, len(chunk) * 4, len(chunk)],
+        )
+
+    def test_flushBeforeWaiting(self):
+        """
+        What has been collected is written before waiting for a L{Deferred}
+        which has not fired, but not for one which has.
+        """
+        written = []
+        waiting = Deferred()
+        d = flatten(None, ["a", succeed("b"), "c", waiting, "e"], written.append)
+        self.assertEqual(written, [b"abc"])
+        waiting.callback("d")
+        self.successResultOf(d)
+        self.assertEqual(written, [b"abc", b"de"])
+
+    def test_flushBeforeFailing(self):
+        """
+        What has been collected before flattening fails is written before the
+        L{Deferred} L{flatten} returns fails.
+        """
+        written = []
+        d = flatten(None, ["before", slot("unfilled")], written.append)
+        self.assertEqual(written, [b"before"])
+        self.failureResultOf(d, FlattenerError)
+
+    def test_paused(self):
+        """
+        While the L{_FlattenProducer} is paused, flattening is paused; when it
+        is resumed, flattening resumes.
+        """
+        written = []
+        producer = _FlattenProducer()
+
+        def write(data):
+            written.append(data)
+            producer.pauseProducing()
+
+        chunk = "x" * BUFFER_SIZE
+        d = _flatten(None, [chunk, chunk, chunk], write, producer)
+        self.assertNoResult(d)
+        self.assertEqual(len(written), 1)
+        producer.resumeProducing()
+        self.assertEqual(len(written), 2)
+        producer.resumeProducing()
+        self.assertEqual(len(written), 3)
+        producer.resumeProducing()
+        self.successResultOf(d)
+
+    def test_stopped(self):
+        """
+        Once the L{_FlattenProducer} is stopped, flattening stops.
+        """
+        written = []
+        producer = _FlattenProducer()
+
+        def write(data):
+            written.append(data)
+            producer.pauseProducing()
+
+        chunk = "x" * BUFFER_SIZE
+        d = _flatten(None, [chunk, chunk, chunk], write, producer)
+        producer.stopProducing()
+        self.assertIsNone(self.successResultOf(d))
+        self.assertEqual(len(written), 1)
@@ -1458,6 +1458,10 @@ class ParsingTests(unittest.TestCase):
     Tests for protocol parsing in L{HTTPChannel}.
     """
 
+    # How many bytes of a request runRequest delivers to the channel at a
+    # time.
+    deliverySize = 1
+
     def setUp(self):
         self.didRequest = False
 
@@ -1491,11 +1495,11 @@ class ParsingTests(unittest.TestCase):
         transport = StringTransport()
 
         channel.makeConnection(transport)
-        # one byte at a time, to stress it.
-        for byte in iterbytes(httpRequest):
+        # one byte at a time by default, to stress it.
+        for start in range(0, len(httpRequest), self.deliverySize):
             if channel.transport.disconnecting:
                 break
-            channel.dataReceived(byte)
+            channel.dataReceived(httpRequest[start : start + self.deliverySize])
         channel.connectionLost(IOError("all done"))
 
         if success:
@@ -2291,6 +2295,93 @@ ok
         )
 
 
+class ParsingAllAtOnceTests(ParsingTests):
+    """
+    Tests for protocol parsing in L{HTTPChannel} when each request arrives all
+    at once, so that its headers are parsed in one pass.
+    """
+
+    deliverySize = 2 ** 20
+
+    def test_headersLoneCarriageReturn(self):
+        """
+        A carriage return in a header value which is not followed by a line
+        feed is replaced with a space, as it is when headers are parsed one
+        line at a time.
+        """
+        processed = []
+
+        class MyRequest(http.Request):
+            def process(self):
+                processed.append(self)
+                self.finish()
+
+        self.runRequest(b"GET / HTTP/1.0\nFoo: bar\rbaz\n\n", MyRequest, 0)
+        [request] = processed
+        self.assertEqual(request.requestHeaders.getRawHeaders(b"foo"), [b"bar baz"])
+
+    def test_pipelinedHeaders(self):
+        """
+        Each of several pipelined requests received at once gets its own
+        headers, and the request bodies are not mistaken for headers.
+        """
+        processed = []
+
+        class MyRequest(http.Request):
+            def process(self):
+                self.body = self.content.read()
+                processed.append(self)
+                self.finish()
+
+        httpRequest = (
+            b"GET / HTTP/1.1\n"
+            b"\n"
+            b"GET / HTTP/1.1\n"
+            b"Foo: 1\n"
+            b"foo: 2\n"
+            b"\n"
+            b"POST / HTTP/1.1\n"
+            b"Content-Length: 13\n"
+            b"Foo: 3\n"
+            b"\n"
+            b"Foo: body\n\n"
+        )
+        self.runRequest(httpRequest, MyRequest, 0)
+        self.assertEqual(
+            [list(request.requestHeaders.getAllRawHeaders()) for request in processed],
+            [
+                [],
+                [(b"Foo", [b"1", b"2"])],
+                [(b"Content-Length", [b"13"]), (b"Foo", [b"3"])],
+            ],
+        )
+        self.assertEqual(processed[2].body, b"Foo: body\r\n\r\n")
+
+    def test_headerReceivedOverridden(self):
+        """
+        If L{HTTPChannel.headerReceived} is overridden, it is called for each
+        header.
+        """
+        received = []
+
+        class MyChannel(http.HTTPChannel):
+            def headerReceived(self, line):
+                received.append(line)
+                return http.HTTPChannel.headerReceived(self, line)
+
+        class MyRequest(http.Request):
+            def process(self):
+                self.finish()
+
+        self.runRequest(
+            b"GET / HTTP/1.0\nFoo: bar\nBaz: quux\n\n",
+            MyRequest,
+            0,
+            channel=MyChannel(),
+        )
+        self.assertEqual(received, [b"Foo: bar", b"Baz: quux"])
+
+
 class QueryArgumentsTests(unittest.TestCase):
     def testParseqs(self):
         self.assertEqual(parse_qs(b"a=b&d=c;+=f"), http.parse_qs(b"a=b&d=c;+=f"))
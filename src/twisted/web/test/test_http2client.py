@@ -0,0 +1,499 @@
+# Copyright (c) Twisted Matrix Laboratories.
+# See LICENSE for details.
+
+"""
+Tests for L{twisted.web._http2client}.
+"""
+
+
+from twisted.internet.defer import CancelledError
+from twisted.internet.error import ConnectionDone, ConnectionLost
+from twisted.internet.testing import AccumulatingProtocol, StringTransport
+from twisted.python.failure import Failure
+from twisted.trial.unittest import SynchronousTestCase
+from twisted.web.client import URI
+from twisted.web.http_headers import Headers
+from twisted.web._newclient import (
+    Request,
+    RequestNotSent,
+    ResponseDone,
+    ResponseFailed,
+    ResponseNeverReceived,
+)
+from twisted.web.test.test_newclient import StringProducer
+
+skipH2 = None
+
+try:
+    from twisted.web._http2client import H2ClientProtocol
+
+    # These third-party imports are guaranteed to be present if HTTP/2 support
+    # is compiled in.
+    import h2.config
+    import h2.connection
+    import h2.errors
+    import h2.events
+    import h2.settings
+except ImportError:
+    skipH2 = "HTTP/2 support not enabled"
+
+
+def makeRequest(method=b"GET", path=b"/", bodyProducer=None, headers=None):
+    """
+    Make a request for C{path} on C{https://example.com}.
+    """
+    if headers is None:
+        headers = Headers()
+    headers.addRawHeader(b"host", b"example.com")
+    uri = b"https://example.com" + path
+    return Request._construct(
+        method, path, headers, bodyProducer, False, URI.fromBytes(uri)
+    )
+
+
+class ServerPeer:
+    """
+    The server end of an HTTP/2 connection to an L{H2ClientProtocol},
+    connected by a L{StringTransport} and driven by the test.
+
+    @ivar conn: The server's HTTP/2 state machine.
+
+    @ivar events: The events the server has received.
+    """
+
+    def __init__(self, client, settings=None):
+        self.client = client
+        self.transport = StringTransport()
+        config = h2.config.H2Configuration(client_side=False, header_encoding=None)
+        self.conn = h2.connection.H2Connection(config=config)
+        self.conn.initiate_connection()
+        if settings is not None:
+            self.conn.update_settings(settings)
+        self.events = []
+        client.makeConnection(self.transport)
+        self.exchange()
+
+    def exchange(self):
+        """
+        Deliver the data each side has to send, until neither has any.
+        """
+        while True:
+            clientData = self.transport.value()
+            self.transport.clear()
+            if clientData:
+                self.events.extend(self.conn.receive_data(clientData))
+            serverData = self.conn.data_to_send()
+            if serverData:
+                self.client.dataReceived(serverData)
+            if not clientData and not serverData:
+                return
+
+    def received(self, eventType):
+        """
+        The events of C{eventType} the server has received.
+        """
+        return [event for event in self.events if isinstance(event, eventType)]
+
+    def respond(self, streamID, body=b"", headers=(), end=True):
+        """
+        Send a 200 response on C{streamID}.
+        """
+        self.conn.send_headers(
+            streamID,
+            [(b":status", b"200")] + list(headers),
+            end_stream=not body and end,
+        )
+        self.send(streamID, body, end)
+
+    def send(self, streamID, body, end=True):
+        """
+        Send C{body} on C{streamID}, in frames no larger than the client
+        allows.
+        """
+        size = self.conn.max_outbound_frame_size
+        for start in range(0, len(body), size):
+            chunk = body[start : start + size]
+            self.conn.send_data(
+                streamID, chunk, end_stream=end and start + size >= len(body)
+            )
+        self.exchange()
+
+
+class H2ClientProtocolTests(SynchronousTestCase):
+    """
+    Tests for L{H2ClientProtocol}.
+    """
+
+    if skipH2:
+        skip = skipH2
+
+    def setUp(self):
+        self.quiescent = []
+        self.lost = []
+        self.protocol = H2ClientProtocol(self.quiescent.append, self.lost.append)
+
+    def connect(self, settings=None):
+        """
+        Connect C{self.protocol} to a new L{ServerPeer}.
+        """
+        self.peer = ServerPeer(self.protocol, settings)
+        return self.peer
+
+    def request(self, *args, **kwargs):
+        """
+        Make a request and deliver it to the server.
+
+        @return: A list which will hold the response or the failure.
+        """
+        result = []
+        d = self.protocol.request(makeRequest(*args, **kwargs))
+        d.addBoth(result.append)
+        self.peer.exchange()
+        return result
+
+    def deliver(self, response):
+        """
+        Deliver the body of C{response} to a new L{AccumulatingProtocol}.
+        """
+        protocol = AccumulatingProtocol()
+        response.deliverBody(protocol)
+        self.peer.exchange()
+        return protocol
+
+    def test_connectionPreface(self):
+        """
+        L{H2ClientProtocol} sends the connection preface and refuses server
+        push.
+        """
+        peer = self.connect()
+        self.assertEqual(peer.conn.remote_settings.enable_push, 0)
+        self.assertEqual(self.protocol.state, "OPEN")
+
+    def test_requestHeaders(self):
+        """
+        The request is sent as an HTTP/2 header block, with the connection
+        specific headers removed.
+        """
+        peer = self.connect()
+        headers = Headers(
+            {b"user-agent": [b"test"], b"connection": [b"close"], b"te": [b"x"]}
+        )
+        self.request(path=b"/foo?bar", headers=headers)
+        [received] = peer.received(h2.events.RequestReceived)
+        self.assertEqual(
+            received.headers,
+            [
+                (b":method", b"GET"),
+                (b":scheme", b"https"),
+                (b":authority", b"example.com"),
+                (b":path", b"/foo?bar"),
+                (b"user-agent", b"test"),
+            ],
+        )
+        self.assertTrue(received.stream_ended)
+
+    def test_response(self):
+        """
+        The L{Deferred} returned by L{H2ClientProtocol.request} fires with the
+        response, whose body is delivered once a protocol is given to
+        L{Response.deliverBody}.
+        """
+        peer = self.connect()
+        result = self.request()
+        peer.respond(1, b"hello", [(b"content-length", b"5"), (b"x-foo", b"bar")])
+        [response] = result
+        self.assertEqual(response.version, (b"HTTP", 2, 0))
+        self.assertEqual(response.code, 200)
+        self.assertEqual(response.phrase, b"OK")
+        self.assertEqual(response.length, 5)
+        self.assertEqual(response.headers.getRawHeaders(b"x-foo"), [b"bar"])
+        protocol = self.deliver(response)
+        self.assertEqual(protocol.data, b"hello")
+        protocol.closedReason.trap(ResponseDone)
+
+    def test_headResponseLength(self):
+        """
+        The response to a I{HEAD} request has no body.
+        """
+        peer = self.connect()
+        result = self.request(method=b"HEAD")
+        peer.respond(1, headers=[(b"content-length", b"5")])
+        self.assertEqual(result[0].length, 0)
+
+    def test_concurrentRequests(self):
+        """
+        Requests are each sent on their own stream without waiting for the
+        responses to earlier ones, which may arrive in any order.
+        """
+        peer = self.connect()
+        results = [self.request(path=b"/" + bytes([c])) for c in b"abc"]
+        streams = [
+            event.stream_id for event in peer.received(h2.events.RequestReceived)
+        ]
+        self.assertEqual(streams, [1, 3, 5])
+        peer.respond(5, b"c")
+        peer.respond(1, b"a")
+        self.assertEqual(results[1], [])
+        peer.respond(3, b"b")
+        bodies = [self.deliver(result[0]).data for result in results]
+        self.assertEqual(bodies, [b"a", b"b", b"c"])
+
+    def test_requestBody(self):
+        """
+        The request body is sent as the stream's data, and the stream is
+        ended once the body producer has finished.
+        """
+        peer = self.connect()
+        producer = StringProducer(5)
+        self.request(method=b"POST", bodyProducer=producer)
+        [received] = peer.received(h2.events.RequestReceived)
+        self.assertIn((b"content-length", b"5"), received.headers)
+        self.assertFalse(received.stream_ended)
+        producer.consumer.write(b"hello")
+        producer.finished.callback(None)
+        peer.exchange()
+        received = b"".join(e.data for e in peer.received(h2.events.DataReceived))
+        self.assertEqual(received, b"hello")
+        self.assertEqual(len(peer.received(h2.events.StreamEnded)), 1)
+
+    def test_requestBodyFlowControl(self):
+        """
+        No more of the request body is sent than the server's flow control
+        window allows, and the rest is sent once the window opens.
+        """
+        peer = self.connect({h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 10})
+        producer = StringProducer(25)
+        self.request(method=b"POST", bodyProducer=producer)
+        producer.consumer.write(b"x" * 25)
+        producer.finished.callback(None)
+        peer.exchange()
+        received = b"".join(e.data for e in peer.received(h2.events.DataReceived))
+        self.assertEqual(received, b"x" * 10)
+        self.assertEqual(peer.received(h2.events.StreamEnded), [])
+
+        peer.conn.increment_flow_control_window(15, stream_id=1)
+        peer.exchange()
+        received = b"".join(e.data for e in peer.received(h2.events.DataReceived))
+        self.assertEqual(received, b"x" * 25)
+        self.assertEqual(len(peer.received(h2.events.StreamEnded)), 1)
+
+    def test_requestBodyProducerPaused(self):
+        """
+        The request body producer is paused while too much of the body is
+        waiting for the flow control window to open, and resumed once it has
+        been sent.
+        """
+        peer = self.connect({h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: 0})
+        paused = []
+        producer = StringProducer(2 ** 17)
+        producer.pauseProducing = lambda: paused.append(True)
+        producer.resumeProducing = lambda: paused.append(False)
+        self.request(method=b"POST", bodyProducer=producer)
+        producer.consumer.write(b"x" * 2 ** 17)
+        self.assertEqual(paused, [True])
+        peer.conn.increment_flow_control_window(2 ** 17, stream_id=1)
+        peer.conn.increment_flow_control_window(2 ** 17)
+        peer.exchange()
+        self.assertEqual(paused, [True, False])
+
+    def test_responseFlowControl(self):
+        """
+        Response body data is not acknowledged until it can be delivered, so
+        the server stops sending once the flow control window is used up.
+        """
+        peer = self.connect()
+        result = self.request()
+        window = peer.conn.local_flow_control_window(1)
+        peer.respond(1, b"x" * window, end=False)
+        self.assertEqual(peer.conn.local_flow_control_window(1), 0)
+        protocol = self.deliver(result[0])
+        self.assertEqual(len(protocol.data), window)
+        self.assertEqual(peer.conn.local_flow_control_window(1), window)
+
+    def test_pauseProducing(self):
+        """
+        Response body data received while the response's transport is paused
+        is acknowledged once it is resumed.
+        """
+        peer = self.connect()
+        result = self.request()
+        peer.respond(1, end=False)
+        protocol = self.deliver(result[0])
+        window = peer.conn.local_flow_control_window(1)
+        protocol.transport.pauseProducing()
+        peer.send(1, b"x" * window, end=False)
+        self.assertEqual(len(protocol.data), window)
+        self.assertEqual(peer.conn.local_flow_control_window(1), 0)
+        protocol.transport.resumeProducing()
+        peer.exchange()
+        self.assertEqual(peer.conn.local_flow_control_window(1), window)
+
+    def test_stopProducing(self):
+        """
+        Stopping the response's transport resets the stream and fails the
+        response body with L{ResponseFailed}.
+        """
+        peer = self.connect()
+        result = self.request()
+        peer.respond(1, b"x", end=False)
+        protocol = self.deliver(result[0])
+        protocol.transport.stopProducing()
+        peer.exchange()
+        [reset] = peer.received(h2.events.StreamReset)
+        self.assertEqual(reset.error_code, h2.errors.ErrorCodes.CANCEL)
+        protocol.closedReason.trap(ResponseFailed)
+        self.assertEqual(self.quiescent, [self.protocol])
+
+    def test_maxConcurrentStreams(self):
+        """
+        Requests beyond the server's limit on concurrent streams are sent
+        once earlier streams have ended.
+        """
+        peer = self.connect({h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS: 1})
+        first = self.request(path=b"/a")
+        second = self.request(path=b"/b")
+        self.assertEqual(len(peer.received(h2.events.RequestReceived)), 1)
+        peer.respond(1, b"a")
+        self.assertEqual(len(peer.received(h2.events.RequestReceived)), 2)
+        self.assertEqual(self.quiescent, [])
+        peer.respond(3, b"b")
+        self.assertEqual(self.deliver(first[0]).data, b"a")
+        self.assertEqual(self.deliver(second[0]).data, b"b")
+        self.assertEqual(self.quiescent, [self.protocol])
+
+    def test_cancel(self):
+        """
+        Cancelling the L{Deferred} returned by L{H2ClientProtocol.request}
+        before the response is received resets the stream and fails it with
+        L{ResponseNeverReceived}.
+        """
+        peer = self.connect()
+        result = []
+        d = self.protocol.request(makeRequest())
+        d.addBoth(result.append)
+        d.cancel()
+        peer.exchange()
+        [reset] = peer.received(h2.events.StreamReset)
+        self.assertEqual(reset.error_code, h2.errors.ErrorCodes.CANCEL)
+        result[0].trap(ResponseNeverReceived)
+        result[0].value.reasons[0].trap(CancelledError)
+        self.assertEqual(self.quiescent, [self.protocol])
+
+    def test_cancelPending(self):
+        """
+        Cancelling a request which has not yet been sent, because of the
+        server's limit on concurrent streams, forgets it.
+        """
+        peer = self.connect({h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS: 1})
+        self.request()
+        d = self.protocol.request(makeRequest())
+        self.assertNoResult(d)
+        d.cancel()
+        self.failureResultOf(d, CancelledError)
+        peer.respond(1)
+        self.assertEqual(len(peer.received(h2.events.RequestReceived)), 1)
+
+    def test_cancelPendingAfterSent(self):
+        """
+        Cancelling a request which was pending, but has since been sent,
+        resets its stream and fails it with L{ResponseNeverReceived}.
+        """
+        peer = self.connect({h2.settings.SettingCodes.MAX_CONCURRENT_STREAMS: 1})
+        self.request()
+        d = self.protocol.request(makeRequest())
+        peer.respond(1)
+        self.assertEqual(len(peer.received(h2.events.RequestReceived)), 2)
+        d.cancel()
+        peer.exchange()
+        [reset] = peer.received(h2.events.StreamReset)
+        self.assertEqual(reset.stream_id, 3)
+        self.assertEqual(reset.error_code, h2.errors.ErrorCodes.CANCEL)
+        failure = self.failureResultOf(d, ResponseNeverReceived)
+        failure.value.reasons[0].trap(CancelledError)
+        self.assertEqual(self.protocol._sentPending, {})
+        self.assertEqual(self.quiescent, [self.protocol])
+
+    def test_streamReset(self):
+        """
+        A stream reset by the server fails its request with
+        L{ResponseNeverReceived}, without affecting the others.
+        """
+        peer = self.connect()
+        first = self.request()
+        second = self.request()
+        peer.conn.reset_stream(1, h2.errors.ErrorCodes.REFUSED_STREAM)
+        peer.exchange()
+        first[0].trap(ResponseNeverReceived)
+        first[0].value.reasons[0].trap(ConnectionLost)
+        peer.respond(3, b"ok")
+        self.assertEqual(self.deliver(second[0]).data, b"ok")
+
+    def test_goAway(self):
+        """
+        Once the server closes the connection, the streams in progress fail
+        with L{ResponseNeverReceived}, no new requests are accepted, and the
+        connection is closed.
+        """
+        peer = self.connect()
+        result = self.request()
+        peer.conn.close_connection()
+        peer.exchange()
+        self.assertEqual(self.protocol.state, "GOING_AWAY")
+        result[0].trap(ResponseNeverReceived)
+        result[0].value.reasons[0].trap(ConnectionLost)
+        self.failureResultOf(self.protocol.request(makeRequest()), RequestNotSent)
+        self.assertTrue(peer.transport.disconnecting)
+        self.assertEqual(self.quiescent, [])
+
+    def test_connectionLost(self):
+        """
+        When the connection is lost, requests awaiting responses fail with
+        L{ResponseNeverReceived}, bodies being received fail with
+        L{ResponseFailed}, and the lost callback is called.
+        """
+        peer = self.connect()
+        first = self.request()
+        second = self.request()
+        peer.respond(1, b"x", end=False)
+        protocol = self.deliver(first[0])
+        self.protocol.connectionLost(Failure(ConnectionDone()))
+        second[0].trap(ResponseNeverReceived)
+        protocol.closedReason.trap(ResponseFailed)
+        self.assertEqual(self.protocol.state, "CONNECTION_LOST")
+        self.assertEqual(self.lost, [self.protocol])
+        self.assertEqual(self.quiescent, [])
+        self.failureResultOf(self.protocol.request(makeRequest()), RequestNotSent)
+
+    def test_quiescentCallback(self):
+        """
+        The quiescent callback is called once no streams are in progress.
+        """
+        peer = self.connect()
+        self.request()
+        peer.respond(1, b"x", end=False)
+        self.assertEqual(self.quiescent, [])
+        peer.conn.end_stream(1)
+        peer.exchange()
+        self.assertEqual(self.quiescent, [self.protocol])
+
+    def test_abort(self):
+        """
+        L{H2ClientProtocol.abort} closes the connection and returns a
+        L{Deferred} which fires once it has been lost.
+        """
+        peer = self.connect()
+        d = self.protocol.abort()
+        self.assertTrue(peer.transport.disconnecting)
+        self.assertNoResult(d)
+        self.protocol.connectionLost(Failure(ConnectionDone()))
+        self.successResultOf(d)
+        self.successResultOf(self.protocol.abort())
+
+    def test_protocolError(self):
+        """
+        The connection is closed when the server breaks the protocol.
+        """
+        peer = self.connect()
+        self.protocol.dataReceived(b"\x00" * 20)
+        self.assertTrue(peer.transport.disconnecting)
+        self.assertEqual(self.protocol.state, "GOING_AWAY")
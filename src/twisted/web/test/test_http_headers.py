@@ -244,6 +244,86 @@ class BytesHeadersTests(TestCase):
         self.assertEqual(h._canonicalNameCaps(b"www-authenticate"), b"WWW-Authenticate")
         self.assertEqual(h._canonicalNameCaps(b"x-xss-protection"), b"X-XSS-Protection")
 
+    def test_canonicalNameCapsCached(self):
+        """
+        L{Headers._canonicalNameCaps} gives the same canonical capitalization
+        each time it is asked for the same header, whether it is a common one
+        or not.
+        """
+        h = Headers()
+        self.assertEqual(h._canonicalNameCaps(b"content-type"), b"Content-Type")
+        self.assertEqual(h._canonicalNameCaps(b"x-forwarded-for"), b"X-Forwarded-For")
+        self.assertEqual(h._canonicalNameCaps(b"x-uncommon"), b"X-Uncommon")
+        self.assertEqual(h._canonicalNameCaps(b"x-uncommon"), b"X-Uncommon")
+
+    def test_canonicalNameCapsSubclass(self):
+        """
+        A subclass of L{Headers} can give its own canonical capitalization of
+        any header, including the common ones, with C{_caseMappings}.
+        """
+
+        class ShoutingHeaders(Headers):
+            _caseMappings = {b"content-type": b"CONTENT-TYPE"}
+
+        h = ShoutingHeaders()
+        h.setRawHeaders(b"content-type", [b"text/plain"])
+        self.assertEqual(h._canonicalNameCaps(b"content-type"), b"CONTENT-TYPE")
+        self.assertEqual(h._canonicalNameCaps(b"etag"), b"Etag")
+        self.assertEqual(
+            list(h.getAllRawHeaders()), [(b"CONTENT-TYPE", [b"text/plain"])]
+        )
+
+    def test_commonNamesShared(self):
+        """
+        Every L{Headers} stores a common header under the same lowercase
+        name, however the name is given.
+        """
+        names = [b"Content-Type", b"content-type", "Content-Type", "content-type"]
+        keys = []
+        for name in names:
+            h = Headers()
+            h.addRawHeader(name, b"text/plain")
+            [key] = h._rawHeaders
+            keys.append(key)
+        self.assertEqual(keys[0], b"content-type")
+        for key in keys[1:]:
+            self.assertIs(key, keys[0])
+
+    def test_headerLines(self):
+        """
+        L{Headers._headerLines} gives a CRLF terminated line for each value of
+        each header, with its canonical name.
+        """
+        h = Headers()
+        h.setRawHeaders(b"etag", [b'"abc"'])
+        h.setRawHeaders(b"x-foo", [b"1", b"2"])
+        self.assertEqual(
+            h._headerLines(), [b'ETag: "abc"\r\n', b"X-Foo: 1\r\n", b"X-Foo: 2\r\n"]
+        )
+
+    def test_headerLinesSubclass(self):
+        """
+        L{Headers._headerLines} on a subclass of L{Headers} which overrides
+        L{Headers.getAllRawHeaders} gives the headers it returns.
+        """
+
+        class ExtraHeaders(Headers):
+            def getAllRawHeaders(self):
+                yield from Headers.getAllRawHeaders(self)
+                yield b"X-Extra", [b"yes"]
+
+        h = ExtraHeaders()
+        h.setRawHeaders(b"x-foo", [b"1"])
+        self.assertEqual(h._headerLines(), [b"X-Foo: 1\r\n", b"X-Extra: yes\r\n"])
+
+    def test_attributes(self):
+        """
+        Attributes other than those L{Headers} uses can be set on an instance.
+        """
+        h = Headers()
+        h.extra = "value"
+        self.assertEqual(h.extra, "value")
+
     def test_getAllRawHeaders(self):
         """
         L{Headers.getAllRawHeaders} returns an iterable of (k, v) pairs, where
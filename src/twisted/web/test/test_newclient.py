@@ -1784,6 +1784,35 @@ class HTTP11ClientProtocolTests(TestCase):
         self.flushLoggedErrors(ZeroDivisionError)
         self.assertTrue(transport.disconnecting)
 
+    def test_lostCallbackCalled(self):
+        """
+        The C{lostCallback} passed to L{HTTP11ClientProtocol} is called with
+        the protocol instance after its connection is lost, once the request
+        which was in progress has been failed.
+        """
+        events = []
+        transport = StringTransport()
+        protocol = HTTP11ClientProtocol(lostCallback=events.append)
+        protocol.makeConnection(transport)
+        requestDeferred = protocol.request(
+            Request(b"GET", b"/", _boringHeaders, None, persistent=True)
+        )
+        requestDeferred.addErrback(lambda reason: events.append(reason.type))
+        protocol.connectionLost(Failure(ConnectionDone()))
+        self.assertEqual(events, [ResponseNeverReceived, protocol])
+        self.assertEqual(protocol.state, "CONNECTION_LOST")
+
+    def test_lostCallbackCalledQuiescent(self):
+        """
+        The C{lostCallback} is called if the connection is lost while no
+        request is in progress.
+        """
+        lost = []
+        protocol = HTTP11ClientProtocol(lostCallback=lost.append)
+        protocol.makeConnection(StringTransport())
+        protocol.connectionLost(Failure(ConnectionDone()))
+        self.assertEqual(lost, [protocol])
+
     def test_cancelBeforeResponse(self):
         """
         The L{Deferred} returned by L{HTTP11ClientProtocol.request} will fire
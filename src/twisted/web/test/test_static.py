@@ -17,18 +17,25 @@ from io import BytesIO as StringIO
 from unittest import skipIf
 from zope.interface.verify import verifyObject
 
-from twisted.internet import abstract, interfaces
+from twisted.internet import abstract, interfaces, reactor, tcp
+from twisted.internet.defer import Deferred, inlineCallbacks
+from twisted.internet.task import Clock
 from twisted.python.runtime import platform
 from twisted.python.filepath import FilePath
 from twisted.python import compat, log
 from twisted.python.compat import networkString
 from twisted.trial.unittest import TestCase
-from twisted.web import static, http, script, resource
+from twisted.web import static, http, script, resource, server
+from twisted.web.client import Agent, readBody
+from twisted.web.http_headers import Headers
 from twisted.web.server import UnsupportedMethod
-from twisted.web.test.requesthelper import DummyRequest
+from twisted.web.test.requesthelper import DummyChannel, DummyRequest
 from twisted.web.test._util import _render
 from twisted.web._responses import FOUND
 
+if platform.supportsINotify():
+    from twisted.internet.inotify import IN_MODIFY, _Watch
+
 
 class StaticDataTests(TestCase):
     """
@@ -1104,6 +1111,91 @@ class MultipleRangeStaticProducerTests(TestCase):
         self.assertEqual([None], callbackList)
 
 
+@skipIf(tcp._sendfile is None, "sendfile() is not available")
+class SendfileStaticProducerTests(TestCase):
+    """
+    Tests for the use of L{interfaces.ISendfileTransport} by the producers
+    of L{static.File}.
+    """
+
+    def setUp(self):
+        self.content = os.urandom(300000)
+        path = FilePath(self.mktemp())
+        path.makedirs()
+        path.child("file").setContent(self.content)
+        port = reactor.listenTCP(
+            0, server.Site(static.File(path.path)), interface="127.0.0.1"
+        )
+        self.addCleanup(port.stopListening)
+        self.url = networkString("http://127.0.0.1:{}/file".format(port.getHost().port))
+
+        self.sent = []
+        sendfile = tcp.Connection.sendfile
+
+        def recordingSendfile(transport, fileObject, offset, count):
+            self.sent.append((offset, count))
+            return sendfile(transport, fileObject, offset, count)
+
+        self.patch(tcp.Connection, "sendfile", recordingSendfile)
+
+    def get(self, headers=None):
+        """
+        Request the file.
+
+        @param headers: The request headers to send.
+
+        @return: A L{Deferred} firing with the response code and body.
+        """
+        agent = Agent(reactor)
+        d = agent.request(b"GET", self.url, Headers(headers or {}))
+
+        def gotResponse(response):
+            return readBody(response).addCallback(lambda body: (response.code, body))
+
+        return d.addCallback(gotResponse)
+
+    def test_wholeFile(self):
+        """
+        A request for the whole file is answered by sending the file with
+        L{interfaces.ISendfileTransport.sendfile}.
+        """
+        d = self.get()
+
+        def check(result):
+            self.assertEqual(result, (http.OK, self.content))
+            self.assertEqual(self.sent, [(0, len(self.content))])
+
+        return d.addCallback(check)
+
+    def test_singleRange(self):
+        """
+        A request for a single range of the file is answered by sending that
+        range with L{interfaces.ISendfileTransport.sendfile}.
+        """
+        d = self.get({b"range": [b"bytes=1000-200999"]})
+
+        def check(result):
+            self.assertEqual(result, (http.PARTIAL_CONTENT, self.content[1000:201000]))
+            self.assertEqual(self.sent, [(1000, 200000)])
+
+        return d.addCallback(check)
+
+    def test_unavailable(self):
+        """
+        If the transport cannot send the file with
+        L{interfaces.ISendfileTransport.sendfile}, the file is written to the
+        request instead.
+        """
+        self.patch(tcp, "_sendfile", None)
+        d = self.get({b"range": [b"bytes=1000-200999"]})
+
+        def check(result):
+            self.assertEqual(result, (http.PARTIAL_CONTENT, self.content[1000:201000]))
+            self.assertEqual(self.sent, [(1000, 200000)])
+
+        return d.addCallback(check)
+
+
 class RangeTests(TestCase):
     """
     Tests for I{Range-Header} support in L{twisted.web.static.File}.
@@ -1754,6 +1846,345 @@ class DirectoryListerTests(TestCase):
         self.assertEqual(static.formatFileSize(1234567890000), "1149G")
 
 
+class FileCacheTests(TestCase):
+    """
+    Tests for L{static.FileCache} and its use by L{static.File}.
+    """
+
+    def setUp(self):
+        self.clock = Clock()
+        self.cache = static.FileCache(ttl=10, reactor=self.clock)
+        self.addCleanup(self.cache.close)
+        self.base = FilePath(self.mktemp())
+        self.base.makedirs()
+        self.base.child("a.txt").setContent(b"hello")
+        self.root = static.File(self.base.path, cache=self.cache)
+
+    def replace(self, name, content):
+        """
+        Replace a file in C{self.base} with a new file.
+        """
+        new = self.base.child(name + ".new")
+        new.setContent(content)
+        os.rename(new.path, self.base.child(name).path)
+
+    def get(self, name):
+        """
+        Request a child of C{self.root}.
+
+        @return: A L{Deferred} firing with the request once it is finished.
+        """
+        request = DummyRequest([name])
+        child = resource.getChildForRequest(self.root, request)
+        d = _render(child, request)
+        d.addCallback(lambda ignored: request)
+        return d
+
+    def test_childCached(self):
+        """
+        The child resources a L{static.File} with a cache finds are reused,
+        along with their content types, until they are older than the cache's
+        C{ttl}.
+        """
+        request = DummyRequest([b"a.txt"])
+        child = self.root.getChild(b"a.txt", request)
+        self.assertIsInstance(child, static.File)
+        self.assertIs(child.cache, self.cache)
+        self.assertIs(self.root.getChild(b"a.txt", request), child)
+        self.clock.advance(10)
+        self.assertIsNot(self.root.getChild(b"a.txt", request), child)
+
+    @inlineCallbacks
+    def test_stale(self):
+        """
+        Changes to a file are not noticed until the cache entries for it are
+        older than the cache's C{ttl}, and the file which was there before
+        is served in the meantime.
+        """
+        request = yield self.get(b"a.txt")
+        self.assertEqual(b"".join(request.written), b"hello")
+        self.replace("a.txt", b"goodbye")
+        self.clock.advance(5)
+        request = yield self.get(b"a.txt")
+        self.assertEqual(b"".join(request.written), b"hello")
+        self.clock.advance(5)
+        request = yield self.get(b"a.txt")
+        self.assertEqual(b"".join(request.written), b"goodbye")
+
+    @inlineCallbacks
+    def test_missing(self):
+        """
+        Files which do not exist are cached too.
+        """
+        request = yield self.get(b"b.txt")
+        self.assertEqual(request.responseCode, http.NOT_FOUND)
+        self.base.child("b.txt").setContent(b"here")
+        request = yield self.get(b"b.txt")
+        self.assertEqual(request.responseCode, http.NOT_FOUND)
+        self.clock.advance(10)
+        request = yield self.get(b"b.txt")
+        self.assertEqual(b"".join(request.written), b"here")
+
+    def test_restat(self):
+        """
+        L{static.File.restat} uses the cache, and raises L{OSError} for a file
+        which does not exist if asked to.
+        """
+        missing = static.File(self.base.child("b.txt").path, cache=self.cache)
+        missing.restat(False)
+        self.assertFalse(missing.exists())
+        self.assertRaises(OSError, missing.restat)
+        self.base.child("b.txt").setContent(b"here")
+        missing.restat(False)
+        self.assertFalse(missing.exists())
+
+    def test_etag(self):
+        """
+        Files served with a cache have an I{ETag} made from their modification
+        time and size, and requests with a matching I{If-None-Match} get
+        I{Not Modified}.
+        """
+        statinfo = os.stat(self.base.child("a.txt").path)
+        etag = b'"%x-5"' % (statinfo.st_mtime_ns,)
+        channel = DummyChannel()
+        channel.site = server.Site(self.root)
+        request = server.Request(channel, False)
+        request.gotLength(0)
+        request.requestReceived(b"GET", b"/a.txt", b"HTTP/1.0")
+        self.assertEqual(request.etag, etag)
+
+        request = server.Request(channel, False)
+        request.requestHeaders.setRawHeaders(b"if-none-match", [etag])
+        request.gotLength(0)
+        request.requestReceived(b"GET", b"/a.txt", b"HTTP/1.0")
+        self.assertEqual(request.code, http.NOT_MODIFIED)
+
+    def test_sharedDescriptor(self):
+        """
+        Files opened through a cache share one file descriptor, each reading
+        from its own position, which is closed once they are closed and the
+        cache no longer keeps it.
+        """
+        path = self.base.child("a.txt").path
+        first = self.cache.open(path)
+        second = self.cache.open(path)
+        self.assertEqual(first.fileno(), second.fileno())
+        self.assertEqual(first.read(2), b"he")
+        second.seek(1)
+        self.assertEqual(second.read(), b"ello")
+        self.assertEqual(first.read(10), b"llo")
+        self.assertEqual(second.seek(-2, os.SEEK_END), 3)
+        self.assertEqual(second.read(), b"lo")
+
+        fileno = first.fileno()
+        first.close()
+        self.cache.clear()
+        os.fstat(fileno)
+        second.close()
+        self.assertRaises(OSError, os.fstat, fileno)
+
+    def test_maxOpenFiles(self):
+        """
+        Only the most recently used C{maxOpenFiles} descriptors are kept open,
+        and a file which has changed is opened again.
+        """
+        cache = static.FileCache(maxOpenFiles=1, reactor=self.clock)
+        self.addCleanup(cache.close)
+        self.base.child("b.txt").setContent(b"bee")
+        a = cache.open(self.base.child("a.txt").path)
+        fileno = a.fileno()
+        a.close()
+        b = cache.open(self.base.child("b.txt").path)
+        b.close()
+        self.assertRaises(OSError, os.fstat, fileno)
+
+        self.replace("b.txt", b"buzz")
+        self.clock.advance(1)
+        b = cache.open(self.base.child("b.txt").path)
+        self.assertEqual(b.read(), b"buzz")
+        b.close()
+
+    def test_noDescriptors(self):
+        """
+        With C{maxOpenFiles} of C{0}, files are opened as usual.
+        """
+        cache = static.FileCache(maxOpenFiles=0, reactor=self.clock)
+        f = cache.open(self.base.child("a.txt").path)
+        self.addCleanup(f.close)
+        self.assertEqual(f.read(), b"hello")
+        self.assertEqual(cache._files, {})
+
+    def test_maxEntries(self):
+        """
+        Only the most recently used C{maxEntries} results are kept.
+        """
+        cache = static.FileCache(maxEntries=1, reactor=self.clock)
+        a = self.base.child("a.txt").path
+        b = self.base.child("b.txt").path
+        cache.stat(a)
+        cache.stat(b)
+        self.assertEqual(list(cache._stats), [b])
+
+    @skipIf(not platform.supportsINotify(), "inotify is not available.")
+    def test_changed(self):
+        """
+        When a watched directory changes, the entries for it are no longer
+        used.
+        """
+        self.cache._watch = True
+        self.cache._watchDirectory = lambda directory: True
+        self.cache._watched = {self.base.asBytesMode().path: self.base.path}
+        request = DummyRequest([b"a.txt"])
+        child = self.root.getChild(b"a.txt", request)
+        path = self.base.child("a.txt").path
+        statinfo = self.cache.stat(path)
+        self.assertIs(self.cache.stat(path), statinfo)
+
+        watch = _Watch(self.base)
+        self.cache._changed(watch, watch.path.child(b"a.txt"), IN_MODIFY)
+        self.assertIsNot(self.cache.stat(path), statinfo)
+        self.assertIsNot(self.root.getChild(b"a.txt", request), child)
+
+    @skipIf(not platform.supportsINotify(), "inotify is not available.")
+    @inlineCallbacks
+    def test_watch(self):
+        """
+        A cache which watches directories stops using the entries for a
+        directory as soon as it changes.
+        """
+        cache = static.FileCache(ttl=None, watch=True)
+        self.addCleanup(cache.close)
+        changed = Deferred()
+        invalidate = cache._changed
+
+        def _changed(*args):
+            invalidate(*args)
+            if not changed.called:
+                changed.callback(None)
+
+        cache._changed = _changed
+        path = self.base.child("a.txt").path
+        statinfo = cache.stat(path)
+        self.assertIs(cache.stat(path), statinfo)
+        self.base.child("b.txt").setContent(b"bee")
+        yield changed
+        self.assertIsNot(cache.stat(path), statinfo)
+
+
+class PrecompressedTests(TestCase):
+    """
+    Tests for L{static.File.precompressedEncodings}.
+    """
+
+    def setUp(self):
+        self.base = FilePath(self.mktemp())
+        self.base.makedirs()
+        self.base.child("style.css").setContent(b"plain")
+        self.base.child("style.css.gz").setContent(b"gzipped")
+        self.base.child("style.css.br").setContent(b"brotlied")
+        self.resource = static.File(self.base.path)
+        self.resource.precompressedEncodings = [("br", ".br"), ("gzip", ".gz")]
+
+    def get(self, acceptEncoding=None, name=b"style.css", rangeHeader=None):
+        """
+        Get a file from C{self.resource}.
+
+        @return: The request, once the response has been rendered.
+        """
+        request = DummyRequest([name])
+        if acceptEncoding is not None:
+            request.requestHeaders.setRawHeaders(b"accept-encoding", [acceptEncoding])
+        if rangeHeader is not None:
+            request.requestHeaders.setRawHeaders(b"range", [rangeHeader])
+        child = resource.getChildForRequest(self.resource, request)
+        self.successResultOf(_render(child, request))
+        return request
+
+    def test_preferred(self):
+        """
+        The first of L{static.File.precompressedEncodings} the request
+        accepts is served, with its I{Content-Encoding} and the type of the
+        uncompressed file, varying on I{Accept-Encoding}.
+        """
+        request = self.get(b"gzip, deflate, br")
+        self.assertEqual(b"".join(request.written), b"brotlied")
+        headers = request.responseHeaders
+        self.assertEqual(headers.getRawHeaders(b"content-encoding"), [b"br"])
+        self.assertEqual(headers.getRawHeaders(b"content-type"), [b"text/css"])
+        self.assertEqual(headers.getRawHeaders(b"vary"), [b"Accept-Encoding"])
+
+        request = self.get(b"gzip")
+        self.assertEqual(b"".join(request.written), b"gzipped")
+
+    def test_refused(self):
+        """
+        A coding with a I{q} of zero is not served, and C{*} accepts the
+        codings not named.
+        """
+        request = self.get(b"br;q=0, gzip;q=0.5")
+        self.assertEqual(b"".join(request.written), b"gzipped")
+        request = self.get(b"br;q=0, *")
+        self.assertEqual(b"".join(request.written), b"gzipped")
+
+    def test_identity(self):
+        """
+        If the request accepts none of the compressed variants, the file
+        itself is served, still varying on I{Accept-Encoding}.
+        """
+        for acceptEncoding in [None, b"deflate", b"*;q=0"]:
+            request = self.get(acceptEncoding)
+            self.assertEqual(b"".join(request.written), b"plain")
+            headers = request.responseHeaders
+            self.assertIsNone(headers.getRawHeaders(b"content-encoding"))
+            self.assertEqual(headers.getRawHeaders(b"vary"), [b"Accept-Encoding"])
+
+    def test_noVariants(self):
+        """
+        A file without compressed variants is served without a I{Vary}.
+        """
+        self.base.child("other.css").setContent(b"other")
+        request = self.get(b"gzip", b"other.css")
+        self.assertEqual(b"".join(request.written), b"other")
+        self.assertIsNone(request.responseHeaders.getRawHeaders(b"vary"))
+
+    def test_range(self):
+        """
+        Ranges of the compressed variant are served.
+        """
+        request = self.get(b"gzip", rangeHeader=b"bytes=1-3")
+        self.assertEqual(request.responseCode, http.PARTIAL_CONTENT)
+        self.assertEqual(b"".join(request.written), b"zip")
+        self.assertEqual(
+            request.responseHeaders.getRawHeaders(b"content-range"), [b"bytes 1-3/7"]
+        )
+
+    def test_encoderDisabled(self):
+        """
+        A compressed variant is not encoded again by an encoder wrapping the
+        file.
+        """
+        request = DummyRequest([b"style.css"])
+        request.requestHeaders.setRawHeaders(b"accept-encoding", [b"gzip"])
+        request._encoder = object()
+        child = resource.getChildForRequest(self.resource, request)
+        self.successResultOf(_render(child, request))
+        self.assertIsNone(request._encoder)
+
+    def test_cached(self):
+        """
+        Compressed variants are found through the L{static.FileCache} of the
+        file, if it has one.
+        """
+        cache = static.FileCache(reactor=Clock())
+        self.addCleanup(cache.close)
+        self.resource.cache = cache
+        request = self.get(b"gzip")
+        self.assertEqual(b"".join(request.written), b"gzipped")
+        self.base.child("style.css.gz").remove()
+        request = self.get(b"gzip")
+        self.assertEqual(b"".join(request.written), b"gzipped")
+
+
 class LoadMimeTypesTests(TestCase):
     """
     Tests for the MIME type loading routine.
@@ -21,6 +21,7 @@ from twisted.web.error import FlattenerError, MissingTemplateLoader, MissingRend
 
 from twisted.web.template import renderElement
 from twisted.web._element import UnexposedMethodError
+from twisted.web._flatten import _Compiled
 from twisted.web.test._util import FlattenTestCase
 from twisted.web.test.test_web import DummyRequest
 from twisted.web.server import NOT_DONE_YET
@@ -252,6 +253,20 @@ class XMLLoaderTestsMixin:
 
     test_loadTwice.suppress = [_xmlFileSuppress]  # type: ignore[attr-defined]
 
+    def test_compiled(self):
+        """
+        L{Element.render} returns the loaded document compiled, compiling it
+        only once for all the elements which use the loader.
+        """
+        loader = self.loaderFactory()
+        compiled = Element(loader).render(None)
+        self.assertIsInstance(compiled, _Compiled)
+        self.assertIs(compiled.original, loader.load())
+        self.assertEqual(compiled.parts, (b"<p>Hello, world.</p>", 1))
+        self.assertIs(Element(loader).render(None), compiled)
+
+    test_compiled.suppress = [_xmlFileSuppress]  # type: ignore[attr-defined]
+
 
 class XMLStringLoaderTests(TestCase, XMLLoaderTestsMixin):
     """
@@ -751,6 +766,55 @@ class RenderElementTests(TestCase):
 
         return d
 
+    def test_paused(self):
+        """
+        L{renderElement} registers a streaming producer with the request, and
+        does not flatten the element while it is paused.
+        """
+        producers = []
+        self.request.registerProducer = lambda producer, streaming: (
+            producers.append((producer, streaming)),
+            producer.pauseProducing(),
+        )
+        renderElement(self.request, TestElement())
+        [(producer, streaming)] = producers
+        self.assertTrue(streaming)
+        self.assertEqual(self.request.written, [b"<!DOCTYPE html>", b"\n"])
+        self.assertFalse(self.request.finished)
+
+        producer.resumeProducing()
+        self.assertEqual(
+            b"".join(self.request.written), b"<!DOCTYPE html>\n<p>Hello, world.</p>"
+        )
+        self.assertTrue(self.request.finished)
+
+    def test_producer(self):
+        """
+        L{renderElement} unregisters its producer before it finishes the
+        request.
+        """
+        renderElement(self.request, TestElement())
+        self.assertTrue(self.request.finished)
+        self.assertIsNone(self.request.producer)
+
+    def test_stopped(self):
+        """
+        If the producer L{renderElement} registers with the request is
+        stopped, because the request's connection has been lost, it stops
+        flattening and does not finish the request.
+        """
+        producers = []
+        self.request.registerProducer = lambda producer, streaming: (
+            producers.append(producer),
+            producer.pauseProducing(),
+        )
+        self.request.unregisterProducer = lambda: None
+        renderElement(self.request, TestElement())
+        [producer] = producers
+        producer.stopProducing()
+        self.assertFalse(self.request.finished)
+        self.assertEqual(self.request.written, [b"<!DOCTYPE html>", b"\n"])
+
     def test_simpleFailure(self):
         """
         L{renderElement} handles failures by writing a minimal
@@ -1068,6 +1068,125 @@ class GzipEncoderTests(unittest.TestCase):
         self.assertEqual(b"Some data", zlib.decompress(body, 16 + zlib.MAX_WBITS))
 
 
+class TaggedData(resource.Resource):
+    """
+    A resource which renders fixed data with a fixed I{ETag}, counting how
+    many times it is rendered.
+    """
+
+    isLeaf = True
+
+    def __init__(self, data, etag):
+        resource.Resource.__init__(self)
+        self.data = data
+        self.etag = etag
+        self.renders = 0
+
+    def render_GET(self, request):
+        self.renders += 1
+        if self.etag is not None:
+            request.setHeader(b"ETag", self.etag)
+        request.setHeader(b"Content-Length", b"%d" % (len(self.data),))
+        return self.data
+
+
+class GzipEncoderCacheTests(unittest.TestCase):
+    """
+    Tests for the compressed body cache of L{server.GzipEncoderFactory}.
+    """
+
+    def setUp(self):
+        self.channel = DummyChannel()
+        self.factory = server.GzipEncoderFactory(cacheSize=1024)
+        self.data = b"Some data " * 20
+
+    def get(self, etag, path=b"/foo"):
+        """
+        Get the resource at C{path}, rendering C{self.data} tagged C{etag}.
+
+        @return: The response's headers and its compressed body.
+        """
+        self.channel.transport.written.seek(0)
+        self.channel.transport.written.truncate()
+        tagged = TaggedData(self.data, etag)
+        self.channel.site.resource.putChild(
+            path[1:], resource.EncodingResourceWrapper(tagged, [self.factory])
+        )
+        request = server.Request(self.channel, False)
+        request.gotLength(0)
+        request.requestHeaders.setRawHeaders(b"Accept-Encoding", [b"gzip"])
+        request.requestReceived(b"GET", path, b"HTTP/1.0")
+        data = self.channel.transport.written.getvalue()
+        return data.split(b"\r\n\r\n", 1)
+
+    def test_compressLevel(self):
+        """
+        The compression level may be given to L{server.GzipEncoderFactory}.
+        """
+        self.assertEqual(server.GzipEncoderFactory().compressLevel, 9)
+        self.assertEqual(server.GzipEncoderFactory(1).compressLevel, 1)
+
+    def test_cached(self):
+        """
+        The compressed body of a response with a strong I{ETag} is kept and
+        sent again, with its length, when the same response is rendered
+        again.
+        """
+        headers, body = self.get(b'"tag"')
+        self.assertNotIn(b"Content-Length", headers)
+        self.assertEqual(self.factory._cache.size, len(body))
+
+        self.patch(server.zlib, "compressobj", lambda *args: self.fail("compressed"))
+        headers, cachedBody = self.get(b'"tag"')
+        self.assertEqual(cachedBody, body)
+        self.assertEqual(self.data, zlib.decompress(body, 16 + zlib.MAX_WBITS))
+        self.assertIn(b"Content-Length: %d" % (len(body),), headers)
+
+    def test_differentETag(self):
+        """
+        A response with a different I{ETag} is compressed again.
+        """
+        self.get(b'"one"')
+        self.data = b"Other data " * 20
+        headers, body = self.get(b'"two"')
+        self.assertEqual(len(self.factory._cache._bodies), 2)
+        self.assertEqual(self.data, zlib.decompress(body, 16 + zlib.MAX_WBITS))
+
+    def test_weakETag(self):
+        """
+        The compressed body of a response with a weak I{ETag} is not kept.
+        """
+        self.get(b'W/"tag"')
+        self.assertEqual(self.factory._cache.size, 0)
+
+    def test_noETag(self):
+        """
+        The compressed body of a response without an I{ETag} is not kept.
+        """
+        self.get(None)
+        self.assertEqual(self.factory._cache.size, 0)
+
+    def test_tooLarge(self):
+        """
+        A compressed body larger than the cache is not kept, and bodies are
+        evicted, least recently used first, to keep within the cache's size.
+        """
+        self.factory = server.GzipEncoderFactory(cacheSize=10)
+        self.get(b'"tag"')
+        self.assertEqual(self.factory._cache.size, 0)
+
+        self.factory = server.GzipEncoderFactory()
+        headers, body = self.get(b'"tag"')
+        self.factory = server.GzipEncoderFactory(cacheSize=len(body) * 2)
+        self.get(b'"tag"', b"/one")
+        self.get(b'"tag"', b"/two")
+        self.get(b'"tag"', b"/one")
+        self.get(b'"tag"', b"/three")
+        self.assertEqual(
+            [key[1] for key in self.factory._cache._bodies], [b"/one", b"/three"]
+        )
+
+
 class RootResource(resource.Resource):
     isLeaf = 0
 